@@ -0,0 +1,29 @@
+"""
+API Dependencies
+
+FastAPI dependency providers that resolve infrastructure from the
+Container, so routes depend on interfaces and tests can override the
+container providers.
+"""
+
+from typing import Optional
+
+from app.container import container
+from app.domain.repositories.user_repository import IAsyncUserRepository
+from app.infrastructure.adapters.ingestion_pipeline import IngestionPipeline
+from tools.src.document_data_extraction_tools.pipeline_metrics import MetricsRegistry
+
+
+def get_user_repository() -> IAsyncUserRepository:
+    """Non-blocking user repository for async route handlers"""
+    return container.async_user_repository()
+
+
+def get_ingestion_pipeline() -> IngestionPipeline:
+    """Process-wide report ingestion pipeline"""
+    return container.ingestion_pipeline()
+
+
+def get_metrics_registry() -> Optional[MetricsRegistry]:
+    """Document pipeline metrics registry; None when metrics are disabled"""
+    return container.metrics_registry()
@@ -5,10 +5,11 @@ POST /api/users/consent — registers user consent with role and language.
 GET  /api/users/consent-status?email=... — checks if user already consented.
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-from app.infrastructure.repositories.postgres_user_repository import PostgresUserRepository
-from app.application.use_cases.register_consent import RegisterConsentUseCase
+from app.api.dependencies import get_user_repository
+from app.application.use_cases.register_consent import AsyncRegisterConsentUseCase
+from app.domain.repositories.user_repository import IAsyncUserRepository
 
 router = APIRouter()
 
@@ -21,11 +22,11 @@ class ConsentRequest(BaseModel):
 
 
 @router.post("/consent")
-async def register_consent(req: ConsentRequest):
+async def register_consent(req: ConsentRequest,
+                           repo: IAsyncUserRepository = Depends(get_user_repository)):
     try:
-        repo = PostgresUserRepository()
-        use_case = RegisterConsentUseCase(user_repo=repo)
-        user = use_case.execute(
+        use_case = AsyncRegisterConsentUseCase(user_repo=repo)
+        user = await use_case.execute(
             email=req.email,
             name=req.name,
             role=req.role,
@@ -45,11 +46,11 @@ async def register_consent(req: ConsentRequest):
 
 
 @router.get("/consent-status")
-async def consent_status(email: str):
+async def consent_status(email: str,
+                         repo: IAsyncUserRepository = Depends(get_user_repository)):
     """Check if a user has already provided consent."""
     try:
-        repo = PostgresUserRepository()
-        user = repo.find_by_email(email)
+        user = await repo.find_by_email(email)
         if user and user.consent_status:
             return {
                 "consented": True,
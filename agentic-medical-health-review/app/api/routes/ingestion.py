@@ -0,0 +1,89 @@
+"""
+Report Ingestion API Routes
+
+POST /api/reports/upload?user_id=...&filename=...[&report_date=...] — store the raw request body and queue it for ingestion (202).
+GET  /api/reports/jobs/{job_id} — ingestion progress of an uploaded report.
+GET  /api/reports/pipeline — queue depths and job counts.
+"""
+
+import asyncio
+import os
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+
+from app.api.dependencies import get_ingestion_pipeline
+from app.config import config
+from app.infrastructure.adapters.ingestion_pipeline import IngestionPipeline, PipelineBusyError
+
+router = APIRouter()
+
+# Upload bytes buffered per disk write; writes run in a worker thread
+WRITE_BUFFER_BYTES = 1024 * 1024
+
+
+@router.post("/upload", status_code=202)
+async def upload_report(user_id: str, filename: str, request: Request,
+                        report_date: Optional[datetime] = None,
+                        pipeline: IngestionPipeline = Depends(get_ingestion_pipeline)):
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in config.storage.allowed_extensions:
+        raise HTTPException(status_code=415, detail=f"Unsupported file type: {extension or filename}")
+
+    max_bytes = config.storage.max_file_size_mb * 1024 * 1024
+    os.makedirs(config.storage.upload_path, exist_ok=True)
+    path = os.path.join(config.storage.upload_path, f"{uuid.uuid4()}{extension}")
+
+    # Stream to disk so large uploads are never held in memory, and keep
+    # the blocking file I/O off the event loop
+    size = 0
+    try:
+        f = await asyncio.to_thread(open, path, "wb")
+        try:
+            buffer = bytearray()
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"File exceeds {config.storage.max_file_size_mb} MB"
+                    )
+                buffer += chunk
+                if len(buffer) >= WRITE_BUFFER_BYTES:
+                    await asyncio.to_thread(f.write, buffer)
+                    buffer.clear()
+            if buffer:
+                await asyncio.to_thread(f.write, buffer)
+        finally:
+            await asyncio.to_thread(f.close)
+        if size == 0:
+            raise HTTPException(status_code=400, detail="Empty upload")
+        job = await pipeline.submit(user_id, path, report_date)
+    except PipelineBusyError as e:
+        os.remove(path)
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+
+    return {
+        "job_id": job.job_id,
+        "status": job.status,
+        "status_url": f"/api/reports/jobs/{job.job_id}"
+    }
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str, pipeline: IngestionPipeline = Depends(get_ingestion_pipeline)):
+    job = pipeline.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@router.get("/pipeline")
+async def pipeline_stats(pipeline: IngestionPipeline = Depends(get_ingestion_pipeline)):
+    return pipeline.stats()
@@ -0,0 +1,22 @@
+"""
+Metrics API Routes
+
+GET /metrics — document pipeline stage latencies and counters in the
+Prometheus text exposition format (404 when METRICS_ENABLED=false).
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+
+from app.api.dependencies import get_metrics_registry
+from tools.src.document_data_extraction_tools.pipeline_metrics import MetricsRegistry
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def metrics(registry: Optional[MetricsRegistry] = Depends(get_metrics_registry)):
+    if registry is None:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return Response(content=registry.render(), media_type=MetricsRegistry.CONTENT_TYPE)
@@ -5,10 +5,11 @@ POST /api/users/profile — save/update user profile (name, birth date, gender,
 GET  /api/users/profile?email=... — get user profile.
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from typing import Optional
-from app.infrastructure.repositories.postgres_user_repository import PostgresUserRepository
+from app.api.dependencies import get_user_repository
+from app.domain.repositories.user_repository import IAsyncUserRepository
 
 router = APIRouter()
 
@@ -24,10 +25,10 @@ class ProfileRequest(BaseModel):
 
 
 @router.post("/profile")
-async def save_profile(req: ProfileRequest):
+async def save_profile(req: ProfileRequest,
+                       repo: IAsyncUserRepository = Depends(get_user_repository)):
     try:
-        repo = PostgresUserRepository()
-        user = repo.update_profile(
+        user = await repo.update_profile(
             email=req.email,
             first_name=req.first_name,
             last_name=req.last_name,
@@ -58,10 +59,10 @@ async def save_profile(req: ProfileRequest):
 
 
 @router.get("/profile")
-async def get_profile(email: str):
+async def get_profile(email: str,
+                      repo: IAsyncUserRepository = Depends(get_user_repository)):
     try:
-        repo = PostgresUserRepository()
-        user = repo.find_by_email(email)
+        user = await repo.find_by_email(email)
         if not user:
             return {"profile_complete": False}
         return {
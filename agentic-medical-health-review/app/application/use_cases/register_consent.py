@@ -7,7 +7,7 @@ DIP: Depends on IUserRepository interface, not implementation.
 """
 
 from app.domain.entities.user import User
-from app.domain.repositories.user_repository import IUserRepository
+from app.domain.repositories.user_repository import IAsyncUserRepository, IUserRepository
 
 
 class RegisterConsentUseCase:
@@ -15,22 +15,41 @@ class RegisterConsentUseCase:
         self.user_repo = user_repo
 
     def execute(self, email: str, name: str, role: str, language: str) -> User:
-        # Split Google name into first/last
-        parts = name.strip().split(' ', 1)
-        first_name = parts[0] if parts else ''
-        last_name = parts[1] if len(parts) > 1 else ''
-
         existing = self.user_repo.find_by_email(email)
 
         if existing:
             return self.user_repo.update_consent(email, role, language)
 
-        user = User(
-            email=email,
-            first_name=first_name,
-            last_name=last_name,
-            role=role,
-            preferred_language=language,
-        )
-        user.grant_consent()
-        return self.user_repo.save(user)
+        return self.user_repo.save(_new_consented_user(email, name, role, language))
+
+
+class AsyncRegisterConsentUseCase:
+    """Same workflow as RegisterConsentUseCase on an IAsyncUserRepository"""
+
+    def __init__(self, user_repo: IAsyncUserRepository):
+        self.user_repo = user_repo
+
+    async def execute(self, email: str, name: str, role: str, language: str) -> User:
+        existing = await self.user_repo.find_by_email(email)
+
+        if existing:
+            return await self.user_repo.update_consent(email, role, language)
+
+        return await self.user_repo.save(_new_consented_user(email, name, role, language))
+
+
+def _new_consented_user(email: str, name: str, role: str, language: str) -> User:
+    # Split Google name into first/last
+    parts = name.strip().split(' ', 1)
+    first_name = parts[0] if parts else ''
+    last_name = parts[1] if len(parts) > 1 else ''
+
+    user = User(
+        email=email,
+        first_name=first_name,
+        last_name=last_name,
+        role=role,
+        preferred_language=language,
+    )
+    user.grant_consent()
+    return user
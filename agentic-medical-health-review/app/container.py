@@ -13,6 +13,11 @@ SOLID Principles:
 
 from dependency_injector import containers, providers
 from app.config import config
+from app.infrastructure.adapters.ingestion_pipeline import IngestionPipeline
+from app.infrastructure.database.async_pool import AsyncDatabasePool
+from app.infrastructure.repositories.asyncpg_user_repository import AsyncpgUserRepository
+from app.infrastructure.repositories.postgres_user_repository import PostgresUserRepository
+from tools.src.document_data_extraction_tools.pipeline_metrics import get_registry
 
 
 class Container(containers.DeclarativeContainer):
@@ -47,16 +52,26 @@ class Container(containers.DeclarativeContainer):
     #     connection_string=app_config.provided.database.connection_string
     # )
     
+    # asyncpg pool for async request handlers (created lazily in the event loop)
+    async_database = providers.Singleton(
+        AsyncDatabasePool.from_config,
+        app_config
+    )
+    
     # ============================================
     # Infrastructure Layer - Repository Implementations
     # ============================================
     
-    # Repositories will be implemented in task 5
-    # user_repository = providers.Factory(
-    #     PostgresUserRepository,
-    #     db_connection=database
-    # )
+    # Blocking psycopg2 repository (scripts, tools, sync use cases)
+    user_repository = providers.Factory(PostgresUserRepository)
     
+    # Non-blocking repository used by the async API routes
+    async_user_repository = providers.Factory(
+        AsyncpgUserRepository,
+        pool=async_database
+    )
+    
+    # Remaining repositories will be implemented in task 5
     # report_repository = providers.Factory(
     #     PostgresReportRepository,
     #     db_connection=database
@@ -76,7 +91,16 @@ class Container(containers.DeclarativeContainer):
     # Infrastructure Layer - External Service Adapters
     # ============================================
     
-    # Adapters will be implemented in task 6
+    # Staged report ingestion (workers start with the first upload)
+    ingestion_pipeline = providers.Singleton(
+        IngestionPipeline.from_config,
+        app_config
+    )
+    
+    # Document pipeline metrics (process-wide; None when METRICS_ENABLED=false)
+    metrics_registry = providers.Callable(get_registry)
+    
+    # Remaining adapters will be implemented in task 6
     # lab_report_parser = providers.Factory(
     #     LabReportParserAdapter
     # )
@@ -28,3 +28,25 @@ class IUserRepository(ABC):
                        birth_date, gender: str, height_cm: float,
                        weight_kg: float) -> Optional[User]:
         pass
+
+
+class IAsyncUserRepository(ABC):
+    """Asyncio counterpart of IUserRepository for use from async request handlers"""
+
+    @abstractmethod
+    async def find_by_email(self, email: str) -> Optional[User]:
+        pass
+
+    @abstractmethod
+    async def save(self, user: User) -> User:
+        pass
+
+    @abstractmethod
+    async def update_consent(self, email: str, role: str, language: str) -> Optional[User]:
+        pass
+
+    @abstractmethod
+    async def update_profile(self, email: str, first_name: str, last_name: str,
+                             birth_date, gender: str, height_cm: float,
+                             weight_kg: float) -> Optional[User]:
+        pass
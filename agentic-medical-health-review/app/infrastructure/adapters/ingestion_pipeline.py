@@ -0,0 +1,353 @@
+"""
+Document Ingestion Pipeline
+
+Turns uploaded lab reports into normalized parameters and updated trends
+through five stages, each with its own bounded queue and worker pool:
+
+    rasterize -> ocr -> extract -> normalize -> analyze
+
+- rasterize: validate the file, check the OCR cache, read the PDF text
+  layer and plan the page tasks (pages are rendered inside the OCR worker
+  processes, so bitmaps never cross process boundaries)
+- ocr: CPU-bound; page tasks run in ParallelOCRExecutor's process pool
+- extract: I/O-bound LLM calls, awaited on the event loop
+- normalize: store the report and its parameters and run normalize_batch
+  (blocking psycopg2, run in threads)
+- analyze: fold the new values into the incremental trend accumulators
+
+A worker hands a job to the next stage with an awaited put(), so when a
+downstream queue is full the upstream workers pause (backpressure). When
+the first queue is full, submit() raises PipelineBusyError instead of
+buffering without bound.
+"""
+
+import asyncio
+import os
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+STAGES = ("rasterize", "ocr", "extract", "normalize", "analyze")
+
+
+class PipelineBusyError(Exception):
+    """Raised when the pipeline's intake queue is full"""
+
+
+@dataclass
+class IngestionJob:
+    """One uploaded document moving through the pipeline"""
+    user_id: str
+    file_path: str
+    report_date: Optional[datetime] = None  # when the sample was taken, if known
+    job_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    status: str = "queued"  # queued, a stage name, completed or failed
+    stage: Optional[str] = None
+    stages_completed: int = 0
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+    pages: int = 0
+    tests_found: int = 0
+    parameters_stored: int = 0
+    parameters_normalized: int = 0
+    parameters_flagged: int = 0
+    trends: Dict[str, str] = field(default_factory=dict)
+    warnings: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    updated_at: datetime = field(default_factory=datetime.utcnow)
+    # Stage outputs handed to the next stage (not reported)
+    data: Dict[str, Any] = field(default_factory=dict, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    @property
+    def measured_at(self) -> datetime:
+        """Report date for the stored parameters and trends (upload time if not given)"""
+        return self.report_date or self.created_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Status report for the job status endpoint"""
+        return {
+            "job_id": self.job_id,
+            "user_id": self.user_id,
+            "report_date": self.measured_at.isoformat(),
+            "status": self.status,
+            "stage": self.stage,
+            "progress": round(self.stages_completed / len(STAGES), 2),
+            "stage_seconds": self.stage_seconds,
+            "pages": self.pages,
+            "tests_found": self.tests_found,
+            "parameters_stored": self.parameters_stored,
+            "parameters_normalized": self.parameters_normalized,
+            "parameters_flagged": self.parameters_flagged,
+            "trends": self.trends,
+            "warnings": self.warnings,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat()
+        }
+
+
+class IngestionPipeline:
+    """Staged asyncio pipeline with bounded queues between the stages"""
+
+    def __init__(
+        self,
+        queue_size: int = 16,
+        workers: Optional[Dict[str, int]] = None,
+        ocr_processes: Optional[int] = None,
+        model_name: str = "gpt-4o-mini",
+        job_retention: int = 1000
+    ):
+        """
+        Args:
+            queue_size: Capacity of each stage's input queue
+            workers: Concurrent jobs per stage (defaults: rasterize 2, ocr 2,
+                extract 4, normalize 2, analyze 2)
+            ocr_processes: OCR worker processes (default: OCR_WORKERS, then CPU count)
+            model_name: LLM used by the extract stage
+            job_retention: Finished jobs kept for status queries
+        """
+        self.queue_size = queue_size
+        self.workers = {"rasterize": 2, "ocr": 2, "extract": 4, "normalize": 2, "analyze": 2}
+        self.workers.update(workers or {})
+        self.ocr_processes = ocr_processes
+        self.model_name = model_name
+        self.job_retention = job_retention
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._ocr_executor = None
+
+    @classmethod
+    def from_config(cls, config) -> "IngestionPipeline":
+        """
+        Build a pipeline from the application config and INGEST_* variables
+
+        INGEST_QUEUE_SIZE (default: 16), INGEST_<STAGE>_WORKERS,
+        LLM_MODEL (default: gpt-4o-mini), INGEST_JOB_RETENTION (default: 1000);
+        OCR processes follow OCR_WORKERS.
+
+        Args:
+            config: app.config.Config instance
+
+        Returns:
+            IngestionPipeline (workers start with the first submitted job)
+        """
+        workers = {
+            stage: int(os.environ[f"INGEST_{stage.upper()}_WORKERS"])
+            for stage in STAGES if os.getenv(f"INGEST_{stage.upper()}_WORKERS")
+        }
+        return cls(
+            queue_size=int(os.getenv("INGEST_QUEUE_SIZE", "16")),
+            workers=workers,
+            model_name=os.getenv("LLM_MODEL", "gpt-4o-mini"),
+            job_retention=int(os.getenv("INGEST_JOB_RETENTION", "1000"))
+        )
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self):
+        """Create the stage queues and workers in the running event loop"""
+        if self.running:
+            return
+        self._queues = {stage: asyncio.Queue(maxsize=self.queue_size) for stage in STAGES}
+        for stage in STAGES:
+            for n in range(max(1, self.workers[stage])):
+                self._tasks.append(asyncio.create_task(self._worker(stage), name=f"ingest-{stage}-{n}"))
+
+    async def close(self):
+        """Stop the workers and the OCR processes (queued jobs are abandoned)"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._ocr_executor is not None:
+            await asyncio.to_thread(self._ocr_executor.close)
+            self._ocr_executor = None
+
+    async def submit(self, user_id: str, file_path: str, report_date: Optional[datetime] = None) -> IngestionJob:
+        """
+        Queue a document for ingestion
+
+        Args:
+            user_id: Owner of the report (users.user_id)
+            file_path: Stored upload
+            report_date: When the sample was taken (default: upload time)
+
+        Returns:
+            IngestionJob (poll get_job() for progress)
+
+        Raises:
+            PipelineBusyError: If the intake queue is full
+        """
+        await self.start()
+        job = IngestionJob(user_id=user_id, file_path=str(file_path), report_date=report_date)
+        try:
+            self._queues[STAGES[0]].put_nowait(job)
+        except asyncio.QueueFull:
+            raise PipelineBusyError(f"Ingestion queue is full ({self.queue_size} jobs waiting)")
+        self._remember(job)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[IngestionJob]:
+        """Job by ID, or None if unknown or expired"""
+        return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depths and job counts per status"""
+        statuses: Dict[str, int] = {}
+        for job in self._jobs.values():
+            statuses[job.status] = statuses.get(job.status, 0) + 1
+        return {
+            "running": self.running,
+            "queue_size": self.queue_size,
+            "queues": {stage: queue.qsize() for stage, queue in self._queues.items()},
+            "workers": dict(self.workers),
+            "jobs": statuses
+        }
+
+    def _remember(self, job: IngestionJob):
+        """Track a job, dropping the oldest finished ones beyond job_retention."""
+        self._jobs[job.job_id] = job
+        excess = len(self._jobs) - self.job_retention
+        for job_id in [job_id for job_id, old in self._jobs.items() if old.finished][:max(0, excess)]:
+            del self._jobs[job_id]
+
+    async def _worker(self, stage: str):
+        """Take jobs from a stage's queue, run the stage and hand them on."""
+        queue = self._queues[stage]
+        handler = getattr(self, f"_{stage}")
+        index = STAGES.index(stage)
+        next_queue = self._queues[STAGES[index + 1]] if index + 1 < len(STAGES) else None
+
+        while True:
+            job = await queue.get()
+            try:
+                job.status = job.stage = stage
+                job.updated_at = datetime.utcnow()
+                started = time.perf_counter()
+                try:
+                    await handler(job)
+                except Exception as e:
+                    job.status = "failed"
+                    job.error = f"{stage}: {e}"
+                    job.data.clear()
+                    continue
+                finally:
+                    job.stage_seconds[stage] = round(time.perf_counter() - started, 3)
+                    job.updated_at = datetime.utcnow()
+
+                job.stages_completed = index + 1
+                if next_queue is None:
+                    job.status = "completed"
+                    job.stage = None
+                    job.data.clear()
+                else:
+                    # Blocks while the next stage is saturated (backpressure)
+                    await next_queue.put(job)
+            finally:
+                queue.task_done()
+
+    # ------------------------------------------------------------------
+    # Stages
+    # ------------------------------------------------------------------
+
+    def _get_ocr_executor(self):
+        """ParallelOCRExecutor shared by the OCR stage (imported on first use)."""
+        if self._ocr_executor is None:
+            from tools.src.document_data_extraction_tools.lab_report_parser.parallel_ocr import ParallelOCRExecutor
+            self._ocr_executor = ParallelOCRExecutor(max_workers=self.ocr_processes)
+        return self._ocr_executor
+
+    async def _rasterize(self, job: IngestionJob):
+        plan = await asyncio.to_thread(self._get_ocr_executor().plan_document, job.file_path)
+        job.pages = len(plan["pages"]) if plan["pages"] is not None else (
+            len(plan["text_layer_pages"]) + len(plan["tasks"])
+        )
+        job.data["plan"] = plan
+
+    async def _ocr(self, job: IngestionJob):
+        from tools.src.document_data_extraction_tools.lab_report_parser.lab_report_parser import LabReportParser
+
+        plan = job.data.pop("plan")
+        pages = await self._get_ocr_executor().aextract_document_pages(plan)
+        job.data["raw_text"] = LabReportParser.pages_to_text(pages, plan["file_type"])
+
+    async def _extract(self, job: IngestionJob):
+        from tools.src.document_data_extraction_tools.lab_report_parser.llm_structured_extractor import (
+            get_default_extractor
+        )
+
+        extractor = get_default_extractor(self.model_name)
+        result = (await extractor.aextract_batch([job.data.pop("raw_text")], [job.file_path]))[0]
+        if result["metadata"].get("extraction_status") == "error":
+            raise RuntimeError(result["metadata"].get("error_message", "extraction failed"))
+        job.data["tests"] = result["tests"]
+        job.tests_found = len(result["tests"])
+
+    async def _normalize(self, job: IngestionJob):
+        await asyncio.to_thread(self._store_and_normalize, job)
+
+    async def _analyze(self, job: IngestionJob):
+        await asyncio.to_thread(self._update_trends, job)
+
+    def _store_and_normalize(self, job: IngestionJob):
+        """
+        Insert the report and its parameters, then normalize them as one batch
+
+        Raises:
+            RuntimeError: If the normalization transaction rolled back (the
+                stored parameters stay 'pending' and can be normalized again)
+        """
+        from models.database_connection import DatabaseConnection
+        from tools.src.document_data_extraction_tools.normalize_lab_data import normalize_batch
+        from tools.src.document_data_extraction_tools.report_store import build_parameters, store_reports
+
+        parameters, warnings = build_parameters(job.user_id, job.data.pop("tests"))
+        job.warnings.extend(warnings)
+        job.data["normalized"] = []
+        if not parameters:
+            return
+
+        with DatabaseConnection() as db:
+            store_reports(db, [{
+                "user_id": job.user_id,
+                "file_path": job.file_path,
+                "report_date": job.measured_at,
+                "parameters": parameters
+            }])
+        job.parameters_stored = len(parameters)
+
+        batch = normalize_batch(parameters)
+        if batch["rolled_back"]:
+            raise RuntimeError(
+                f"normalization rolled back, {len(parameters)} parameters left pending: {batch['error']}"
+            )
+        job.parameters_normalized = batch["successful"]
+        job.parameters_flagged = batch["flagged"]
+        job.data["normalized"] = [
+            result["normalized_parameter"] for result in batch["results"] if result["success"]
+        ]
+
+    def _update_trends(self, job: IngestionJob):
+        """Add the normalized values to each parameter's trend accumulator."""
+        from models.database_connection import DatabaseConnection
+        from tools.src.document_data_extraction_tools.report_store import update_trends
+
+        normalized = job.data.pop("normalized")
+        if not normalized:
+            return
+
+        timestamps = {parameter["original_parameter_id"]: job.measured_at for parameter in normalized}
+        with DatabaseConnection() as db:
+            trends = update_trends(db, normalized, timestamps)
+        job.trends = {canonical_name: trend_type for (_, canonical_name), trend_type in trends.items()}
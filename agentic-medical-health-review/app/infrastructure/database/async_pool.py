@@ -0,0 +1,135 @@
+"""
+Async Database Pool
+
+asyncpg connection pool for async request handlers. Queries are awaited on
+the event loop instead of blocking it like psycopg2 calls do. The pool is
+created lazily inside the running loop and sized by the same DB_POOL_*
+variables as the synchronous pool in models.database_connection.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Dict, Optional
+
+from app.config import DatabaseConfig
+
+
+class AsyncDatabasePool:
+    """Lazily created asyncpg pool with acquire-wait metrics"""
+
+    def __init__(
+        self,
+        database: DatabaseConfig,
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 30.0,
+        max_lifetime: float = 1800.0
+    ):
+        """
+        Args:
+            database: Connection settings
+            min_size: Connections kept open
+            max_size: Maximum open connections
+            timeout: Seconds to wait for a free connection
+            max_lifetime: Seconds after which idle connections are replaced
+        """
+        self.database = database
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self._pool = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._metrics = {
+            'acquires': 0,
+            'wait_seconds_total': 0.0,
+            'wait_seconds_max': 0.0
+        }
+
+    @classmethod
+    def from_config(cls, config) -> "AsyncDatabasePool":
+        """
+        Build a pool from the application config and DB_POOL_* variables
+
+        Args:
+            config: app.config.Config instance
+
+        Returns:
+            AsyncDatabasePool (no connections are opened until first use)
+        """
+        return cls(
+            config.database,
+            min_size=int(os.getenv('DB_POOL_MIN_SIZE', '1')),
+            max_size=int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+            timeout=float(os.getenv('DB_POOL_TIMEOUT', '30')),
+            max_lifetime=float(os.getenv('DB_POOL_MAX_LIFETIME', '1800'))
+        )
+
+    async def _get_pool(self):
+        """Create the asyncpg pool on first use."""
+        if self._pool is None:
+            if self._lock is None:
+                self._lock = asyncio.Lock()
+            async with self._lock:
+                if self._pool is None:
+                    try:
+                        import asyncpg
+                    except ImportError as e:
+                        raise ImportError(
+                            "asyncpg is required for async database access: pip install asyncpg"
+                        ) from e
+                    self._pool = await asyncpg.create_pool(
+                        host=self.database.host,
+                        port=self.database.port,
+                        database=self.database.database,
+                        user=self.database.user,
+                        password=self.database.password,
+                        min_size=self.min_size,
+                        max_size=self.max_size,
+                        max_inactive_connection_lifetime=self.max_lifetime
+                    )
+        return self._pool
+
+    async def fetchrow(self, query: str, *args) -> Optional[Dict[str, Any]]:
+        """
+        Run a query and return its first row
+
+        The statement runs in its own implicit transaction (committed on
+        success, rolled back on error).
+
+        Args:
+            query: SQL with $1, $2, ... placeholders
+            *args: Query parameters
+
+        Returns:
+            Row as a dict, or None if the query returned no rows
+        """
+        pool = await self._get_pool()
+        start = time.perf_counter()
+        async with pool.acquire(timeout=self.timeout) as conn:
+            wait = time.perf_counter() - start
+            self._metrics['acquires'] += 1
+            self._metrics['wait_seconds_total'] += wait
+            self._metrics['wait_seconds_max'] = max(self._metrics['wait_seconds_max'], wait)
+            row = await conn.fetchrow(query, *args)
+        return dict(row) if row is not None else None
+
+    async def close(self):
+        """Close all pooled connections"""
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await pool.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Pool size and acquire-wait metrics
+
+        Returns:
+            Dict with open/idle connection counts (when created) and wait counters
+        """
+        stats = {'max_size': self.max_size, **self._metrics}
+        if self._pool is not None:
+            stats['size'] = self._pool.get_size()
+            stats['idle'] = self._pool.get_idle_size()
+        return stats
@@ -0,0 +1,93 @@
+"""
+Asyncpg User Repository Implementation (Adapter)
+
+Implements IAsyncUserRepository on AsyncDatabasePool, so async routes
+await database I/O instead of blocking the event loop.
+LSP: Returns the same User entities as PostgresUserRepository.
+"""
+
+from typing import Optional
+from datetime import date, datetime
+from decimal import Decimal
+from app.domain.entities.user import User
+from app.domain.repositories.user_repository import IAsyncUserRepository
+from app.infrastructure.database.async_pool import AsyncDatabasePool
+from app.infrastructure.repositories.postgres_user_repository import PostgresUserRepository
+
+
+class AsyncpgUserRepository(IAsyncUserRepository):
+
+    def __init__(self, pool: AsyncDatabasePool):
+        self.pool = pool
+
+    async def find_by_email(self, email: str) -> Optional[User]:
+        row = await self.pool.fetchrow("SELECT * FROM users WHERE email = $1", email)
+        if not row:
+            return None
+        return self._row_to_user(row)
+
+    async def save(self, user: User) -> User:
+        row = await self.pool.fetchrow(
+            """INSERT INTO users
+                 (email, first_name, last_name, role, preferred_language,
+                  consent_status, consent_timestamp)
+               VALUES ($1, $2, $3, $4, $5, $6, $7)
+               ON CONFLICT (email) DO UPDATE SET
+                 first_name = EXCLUDED.first_name,
+                 last_name = EXCLUDED.last_name,
+                 role = EXCLUDED.role,
+                 preferred_language = EXCLUDED.preferred_language,
+                 consent_status = EXCLUDED.consent_status,
+                 consent_timestamp = EXCLUDED.consent_timestamp
+               RETURNING *""",
+            user.email, user.first_name, user.last_name,
+            user.role, user.preferred_language,
+            user.consent_status, user.consent_timestamp,
+        )
+        return self._row_to_user(row)
+
+    async def update_consent(self, email: str, role: str, language: str) -> Optional[User]:
+        now = datetime.utcnow()
+        row = await self.pool.fetchrow(
+            """UPDATE users
+               SET role = $1,
+                   preferred_language = $2,
+                   consent_status = TRUE,
+                   consent_timestamp = $3
+               WHERE email = $4
+               RETURNING *""",
+            role, language, now, email,
+        )
+        if not row:
+            return None
+        return self._row_to_user(row)
+
+    async def update_profile(self, email: str, first_name: str, last_name: str,
+                             birth_date, gender: str, height_cm: float,
+                             weight_kg: float) -> Optional[User]:
+        # asyncpg binds typed values, where psycopg2 let PostgreSQL parse them
+        if isinstance(birth_date, str):
+            birth_date = date.fromisoformat(birth_date)
+        height_cm = Decimal(str(height_cm)) if height_cm is not None else None
+        weight_kg = Decimal(str(weight_kg)) if weight_kg is not None else None
+        row = await self.pool.fetchrow(
+            """UPDATE users
+               SET first_name = $1,
+                   last_name = $2,
+                   birth_date = $3,
+                   gender = $4,
+                   height_cm = $5,
+                   weight_kg = $6,
+                   profile_complete = TRUE
+               WHERE email = $7
+               RETURNING *""",
+            first_name, last_name, birth_date, gender,
+            height_cm, weight_kg, email,
+        )
+        if not row:
+            return None
+        return self._row_to_user(row)
+
+    @staticmethod
+    def _row_to_user(row: dict) -> User:
+        return PostgresUserRepository._row_to_user(row)
@@ -4,15 +4,70 @@ Logging Infrastructure with Appropriate Handlers
 This module sets up centralized logging for the application with
 file and console handlers, proper formatting, and log rotation.
 
+Records are handed to a QueueHandler and written by a QueueListener
+thread, so the code that logs never blocks on console or file I/O.
+
 SOLID Principles:
 - SRP: Only handles logging configuration
 - OCP: New handlers can be added without modifying existing code
 """
 
+import atexit
+import functools
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import re
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from typing import Optional
+
+
+# Attributes every LogRecord has; anything else came from `extra`
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Formatter that appends a record's `extra` fields as key=value pairs
+
+    Example:
+        logger.debug("OCR page done", extra={"page": 3, "regions": 41, "ms": 812.4})
+        -> ... - DEBUG - OCR page done | page=3 regions=41 ms=812.4
+    """
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        message = super().formatMessage(record)
+        fields = [
+            f"{key}={value}" for key, value in vars(record).items()
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_")
+        ]
+        return f"{message} | {' '.join(fields)}" if fields else message
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves all formatting to the listener thread
+
+    The stdlib QueueHandler merges the message and arguments before
+    enqueueing so records can be pickled; the queue here never leaves the
+    process, so the record is passed on as is. Log arguments must not be
+    mutated after the call.
+
+    When the queue is full the record is dropped (and counted) instead of
+    blocking the caller.
+    """
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
 
 
 class LoggingConfig:
@@ -26,7 +81,7 @@ class LoggingConfig:
     - Separate log levels for different environments
     """
     
-    # Log format
+    # Log format (extra fields are appended by StructuredFormatter)
     LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
     
@@ -36,13 +91,20 @@ class LoggingConfig:
     MAX_BYTES = 10 * 1024 * 1024  # 10 MB
     BACKUP_COUNT = 5
     
+    # Records waiting for the listener thread; beyond this, new records are dropped
+    QUEUE_SIZE = 10000
+    
+    _listener: Optional[QueueListener] = None
+    
     @classmethod
-    def setup_logging(cls, log_level: str = 'INFO') -> None:
+    def setup_logging(cls, log_level: str = 'INFO', use_queue: bool = True) -> None:
         """
         Set up logging with console and file handlers
         
         Args:
             log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+            use_queue: Write records from a background listener thread
+                (False: write synchronously in the logging thread)
         """
         # Create logs directory if it doesn't exist
         log_dir = Path(cls.LOG_DIR)
@@ -53,16 +115,16 @@ class LoggingConfig:
         root_logger.setLevel(getattr(logging, log_level.upper()))
         
         # Clear existing handlers
+        cls.stop_listener()
         root_logger.handlers.clear()
         
         # Create formatters
-        formatter = logging.Formatter(cls.LOG_FORMAT, cls.DATE_FORMAT)
+        formatter = StructuredFormatter(cls.LOG_FORMAT, cls.DATE_FORMAT)
         
         # Console handler
         console_handler = logging.StreamHandler()
         console_handler.setLevel(logging.INFO)
         console_handler.setFormatter(formatter)
-        root_logger.addHandler(console_handler)
         
         # File handler with rotation
         log_file_path = log_dir / cls.LOG_FILE
@@ -73,11 +135,30 @@ class LoggingConfig:
         )
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(formatter)
-        root_logger.addHandler(file_handler)
+        
+        if use_queue:
+            cls._listener = QueueListener(
+                queue.Queue(cls.QUEUE_SIZE), console_handler, file_handler,
+                respect_handler_level=True
+            )
+            root_logger.addHandler(DeferredQueueHandler(cls._listener.queue))
+            cls._listener.start()
+        else:
+            root_logger.addHandler(console_handler)
+            root_logger.addHandler(file_handler)
         
         # Log startup message
         root_logger.info("Logging system initialized")
     
+    @classmethod
+    def stop_listener(cls) -> None:
+        """Write out queued records and stop the listener thread"""
+        if cls._listener is not None:
+            cls._listener.stop()
+            for handler in cls._listener.handlers:
+                handler.close()
+            cls._listener = None
+    
     @classmethod
     def get_logger(cls, name: str) -> logging.Logger:
         """
@@ -112,9 +193,38 @@ class SanitizedLogger:
         'refresh_token', 'oauth_token', 'authorization', 'auth'
     ]
     
+    # Sanitized format strings (messages logged with arguments) kept per class
+    FORMAT_CACHE_SIZE = 1024
+    
     def __init__(self, logger: logging.Logger):
         self.logger = logger
     
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._compile()
+    
+    @classmethod
+    def _compile(cls) -> None:
+        """
+        Build the single-pass sanitizer for SENSITIVE_FIELDS
+        
+        One case-insensitive alternation replaces the per-field patterns
+        (field_name=value or field_name: value); longer names come first,
+        so "access_token" wins over "token".
+        """
+        fields = sorted(cls.SENSITIVE_FIELDS, key=len, reverse=True)
+        cls._pattern = re.compile(
+            rf"({'|'.join(map(re.escape, fields))})[=:]\s*[^\s,\)}}]+",
+            re.IGNORECASE
+        )
+        cls._sanitize_format = staticmethod(
+            functools.lru_cache(maxsize=cls.FORMAT_CACHE_SIZE)(cls._sanitize_text)
+        )
+    
+    @classmethod
+    def _sanitize_text(cls, message: str) -> str:
+        return cls._pattern.sub(lambda match: f"{match.group(1).lower()}=[REDACTED]", message)
+    
     def _sanitize_message(self, message: str) -> str:
         """
         Sanitize sensitive data from log message
@@ -125,40 +235,54 @@ class SanitizedLogger:
         Returns:
             Sanitized log message
         """
-        sanitized = message
-        
-        # Replace sensitive field values with [REDACTED]
-        for field in self.SENSITIVE_FIELDS:
-            # Pattern: field_name=value or field_name: value
-            import re
-            pattern = rf'{field}[=:]\s*[^\s,\)}}]+'
-            sanitized = re.sub(pattern, f'{field}=[REDACTED]', sanitized, flags=re.IGNORECASE)
+        return self._sanitize_text(str(message))
+    
+    def _log(self, level: int, message: str, args: tuple, kwargs: dict) -> None:
+        """
+        Sanitize and log a message if the level is enabled
         
-        return sanitized
+        Messages logged with arguments are format strings that repeat, so
+        their sanitized form is cached. Messages without arguments usually
+        have values baked in (and may hold secrets), so they are not kept.
+        """
+        if not self.logger.isEnabledFor(level):
+            return
+        if args and isinstance(message, str):
+            sanitized = self._sanitize_format(message)
+        else:
+            sanitized = self._sanitize_message(message)
+        self.logger.log(level, sanitized, *args, **kwargs)
     
     def debug(self, message: str, *args, **kwargs) -> None:
         """Log debug message with sanitization"""
-        self.logger.debug(self._sanitize_message(message), *args, **kwargs)
+        self._log(logging.DEBUG, message, args, kwargs)
     
     def info(self, message: str, *args, **kwargs) -> None:
         """Log info message with sanitization"""
-        self.logger.info(self._sanitize_message(message), *args, **kwargs)
+        self._log(logging.INFO, message, args, kwargs)
     
     def warning(self, message: str, *args, **kwargs) -> None:
         """Log warning message with sanitization"""
-        self.logger.warning(self._sanitize_message(message), *args, **kwargs)
+        self._log(logging.WARNING, message, args, kwargs)
     
     def error(self, message: str, *args, **kwargs) -> None:
         """Log error message with sanitization"""
-        self.logger.error(self._sanitize_message(message), *args, **kwargs)
+        self._log(logging.ERROR, message, args, kwargs)
     
     def critical(self, message: str, *args, **kwargs) -> None:
         """Log critical message with sanitization"""
-        self.logger.critical(self._sanitize_message(message), *args, **kwargs)
+        self._log(logging.CRITICAL, message, args, kwargs)
+
+
+SanitizedLogger._compile()
 
 
 # Initialize logging on module import
-LoggingConfig.setup_logging(os.getenv('LOG_LEVEL', 'INFO'))
+LoggingConfig.setup_logging(
+    os.getenv('LOG_LEVEL', 'INFO'),
+    use_queue=os.getenv('LOG_QUEUE', 'true').lower() == 'true'
+)
+atexit.register(LoggingConfig.stop_listener)
 
 
 def get_logger(name: str, sanitized: bool = True) -> logging.Logger | SanitizedLogger:
@@ -9,15 +9,26 @@ SOLID Principles:
 - DIP: Uses dependency injection for all components
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.container import container
 from app.config import config
 from app.logging_config import get_logger
+from models.database_connection import close_connection_pool
 
 logger = get_logger(__name__)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Stop the ingestion pipeline and close pooled database connections on shutdown"""
+    yield
+    await container.ingestion_pipeline().close()
+    close_connection_pool()
+    await container.async_database().close()
+
+
 def create_app() -> FastAPI:
     """
     Create and configure FastAPI application with dependency injection
@@ -30,7 +41,8 @@ def create_app() -> FastAPI:
         title="Medical Health Review API",
         description="Backend API for Medical Health Review System with Streamlit UI",
         version="1.0.0",
-        debug=config.api.debug
+        debug=config.api.debug,
+        lifespan=lifespan
     )
     
     # Attach container to app
@@ -52,9 +64,13 @@ def create_app() -> FastAPI:
     from app.api.routes.consent import router as consent_router
     from app.api.routes.auth import router as auth_router
     from app.api.routes.profile import router as profile_router
+    from app.api.routes.ingestion import router as ingestion_router
+    from app.api.routes.metrics import router as metrics_router
     app.include_router(consent_router, prefix="/api/users", tags=["users"])
     app.include_router(auth_router, prefix="/api/auth", tags=["auth"])
     app.include_router(profile_router, prefix="/api/users", tags=["users"])
+    app.include_router(ingestion_router, prefix="/api/reports", tags=["reports"])
+    app.include_router(metrics_router, tags=["metrics"])
     
     # Health check endpoint
     @app.get("/health")
@@ -6,7 +6,7 @@ Contains all data models for the medical health review system
 
 from .lab_parameter import LabParameter
 from .normalized_parameter import NormalizedParameter
-from .database_connection import DatabaseConnection
+from .database_connection import DatabaseConnection, ConnectionPool, get_connection_pool
 
 # Import NormalizationResult after NormalizedParameter to avoid circular import
 from .normalization_result import NormalizationResult
@@ -20,4 +20,6 @@ __all__ = [
     'MismatchResult',
     'TrendResult',
     'DatabaseConnection',
+    'ConnectionPool',
+    'get_connection_pool',
 ]
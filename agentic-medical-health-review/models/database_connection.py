@@ -1,21 +1,344 @@
 """
 Database Connection Manager
 
-Handles PostgreSQL database connections with context manager support
+Handles PostgreSQL database connections with context manager support.
+Connections are borrowed from a process-wide pool (see ConnectionPool)
+unless DB_POOL_ENABLED=false.
 """
 
 import psycopg2
 from psycopg2.extras import RealDictCursor
 import os
-from typing import Optional
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+
+def _connect_from_env() -> psycopg2.extensions.connection:
+    """Open a new connection from the POSTGRES_* environment variables"""
+    return psycopg2.connect(
+        host=os.getenv('POSTGRES_HOST', 'localhost'),
+        port=os.getenv('POSTGRES_PORT', '5432'),
+        database=os.getenv('POSTGRES_DB', 'medical_health_review'),
+        user=os.getenv('POSTGRES_USER', 'postgres'),
+        password=os.getenv('POSTGRES_PASSWORD', 'postgres')
+    )
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes available in time"""
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of PostgreSQL connections
+    
+    Callers wait (up to a timeout) when all max_size connections are in use.
+    Idle connections are health-checked before reuse and recycled once they
+    exceed max_lifetime.
+    """
+    
+    def __init__(
+        self,
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 30.0,
+        max_lifetime: float = 1800.0,
+        health_check_interval: float = 30.0,
+        connect: Callable[[], Any] = _connect_from_env
+    ):
+        """
+        Initialize the pool and open min_size connections
+        
+        Args:
+            min_size: Connections kept open even when idle
+            max_size: Maximum open connections
+            timeout: Seconds getconn() waits for a free connection
+            max_lifetime: Seconds after which a connection is closed instead of reused
+            health_check_interval: Idle seconds after which a connection is
+                checked with SELECT 1 before reuse (0: check on every checkout)
+            connect: Factory opening a new connection
+        """
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool size: min={min_size}, max={max_size}")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.health_check_interval = health_check_interval
+        self.pid = os.getpid()
+        self._connect = connect
+        
+        # Idle connections as (connection, created_at, returned_at)
+        self._idle: Deque[Tuple[Any, float, float]] = deque()
+        self._created_at: Dict[int, float] = {}
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._metrics = {
+            'checkouts': 0,
+            'waits': 0,
+            'wait_seconds_total': 0.0,
+            'wait_seconds_max': 0.0,
+            'timeouts': 0,
+            'connections_opened': 0,
+            'connections_recycled': 0,
+            'connections_broken': 0
+        }
+        
+        for _ in range(min_size):
+            conn = self._open()
+            self._idle.append((conn, self._created_at[id(conn)], time.monotonic()))
+    
+    @classmethod
+    def from_env(cls) -> Optional["ConnectionPool"]:
+        """
+        Build a pool from environment variables
+        
+        DB_POOL_ENABLED (default: true), DB_POOL_MIN_SIZE (default: 1),
+        DB_POOL_MAX_SIZE (default: 10), DB_POOL_TIMEOUT (default: 30),
+        DB_POOL_MAX_LIFETIME (default: 1800), DB_POOL_HEALTH_CHECK_SECONDS (default: 30).
+        
+        Returns:
+            ConnectionPool instance, or None if pooling is disabled
+        """
+        if os.getenv('DB_POOL_ENABLED', 'true').lower() != 'true':
+            return None
+        return cls(
+            min_size=int(os.getenv('DB_POOL_MIN_SIZE', '1')),
+            max_size=int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+            timeout=float(os.getenv('DB_POOL_TIMEOUT', '30')),
+            max_lifetime=float(os.getenv('DB_POOL_MAX_LIFETIME', '1800')),
+            health_check_interval=float(os.getenv('DB_POOL_HEALTH_CHECK_SECONDS', '30'))
+        )
+    
+    def _open(self):
+        """Open a connection and count it (caller holds or owns the slot)."""
+        conn = self._connect()
+        self._created_at[id(conn)] = time.monotonic()
+        self._size += 1
+        self._metrics['connections_opened'] += 1
+        return conn
+    
+    def _forget(self, conn, metric: Optional[str] = None):
+        """Free a connection's slot (caller holds the condition)."""
+        self._created_at.pop(id(conn), None)
+        self._size -= 1
+        if metric:
+            self._metrics[metric] += 1
+        self._condition.notify()
+    
+    @staticmethod
+    def _close_quietly(conn):
+        """Close a connection, ignoring errors from an already dead one."""
+        try:
+            conn.close()
+        except Exception:
+            pass
+    
+    def _discard(self, conn, metric: Optional[str] = None):
+        """Close a connection and free its slot (caller holds the condition)."""
+        self._forget(conn, metric)
+        self._close_quietly(conn)
+    
+    def _is_healthy(self, conn, returned_at: float, now: float) -> bool:
+        """Check a connection taken from the idle queue."""
+        if conn.closed:
+            return False
+        if now - returned_at < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+    
+    def getconn(self):
+        """
+        Borrow a connection, waiting if the pool is exhausted
+        
+        Returns:
+            Open psycopg2 connection
+        
+        Raises:
+            PoolTimeoutError: If no connection is free within the timeout
+        """
+        start = time.monotonic()
+        deadline = start + self.timeout
+        waited = False
+        while True:
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Connection pool is closed")
+                    
+                    if self._idle:
+                        candidate = self._idle.pop()
+                        break
+                    
+                    if self._size < self.max_size:
+                        # Reserve the slot, then connect without holding the lock
+                        self._size += 1
+                        candidate = None
+                        break
+                    
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._metrics['timeouts'] += 1
+                        raise PoolTimeoutError(
+                            f"No database connection available after {self.timeout}s "
+                            f"(max_size={self.max_size})"
+                        )
+                    waited = True
+                    self._condition.wait(remaining)
+            
+            if candidate is None:
+                break
+            
+            # The candidate keeps its slot while SELECT 1 and close() run without the lock
+            conn, created_at, returned_at = candidate
+            now = time.monotonic()
+            if now - created_at >= self.max_lifetime:
+                metric = 'connections_recycled'
+            elif not self._is_healthy(conn, returned_at, now):
+                metric = 'connections_broken'
+            else:
+                with self._condition:
+                    return self._checked_out(conn, start, waited)
+            self._close_quietly(conn)
+            with self._condition:
+                self._forget(conn, metric)
+        
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._created_at[id(conn)] = time.monotonic()
+            self._metrics['connections_opened'] += 1
+            return self._checked_out(conn, start, waited)
+    
+    def _checked_out(self, conn, start: float, waited: bool):
+        """Record checkout metrics (caller holds the condition)."""
+        self._metrics['checkouts'] += 1
+        if waited:
+            wait = time.monotonic() - start
+            self._metrics['waits'] += 1
+            self._metrics['wait_seconds_total'] += wait
+            self._metrics['wait_seconds_max'] = max(self._metrics['wait_seconds_max'], wait)
+        return conn
+    
+    def putconn(self, conn):
+        """
+        Return a borrowed connection
+        
+        An open transaction is rolled back. Broken, expired and surplus
+        connections are closed instead of kept.
+        
+        Args:
+            conn: Connection obtained from getconn()
+        """
+        if not conn.closed and conn.status != psycopg2.extensions.STATUS_READY:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+        
+        with self._condition:
+            created_at = self._created_at.get(id(conn), 0.0)
+            now = time.monotonic()
+            if conn.closed or self._closed:
+                self._discard(conn, 'connections_broken' if not self._closed else None)
+            elif now - created_at >= self.max_lifetime:
+                self._discard(conn, 'connections_recycled')
+            else:
+                self._idle.append((conn, created_at, now))
+                self._condition.notify()
+    
+    def close(self):
+        """Close idle connections; borrowed ones are closed when returned"""
+        with self._condition:
+            self._closed = True
+            while self._idle:
+                conn, _, _ = self._idle.pop()
+                self._discard(conn)
+            self._condition.notify_all()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Pool size and wait metrics
+        
+        Returns:
+            Dict with open/idle/in-use counts and cumulative checkout, wait,
+            timeout and recycling counters
+        """
+        with self._condition:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                'max_size': self.max_size,
+                **self._metrics
+            }
+
+
+_shared_pool: Optional[ConnectionPool] = None
+_shared_pool_lock = threading.Lock()
+_pool_disabled = False
+
+
+def get_connection_pool() -> Optional[ConnectionPool]:
+    """
+    Get the process-wide connection pool, creating it on first use
+    
+    A forked child gets its own pool; connections are never shared across
+    processes.
+    
+    Returns:
+        ConnectionPool, or None if disabled via DB_POOL_ENABLED
+    """
+    global _shared_pool, _pool_disabled
+    if _pool_disabled:
+        return None
+    if _shared_pool is None or _shared_pool.pid != os.getpid():
+        with _shared_pool_lock:
+            if _shared_pool is None or _shared_pool.pid != os.getpid():
+                pool = ConnectionPool.from_env()
+                _pool_disabled = pool is None
+                _shared_pool = pool
+    return _shared_pool
+
+
+def close_connection_pool():
+    """Close the process-wide pool (e.g. on application shutdown)"""
+    global _shared_pool, _pool_disabled
+    with _shared_pool_lock:
+        if _shared_pool is not None and _shared_pool.pid == os.getpid():
+            _shared_pool.close()
+        _shared_pool = None
+        _pool_disabled = False
 
 
 class DatabaseConnection:
     """Database connection manager with context manager support"""
     
-    def __init__(self):
+    def __init__(self, pool: Optional[ConnectionPool] = None):
+        """
+        Initialize the manager
+        
+        Args:
+            pool: Pool to borrow from (default: the process-wide pool, or a
+                dedicated connection if pooling is disabled)
+        """
         self.conn: Optional[psycopg2.extensions.connection] = None
         self.cursor: Optional[psycopg2.extensions.cursor] = None
+        self.pool = pool
     
     def connect(self) -> bool:
         """
@@ -25,13 +348,12 @@ class DatabaseConnection:
             bool: True if connection successful, False otherwise
         """
         try:
-            self.conn = psycopg2.connect(
-                host=os.getenv('POSTGRES_HOST', 'localhost'),
-                port=os.getenv('POSTGRES_PORT', '5432'),
-                database=os.getenv('POSTGRES_DB', 'medical_health_review'),
-                user=os.getenv('POSTGRES_USER', 'postgres'),
-                password=os.getenv('POSTGRES_PASSWORD', 'postgres')
-            )
+            if self.pool is None:
+                self.pool = get_connection_pool()
+            if self.pool is not None:
+                self.conn = self.pool.getconn()
+            else:
+                self.conn = _connect_from_env()
             self.cursor = self.conn.cursor(cursor_factory=RealDictCursor)
             return True
         except Exception as e:
@@ -39,11 +361,16 @@ class DatabaseConnection:
             return False
     
     def close(self):
-        """Close database connection and cursor"""
+        """Close the cursor and release the connection (back to the pool if pooled)"""
         if self.cursor:
             self.cursor.close()
+            self.cursor = None
         if self.conn:
-            self.conn.close()
+            if self.pool is not None:
+                self.pool.putconn(self.conn)
+            else:
+                self.conn.close()
+            self.conn = None
     
     def commit(self):
         """Commit current transaction"""
@@ -62,8 +389,10 @@ class DatabaseConnection:
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit with automatic commit/rollback"""
-        if exc_type is None:
-            self.commit()
-        else:
-            self.rollback()
-        self.close()
+        try:
+            if exc_type is None:
+                self.commit()
+            else:
+                self.rollback()
+        finally:
+            self.close()
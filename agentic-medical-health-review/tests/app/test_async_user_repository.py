@@ -0,0 +1,126 @@
+"""
+Tests for the Async User Repository
+
+Tests the asyncio data access path including:
+- AsyncpgUserRepository query parameters and row mapping
+- AsyncRegisterConsentUseCase create/update workflow
+- Consent and profile routes awaiting the container's async repository
+
+Uses a stand-in pool, so neither asyncpg nor PostgreSQL is needed.
+"""
+
+import asyncio
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from dependency_injector import providers
+from fastapi.testclient import TestClient
+
+from app.application.use_cases.register_consent import AsyncRegisterConsentUseCase
+from app.container import container
+from app.domain.entities.user import User
+from app.infrastructure.repositories.asyncpg_user_repository import AsyncpgUserRepository
+from app.main import app
+
+
+def user_row(**overrides):
+    row = {
+        'user_id': 'a3c1c7e6-0000-0000-0000-000000000001', 'email': 'jo@example.com',
+        'first_name': 'Jo', 'last_name': 'Doe', 'birth_date': None, 'gender': '',
+        'height_cm': None, 'weight_kg': None, 'role': 'patient', 'preferred_language': 'en',
+        'consent_status': True, 'consent_timestamp': None, 'profile_complete': False,
+        'created_at': None, 'updated_at': None
+    }
+    row.update(overrides)
+    return row
+
+
+class FakePool:
+    """AsyncDatabasePool stand-in returning queued rows"""
+
+    def __init__(self, *rows):
+        self.rows = list(rows)
+        self.calls = []
+
+    async def fetchrow(self, query, *args):
+        self.calls.append((" ".join(query.split()), args))
+        return self.rows.pop(0) if self.rows else None
+
+
+class TestAsyncpgUserRepository:
+    """Test suite for AsyncpgUserRepository"""
+
+    def test_find_by_email(self):
+        """Test that rows map to User entities"""
+        pool = FakePool(user_row(height_cm=Decimal('170.5')))
+        user = asyncio.run(AsyncpgUserRepository(pool).find_by_email('jo@example.com'))
+
+        assert user.email == 'jo@example.com'
+        assert user.height_cm == 170.5
+        assert pool.calls == [("SELECT * FROM users WHERE email = $1", ('jo@example.com',))]
+
+    def test_missing_user(self):
+        """Test that no row returns None"""
+        assert asyncio.run(AsyncpgUserRepository(FakePool()).find_by_email('x@example.com')) is None
+
+    def test_update_profile_binds_typed_values(self):
+        """Test that the ISO birth date and measurements are converted for asyncpg"""
+        pool = FakePool(user_row(profile_complete=True))
+        asyncio.run(AsyncpgUserRepository(pool).update_profile(
+            'jo@example.com', 'Jo', 'Doe', '1990-04-01', 'F', 165.0, 60.5
+        ))
+
+        args = pool.calls[0][1]
+        assert args[2] == date(1990, 4, 1)
+        assert args[4:6] == (Decimal('165.0'), Decimal('60.5'))
+        assert args[-1] == 'jo@example.com'
+
+
+class TestAsyncRegisterConsentUseCase:
+    """Test suite for the async consent workflow"""
+
+    def test_new_user_saved(self):
+        """Test that an unknown email creates a consented user"""
+        pool = FakePool(None, user_row(first_name='Jo', last_name='Anne Doe'))
+        repo = AsyncpgUserRepository(pool)
+
+        asyncio.run(AsyncRegisterConsentUseCase(repo).execute('jo@example.com', 'Jo Anne Doe', 'patient', 'en'))
+
+        insert_args = pool.calls[1][1]
+        assert pool.calls[1][0].startswith("INSERT INTO users")
+        assert insert_args[:3] == ('jo@example.com', 'Jo', 'Anne Doe')
+        assert insert_args[5] is True
+
+    def test_existing_user_updated(self):
+        """Test that a known email only updates consent"""
+        pool = FakePool(user_row(), user_row(role='doctor'))
+        repo = AsyncpgUserRepository(pool)
+
+        user = asyncio.run(AsyncRegisterConsentUseCase(repo).execute('jo@example.com', 'Jo', 'doctor', 'en'))
+
+        assert pool.calls[1][0].startswith("UPDATE users SET role = $1")
+        assert user.role == 'doctor'
+
+
+class TestAsyncRoutes:
+    """Test suite for routes resolving the repository from the container"""
+
+    @pytest.fixture
+    def client(self):
+        pool = FakePool(user_row(), user_row(profile_complete=True, birth_date=date(1990, 4, 1)))
+        with container.async_user_repository.override(providers.Object(AsyncpgUserRepository(pool))):
+            yield TestClient(app)
+
+    def test_consent_status(self, client):
+        """Test that the consent status route awaits the async repository"""
+        response = client.get("/api/users/consent-status", params={"email": "jo@example.com"})
+
+        assert response.json() == {"consented": True, "role": "patient", "preferred_language": "en"}
+
+    def test_get_profile(self, client):
+        """Test that the profile route awaits the async repository"""
+        client.get("/api/users/profile", params={"email": "jo@example.com"})
+        response = client.get("/api/users/profile", params={"email": "jo@example.com"})
+
+        assert response.json()["birth_date"] == "1990-04-01"
@@ -0,0 +1,247 @@
+"""
+Tests for the Ingestion Pipeline
+
+Tests the staged report ingestion including:
+- Jobs passing through every stage in order with progress reporting
+- Failures recorded on the job without stopping the workers
+- Backpressure between stages and a bounded intake queue
+- Rolled-back normalization failing the job
+- Upload and job status routes
+
+Stage work is replaced by stand-ins, so neither OCR, an LLM nor
+PostgreSQL is needed.
+"""
+
+import asyncio
+
+import pytest
+from dependency_injector import providers
+from fastapi.testclient import TestClient
+
+from app.config import config
+from app.container import container
+from app.infrastructure.adapters.ingestion_pipeline import (
+    STAGES, IngestionJob, IngestionPipeline, PipelineBusyError
+)
+from app.main import app
+from models import database_connection
+from tools.src.document_data_extraction_tools import normalize_lab_data, report_store
+
+
+class RecordingPipeline(IngestionPipeline):
+    """Pipeline whose stages only record the order they ran in"""
+
+    def __init__(self, fail_stage=None, gate=None, **kwargs):
+        super().__init__(**kwargs)
+        self.fail_stage = fail_stage
+        self.gate = gate
+        self.calls = []
+
+    async def _run(self, stage, job):
+        self.calls.append((stage, job.file_path))
+        if stage == self.fail_stage:
+            raise RuntimeError("boom")
+
+    async def _rasterize(self, job):
+        await self._run("rasterize", job)
+        job.pages = 2
+
+    async def _ocr(self, job):
+        await self._run("ocr", job)
+
+    async def _extract(self, job):
+        if self.gate is not None:
+            await self.gate.wait()
+        await self._run("extract", job)
+        job.tests_found = 3
+
+    async def _normalize(self, job):
+        await self._run("normalize", job)
+
+    async def _analyze(self, job):
+        await self._run("analyze", job)
+        job.trends["Glucose"] = "stable"
+
+
+async def wait_finished(pipeline, jobs):
+    while not all(job.finished for job in jobs):
+        await asyncio.sleep(0.01)
+
+
+class TestIngestionPipeline:
+    """Test suite for IngestionPipeline"""
+
+    def test_job_runs_every_stage(self):
+        """Test that a job visits the stages in order and reports full progress"""
+        async def scenario():
+            pipeline = RecordingPipeline()
+            job = await pipeline.submit("user-1", "report.pdf")
+            await asyncio.wait_for(wait_finished(pipeline, [job]), 5)
+            await pipeline.close()
+            return pipeline, job
+
+        pipeline, job = asyncio.run(scenario())
+        status = job.to_dict()
+
+        assert [stage for stage, _ in pipeline.calls] == list(STAGES)
+        assert status["status"] == "completed"
+        assert status["progress"] == 1.0
+        assert status["pages"] == 2 and status["tests_found"] == 3
+        assert set(status["stage_seconds"]) == set(STAGES)
+        assert pipeline.get_job(job.job_id) is job
+
+    def test_failure_recorded_on_job(self):
+        """Test that a failing stage fails only its job and later jobs still run"""
+        async def scenario():
+            pipeline = RecordingPipeline(fail_stage="ocr")
+            first = await pipeline.submit("user-1", "a.pdf")
+            await asyncio.wait_for(wait_finished(pipeline, [first]), 5)
+            pipeline.fail_stage = None
+            second = await pipeline.submit("user-1", "b.pdf")
+            await asyncio.wait_for(wait_finished(pipeline, [second]), 5)
+            await pipeline.close()
+            return first, second
+
+        first, second = asyncio.run(scenario())
+
+        assert first.status == "failed"
+        assert first.error == "ocr: boom"
+        assert first.to_dict()["progress"] == 0.2
+        assert second.status == "completed"
+
+    def test_backpressure_and_busy(self):
+        """Test that a stalled stage fills the queues up to intake, which then rejects jobs"""
+        async def scenario():
+            gate = asyncio.Event()
+            pipeline = RecordingPipeline(gate=gate, queue_size=1, workers={stage: 1 for stage in STAGES})
+            jobs = []
+            with pytest.raises(PipelineBusyError):
+                for n in range(10):
+                    jobs.append(await pipeline.submit("user-1", f"{n}.pdf"))
+                    await asyncio.sleep(0.01)
+            queues = pipeline.stats()["queues"]
+            gate.set()
+            await asyncio.wait_for(wait_finished(pipeline, jobs), 5)
+            await pipeline.close()
+            return jobs, queues
+
+        jobs, queues = asyncio.run(scenario())
+
+        # One job in each of the 3 upstream workers, one in each upstream queue
+        assert len(jobs) == 6
+        assert queues["rasterize"] == queues["ocr"] == queues["extract"] == 1
+        assert all(job.status == "completed" for job in jobs)
+
+    def test_finished_jobs_expire(self):
+        """Test that only job_retention finished jobs are kept"""
+        async def scenario():
+            pipeline = RecordingPipeline(job_retention=2)
+            jobs = []
+            for n in range(4):
+                jobs.append(await pipeline.submit("user-1", f"{n}.pdf"))
+                await asyncio.wait_for(wait_finished(pipeline, jobs), 5)
+            await pipeline.close()
+            return pipeline, jobs
+
+        pipeline, jobs = asyncio.run(scenario())
+
+        assert pipeline.get_job(jobs[0].job_id) is None
+        assert pipeline.get_job(jobs[-1].job_id) is jobs[-1]
+
+
+class TestStoreAndNormalize:
+    """Test suite for IngestionPipeline._store_and_normalize"""
+
+    def test_rolled_back_normalization_fails_job(self, monkeypatch):
+        """Test that a rolled-back normalization raises instead of completing with nothing normalized"""
+        class FakeDB:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args):
+                return False
+
+        monkeypatch.setattr(database_connection, "DatabaseConnection", FakeDB)
+        monkeypatch.setattr(report_store, "store_reports", lambda db, reports: ["report-1"])
+        monkeypatch.setattr(normalize_lab_data, "normalize_batch", lambda parameters: {
+            "rolled_back": True, "error": "deadlock detected", "results": []
+        })
+        job = IngestionJob(user_id="user-1", file_path="report.pdf")
+        job.data["tests"] = [{"test_name": "Glucose", "test_value": "100", "unit": "mg/dL"}]
+
+        with pytest.raises(RuntimeError, match="1 parameters left pending: deadlock detected"):
+            IngestionPipeline()._store_and_normalize(job)
+        assert job.parameters_normalized == 0
+
+
+class TestIngestionRoutes:
+    """Test suite for the upload and job status routes"""
+
+    @pytest.fixture
+    def client(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config.storage, "upload_path", str(tmp_path))
+        pipeline = RecordingPipeline()
+        with container.ingestion_pipeline.override(providers.Object(pipeline)):
+            with TestClient(app) as client:
+                yield client
+
+    def test_upload_and_poll(self, client, tmp_path):
+        """Test that an upload is stored, accepted and reported by the status route"""
+        response = client.post(
+            "/api/reports/upload", params={"user_id": "user-1", "filename": "Lab.PDF"},
+            content=b"%PDF-1.4 test"
+        )
+        assert response.status_code == 202
+        body = response.json()
+        assert body["status_url"] == f"/api/reports/jobs/{body['job_id']}"
+
+        stored = list(tmp_path.iterdir())
+        assert len(stored) == 1 and stored[0].read_bytes() == b"%PDF-1.4 test"
+
+        status = client.get(body["status_url"]).json()
+        assert status["user_id"] == "user-1"
+        assert status["status"] in ("queued", "completed") + STAGES
+        assert status["report_date"] == status["created_at"]
+
+    def test_upload_with_report_date(self, client):
+        """Test that a given report date is kept on the job instead of the upload time"""
+        response = client.post(
+            "/api/reports/upload",
+            params={"user_id": "user-1", "filename": "lab.pdf", "report_date": "2019-05-02"},
+            content=b"%PDF-1.4 test"
+        )
+        assert response.status_code == 202
+
+        status = client.get(response.json()["status_url"]).json()
+        assert status["report_date"] == "2019-05-02T00:00:00"
+        assert client.post(
+            "/api/reports/upload",
+            params={"user_id": "user-1", "filename": "lab.pdf", "report_date": "last week"},
+            content=b"x"
+        ).status_code == 422
+
+    def test_large_upload_written_in_full(self, client, tmp_path):
+        """Test that a body spanning several write buffers is stored byte for byte"""
+        body = bytes(range(256)) * (3 * 4096 + 7)
+
+        response = client.post(
+            "/api/reports/upload", params={"user_id": "user-1", "filename": "lab.pdf"},
+            content=iter([body[i:i + 65536] for i in range(0, len(body), 65536)])
+        )
+
+        assert response.status_code == 202
+        assert [path.read_bytes() for path in tmp_path.iterdir()] == [body]
+
+    def test_rejected_uploads(self, client, tmp_path, monkeypatch):
+        """Test that unsupported types and oversized bodies are rejected and not kept"""
+        monkeypatch.setattr(config.storage, "max_file_size_mb", 0)
+        params = {"user_id": "user-1", "filename": "lab.pdf"}
+
+        assert client.post("/api/reports/upload", params={**params, "filename": "lab.exe"},
+                           content=b"x").status_code == 415
+        assert client.post("/api/reports/upload", params=params, content=b"x").status_code == 413
+        assert list(tmp_path.iterdir()) == []
+
+    def test_unknown_job(self, client):
+        """Test that an unknown job ID is a 404"""
+        assert client.get("/api/reports/jobs/missing").status_code == 404
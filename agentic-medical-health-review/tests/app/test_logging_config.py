@@ -0,0 +1,162 @@
+"""
+Tests for the Logging Configuration
+
+Tests the non-blocking logging path including:
+- Structured `extra` fields appended by StructuredFormatter
+- Formatting deferred to the listener thread
+- Records dropped, not blocking, when the queue is full
+- SanitizedLogger redaction, level gating and format string cache
+"""
+
+import logging
+import queue
+import re
+from logging.handlers import QueueListener
+
+import pytest
+
+from app.logging_config import DeferredQueueHandler, SanitizedLogger, StructuredFormatter
+
+
+class CountingArg:
+    """Log argument that counts how often it is rendered"""
+
+    def __init__(self):
+        self.renders = 0
+
+    def __str__(self):
+        self.renders += 1
+        return "arg"
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+
+def make_logger(name, handler):
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    return logger
+
+
+class TestStructuredFormatter:
+    """Test suite for StructuredFormatter"""
+
+    def test_extra_fields_appended(self):
+        """Test that extra fields follow the message as key=value pairs"""
+        handler = ListHandler()
+        handler.setFormatter(StructuredFormatter("%(levelname)s - %(message)s"))
+        logger = make_logger("test.structured", handler)
+
+        logger.info("OCR page", extra={"page": 3, "regions": 41, "ms": 812.4})
+        logger.info("plain")
+
+        assert handler.lines == ["INFO - OCR page | page=3 regions=41 ms=812.4", "INFO - plain"]
+
+
+class TestDeferredQueueHandler:
+    """Test suite for DeferredQueueHandler"""
+
+    def test_formatting_happens_in_listener(self):
+        """Test that the logging thread only enqueues and the listener formats"""
+        records = queue.Queue()
+        output = ListHandler()
+        logger = make_logger("test.deferred", DeferredQueueHandler(records))
+        arg = CountingArg()
+
+        logger.debug("value %s", arg, extra={"page": 1})
+        assert arg.renders == 0
+
+        listener = QueueListener(records, output)
+        listener.start()
+        listener.stop()
+        assert output.lines == ["value arg"]
+        assert arg.renders == 1
+
+    def test_disabled_level_costs_nothing(self):
+        """Test that disabled levels never render their arguments"""
+        records = queue.Queue()
+        logger = make_logger("test.disabled", DeferredQueueHandler(records))
+        logger.setLevel(logging.INFO)
+        arg = CountingArg()
+
+        logger.debug("value %s", arg)
+
+        assert records.empty() and arg.renders == 0
+
+    def test_full_queue_drops(self):
+        """Test that a full queue drops records instead of blocking"""
+        handler = DeferredQueueHandler(queue.Queue(maxsize=1))
+        logger = make_logger("test.full", handler)
+
+        logger.info("first")
+        logger.info("second")
+
+        assert handler.queue.qsize() == 1
+        assert handler.dropped == 1
+
+
+def sanitize_per_field(message):
+    """The previous sanitizer: one re.sub per sensitive field, in list order"""
+    for field in SanitizedLogger.SENSITIVE_FIELDS:
+        message = re.sub(rf'{field}[=:]\s*[^\s,\)}}]+', f'{field}=[REDACTED]', message, flags=re.IGNORECASE)
+    return message
+
+
+class TestSanitizedLogger:
+    """Test suite for SanitizedLogger"""
+
+    @pytest.mark.parametrize("message", [
+        "login password=hunter2, user=jo",
+        "Access_Token: abc} refresh_token=def",
+        "oauth_token=1 auth:2 my_token=3)",
+        "Authorization: Bearer xyz",
+        "API_KEY=k secret:s",
+        "nothing sensitive here"
+    ])
+    def test_matches_per_field_sanitizer(self, message):
+        """Test that the single-pass sanitizer redacts exactly like the per-field one"""
+        assert SanitizedLogger(logging.getLogger("test"))._sanitize_message(message) == sanitize_per_field(message)
+
+    def test_disabled_level_skips_sanitizing(self, monkeypatch):
+        """Test that nothing is sanitized for a disabled level"""
+        handler = ListHandler()
+        logger = SanitizedLogger(make_logger("test.sanitized.disabled", handler))
+        logger.logger.setLevel(logging.INFO)
+        monkeypatch.setattr(SanitizedLogger, "_sanitize_text", classmethod(lambda cls, message: pytest.fail()))
+
+        logger.debug("password=%s", "x")
+
+        assert handler.lines == []
+
+    def test_format_strings_cached(self):
+        """Test that format strings are sanitized once and arg-less messages are not kept"""
+        handler = ListHandler()
+        logger = SanitizedLogger(make_logger("test.sanitized.cache", handler))
+        SanitizedLogger._sanitize_format.cache_clear()
+
+        for page in range(3):
+            logger.info("token=abc page %d", page)
+        logger.info("password=hunter2")
+
+        cache = SanitizedLogger._sanitize_format.cache_info()
+        assert (cache.misses, cache.hits, cache.currsize) == (1, 2, 1)
+        assert handler.lines[0] == "token=[REDACTED] page 0"
+        assert handler.lines[-1] == "password=[REDACTED]"
+
+    def test_subclass_fields(self):
+        """Test that subclasses with more fields get their own pattern"""
+        class PinSanitizedLogger(SanitizedLogger):
+            SENSITIVE_FIELDS = SanitizedLogger.SENSITIVE_FIELDS + ['pin']
+
+        logger = PinSanitizedLogger(logging.getLogger("test"))
+
+        assert logger._sanitize_message("pin=1234 token=x") == "pin=[REDACTED] token=[REDACTED]"
+        assert SanitizedLogger(logging.getLogger("test"))._sanitize_message("pin=1234") == "pin=1234"
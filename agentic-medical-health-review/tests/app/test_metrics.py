@@ -0,0 +1,175 @@
+"""
+Tests for the Document Pipeline Metrics
+
+Tests the instrumentation layer including:
+- Counter and histogram rendering in the Prometheus text format
+- Spans recording durations, and the no-op span when metrics are disabled
+- Collecting span durations for OCR worker processes
+- LLM extraction spans and counters
+- The /metrics route
+"""
+
+import pytest
+from dependency_injector import providers
+from fastapi.testclient import TestClient
+
+from app.container import container
+from app.main import app
+from tools.src.document_data_extraction_tools import pipeline_metrics
+from tools.src.document_data_extraction_tools.lab_report_parser.llm_structured_extractor import (
+    LLMStructuredExtractor
+)
+from tools.src.document_data_extraction_tools.pipeline_metrics import (
+    LLM_REQUESTS_TOTAL, PAGES_TOTAL, STAGE_SECONDS, Histogram, MetricsRegistry
+)
+
+
+class FakeResponse:
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeLLM:
+    """LangChain-style LLM that answers every prompt with one test"""
+
+    def invoke(self, prompt):
+        return FakeResponse(
+            '[{"test_name": "Glucose", "test_value": "100", "unit": "mg/dL", "reference_range": "70-99"}]'
+        )
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Fresh process-wide registry for the test"""
+    registry = MetricsRegistry()
+    monkeypatch.setattr(pipeline_metrics, "_shared_registry", registry)
+    monkeypatch.setattr(pipeline_metrics, "_shared_registry_loaded", True)
+    return registry
+
+
+class TestMetricsRegistry:
+    """Test suite for MetricsRegistry"""
+
+    def test_render_counter_and_histogram(self):
+        """Test HELP/TYPE lines, labels, cumulative buckets, _sum and _count"""
+        registry = MetricsRegistry()
+        registry.counter(PAGES_TOTAL).inc(2, source="ocr")
+        latency = registry.histogram("test_seconds", "Test latency", ("stage",), buckets=(0.1, 1.0))
+        latency.observe(0.05, stage="ocr")
+        latency.observe(0.5, stage="ocr")
+        latency.observe(5, stage="ocr")
+
+        lines = registry.render().splitlines()
+
+        assert "# TYPE document_pipeline_pages_total counter" in lines
+        assert 'document_pipeline_pages_total{source="ocr"} 2' in lines
+        assert "# HELP test_seconds Test latency" in lines
+        assert "# TYPE test_seconds histogram" in lines
+        assert [line for line in lines if line.startswith("test_seconds")] == [
+            'test_seconds_bucket{stage="ocr",le="0.1"} 1',
+            'test_seconds_bucket{stage="ocr",le="1"} 2',
+            'test_seconds_bucket{stage="ocr",le="+Inf"} 3',
+            'test_seconds_sum{stage="ocr"} 5.55',
+            'test_seconds_count{stage="ocr"} 3'
+        ]
+
+    def test_label_values_escaped(self):
+        """Test that quotes, backslashes and newlines in label values are escaped"""
+        registry = MetricsRegistry()
+        registry.counter("test_total", "Test", ("name",)).inc(name='a"b\\c\nd')
+
+        assert 'test_total{name="a\\"b\\\\c\\nd"} 1' in registry.render().splitlines()
+
+    def test_type_conflict(self):
+        """Test that a name cannot be registered as two metric types"""
+        registry = MetricsRegistry()
+
+        with pytest.raises(ValueError):
+            registry.histogram(PAGES_TOTAL)
+
+    def test_from_env_disabled(self, monkeypatch):
+        """Test that METRICS_ENABLED=false disables the registry"""
+        monkeypatch.setenv("METRICS_ENABLED", "false")
+
+        assert MetricsRegistry.from_env() is None
+
+
+class TestSpans:
+    """Test suite for span() and the module-level helpers"""
+
+    def test_span_records_on_error(self, registry):
+        """Test that a span records its duration even when the block raises"""
+        with pipeline_metrics.span("ocr_inference"):
+            pass
+        with pytest.raises(RuntimeError):
+            with pipeline_metrics.span("ocr_inference"):
+                raise RuntimeError("boom")
+
+        assert registry.stage_seconds.count(stage="ocr_inference") == 2
+
+    def test_disabled_is_noop(self, monkeypatch):
+        """Test that disabled metrics hand out one shared no-op span"""
+        monkeypatch.setattr(pipeline_metrics, "_shared_registry", None)
+        monkeypatch.setattr(pipeline_metrics, "_shared_registry_loaded", True)
+
+        assert pipeline_metrics.span("a") is pipeline_metrics.span("b")
+        with pipeline_metrics.span("a"):
+            pipeline_metrics.increment(PAGES_TOTAL, source="ocr")
+            pipeline_metrics.observe_stage("resolve_rules", 0.1)
+
+    def test_collect_stages(self, registry):
+        """Test that collect_stages() sees spans of its block only, and still records them"""
+        with pipeline_metrics.span("text_layer"):
+            pass
+        with pipeline_metrics.collect_stages() as stages:
+            with pipeline_metrics.span("pdf_convert"):
+                pass
+        with pipeline_metrics.span("ocr_inference"):
+            pass
+
+        assert [stage for stage, _ in stages] == ["pdf_convert"]
+        assert registry.stage_seconds.count(stage="pdf_convert") == 1
+
+    def test_default_buckets_cover_sub_millisecond(self):
+        """Test that rule lookups and LLM calls land in different buckets"""
+        latency = Histogram("test_seconds", "Test")
+
+        assert latency.buckets[0] < 0.001 and latency.buckets[-1] >= 60
+
+
+class TestLLMInstrumentation:
+    """Test suite for LLMStructuredExtractor spans and counters"""
+
+    def test_llm_call_and_parse(self, registry, monkeypatch):
+        """Test that an extraction records llm_call, llm_parse and a success"""
+        monkeypatch.setenv("RULE_EXTRACTOR_ENABLED", "false")
+        monkeypatch.setenv("LLM_CACHE_ENABLED", "false")
+        extractor = LLMStructuredExtractor(llm=FakeLLM())
+
+        result = extractor.extract_structured_data("Glucose 100 mg/dL 70-99")
+
+        assert result["metadata"]["total_tests_found"] == 1
+        assert registry.stage_seconds.count(stage="llm_call") == 1
+        assert registry.stage_seconds.count(stage="llm_parse") == 1
+        assert registry.counter(LLM_REQUESTS_TOTAL).value(result="success") == 1
+
+
+class TestMetricsRoute:
+    """Test suite for GET /metrics"""
+
+    def test_metrics_exposition(self, registry):
+        """Test that the route serves the registry in the Prometheus text format"""
+        registry.stage_seconds.observe(0.2, stage="pdf_convert")
+
+        with TestClient(app) as client:
+            response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert f'{STAGE_SECONDS}_count{{stage="pdf_convert"}} 1' in response.text
+
+    def test_disabled(self):
+        """Test that the route is a 404 when metrics are disabled"""
+        with container.metrics_registry.override(providers.Object(None)):
+            with TestClient(app) as client:
+                assert client.get("/metrics").status_code == 404
@@ -0,0 +1,148 @@
+"""
+Benchmark: blocking vs async user repository under concurrent API load
+
+Sends concurrent GET /api/users/consent-status requests to the FastAPI app
+(in-process, via httpx's ASGI transport) with two repository bindings:
+
+- blocking: the psycopg2 PostgresUserRepository called directly from the
+  async handler (the previous route behaviour; each query stalls the loop)
+- async:    the asyncpg repository from the Container
+
+Usage (from agentic-medical-health-review/):
+    python tests/benchmarks/bench_user_repository.py --requests 500 --concurrency 50
+    python tests/benchmarks/bench_user_repository.py --simulate-latency 0.01
+
+--simulate-latency replaces both repositories with stand-ins that sleep for
+the given query time (time.sleep vs asyncio.sleep), so the effect can be
+measured without a database.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+import httpx
+from dependency_injector import providers
+
+from app.domain.entities.user import User
+from app.domain.repositories.user_repository import IAsyncUserRepository
+from app.infrastructure.repositories.postgres_user_repository import PostgresUserRepository
+from app.container import container
+from app.main import app
+
+
+class BlockingUserRepository(IAsyncUserRepository):
+    """Async interface over a synchronous repository, without offloading (old behaviour)"""
+
+    def __init__(self, repo):
+        self.repo = repo
+
+    async def find_by_email(self, email):
+        return self.repo.find_by_email(email)
+
+    async def save(self, user):
+        return self.repo.save(user)
+
+    async def update_consent(self, email, role, language):
+        return self.repo.update_consent(email, role, language)
+
+    async def update_profile(self, email, first_name, last_name, birth_date, gender, height_cm, weight_kg):
+        return self.repo.update_profile(email, first_name, last_name, birth_date, gender, height_cm, weight_kg)
+
+
+class SimulatedUserRepository(IAsyncUserRepository):
+    """Repository stand-in that spends a fixed query time, blocking or not"""
+
+    def __init__(self, latency: float, blocking: bool):
+        self.latency = latency
+        self.blocking = blocking
+
+    async def _query(self, email):
+        if self.blocking:
+            time.sleep(self.latency)
+        else:
+            await asyncio.sleep(self.latency)
+        return User(email=email, role='patient', consent_status=True)
+
+    async def find_by_email(self, email):
+        return await self._query(email)
+
+    async def save(self, user):
+        return await self._query(user.email)
+
+    async def update_consent(self, email, role, language):
+        return await self._query(email)
+
+    async def update_profile(self, email, first_name, last_name, birth_date, gender, height_cm, weight_kg):
+        return await self._query(email)
+
+
+async def run_load(total: int, concurrency: int, email: str) -> dict:
+    """Send total requests with at most concurrency in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def one():
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get("/api/users/consent-status", params={"email": email})
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests_per_second": total / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "errors": errors
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--email", default=os.getenv("BENCH_EMAIL", "benchmark@example.com"))
+    parser.add_argument("--simulate-latency", type=float, default=None,
+                        help="Seconds per simulated query instead of a real database")
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    if args.simulate_latency is not None:
+        bindings = {
+            "blocking": SimulatedUserRepository(args.simulate_latency, blocking=True),
+            "async": SimulatedUserRepository(args.simulate_latency, blocking=False),
+        }
+    else:
+        bindings = {
+            "blocking": BlockingUserRepository(PostgresUserRepository()),
+            "async": container.async_user_repository(),
+        }
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}")
+    for name, repo in bindings.items():
+        with container.async_user_repository.override(providers.Object(repo)):
+            result = asyncio.run(run_load(args.requests, args.concurrency, args.email))
+        print(
+            f"  {name:<9} {result['requests_per_second']:8.1f} req/s  "
+            f"p50 {result['p50_ms']:7.1f} ms  p95 {result['p95_ms']:7.1f} ms  "
+            f"errors {result['errors']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
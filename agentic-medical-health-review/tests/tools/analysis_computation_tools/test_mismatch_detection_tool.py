@@ -9,6 +9,7 @@ Tests the mismatch_detection_tool functionality including:
 - Severity classification
 - Batch processing
 - Edge cases
+- Columnar (NumPy) detection matching the per-parameter results
 """
 
 import sys
@@ -20,11 +21,17 @@ project_root = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(project_root))
 sys.path.insert(0, str(project_root / "tools" / "src" / "analysus_computation_tools"))
 
+import numpy as np
 import pytest
 from mismatch_detection import (
     detect_mismatch,
     detect_mismatches_batch,
+    detect_mismatches_columnar,
+    summarize_mismatches,
+    mismatches_to_frame,
     MismatchType,
+    MISMATCH_TYPE_CODES,
+    SEVERITY_LEVELS,
     _calculate_severity
 )
 from models.normalized_parameter import NormalizedParameter
@@ -640,6 +647,107 @@ class TestRealWorldScenarios:
         assert result['severity'] in ['mild', 'moderate']
 
 
+class TestColumnarDetection:
+    """Test suite for detect_mismatches_columnar"""
+    
+    CASES = [
+        # (value, min, max)
+        (8.3, 3.9, 6.1),
+        (2.5, 3.9, 6.1),
+        (5.0, 3.9, 6.1),
+        (3.9, 3.9, 6.1),
+        (6.1, 3.9, 6.1),
+        (5.0, None, None),
+        (2.0, 3.9, None),
+        (5.0, 3.9, None),
+        (7.0, None, 6.1),
+        (5.0, None, 6.1),
+        (6.5, 3.9, 6.0),
+        (6.2, 0.0, 5.2),
+        (-1.0, 3.9, 6.1),
+        (1000.0, 3.9, 6.1),
+        (5.5, 5.0, 4.0),
+    ]
+    
+    @staticmethod
+    def make_param(index, value, range_min, range_max):
+        return NormalizedParameter(
+            normalized_parameter_id=f"test-col-{index}",
+            original_parameter_id=f"orig-col-{index}",
+            user_id="USER-COL",
+            canonical_name="glucose_fasting",
+            original_value=value,
+            original_unit="mmol/L",
+            normalized_value=value,
+            standard_unit="mmol/L",
+            conversion_factor=1.0,
+            reference_range_min=range_min,
+            reference_range_max=range_max,
+            normalization_confidence=0.95
+        )
+    
+    def test_matches_detect_mismatch(self):
+        """Test that every column entry equals the per-parameter result"""
+        values, mins, maxes = zip(*self.CASES)
+        result = detect_mismatches_columnar(values, mins, maxes)
+        
+        for index, case in enumerate(self.CASES):
+            expected = detect_mismatch(self.make_param(index, *case))
+            record = result[index]
+            
+            assert bool(record["has_mismatch"]) == expected["has_mismatch"]
+            assert MISMATCH_TYPE_CODES[record["mismatch_type"]] == expected["mismatch_type"]
+            assert SEVERITY_LEVELS[record["severity"]] == expected["severity"]
+            if expected["deviation_percentage"] is None:
+                assert np.isnan(record["deviation_percentage"])
+            else:
+                assert record["deviation_percentage"] == expected["deviation_percentage"]
+    
+    def test_summary_matches_batch(self):
+        """Test that the counts equal detect_mismatches_batch"""
+        params = [self.make_param(index, *case) for index, case in enumerate(self.CASES)]
+        values, mins, maxes = zip(*self.CASES)
+        
+        summary = summarize_mismatches(detect_mismatches_columnar(values, mins, maxes))
+        batch = detect_mismatches_batch(params)
+        
+        for key in ("total", "mismatches_found", "within_range", "no_reference"):
+            assert summary[key] == batch[key]
+    
+    def test_nan_bounds_and_broadcast(self):
+        """Test NaN as a missing bound and scalar bounds broadcast over values"""
+        result = detect_mismatches_columnar(np.array([2.0, 5.0, 7.0]), 3.9, np.nan)
+        
+        assert [MISMATCH_TYPE_CODES[code] for code in result["mismatch_type"]] == [
+            MismatchType.BELOW_RANGE, MismatchType.WITHIN_RANGE, MismatchType.WITHIN_RANGE
+        ]
+    
+    def test_zero_bound_is_severe(self):
+        """Test that a violated zero bound gives an infinite, severe deviation"""
+        result = detect_mismatches_columnar([-1.0], [0.0], [np.nan])
+        
+        assert np.isinf(result["deviation_percentage"][0])
+        assert SEVERITY_LEVELS[result["severity"][0]] == "severe"
+    
+    def test_empty_input(self):
+        """Test that empty columns give an empty result"""
+        result = detect_mismatches_columnar([], [], [])
+        
+        assert result.size == 0
+        assert summarize_mismatches(result)["total"] == 0
+    
+    def test_to_frame(self):
+        """Test conversion to a labelled DataFrame"""
+        pytest.importorskip("pandas")
+        frame = mismatches_to_frame(
+            detect_mismatches_columnar([8.3, 5.0], [3.9, 3.9], [6.1, 6.1]), index=["a", "b"]
+        )
+        
+        assert list(frame["mismatch_type"]) == [MismatchType.ABOVE_RANGE, MismatchType.WITHIN_RANGE]
+        assert list(frame["severity"]) == ["severe", "none"]
+        assert list(frame.index) == ["a", "b"]
+
+
 # Run tests if executed directly
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
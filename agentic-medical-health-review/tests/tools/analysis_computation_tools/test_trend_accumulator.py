@@ -0,0 +1,146 @@
+"""
+Tests for Incremental Trend Accumulator
+
+Tests the TrendAccumulator functionality including:
+- Results equal to compute_trend after every added measurement
+- Out-of-order arrival and timestamp ties
+- Round trip through the persisted row format
+- update_trend creating, locking and upserting the stored row
+
+Database access is captured with a stand-in cursor.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from trend_computation import compute_trend, TrendType
+from trend_accumulator import TrendAccumulator, update_trend
+
+
+def assert_same_trend(result, expected):
+    assert result["trend_type"] == expected["trend_type"]
+    assert result["data_point_count"] == expected["data_point_count"]
+    for key in ("confidence_score", "value_change", "percentage_change", "average_value", "time_span_days"):
+        if expected[key] is None:
+            assert result[key] is None
+        else:
+            assert result[key] == pytest.approx(expected[key], rel=1e-6, abs=1e-9)
+
+
+class TestTrendAccumulator:
+    """Test suite for TrendAccumulator"""
+
+    def test_matches_compute_trend_incrementally(self):
+        """Test that the trend equals a full recompute after each new point"""
+        rng = random.Random(11)
+        base = datetime(2023, 1, 1)
+        accumulator = TrendAccumulator("USER-1", "glucose_fasting")
+        points = []
+
+        for _ in range(12):
+            point = {
+                "value": rng.uniform(4.0, 8.0),
+                "timestamp": base + timedelta(days=rng.randint(0, 500), hours=rng.randint(0, 23))
+            }
+            points.append(point)
+            accumulator.add(point["value"], point["timestamp"])
+
+            assert_same_trend(accumulator.to_result(), compute_trend(points, "glucose_fasting", "USER-1"))
+
+    def test_out_of_order_first_and_last(self):
+        """Test that first and last follow time, not arrival order"""
+        accumulator = TrendAccumulator("USER-1", "ldl")
+        accumulator.add(6.0, "2024-03-01")
+        accumulator.add(4.0, "2024-01-01")
+        accumulator.add(5.0, "2024-02-01")
+
+        result = accumulator.to_result()
+
+        assert result["value_change"] == pytest.approx(2.0)
+        assert result["trend_type"] == TrendType.INCREASING
+        assert accumulator.slope() == pytest.approx(1.0 / 30, rel=0.05)
+
+    def test_timestamp_ties_match_stable_sort(self):
+        """Test that equal timestamps order like compute_trend's stable sort"""
+        points = [
+            {"value": 5.0, "timestamp": "2024-01-01"},
+            {"value": 9.0, "timestamp": "2024-01-01"},
+            {"value": 6.0, "timestamp": "2024-02-01"},
+            {"value": 3.0, "timestamp": "2024-02-01"},
+        ]
+        accumulator = TrendAccumulator("USER-1", "ldl")
+        accumulator.add_points(points)
+
+        assert_same_trend(accumulator.to_result(), compute_trend(points, "ldl", "USER-1"))
+
+    def test_same_time_has_zero_slope(self):
+        """Test that measurements at one instant give a zero slope"""
+        accumulator = TrendAccumulator("USER-1", "ldl")
+        accumulator.add(3.0, 19800.25)
+        accumulator.add(4.0, 19800.25)
+
+        assert accumulator.slope() == 0.0
+
+    def test_single_point_insufficient(self):
+        """Test that one point is insufficient_data"""
+        accumulator = TrendAccumulator("USER-1", "ldl")
+        accumulator.add(3.0, "2024-01-01")
+
+        assert accumulator.to_result()["trend_type"] == TrendType.INSUFFICIENT_DATA
+
+    def test_row_round_trip(self):
+        """Test that a restored accumulator continues identically"""
+        accumulator = TrendAccumulator("USER-1", "ldl")
+        accumulator.add_points([{"value": 3.0, "timestamp": "2024-01-01"}, {"value": 3.4, "timestamp": "2024-02-01"}])
+
+        restored = TrendAccumulator.from_row(accumulator.to_row())
+        for acc in (accumulator, restored):
+            acc.add(3.9, "2024-03-01")
+
+        assert restored.to_result() == accumulator.to_result()
+
+
+class RecordingCursor:
+    """Cursor stand-in holding one stored accumulator row"""
+
+    def __init__(self, row=None):
+        self.row = row
+        self.statements = []
+
+    def execute(self, query, params=None):
+        self.statements.append(" ".join(query.split()))
+
+    def fetchone(self):
+        return self.row
+
+
+class FakeDB:
+    def __init__(self, row=None):
+        self.cursor = RecordingCursor(row)
+
+
+class TestUpdateTrend:
+    """Test suite for update_trend persistence"""
+
+    def test_existing_row_locked_and_upserted(self):
+        """Test that the stored state is locked, extended and written back"""
+        stored = TrendAccumulator("USER-1", "ldl")
+        stored.add_points([{"value": 3.0, "timestamp": "2024-01-01"}, {"value": 3.5, "timestamp": "2024-02-01"}])
+        db = FakeDB(stored.to_row())
+
+        result = update_trend("USER-1", "ldl", [{"value": 4.0, "timestamp": "2024-03-01"}], db=db)
+
+        assert result["data_point_count"] == 3
+        assert db.cursor.statements[0].startswith("INSERT INTO trend_accumulators (user_id, canonical_name) VALUES")
+        assert db.cursor.statements[1].endswith("FOR UPDATE")
+        assert "ON CONFLICT (user_id, canonical_name) DO UPDATE SET point_count = EXCLUDED.point_count" in db.cursor.statements[2]
+
+    def test_new_row(self):
+        """Test that a parameter without stored state starts empty"""
+        db = FakeDB(None)
+
+        result = update_trend("USER-1", "ldl", [{"value": 4.0, "timestamp": "2024-03-01"}], db=db)
+
+        assert result["trend_type"] == TrendType.INSUFFICIENT_DATA
+        assert result["data_point_count"] == 1
@@ -9,6 +9,8 @@ Tests the trend_computation_tool functionality including:
 - Insufficient data handling
 - Batch processing
 - Edge cases
+- Timestamp format sniffing and per-source memo
+- Columnar (NumPy) trends matching compute_trend per group
 """
 
 import sys
@@ -20,14 +22,21 @@ project_root = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(project_root))
 sys.path.insert(0, str(project_root / "tools" / "src" / "analysis_computation_tools"))
 
+import numpy as np
 import pytest
 from datetime import datetime, timedelta
 from trend_computation import (
     compute_trend,
     compute_trends_batch,
+    compute_trends_columnar,
+    trend_records,
+    trends_to_frame,
     TrendType,
+    TREND_TYPE_CODES,
+    TimestampParser,
     _calculate_slope,
-    _calculate_std_dev
+    _calculate_std_dev,
+    _parse_timestamp_slow
 )
 
 
@@ -538,6 +547,147 @@ class TestTimestampFormats:
         result = compute_trend(data_points, "glucose_fasting", "USER-029")
         
         assert result['trend_type'] == TrendType.INCREASING
+    
+    def test_sniffed_formats_match_fallback(self):
+        """Test that the sniffing table parses like the general fallback chain"""
+        parser = TimestampParser()
+        for timestamp in [
+            "2024-01-05", "2024/1/5", "2024/01/05", "2024-01-05 08:30:00",
+            "2024-01-05T08:30", "2024-01-05T08:30:00.123456", "2024-01-05T08:30:00Z",
+            "2024-01-05T08:30:00+05:30"
+        ]:
+            assert parser.parse(timestamp) == _parse_timestamp_slow(timestamp)
+    
+    def test_unknown_format_raises(self):
+        """Test that unparseable strings still raise ValueError"""
+        with pytest.raises(ValueError):
+            TimestampParser().parse("05.01.2024")
+        with pytest.raises(ValueError):
+            TimestampParser().parse("2024-13-05")
+    
+    def test_format_memoized_per_source(self):
+        """Test that the detected format is remembered per data source"""
+        parser = TimestampParser()
+        parser.parse("2024/01/05", source="lab_a")
+        parser.parse("2024-01-05T08:30:00Z", source="device_b")
+        
+        assert parser.source_format("lab_a") == "slashed_date"
+        assert parser.source_format("device_b") == "iso_datetime_utc"
+        assert parser.source_format("lab_c") is None
+        # A source switching formats is re-sniffed
+        assert parser.parse("2024-02-01", source="lab_a") == datetime(2024, 2, 1)
+        assert parser.source_format("lab_a") == "date"
+    
+    def test_mixed_formats_with_source(self):
+        """Test compute_trend with a source and mixed timestamp formats"""
+        data_points = [
+            {"value": 6.0, "timestamp": "2024/02/01"},
+            {"value": 5.0, "timestamp": "2024-01-01"},
+            {"value": 7.0, "timestamp": datetime(2024, 3, 1)}
+        ]
+        
+        result = compute_trend(data_points, "glucose_fasting", "USER-030", source="lab_a")
+        
+        assert result['trend_type'] == TrendType.INCREASING
+        assert result['value_change'] == 2.0
+        assert result['time_span_days'] == 60.0
+    
+    def test_slope_from_day_floats(self):
+        """Test that _calculate_slope gives the same slope for datetimes and day floats"""
+        base = datetime(2024, 1, 1)
+        timestamps = [base + timedelta(days=d, hours=h) for d, h in [(0, 0), (3, 6), (10, 12), (31, 0)]]
+        days = [(t - datetime(1970, 1, 1)).total_seconds() / 86400 for t in timestamps]
+        values = [5.0, 5.4, 5.9, 7.1]
+        
+        assert _calculate_slope(values, days) == pytest.approx(_calculate_slope(values, timestamps), rel=1e-9)
+
+
+class TestColumnarTrends:
+    """Test suite for compute_trends_columnar"""
+    
+    @staticmethod
+    def long_table(seed=7, users=4, names=("glucose_fasting", "hba1c", "ldl"), max_points=7):
+        """Random long-format rows, shuffled, with some single-point groups"""
+        rng = np.random.default_rng(seed)
+        rows = []
+        for user in range(users):
+            for name in names:
+                count = int(rng.integers(1, max_points + 1))
+                start = datetime(2023, 1, 1) + timedelta(days=int(rng.integers(0, 100)))
+                level = float(rng.uniform(1, 10))
+                for _ in range(count):
+                    rows.append((
+                        f"USER-{user}", name,
+                        start + timedelta(days=int(rng.integers(0, 400)), hours=int(rng.integers(0, 24))),
+                        level * float(rng.uniform(0.7, 1.3))
+                    ))
+        order = rng.permutation(len(rows))
+        return [rows[i] for i in order]
+    
+    def expected(self, rows):
+        groups = {}
+        for user, name, timestamp, value in rows:
+            groups.setdefault((user, name), []).append({"value": value, "timestamp": timestamp})
+        return {key: compute_trend(points, key[1], key[0]) for key, points in groups.items()}
+    
+    def test_matches_compute_trend(self):
+        """Test that every group equals the per-parameter compute_trend result"""
+        rows = self.long_table()
+        users, names, timestamps, values = zip(*rows)
+        
+        records = trend_records(compute_trends_columnar(users, names, timestamps, values))
+        expected = self.expected(rows)
+        
+        assert len(records) == len(expected)
+        for record in records:
+            reference = expected[(record["user_id"], record["canonical_name"])]
+            assert record["trend_type"] == reference["trend_type"]
+            assert record["data_point_count"] == reference["data_point_count"]
+            for key in ("confidence_score", "value_change", "percentage_change", "average_value", "time_span_days"):
+                if reference[key] is None:
+                    assert record[key] is None
+                else:
+                    assert record[key] == pytest.approx(reference[key], rel=1e-9, abs=1e-9)
+    
+    def test_slope_matches(self):
+        """Test that slopes equal _calculate_slope on the sorted group"""
+        base = datetime(2024, 1, 1)
+        timestamps = [base + timedelta(days=d) for d in (30, 0, 60, 90)]
+        values = [5.5, 5.0, 6.0, 6.4]
+        
+        result = compute_trends_columnar(["U"] * 4, ["glucose"] * 4, timestamps, values)
+        
+        ordered = sorted(zip(timestamps, values))
+        expected = _calculate_slope([v for _, v in ordered], [t for t, _ in ordered])
+        assert result["slope"][0] == pytest.approx(expected)
+    
+    def test_float_day_timestamps(self):
+        """Test that numeric timestamps are treated as days"""
+        result = compute_trends_columnar(["U"] * 3, ["ldl"] * 3, [0.0, 10.0, 20.0], [3.0, 3.5, 4.0])
+        
+        assert TREND_TYPE_CODES[result["trend_type"][0]] == TrendType.INCREASING
+        assert result["slope"][0] == pytest.approx(0.05)
+        assert result["time_span_days"][0] == 20.0
+    
+    def test_single_point_insufficient(self):
+        """Test that one-point groups are insufficient_data"""
+        records = trend_records(compute_trends_columnar(["U"], ["ldl"], [0.0], [3.0]))
+        
+        assert records[0]["trend_type"] == TrendType.INSUFFICIENT_DATA
+        assert records[0]["confidence_score"] == 0.0
+        assert records[0]["average_value"] is None
+    
+    def test_empty_table(self):
+        """Test that an empty table gives no groups"""
+        assert compute_trends_columnar([], [], [], []).size == 0
+    
+    def test_to_frame(self):
+        """Test conversion to a labelled DataFrame"""
+        pytest.importorskip("pandas")
+        frame = trends_to_frame(compute_trends_columnar(["U"] * 2, ["ldl"] * 2, [0.0, 30.0], [3.0, 4.0]))
+        
+        assert list(frame["trend_type"]) == [TrendType.INCREASING]
+        assert frame["data_point_count"].iloc[0] == 2
 
 
 # Run tests if executed directly
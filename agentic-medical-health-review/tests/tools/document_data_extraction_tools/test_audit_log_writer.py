@@ -0,0 +1,358 @@
+"""
+Tests for Normalization Audit Log Persistence
+
+Tests the bulk audit log path including:
+- Multi-row INSERT of buffered entries in column order
+- Flush threshold and savepoint handling in LabDataNormalizer
+- Backfill of the required original name/value columns
+- Background AuditLogWriter batching, flushing and failure counting
+- normalize_batch handing entries to the writer only after the commit
+- Parameter counts recorded only for committed batches
+
+Database writes are captured with stand-ins, so no PostgreSQL instance is needed.
+"""
+
+import importlib
+
+import pytest
+
+pytest.importorskip("psycopg2")
+
+from tools.src.document_data_extraction_tools import pipeline_metrics
+from tools.src.document_data_extraction_tools.normalize_lab_data import audit_log_writer, lab_data_normalizer
+from tools.src.document_data_extraction_tools.normalize_lab_data.audit_log_writer import AuditLogWriter
+from tools.src.document_data_extraction_tools.normalize_lab_data.lab_data_normalizer import (
+    AUDIT_LOG_COLUMNS,
+    LabDataNormalizer,
+    write_audit_logs
+)
+from tools.src.document_data_extraction_tools.pipeline_metrics import NORMALIZED_PARAMETERS_TOTAL, MetricsRegistry
+
+normalize_module = importlib.import_module(
+    "tools.src.document_data_extraction_tools.normalize_lab_data.normalize_lab_data"
+)
+
+
+class RecordingCursor:
+    """Cursor that records executed statements"""
+
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, query, params=None):
+        self.statements.append(query.strip())
+
+
+class FakeDB:
+    """DatabaseConnection stand-in"""
+
+    def __init__(self):
+        self.cursor = RecordingCursor()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+@pytest.fixture
+def written(monkeypatch):
+    """Capture write_audit_logs calls made by the normalizer and the writer"""
+    batches = []
+
+    def fake_write(cursor, entries, page_size=1000):
+        batches.append(list(entries))
+
+    monkeypatch.setattr(lab_data_normalizer, "write_audit_logs", fake_write)
+    monkeypatch.setattr(audit_log_writer, "write_audit_logs", fake_write)
+    monkeypatch.setattr(audit_log_writer, "DatabaseConnection", FakeDB)
+    return batches
+
+
+def log_name_mapping(normalizer, parameter_id="p1"):
+    normalizer._log_operation(
+        parameter_id=parameter_id, operation='name_mapping', status='success',
+        original_name='Glucose', canonical_name='glucose_fasting'
+    )
+
+
+class TestWriteAuditLogs:
+    """Test suite for the multi-row INSERT helper"""
+
+    def test_single_statement_in_column_order(self, monkeypatch):
+        """Test that entries become one execute_values call with ordered tuples"""
+        calls = []
+        monkeypatch.setattr(
+            lab_data_normalizer, "execute_values",
+            lambda cursor, sql, rows, page_size: calls.append((sql, rows, page_size))
+        )
+        entry = {column: column for column in AUDIT_LOG_COLUMNS}
+
+        write_audit_logs(object(), [entry, entry], page_size=50)
+
+        assert len(calls) == 1
+        sql, rows, page_size = calls[0]
+        assert sql.startswith("INSERT INTO normalization_audit_logs (parameter_id, operation, status,")
+        assert rows == [AUDIT_LOG_COLUMNS, AUDIT_LOG_COLUMNS]
+        assert page_size == 50
+
+    def test_empty_is_noop(self, monkeypatch):
+        """Test that no statement is issued for an empty buffer"""
+        monkeypatch.setattr(lab_data_normalizer, "execute_values", lambda *args, **kwargs: pytest.fail())
+        write_audit_logs(object(), [])
+
+
+class TestNormalizerAuditBuffer:
+    """Test suite for LabDataNormalizer audit buffering"""
+
+    def test_save_uses_savepoint_and_clears_buffer(self, written):
+        """Test that one bulk write runs inside a savepoint"""
+        db = FakeDB()
+        normalizer = LabDataNormalizer(db)
+        log_name_mapping(normalizer)
+        log_name_mapping(normalizer)
+
+        normalizer.save_audit_logs()
+
+        assert [len(batch) for batch in written] == [2]
+        assert db.cursor.statements == ["SAVEPOINT save_audit_logs", "RELEASE SAVEPOINT save_audit_logs"]
+        assert normalizer.operations_log == []
+        assert normalizer.audit_logs_saved == 2
+        assert normalizer.operations_count == 2
+
+    def test_threshold_triggers_flush(self, written):
+        """Test that reaching the threshold writes the buffer"""
+        normalizer = LabDataNormalizer(FakeDB(), audit_flush_threshold=3)
+        for _ in range(7):
+            log_name_mapping(normalizer)
+
+        assert [len(batch) for batch in written] == [3, 3]
+        assert len(normalizer.operations_log) == 1
+        assert normalizer.operations_count == 7
+
+    def test_failed_write_rolls_back_to_savepoint(self, monkeypatch, caplog):
+        """Test that a failed bulk write does not abort the transaction, and is counted and logged"""
+        def failing_write(cursor, entries, page_size=1000):
+            raise RuntimeError("constraint violated")
+
+        monkeypatch.setattr(lab_data_normalizer, "write_audit_logs", failing_write)
+        db = FakeDB()
+        normalizer = LabDataNormalizer(db)
+        log_name_mapping(normalizer)
+
+        normalizer.save_audit_logs()
+
+        assert db.cursor.statements[-1] == "ROLLBACK TO SAVEPOINT save_audit_logs"
+        assert normalizer.audit_logs_saved == 0
+        assert normalizer.audit_logs_failed == 1
+        assert [record.entries for record in caplog.records if record.levelname == "ERROR"] == [1]
+
+    def test_context_fills_required_columns(self, written):
+        """Test that entries without a source name/value get the parameter's"""
+        normalizer = LabDataNormalizer(FakeDB())
+        normalizer.set_parameter_context("p1", "Glucose", 95.0)
+        normalizer._log_operation(parameter_id="p1", operation='range_alignment', status='success')
+
+        entry = normalizer.operations_log[0]
+        assert entry['original_name'] == "Glucose"
+        assert entry['original_value'] == 95.0
+
+    def test_entries_handed_to_writer(self, written):
+        """Test that an audit writer receives the entries instead of the connection"""
+        class Writer:
+            submitted = []
+
+            def submit(self, entries):
+                self.submitted.append(entries)
+
+        db = FakeDB()
+        writer = Writer()
+        normalizer = LabDataNormalizer(db, audit_writer=writer)
+        log_name_mapping(normalizer)
+
+        normalizer.save_audit_logs()
+
+        assert len(writer.submitted) == 1
+        assert written == []
+        assert db.cursor.statements == []
+
+
+class TestAuditLogWriter:
+    """Test suite for the background AuditLogWriter"""
+
+    def test_submissions_coalesced(self, written):
+        """Test that submissions within the flush interval share one write"""
+        writer = AuditLogWriter(batch_size=100, flush_interval=0.2)
+        try:
+            for _ in range(3):
+                writer.submit([{'parameter_id': 'p1'}] * 2)
+            assert writer.flush(timeout=5)
+        finally:
+            writer.close()
+
+        assert sum(len(batch) for batch in written) == 6
+        assert len(written) < 3
+        assert writer.written == 6
+
+    def test_batch_size_caps_write(self, written):
+        """Test that a full batch is written without waiting for the interval"""
+        writer = AuditLogWriter(batch_size=2, flush_interval=30)
+        try:
+            writer.submit([{'parameter_id': 'p1'}] * 2)
+            assert writer.flush(timeout=5)
+        finally:
+            writer.close()
+
+        assert written == [[{'parameter_id': 'p1'}] * 2]
+
+    def test_failures_counted(self, monkeypatch):
+        """Test that a failed write is counted and the thread keeps running"""
+        def failing_write(cursor, entries, page_size=1000):
+            raise RuntimeError("database down")
+
+        monkeypatch.setattr(audit_log_writer, "write_audit_logs", failing_write)
+        monkeypatch.setattr(audit_log_writer, "DatabaseConnection", FakeDB)
+        writer = AuditLogWriter(batch_size=1, flush_interval=0)
+        try:
+            writer.submit([{'parameter_id': 'p1'}])
+            writer.submit([{'parameter_id': 'p2'}])
+            assert writer.flush(timeout=5)
+        finally:
+            writer.close()
+
+        assert writer.failed == 2
+        assert writer.written == 0
+
+    def test_close_drains_and_rejects(self, written):
+        """Test that close() writes pending entries and refuses new ones"""
+        writer = AuditLogWriter(batch_size=100, flush_interval=30)
+        writer.submit([{'parameter_id': 'p1'}])
+        writer.close()
+
+        assert written == [[{'parameter_id': 'p1'}]]
+        with pytest.raises(RuntimeError):
+            writer.submit([{'parameter_id': 'p2'}])
+
+    def test_disabled_by_default(self, monkeypatch):
+        """Test that from_env returns None unless AUDIT_LOG_ASYNC is true"""
+        monkeypatch.delenv("AUDIT_LOG_ASYNC", raising=False)
+        assert AuditLogWriter.from_env() is None
+
+
+class TransactionDB(FakeDB):
+    """DatabaseConnection stand-in recording commits and rollbacks in a shared event list"""
+
+    events = []
+    fail = False
+
+    def __init__(self):
+        super().__init__()
+        if self.fail:
+            self.cursor.execute = self.failing_execute
+
+    @staticmethod
+    def failing_execute(query, params=None):
+        raise RuntimeError("deadlock detected")
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.events.append("rollback" if exc_type else "commit")
+        return False
+
+
+@pytest.fixture
+def events(monkeypatch):
+    """Transaction outcomes and writer submissions, in the order they happen"""
+    events = []
+
+    class Writer:
+        def submit(self, entries):
+            events.append(("submit", len(entries)))
+
+    class RuleIndex:
+        def ensure_fresh(self, db):
+            pass
+
+    def normalize_parameter(normalizer, result, parameter_id, *args):
+        log_name_mapping(normalizer, parameter_id)
+        result["success"] = True
+        return "flagged", None
+
+    monkeypatch.setattr(TransactionDB, "events", events)
+    monkeypatch.setattr(normalize_module, "DatabaseConnection", TransactionDB)
+    monkeypatch.setattr(normalize_module, "get_rule_index", RuleIndex)
+    monkeypatch.setattr(normalize_module, "get_audit_writer", Writer)
+    monkeypatch.setattr(normalize_module, "_normalize_parameter", normalize_parameter)
+    # Would flush every entry mid-transaction without a writer
+    monkeypatch.setenv("AUDIT_LOG_FLUSH_THRESHOLD", "1")
+    return events
+
+
+def batch_parameters(count):
+    return [
+        {"parameter_id": f"p{n}", "user_id": "u1", "parameter_name": "Glucose", "value": 95.0}
+        for n in range(count)
+    ]
+
+
+class TestNormalizeBatchAudit:
+    """Test suite for normalize_batch with the background writer"""
+
+    def test_submitted_after_commit(self, events):
+        """Test that the writer gets the whole batch once the transaction has committed"""
+        result = normalize_module.normalize_batch(batch_parameters(3))
+
+        assert result["successful"] == 3 and result["rolled_back"] is False
+        assert events == ["commit", ("submit", 3)]
+
+    def test_rolled_back_batch_not_submitted(self, events, monkeypatch):
+        """Test that a rolled-back batch hands nothing to the writer"""
+        monkeypatch.setattr(TransactionDB, "fail", True)
+
+        result = normalize_module.normalize_batch(batch_parameters(3))
+
+        assert result["failed"] == 3
+        assert result["rolled_back"] is True and result["error"] == "deadlock detected"
+        assert events == ["rollback"]
+
+    def test_submit_failure_keeps_committed_results(self, events, monkeypatch):
+        """Test that a writer failing after the commit does not turn the batch into a rollback"""
+        def closed(self, entries):
+            raise RuntimeError("AuditLogWriter is closed")
+
+        writer_class = normalize_module.get_audit_writer
+        monkeypatch.setattr(writer_class, "submit", closed)
+
+        result = normalize_module.normalize_batch(batch_parameters(2))
+
+        assert result["rolled_back"] is False
+        assert result["successful"] == 2
+        assert events == ["commit"]
+
+
+class TestNormalizeBatchMetrics:
+    """Test suite for the normalize_batch parameter counter"""
+
+    @pytest.fixture
+    def registry(self, monkeypatch):
+        registry = MetricsRegistry()
+        monkeypatch.setattr(pipeline_metrics, "_shared_registry", registry)
+        monkeypatch.setattr(pipeline_metrics, "_shared_registry_loaded", True)
+        return registry.counter(NORMALIZED_PARAMETERS_TOTAL)
+
+    def test_counted_after_commit(self, events, registry):
+        """Test that committed parameters are counted by their status"""
+        normalize_module.normalize_batch(batch_parameters(2))
+
+        assert registry.value(status="flagged") == 2
+        assert registry.value(status="failed") == 0
+
+    def test_rolled_back_counted_as_failed(self, events, registry, monkeypatch):
+        """Test that a rolled-back batch is not counted as normalized or flagged"""
+        monkeypatch.setattr(TransactionDB, "fail", True)
+
+        normalize_module.normalize_batch(batch_parameters(2))
+
+        assert registry.value(status="flagged") == 0
+        assert registry.value(status="failed") == 2
+
@@ -0,0 +1,421 @@
+"""
+Tests for Batch Lab Report Ingestion
+
+Tests the batch ingestion CLI building blocks including:
+- Directory scanning and CSV / JSON Lines manifests
+- Checkpoint persistence and resume
+- Resume after an interruption between a commit and its checkpoint line
+- Batching, failure handling and throughput stats
+- Parameter building for the bulk inserts
+
+OCR, LLM and database steps are replaced by stand-ins.
+"""
+
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+import models.database_connection
+import tools.src.document_data_extraction_tools.normalize_lab_data as normalize_lab_data
+from tools.src.document_data_extraction_tools import report_store
+from tools.src.document_data_extraction_tools.batch_ingest import (
+    BatchIngestor,
+    BatchItem,
+    IngestionCheckpoint,
+    ThroughputStats,
+    load_manifest,
+    scan_directory
+)
+from tools.src.document_data_extraction_tools.report_store import build_parameters, parse_test_value
+
+
+class StubIngestor(BatchIngestor):
+    """Ingestor with OCR and LLM stand-ins"""
+
+    def __init__(self, **kwargs):
+        super().__init__(report=lambda line: None, **kwargs)
+        self.ocr_batches = []
+
+    def _ocr_batch(self, batch):
+        self.ocr_batches.append([item.file_path for item in batch])
+        return [
+            {
+                "item": item,
+                "pages": [{"page_num": 1}, {"page_num": 2}],
+                "text": "Glucose 100 mg/dL",
+                "tests": [],
+                "error": "File not found" if "bad" in item.file_path else None
+            }
+            for item in batch
+        ]
+
+    async def _extract_batch(self, documents):
+        for document in documents:
+            if not document["error"]:
+                document["tests"] = [{"test_name": "Glucose", "test_value": "100", "unit": "mg/dL"}]
+
+
+class FakeIngestor(StubIngestor):
+    """Ingestor with OCR, LLM and database stand-ins"""
+
+    def __init__(self, fail_trends=False, **kwargs):
+        super().__init__(**kwargs)
+        self.fail_trends = fail_trends
+        self.normalized = []
+        self.trended = []
+        self.resumed = []
+        self.replayed = []
+
+    def _store_reports(self, documents):
+        for document in documents:
+            document["report_id"] = f"report-{document['item'].file_path}"
+
+    def _normalize(self, parameters):
+        self.normalized.extend(parameters)
+        return True
+
+    def _apply_trends(self, report_ids):
+        if self.fail_trends:
+            return False
+        self.trended.extend(report_ids)
+        return True
+
+    def _resume_stored(self, items):
+        self.resumed.extend(item.file_path for item in items)
+        self.checkpoint.record([{"key": item.key, "status": "done"} for item in items])
+
+    def _resume_normalized(self, items):
+        self.replayed.extend(item.file_path for item in items)
+        self._record_status([(item, self.checkpoint.entries[item.key]["report_id"]) for item in items], "done")
+
+
+class MemoryStore:
+    """report_store and normalize_batch() stand-in keeping committed rows in memory"""
+
+    def __init__(self):
+        self.reports = {}
+        self.parameters = {}
+        self.trend_claims = set()
+        self.trend_points = []
+
+    def find_reports(self, db, reports):
+        keys = {(report["user_id"], report["file_path"]) for report in reports}
+        return {key: report_id for key, report_id in self.reports.items() if key in keys}
+
+    def store_reports(self, db, reports):
+        report_ids = []
+        for report in reports:
+            report_id = f"r{len(self.reports) + 1}"
+            self.reports[(report["user_id"], report["file_path"])] = report_id
+            for parameter in report["parameters"]:
+                self.parameters[parameter["parameter_id"]] = {
+                    **parameter, "report_id": report_id, "timestamp": report["report_date"], "status": "pending"
+                }
+            report_ids.append(report_id)
+        return report_ids
+
+    def pending_parameters(self, db, report_ids):
+        return [
+            parameter for parameter in self.parameters.values()
+            if parameter["report_id"] in report_ids and parameter["status"] == "pending"
+        ]
+
+    def normalize_batch(self, parameters):
+        for parameter in parameters:
+            self.parameters[parameter["parameter_id"]]["status"] = "normalized"
+        return {"rolled_back": False, "error": None}
+
+    def normalized_parameters(self, db, report_ids):
+        return [
+            {
+                "original_parameter_id": parameter["parameter_id"],
+                "user_id": parameter["user_id"],
+                "canonical_name": parameter["parameter_name"].lower(),
+                "normalized_value": parameter["value"],
+                "timestamp": parameter["timestamp"]
+            }
+            for parameter in self.parameters.values()
+            if parameter["report_id"] in report_ids and parameter["status"] == "normalized"
+        ]
+
+    def claim_trend_updates(self, db, report_ids):
+        claimed = [report_id for report_id in report_ids if report_id not in self.trend_claims]
+        self.trend_claims.update(claimed)
+        return claimed
+
+    def update_trends(self, db, normalized, timestamps):
+        self.trend_points.extend(parameter["original_parameter_id"] for parameter in normalized)
+
+    def add_report(self, item, status):
+        """Commit a report of item whose parameters reached status, as an interrupted run would"""
+        report = {"user_id": item.user_id, "file_path": os.path.abspath(item.file_path), "report_date": item.report_date}
+        report["parameters"], _ = build_parameters(item.user_id, [{"test_name": "Glucose", "test_value": "100"}])
+        report_id = self.store_reports(None, [report])[0]
+        for parameter in self.parameters.values():
+            parameter["status"] = status
+        return report_id
+
+
+class StubConnection:
+    """DatabaseConnection stand-in"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """In-memory database behind the real BatchIngestor storage steps"""
+    memory = MemoryStore()
+    monkeypatch.setattr(models.database_connection, "DatabaseConnection", StubConnection)
+    monkeypatch.setattr(normalize_lab_data, "normalize_batch", memory.normalize_batch)
+    for name in ("find_reports", "store_reports", "pending_parameters", "normalized_parameters",
+                 "claim_trend_updates", "update_trends"):
+        monkeypatch.setattr(report_store, name, getattr(memory, name))
+    return memory
+
+
+class StubOCRExecutor:
+    """ParallelOCRExecutor stand-in; files named "corrupt" fail to plan"""
+
+    def plan_document(self, file_path):
+        if "corrupt" in file_path:
+            raise RuntimeError("Unable to get page count. Syntax Error: Couldn't read xref table")
+        return {"file_path": file_path, "file_type": "pdf"}
+
+    def extract_planned(self, plans):
+        return [[{"page_num": 1, "text": f"text of {plan['file_path']}"}] for plan in plans]
+
+
+def items(*names):
+    return [BatchItem(name, "user-1", datetime(2024, 1, 1)) for name in names]
+
+
+class TestSources:
+    """Test suite for directory scans and manifests"""
+
+    def test_scan_with_user_id(self, tmp_path):
+        """Test that supported files are found recursively in path order"""
+        (tmp_path / "2023").mkdir()
+        for name in ("2023/b.pdf", "a.PNG", "notes.txt"):
+            (tmp_path / name).write_bytes(b"x")
+
+        found = scan_directory(str(tmp_path), user_id="user-1")
+
+        assert [item.file_path for item in found] == [str(tmp_path / "a.PNG"), str(tmp_path / "2023" / "b.pdf")]
+        assert {item.user_id for item in found} == {"user-1"}
+
+    def test_scan_user_directories(self, tmp_path):
+        """Test that top-level directories name the owners"""
+        for name in ("user-1/a.pdf", "user-2/2023/b.jpg", "loose.pdf"):
+            (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / name).write_bytes(b"x")
+
+        found = scan_directory(str(tmp_path))
+
+        assert [(item.user_id, item.file_path.rsplit("/", 1)[-1]) for item in found] == [
+            ("user-1", "a.pdf"), ("user-2", "b.jpg")
+        ]
+
+    def test_csv_manifest(self, tmp_path):
+        """Test CSV manifests with relative paths and optional report dates"""
+        manifest = tmp_path / "backfill.csv"
+        manifest.write_text("file_path,user_id,report_date\na.pdf,user-1,2019-05-02\nb.pdf,user-2,\n")
+
+        found = load_manifest(str(manifest))
+
+        assert found[0].file_path == str(tmp_path / "a.pdf")
+        assert found[0].report_date == datetime(2019, 5, 2)
+        assert found[1].user_id == "user-2" and found[1].report_date is None
+
+    def test_jsonl_manifest_requires_user(self, tmp_path):
+        """Test that JSON Lines entries without a user are rejected"""
+        manifest = tmp_path / "backfill.jsonl"
+        manifest.write_text(json.dumps({"file_path": "a.pdf"}) + "\n")
+
+        with pytest.raises(ValueError):
+            load_manifest(str(manifest))
+
+
+class TestCheckpoint:
+    """Test suite for IngestionCheckpoint"""
+
+    def test_reload_last_status_wins(self, tmp_path):
+        """Test that a reopened checkpoint sees the latest status per document"""
+        path = str(tmp_path / "checkpoint.jsonl")
+        IngestionCheckpoint(path).record([{"key": "a", "status": "stored"}, {"key": "a", "status": "done"}])
+        with open(path, "a") as f:
+            f.write('{"key": "b", "sta')
+
+        checkpoint = IngestionCheckpoint(path)
+
+        assert checkpoint.status("a") == "done"
+        assert checkpoint.status("b") is None
+
+
+class TestBatchIngestor:
+    """Test suite for BatchIngestor"""
+
+    def test_batches_and_checkpoint(self, tmp_path):
+        """Test batching, stats and per-document checkpoint statuses"""
+        checkpoint = IngestionCheckpoint(str(tmp_path / "checkpoint.jsonl"))
+        ingestor = FakeIngestor(checkpoint=checkpoint, batch_size=2)
+        batch = items("a.pdf", "bad.pdf", "c.pdf")
+
+        stats = ingestor.run(batch)
+
+        assert ingestor.ocr_batches == [["a.pdf", "bad.pdf"], ["c.pdf"]]
+        assert (stats.docs, stats.pages, stats.tests, stats.failed) == (2, 4, 2, 1)
+        assert [checkpoint.status(item.key) for item in batch] == ["done", "failed", "done"]
+        assert len(ingestor.normalized) == 2
+        assert len(ingestor.trended) == 2
+
+    def test_failed_trend_update_replayed(self, tmp_path):
+        """Test that documents whose trend update failed stay "normalized" and only get their trends replayed"""
+        path = str(tmp_path / "checkpoint.jsonl")
+        batch = items("a.pdf", "b.pdf")
+
+        FakeIngestor(checkpoint=IngestionCheckpoint(path), fail_trends=True).run(batch)
+        checkpoint = IngestionCheckpoint(path)
+        assert [checkpoint.status(item.key) for item in batch] == ["normalized", "normalized"]
+
+        ingestor = FakeIngestor(checkpoint=checkpoint)
+        ingestor.run(batch)
+
+        assert ingestor.replayed == ["a.pdf", "b.pdf"]
+        assert ingestor.ocr_batches == [] and ingestor.normalized == []
+        assert [IngestionCheckpoint(path).status(item.key) for item in batch] == ["done", "done"]
+
+    def test_resume(self, tmp_path):
+        """Test that done documents are skipped and stored ones only normalized"""
+        path = str(tmp_path / "checkpoint.jsonl")
+        batch = items("a.pdf", "b.pdf", "c.pdf")
+        IngestionCheckpoint(path).record([
+            {"key": batch[0].key, "status": "done"},
+            {"key": batch[1].key, "status": "stored", "report_id": "r-b"}
+        ])
+
+        ingestor = FakeIngestor(checkpoint=IngestionCheckpoint(path))
+        stats = ingestor.run(batch)
+
+        assert ingestor.resumed == ["b.pdf"]
+        assert ingestor.ocr_batches == [["c.pdf"]]
+        assert stats.skipped == 1 and stats.docs == 1
+
+    def test_skip_failed(self, tmp_path):
+        """Test that failed documents are retried unless disabled"""
+        path = str(tmp_path / "checkpoint.jsonl")
+        batch = items("a.pdf")
+        IngestionCheckpoint(path).record([{"key": batch[0].key, "status": "failed", "error": "x"}])
+
+        assert FakeIngestor(checkpoint=IngestionCheckpoint(path), retry_failed=False).run(batch).skipped == 1
+        assert FakeIngestor(checkpoint=IngestionCheckpoint(path)).run(batch).docs == 1
+
+    def test_unreadable_file_fails_only_itself(self):
+        """Test that a document whose planning raises is failed while the rest are OCR'd"""
+        ingestor = BatchIngestor(report=lambda line: None)
+        ingestor._ocr_executor = StubOCRExecutor()
+
+        documents = ingestor._ocr_batch(items("a.pdf", "corrupt.pdf", "c.pdf"))
+
+        assert [document["error"] is None for document in documents] == [True, False, True]
+        assert "page count" in documents[1]["error"]
+        assert documents[2]["text"] == "--- Page 1 ---\ntext of c.pdf"
+
+    def test_dry_run_writes_nothing(self):
+        """Test that a dry run extracts without storing or normalizing"""
+        ingestor = FakeIngestor(store=False)
+
+        stats = ingestor.run(items("a.pdf"))
+
+        assert stats.tests == 1
+        assert ingestor.normalized == []
+
+    def test_stats_format(self):
+        """Test that progress lines report all three rates"""
+        stats = ThroughputStats()
+        stats.docs, stats.pages, stats.tests = 2, 5, 30
+
+        line = stats.format()
+
+        assert "docs/s" in line and "pages/s" in line and "tests/s" in line
+
+
+class TestInterruptedResume:
+    """Test suite for resuming runs interrupted between a commit and its checkpoint line"""
+
+    def test_fresh_run(self, tmp_path, store):
+        """Test that a full run stores, normalizes and trends each report once"""
+        checkpoint = IngestionCheckpoint(str(tmp_path / "checkpoint.jsonl"))
+        batch = items("a.pdf", "b.pdf")
+
+        StubIngestor(checkpoint=checkpoint).run(batch)
+
+        assert len(store.reports) == 2
+        assert {parameter["status"] for parameter in store.parameters.values()} == {"normalized"}
+        assert sorted(store.trend_points) == sorted(store.parameters)
+        assert [checkpoint.status(item.key) for item in batch] == ["done", "done"]
+
+    def test_stored_report_not_inserted_again(self, tmp_path, store):
+        """Test that a report committed before "stored" was recorded is reused, not duplicated"""
+        checkpoint = IngestionCheckpoint(str(tmp_path / "checkpoint.jsonl"))
+        batch = items("a.pdf")
+        report_id = store.add_report(batch[0], "pending")
+
+        StubIngestor(checkpoint=checkpoint).run(batch)
+
+        assert list(store.reports.values()) == [report_id]
+        assert len(store.parameters) == 1
+        assert store.trend_points == list(store.parameters)
+        assert checkpoint.entries[batch[0].key] == {"key": batch[0].key, "status": "done", "report_id": report_id}
+
+    def test_normalized_before_checkpoint(self, tmp_path, store):
+        """Test that a "stored" document whose normalization committed still gets its trends"""
+        path = str(tmp_path / "checkpoint.jsonl")
+        batch = items("a.pdf")
+        report_id = store.add_report(batch[0], "normalized")
+        IngestionCheckpoint(path).record([{"key": batch[0].key, "status": "stored", "report_id": report_id}])
+
+        StubIngestor(checkpoint=IngestionCheckpoint(path)).run(batch)
+
+        assert store.trend_points == list(store.parameters)
+        assert IngestionCheckpoint(path).status(batch[0].key) == "done"
+
+    def test_trends_applied_before_checkpoint(self, tmp_path, store):
+        """Test that a "normalized" document whose trend update committed is not added twice"""
+        path = str(tmp_path / "checkpoint.jsonl")
+        batch = items("a.pdf")
+        report_id = store.add_report(batch[0], "normalized")
+        store.update_trends(None, store.normalized_parameters(None, store.claim_trend_updates(None, [report_id])), {})
+        IngestionCheckpoint(path).record([{"key": batch[0].key, "status": "normalized", "report_id": report_id}])
+
+        StubIngestor(checkpoint=IngestionCheckpoint(path)).run(batch)
+
+        assert store.trend_points == list(store.parameters)
+        assert IngestionCheckpoint(path).status(batch[0].key) == "done"
+
+
+class TestReportStore:
+    """Test suite for the bulk-insert helpers"""
+
+    def test_parse_test_value(self):
+        """Test numeric parsing of extracted values"""
+        assert parse_test_value("<0.5") == 0.5
+        assert parse_test_value(" 1,200 ") == 1200.0
+        assert parse_test_value("Negative") is None
+
+    def test_build_parameters(self):
+        """Test that unusable values are skipped with a warning"""
+        parameters, warnings = build_parameters("user-1", [
+            {"test_name": "Glucose", "test_value": "100", "unit": "mg/dL"},
+            {"test_name": "Culture", "test_value": "Negative", "unit": ""},
+            {"test_name": "Platelets", "test_value": "2500000", "unit": ""}
+        ])
+
+        assert [(p["parameter_name"], p["value"], p["unit"]) for p in parameters] == [("Glucose", 100.0, "mg/dL")]
+        assert len(warnings) == 2
@@ -0,0 +1,225 @@
+"""
+Tests for Database Connection Pooling
+
+Tests the ConnectionPool functionality including:
+- Connection reuse across DatabaseConnection blocks
+- Commit on success and rollback on error with pooled connections
+- Waiting for a free connection, wait metrics and timeouts
+- Max-lifetime recycling and health checks of idle connections
+- Health checks running without the pool lock held
+
+Uses stand-in connections, so no PostgreSQL instance is needed.
+"""
+
+import threading
+import time
+
+import pytest
+
+psycopg2 = pytest.importorskip("psycopg2")
+
+from models.database_connection import ConnectionPool, DatabaseConnection, PoolTimeoutError
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, query, params=None):
+        if self.conn.on_execute:
+            self.conn.on_execute()
+        if self.conn.broken:
+            raise psycopg2.OperationalError("server closed the connection")
+        self.conn.queries.append(query)
+        self.conn.status = psycopg2.extensions.STATUS_BEGIN
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+class FakeConnection:
+    """Connection stand-in tracking transactions"""
+
+    def __init__(self):
+        self.closed = 0
+        self.broken = False
+        self.on_execute = None
+        self.status = psycopg2.extensions.STATUS_READY
+        self.queries = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self, cursor_factory=None):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+        self.status = psycopg2.extensions.STATUS_READY
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = psycopg2.extensions.STATUS_READY
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture
+def opened():
+    """Connections opened by the pool under test"""
+    return []
+
+
+@pytest.fixture
+def make_pool(opened):
+    def make(**kwargs):
+        def connect():
+            conn = FakeConnection()
+            opened.append(conn)
+            return conn
+        kwargs.setdefault('min_size', 0)
+        return ConnectionPool(connect=connect, **kwargs)
+    return make
+
+
+class TestDatabaseConnectionPooled:
+    """Test suite for DatabaseConnection on a pool"""
+
+    def test_connection_reused(self, make_pool, opened):
+        """Test that consecutive blocks share one connection"""
+        pool = make_pool(max_size=2)
+        for _ in range(3):
+            with DatabaseConnection(pool) as db:
+                db.cursor.execute("SELECT 1")
+
+        assert len(opened) == 1
+        assert opened[0].commits == 3
+        assert pool.stats()['checkouts'] == 3
+        assert pool.stats()['in_use'] == 0
+
+    def test_rollback_on_error(self, make_pool, opened):
+        """Test that an exception rolls back and still returns the connection"""
+        pool = make_pool()
+        with pytest.raises(ValueError):
+            with DatabaseConnection(pool) as db:
+                db.cursor.execute("INSERT ...")
+                raise ValueError("boom")
+
+        assert opened[0].rollbacks == 1
+        assert opened[0].commits == 0
+        assert pool.stats()['idle'] == 1
+
+    def test_open_transaction_rolled_back_on_return(self, make_pool, opened):
+        """Test that a connection released mid-transaction is cleaned up"""
+        pool = make_pool()
+        db = DatabaseConnection(pool)
+        db.connect()
+        db.cursor.execute("UPDATE ...")
+        db.close()
+
+        assert opened[0].rollbacks == 1
+        assert opened[0].status == psycopg2.extensions.STATUS_READY
+
+    def test_min_size_prefilled(self, make_pool, opened):
+        """Test that min_size connections are opened up front"""
+        pool = make_pool(min_size=2, max_size=3)
+
+        assert len(opened) == 2
+        assert pool.stats()['idle'] == 2
+
+
+class TestPoolLimits:
+    """Test suite for max size, waiting and timeouts"""
+
+    def test_waits_for_returned_connection(self, make_pool, opened):
+        """Test that a borrower blocks until a connection is returned"""
+        pool = make_pool(max_size=1, timeout=5)
+        conn = pool.getconn()
+        threading.Timer(0.1, pool.putconn, args=(conn,)).start()
+
+        assert pool.getconn() is conn
+        stats = pool.stats()
+        assert stats['waits'] == 1
+        assert stats['wait_seconds_max'] >= 0.05
+        assert len(opened) == 1
+
+    def test_timeout(self, make_pool):
+        """Test that an exhausted pool raises after the timeout"""
+        pool = make_pool(max_size=1, timeout=0.05)
+        pool.getconn()
+
+        with pytest.raises(PoolTimeoutError):
+            pool.getconn()
+        assert pool.stats()['timeouts'] == 1
+
+    def test_invalid_sizes(self, make_pool):
+        """Test that min_size above max_size is rejected"""
+        with pytest.raises(ValueError):
+            make_pool(min_size=3, max_size=2)
+
+
+class TestPoolRecycling:
+    """Test suite for lifetime recycling and health checks"""
+
+    def test_expired_connection_recycled(self, make_pool, opened):
+        """Test that connections past max_lifetime are replaced"""
+        pool = make_pool(max_lifetime=0.05)
+        pool.putconn(pool.getconn())
+        time.sleep(0.1)
+
+        conn = pool.getconn()
+
+        assert conn is opened[1]
+        assert opened[0].closed
+        assert pool.stats()['connections_recycled'] == 1
+
+    def test_broken_connection_replaced(self, make_pool, opened):
+        """Test that an idle connection failing SELECT 1 is discarded"""
+        pool = make_pool(health_check_interval=0)
+        pool.putconn(pool.getconn())
+        opened[0].broken = True
+
+        conn = pool.getconn()
+
+        assert conn is opened[1]
+        assert pool.stats()['connections_broken'] == 1
+        assert pool.stats()['size'] == 1
+
+    def test_health_check_outside_lock(self, make_pool, opened):
+        """Test that other threads can use the pool while SELECT 1 runs"""
+        pool = make_pool(health_check_interval=0)
+        pool.putconn(pool.getconn())
+        stats = []
+
+        def check_from_other_thread():
+            thread = threading.Thread(target=lambda: stats.append(pool.stats()))
+            thread.start()
+            thread.join(timeout=2)
+
+        opened[0].on_execute = check_from_other_thread
+        conn = pool.getconn()
+
+        assert conn is opened[0]
+        assert len(stats) == 1 and stats[0]['size'] == 1
+
+    def test_recent_connection_not_checked(self, make_pool, opened):
+        """Test that connections idle less than the interval skip the health check"""
+        pool = make_pool(health_check_interval=60)
+        pool.putconn(pool.getconn())
+        pool.getconn()
+
+        assert opened[0].queries == []
+
+    def test_close_discards_idle(self, make_pool, opened):
+        """Test that closing the pool closes idle connections"""
+        pool = make_pool(min_size=2, max_size=2)
+        pool.close()
+
+        assert all(conn.closed for conn in opened)
+        assert pool.stats()['size'] == 0
@@ -0,0 +1,348 @@
+"""
+Tests for batched and chunked async LLM extraction
+
+Runs LLMStructuredExtractor.aextract_batch / aextract_chunked against a local
+stub server that speaks the OpenAI chat completions protocol. Covers:
+- Results returned in input order
+- Bounded number of in-flight requests
+- Retry with backoff after provider errors
+- Per-request timeouts
+- Splitting reports on page markers or a token budget
+- Merging and deduplicating tests across chunks
+- Serving repeated requests from the response cache, read and written off the event loop
+- A clear error from the blocking wrappers inside a running event loop
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("openai")
+
+from tools.src.document_data_extraction_tools.lab_report_parser.llm_cache import LLMResponseCache
+from tools.src.document_data_extraction_tools.lab_report_parser.llm_structured_extractor import LLMStructuredExtractor
+
+
+class StubProvider:
+    """Shared state for the stub chat completions server"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = 0
+        self.fail_first = set()  # Markers that get one HTTP 500 before succeeding
+        self.slow = set()  # Markers that never answer in time
+        self.statuses = {}  # Markers always answered with this HTTP error status
+        self.contents = {}  # Markers answered with this message content instead of a test
+        self.delay = 0.05
+
+
+def _make_handler(provider):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            prompt = body["messages"][0]["content"]
+            marker = next(word for word in prompt.split() if word.startswith("DOC-"))
+
+            with provider.lock:
+                provider.requests += 1
+                provider.in_flight += 1
+                provider.max_in_flight = max(provider.max_in_flight, provider.in_flight)
+                fail = marker in provider.fail_first
+                provider.fail_first.discard(marker)
+                status = provider.statuses.get(marker, 500 if fail else None)
+            try:
+                time.sleep(2.0 if marker in provider.slow else provider.delay)
+                if status is not None:
+                    self.send_response(status)
+                    self.end_headers()
+                    return
+
+                content = provider.contents.get(marker, json.dumps([{
+                    "test_name": marker,
+                    "test_value": "1",
+                    "unit": "mg/dL",
+                    "reference_range": "0-2"
+                }]))
+                payload = json.dumps({
+                    "id": "stub",
+                    "object": "chat.completion",
+                    "created": 0,
+                    "model": body["model"],
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop"
+                    }]
+                }).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+            finally:
+                with provider.lock:
+                    provider.in_flight -= 1
+
+    return Handler
+
+
+@pytest.fixture
+def stub_provider(monkeypatch):
+    """Start a local OpenAI-compatible stub server"""
+    provider = StubProvider()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(provider))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "false")
+    provider.base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    yield provider
+    server.shutdown()
+
+
+@pytest.fixture
+def extractor(stub_provider):
+    """Extractor pointed at the stub server"""
+    return LLMStructuredExtractor(model_name="stub-model", base_url=stub_provider.base_url)
+
+
+class TestExtractBatch:
+    """Test suite for LLMStructuredExtractor.extract_batch"""
+
+    def test_results_in_input_order(self, extractor):
+        """Test that results line up with inputs"""
+        texts = [f"Report DOC-{i} Glucose 95" for i in range(10)]
+
+        results = extractor.extract_batch(texts, max_concurrency=4)
+
+        assert [r["tests"][0]["test_name"] for r in results] == [f"DOC-{i}" for i in range(10)]
+        assert all(r["metadata"]["extraction_status"] == "success" for r in results)
+
+    def test_bounded_concurrency(self, extractor, stub_provider):
+        """Test that no more than max_concurrency requests are in flight"""
+        texts = [f"Report DOC-{i}" for i in range(12)]
+
+        extractor.extract_batch(texts, max_concurrency=3)
+
+        assert 1 < stub_provider.max_in_flight <= 3
+
+    def test_retry_after_provider_error(self, extractor, stub_provider):
+        """Test that a failed request is retried with backoff"""
+        stub_provider.fail_first.add("DOC-1")
+
+        results = extractor.extract_batch(["Report DOC-1"], max_retries=2, backoff_base=0.01)
+
+        assert results[0]["metadata"]["extraction_status"] == "success"
+        assert stub_provider.requests == 2
+
+    def test_client_error_not_retried(self, extractor, stub_provider):
+        """Test that a 4xx answer such as a rejected key fails without retries"""
+        stub_provider.statuses["DOC-1"] = 401
+
+        results = extractor.extract_batch(["Report DOC-1"], max_retries=3, backoff_base=0.01)
+
+        assert results[0]["metadata"]["extraction_status"] == "error"
+        assert stub_provider.requests == 1
+
+    def test_rate_limit_retried(self, extractor, stub_provider):
+        """Test that a 429 answer is retried until retries are exhausted"""
+        stub_provider.statuses["DOC-1"] = 429
+
+        results = extractor.extract_batch(["Report DOC-1"], max_retries=2, backoff_base=0.01)
+
+        assert results[0]["metadata"]["extraction_status"] == "error"
+        assert stub_provider.requests == 3
+
+    def test_timeout_reports_error(self, extractor, stub_provider):
+        """Test that a request exceeding its timeout yields an error result"""
+        stub_provider.slow.add("DOC-slow")
+
+        results = extractor.extract_batch(
+            ["Report DOC-fast", "Report DOC-slow"], timeout=0.5, max_retries=0
+        )
+
+        assert results[0]["metadata"]["extraction_status"] == "success"
+        assert results[1]["metadata"]["extraction_status"] == "error"
+
+    def test_malformed_response_fails_one_document(self, extractor, stub_provider):
+        """Test that valid JSON of the wrong shape fails only its own document"""
+        stub_provider.contents["DOC-bad"] = "[1, 2]"
+
+        results = extractor.extract_batch(["Report DOC-ok", "Report DOC-bad"], max_retries=0)
+
+        assert results[0]["metadata"]["extraction_status"] == "success"
+        assert results[1]["metadata"]["extraction_status"] == "error"
+
+    def test_empty_text_skips_request(self, extractor, stub_provider):
+        """Test that empty OCR text never reaches the provider"""
+        results = extractor.extract_batch(["", "   "])
+
+        assert [r["metadata"]["extraction_status"] for r in results] == ["no_text", "no_text"]
+        assert stub_provider.requests == 0
+
+
+class TestBlockingWrappersInEventLoop:
+    """Test suite for calling the blocking wrappers from async code"""
+
+    def test_extract_batch_points_to_async_variant(self, extractor, stub_provider):
+        """Test that extract_batch() inside a running loop names aextract_batch() without sending requests"""
+        async def handler():
+            return extractor.extract_batch(["Report DOC-1"])
+
+        with pytest.raises(RuntimeError, match=r"await aextract_batch\(\)"):
+            asyncio.run(handler())
+        assert stub_provider.requests == 0
+
+    def test_extract_chunked_points_to_async_variant(self, extractor, stub_provider):
+        """Test that extract_chunked() inside a running loop names aextract_chunked()"""
+        async def handler():
+            return extractor.extract_chunked("--- Page 1 ---\nReport DOC-1")
+
+        with pytest.raises(RuntimeError, match=r"await aextract_chunked\(\)"):
+            asyncio.run(handler())
+        assert stub_provider.requests == 0
+
+
+class TestSplitIntoChunks:
+    """Test suite for LLMStructuredExtractor.split_into_chunks"""
+
+    def test_pages_packed_up_to_budget(self):
+        """Test that consecutive pages share a chunk until the budget is reached"""
+        page = "Glucose 95 mg/dL 70-100\n" * 10  # ~240 chars
+        text = "\n\n".join(f"--- Page {n} ---\n{page}" for n in range(1, 5))
+
+        chunks = LLMStructuredExtractor.split_into_chunks(text, max_chunk_tokens=130)
+
+        assert [chunk["pages"] for chunk in chunks] == [[1, 2], [3, 4]]
+        assert chunks[0]["text"].startswith("--- Page 1 ---")
+        assert "--- Page 2 ---" in chunks[0]["text"]
+
+    def test_text_without_markers_split_on_lines(self):
+        """Test that plain text is cut on line boundaries within the budget"""
+        text = "".join(f"Test {n} value {n}\n" for n in range(100))
+
+        chunks = LLMStructuredExtractor.split_into_chunks(text, max_chunk_tokens=50)
+
+        assert len(chunks) > 1
+        assert all(len(chunk["text"]) <= 200 for chunk in chunks)
+        assert all(chunk["pages"] == [] for chunk in chunks)
+        assert "\n".join(chunk["text"] for chunk in chunks).split() == text.split()
+
+    def test_short_report_single_chunk(self):
+        """Test that a report within budget is sent as one chunk"""
+        text = "--- Page 1 ---\nGlucose 95\n\n--- Page 2 ---\nHemoglobin 14"
+
+        chunks = LLMStructuredExtractor.split_into_chunks(text)
+
+        assert len(chunks) == 1
+        assert chunks[0]["pages"] == [1, 2]
+
+
+class TestMergeChunkTests:
+    """Test suite for LLMStructuredExtractor.merge_chunk_tests"""
+
+    def test_duplicates_removed(self):
+        """Test that tests equal after normalization are merged, order kept"""
+        glucose = {"test_name": "Glucose", "test_value": "95", "unit": "mg/dL", "reference_range": "70-100"}
+        glucose_again = {"test_name": " GLUCOSE ", "test_value": "95", "unit": "MG/DL", "reference_range": ""}
+        glucose_later = {"test_name": "Glucose", "test_value": "110", "unit": "mg/dL", "reference_range": "70-100"}
+
+        merged = LLMStructuredExtractor.merge_chunk_tests([[glucose], [glucose_again, glucose_later]])
+
+        assert merged == [glucose, glucose_later]
+
+
+class TestExtractChunked:
+    """Test suite for LLMStructuredExtractor.extract_chunked"""
+
+    def test_chunks_extracted_and_merged(self, extractor, stub_provider):
+        """Test that every chunk is sent and timings are reported per chunk"""
+        text = "\n\n".join(f"--- Page {n} ---\nReport DOC-{n} " + "x" * 300 for n in range(1, 4))
+
+        result = extractor.extract_chunked(text, "report.pdf", max_chunk_tokens=100)
+
+        metadata = result["metadata"]
+        assert stub_provider.requests == 3
+        assert [t["test_name"] for t in result["tests"]] == ["DOC-1", "DOC-2", "DOC-3"]
+        assert metadata["extraction_status"] == "success"
+        assert metadata["extraction_mode"] == "chunked"
+        assert [c["pages"] for c in metadata["chunks"]] == [[1], [2], [3]]
+        assert all(c["duration_seconds"] > 0 for c in metadata["chunks"])
+
+    def test_failed_chunk_reported(self, extractor, stub_provider):
+        """Test that a failing chunk does not discard the other chunks' tests"""
+        stub_provider.slow.add("DOC-2")
+        text = "--- Page 1 ---\nReport DOC-1 " + "x" * 300 + "\n\n--- Page 2 ---\nReport DOC-2 " + "x" * 300
+
+        result = extractor.extract_chunked(text, max_chunk_tokens=100, timeout=0.5, max_retries=0)
+
+        assert [t["test_name"] for t in result["tests"]] == ["DOC-1"]
+        assert result["metadata"]["failed_chunks"] == 1
+        assert [c["extraction_status"] for c in result["metadata"]["chunks"]] == ["success", "error"]
+
+
+class TestResponseCache:
+    """Test suite for the LLM response cache inside LLMStructuredExtractor"""
+
+    @pytest.fixture
+    def cached_extractor(self, stub_provider, tmp_path):
+        """Extractor with a response cache in a temp directory"""
+        return LLMStructuredExtractor(
+            model_name="stub-model",
+            base_url=stub_provider.base_url,
+            response_cache=LLMResponseCache(str(tmp_path / "responses.sqlite3"))
+        )
+
+    def test_repeat_extraction_served_from_cache(self, cached_extractor, stub_provider):
+        """Test that re-extracting the same text makes no API call"""
+        first = cached_extractor.extract_structured_data("Report DOC-7 Glucose 95")
+        second = cached_extractor.extract_structured_data("Report  DOC-7   Glucose 95\n")
+
+        assert stub_provider.requests == 1
+        assert second["tests"] == first["tests"]
+        assert second["metadata"]["cached"] is True
+        assert "cached" not in first["metadata"]
+
+    def test_batch_uses_cache(self, cached_extractor, stub_provider):
+        """Test that batch extraction reads and fills the same cache"""
+        cached_extractor.extract_batch(["Report DOC-1", "Report DOC-2"])
+        results = cached_extractor.extract_batch(["Report DOC-1", "Report DOC-2", "Report DOC-3"])
+
+        assert stub_provider.requests == 3
+        assert [r["metadata"].get("cached", False) for r in results] == [True, True, False]
+
+    def test_batch_cache_access_off_event_loop(self, cached_extractor, stub_provider):
+        """Test that async extraction reads and writes the SQLite cache in worker threads"""
+        cache = cached_extractor.response_cache
+        threads = []
+        for name in ("get", "put"):
+            method = getattr(cache, name)
+
+            def record(*args, method=method):
+                threads.append(threading.get_ident())
+                return method(*args)
+
+            setattr(cache, name, record)
+
+        cached_extractor.extract_batch(["Report DOC-1"])
+        cached_extractor.extract_batch(["Report DOC-1"])
+
+        assert len(threads) == 3
+        assert threading.get_ident() not in threads
+
+    def test_model_change_misses(self, cached_extractor, stub_provider):
+        """Test that a different model does not reuse cached responses"""
+        cached_extractor.extract_structured_data("Report DOC-1")
+        cached_extractor.model_name = "other-model"
+        cached_extractor.extract_structured_data("Report DOC-1")
+
+        assert stub_provider.requests == 2
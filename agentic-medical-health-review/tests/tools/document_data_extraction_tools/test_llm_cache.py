@@ -0,0 +1,80 @@
+"""
+Tests for LLM Response Cache
+
+Tests the LLMResponseCache functionality including:
+- Key derivation from model, prompt version and normalized OCR text
+- Store and lookup of responses
+- TTL expiry
+- Entry-count bounded LRU eviction
+"""
+
+import time
+
+import pytest
+from tools.src.document_data_extraction_tools.lab_report_parser.llm_cache import LLMResponseCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Cache in a temporary directory"""
+    return LLMResponseCache(str(tmp_path / "llm" / "responses.sqlite3"), max_entries=3)
+
+
+class TestMakeKey:
+    """Test suite for cache key derivation"""
+
+    def test_whitespace_insensitive(self):
+        """Test that layout-only whitespace differences share a key"""
+        key = LLMResponseCache.make_key("gpt-4o-mini", "v1", "Glucose   95 mg/dL\n\nHbA1c 5.6 %")
+        same = LLMResponseCache.make_key("gpt-4o-mini", "v1", "  Glucose 95 mg/dL \nHbA1c\t5.6 %\n")
+
+        assert key == same
+
+    def test_inputs_change_key(self):
+        """Test that model, prompt version and text all change the key"""
+        base = LLMResponseCache.make_key("gpt-4o-mini", "v1", "Glucose 95")
+
+        assert LLMResponseCache.make_key("gpt-4o", "v1", "Glucose 95") != base
+        assert LLMResponseCache.make_key("gpt-4o-mini", "v2", "Glucose 95") != base
+        assert LLMResponseCache.make_key("gpt-4o-mini", "v1", "Glucose 96") != base
+
+
+class TestGetPut:
+    """Test suite for cache reads and writes"""
+
+    def test_round_trip(self, cache):
+        """Test that a stored response is returned"""
+        cache.put("k1", '[{"test_name": "Glucose"}]', "gpt-4o-mini", "v1")
+
+        assert cache.get("k1") == '[{"test_name": "Glucose"}]'
+        assert cache.get("missing") is None
+
+    def test_ttl_expiry(self, tmp_path):
+        """Test that expired entries are not returned and are purged"""
+        cache = LLMResponseCache(str(tmp_path / "responses.sqlite3"), ttl_hours=0.1 / 3600)
+        cache.put("k1", "[]")
+
+        time.sleep(0.2)
+
+        assert cache.get("k1") is None
+        assert len(cache) == 0
+
+    def test_lru_eviction(self, cache):
+        """Test that the least recently used entry is evicted beyond max_entries"""
+        for key in ("k1", "k2", "k3"):
+            cache.put(key, "[]")
+            time.sleep(0.01)
+        cache.get("k1")  # k2 becomes least recently used
+        time.sleep(0.01)
+
+        cache.put("k4", "[]")
+
+        assert len(cache) == 3
+        assert cache.get("k2") is None
+        assert cache.get("k1") == "[]"
+
+    def test_persistent(self, cache):
+        """Test that entries survive a new cache instance"""
+        cache.put("k1", "[]")
+
+        assert LLMResponseCache(str(cache.db_path)).get("k1") == "[]"
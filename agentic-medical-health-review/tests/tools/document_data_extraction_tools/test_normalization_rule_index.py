@@ -0,0 +1,180 @@
+"""
+Tests for Normalization Rule Index
+
+Tests the NormalizationRuleIndex functionality including:
+- Case-insensitive lookups matching the SQL lookup semantics
+- Reload only when the table watermark changes
+- Refresh interval throttling of watermark checks
+- LabDataNormalizer running without per-parameter queries
+
+Uses an in-memory stand-in for the three reference tables, so no
+PostgreSQL instance is needed.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip("psycopg2")
+
+from tools.src.document_data_extraction_tools.normalize_lab_data.normalization_rule_index import NormalizationRuleIndex
+from tools.src.document_data_extraction_tools.normalize_lab_data.lab_data_normalizer import LabDataNormalizer
+
+
+class RuleTablesCursor:
+    """Minimal cursor answering the index's queries from Python lists"""
+
+    def __init__(self):
+        self.updated_at = datetime(2024, 1, 1)
+        self.names = [
+            {'variant_name': 'Glucose', 'canonical_name': 'glucose_fasting', 'confidence_score': Decimal('0.85')},
+            {'variant_name': 'Blood Glucose', 'canonical_name': 'glucose_fasting', 'confidence_score': Decimal('1.0')},
+            {'variant_name': 'GLUCOSE', 'canonical_name': 'glucose_random', 'confidence_score': Decimal('0.50')},
+        ]
+        self.units = [
+            {'canonical_parameter_name': 'glucose_fasting', 'source_unit': 'mg/dL', 'target_unit': 'mmol/L',
+             'conversion_factor': Decimal('0.0555'), 'confidence_score': Decimal('1.0')},
+        ]
+        self.ranges = [
+            {'canonical_parameter_name': 'glucose_fasting', 'standard_unit': 'mmol/L',
+             'range_min': Decimal('3.9'), 'range_max': Decimal('5.6'), 'confidence_score': Decimal('1.0')},
+        ]
+        self.queries = []
+        self._result = None
+
+    def execute(self, query, params=None):
+        self.queries.append(query)
+        if "COUNT(*)" in query:
+            self._result = [{
+                'name_count': len(self.names), 'name_updated_at': self.updated_at,
+                'unit_count': len(self.units), 'unit_updated_at': self.updated_at,
+                'range_count': len(self.ranges), 'range_updated_at': self.updated_at,
+            }]
+        elif "FROM parameter_name_mappings" in query:
+            self._result = sorted(self.names, key=lambda r: -r['confidence_score'])
+        elif "FROM unit_conversion_rules" in query:
+            self._result = list(self.units)
+        elif "FROM standard_reference_ranges" in query:
+            self._result = list(self.ranges)
+        else:
+            raise AssertionError(f"Unexpected query: {query}")
+
+    def fetchone(self):
+        return self._result[0] if self._result else None
+
+    def fetchall(self):
+        return self._result
+
+
+class FakeDB:
+    """DatabaseConnection stand-in exposing a cursor"""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+
+@pytest.fixture
+def db():
+    return FakeDB(RuleTablesCursor())
+
+
+@pytest.fixture
+def index(db):
+    rule_index = NormalizationRuleIndex(refresh_interval=0)
+    rule_index.ensure_fresh(db)
+    return rule_index
+
+
+class TestLookups:
+    """Test suite for index lookups"""
+
+    def test_name_mapping_case_insensitive_highest_confidence(self, index):
+        """Test that names match case-insensitively and the best mapping wins"""
+        assert index.get_name_mapping("glucose")['canonical_name'] == 'glucose_fasting'
+        assert index.get_name_mapping("BLOOD GLUCOSE")['confidence_score'] == Decimal('1.0')
+        assert index.get_name_mapping("Unknown Test") is None
+
+    def test_unit_conversion(self, index):
+        """Test unit lookups (unit case-insensitive, canonical name exact)"""
+        assert index.get_unit_conversion('glucose_fasting', 'MG/DL')['target_unit'] == 'mmol/L'
+        assert index.get_unit_conversion('glucose_fasting', 'g/L') is None
+        assert index.get_standard_unit('glucose_fasting')['target_unit'] == 'mmol/L'
+
+    def test_reference_range(self, index):
+        """Test reference range lookup by canonical name and unit"""
+        assert index.get_reference_range('glucose_fasting', 'mmol/L')['range_max'] == Decimal('5.6')
+        assert index.get_reference_range('glucose_fasting', 'mg/dL') is None
+
+
+class TestRefresh:
+    """Test suite for watermark-based reloading"""
+
+    def test_unchanged_tables_not_reloaded(self, index, db):
+        """Test that only the watermark query runs when nothing changed"""
+        db.cursor.queries.clear()
+
+        index.ensure_fresh(db)
+
+        assert len(db.cursor.queries) == 1
+        assert "COUNT(*)" in db.cursor.queries[0]
+
+    def test_updated_rule_reloaded(self, index, db):
+        """Test that a newer updated_at triggers a reload"""
+        db.cursor.names.append({'variant_name': 'FBS', 'canonical_name': 'glucose_fasting',
+                                'confidence_score': Decimal('0.9')})
+        db.cursor.updated_at = datetime(2024, 2, 1)
+
+        index.ensure_fresh(db)
+
+        assert index.get_name_mapping("fbs")['canonical_name'] == 'glucose_fasting'
+
+    def test_deleted_rule_reloaded(self, index, db):
+        """Test that a deleted row (count change) triggers a reload"""
+        db.cursor.ranges.clear()
+
+        index.ensure_fresh(db)
+
+        assert index.get_reference_range('glucose_fasting', 'mmol/L') is None
+
+    def test_refresh_interval_throttles_checks(self, db):
+        """Test that the watermark is not re-checked within the interval"""
+        rule_index = NormalizationRuleIndex(refresh_interval=3600)
+        rule_index.ensure_fresh(db)
+        db.cursor.queries.clear()
+
+        rule_index.ensure_fresh(db)
+
+        assert db.cursor.queries == []
+
+
+class TestNormalizerWithIndex:
+    """Test suite for LabDataNormalizer lookups served by the index"""
+
+    def test_no_queries_per_parameter(self, index, db):
+        """Test that name, unit and range steps run without SQL"""
+        db.cursor.queries.clear()
+        normalizer = LabDataNormalizer(db, rule_index=index)
+
+        canonical_name, name_confidence = normalizer.normalize_parameter_name("Blood Glucose", "p1")
+        value, unit, factor, _ = normalizer.convert_unit(117.0, "mg/dL", canonical_name, "p1")
+        range_min, range_max, _ = normalizer.align_reference_range(canonical_name, unit, "p1")
+
+        assert db.cursor.queries == []
+        assert (canonical_name, name_confidence) == ('glucose_fasting', 1.0)
+        assert value == pytest.approx(117.0 * 0.0555)
+        assert (range_min, range_max) == (3.9, 5.6)
+        assert [log['status'] for log in normalizer.operations_log] == ['success'] * 3
+
+    def test_already_standard_unit(self, index, db):
+        """Test that a value already in the standard unit is accepted"""
+        normalizer = LabDataNormalizer(db, rule_index=index)
+
+        assert normalizer.convert_unit(5.2, "mmol/l", "glucose_fasting", "p1") == (5.2, "mmol/l", 1.0, 1.0)
+
+    def test_unmapped_name_flagged(self, index, db):
+        """Test that an unknown name is flagged for review"""
+        normalizer = LabDataNormalizer(db, rule_index=index)
+
+        assert normalizer.normalize_parameter_name("Mystery Marker", "p1") == (None, 0.0)
+        assert normalizer.operations_log[-1]['status'] == 'flagged'
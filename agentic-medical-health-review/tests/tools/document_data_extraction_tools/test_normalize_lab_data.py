@@ -282,6 +282,49 @@ class TestNormalizeBatch:
         assert batch_result['total'] == 2
         assert batch_result['successful'] >= 1  # At least glucose should succeed
         assert batch_result['failed'] >= 1      # Unknown parameter should fail
+    
+    def test_batch_writes_statuses_and_timings(self, test_user_id, create_health_parameter):
+        """Test that a batch updates every status and reports stage timings"""
+        param1_id = create_health_parameter("Blood Glucose", 117.0, "mg/dL")
+        param2_id = create_health_parameter("Unknown Parameter", 100.0, "mg/dL")
+        
+        batch_result = normalize_batch([
+            {"parameter_id": param1_id, "user_id": test_user_id,
+             "parameter_name": "Blood Glucose", "value": 117.0, "unit": "mg/dL"},
+            {"parameter_id": param2_id, "user_id": test_user_id,
+             "parameter_name": "Unknown Parameter", "value": 100.0, "unit": "mg/dL"}
+        ])
+        
+        assert set(batch_result['timings']) == {
+            'resolve_rules', 'normalize', 'insert_normalized', 'update_status', 'audit_logs', 'total'
+        }
+        with DatabaseConnection() as db:
+            db.cursor.execute("""
+                SELECT parameter_id::text AS parameter_id, normalization_status::text AS status
+                FROM health_parameters WHERE parameter_id = ANY(%s::uuid[])
+            """, ([param1_id, param2_id],))
+            statuses = {row['parameter_id']: row['status'] for row in db.cursor.fetchall()}
+            db.cursor.execute(
+                "SELECT COUNT(*) AS n FROM normalized_parameters WHERE original_parameter_id = %s",
+                (param1_id,)
+            )
+            normalized_count = db.cursor.fetchone()['n']
+        
+        assert statuses == {param1_id: 'normalized', param2_id: 'flagged'}
+        assert normalized_count == 1
+    
+    def test_batch_without_rule_index(self, test_user_id, create_health_parameter, monkeypatch):
+        """Test that set-based rule queries give the same result as the rule index"""
+        parameter_id = create_health_parameter("Blood Glucose", 117.0, "mg/dL")
+        param = {"parameter_id": parameter_id, "user_id": test_user_id,
+                 "parameter_name": "Blood Glucose", "value": 117.0, "unit": "mg/dL"}
+        monkeypatch.setitem(normalize_batch.__globals__, "get_rule_index", lambda: None)
+        
+        batch_result = normalize_batch([param])
+        
+        normalized = batch_result['results'][0]['normalized_parameter']
+        assert normalized['canonical_name'] == 'glucose_fasting'
+        assert normalized['normalized_value'] == pytest.approx(117.0 * 0.0555)
 
 
 class TestReferenceRanges:
@@ -0,0 +1,102 @@
+"""
+Tests for OCR Result Cache
+
+Tests the OCRCache functionality including:
+- Content-addressed keys (file bytes + OCR settings)
+- Round-trip of per-page text and regions
+- Size-based LRU eviction
+"""
+
+import os
+import time
+
+import pytest
+from tools.src.document_data_extraction_tools.lab_report_parser.ocr_cache import OCRCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """OCR cache rooted in a temporary directory"""
+    return OCRCache(cache_dir=str(tmp_path / "ocr"), max_size_mb=1)
+
+
+@pytest.fixture
+def sample_file(tmp_path):
+    """A small file standing in for an uploaded report"""
+    path = tmp_path / "report.pdf"
+    path.write_bytes(b"%PDF-1.4 sample lab report")
+    return str(path)
+
+
+class TestCacheKey:
+    """Test suite for cache key construction"""
+
+    def test_same_bytes_same_key(self, tmp_path, sample_file):
+        """Test that a re-exported copy with identical bytes maps to the same key"""
+        copy_path = tmp_path / "copy.pdf"
+        copy_path.write_bytes(open(sample_file, "rb").read())
+
+        assert OCRCache.make_key(sample_file, 300, "en", "2.7") == \
+            OCRCache.make_key(str(copy_path), 300, "en", "2.7")
+
+    def test_settings_change_key(self, sample_file):
+        """Test that DPI, language and engine version are part of the key"""
+        base = OCRCache.make_key(sample_file, 300, "en", "2.7")
+
+        assert OCRCache.make_key(sample_file, 200, "en", "2.7") != base
+        assert OCRCache.make_key(sample_file, 300, "fr", "2.7") != base
+        assert OCRCache.make_key(sample_file, 300, "en", "2.8") != base
+
+    def test_content_change_key(self, tmp_path, sample_file):
+        """Test that different bytes produce a different key"""
+        other = tmp_path / "other.pdf"
+        other.write_bytes(b"%PDF-1.4 a different report")
+
+        assert OCRCache.make_key(sample_file, 300, "en", "2.7") != \
+            OCRCache.make_key(str(other), 300, "en", "2.7")
+
+
+class TestCacheStorage:
+    """Test suite for get/put and eviction"""
+
+    def test_miss_returns_none(self, cache):
+        """Test lookup of an unknown key"""
+        assert cache.get("missing") is None
+
+    def test_round_trip(self, cache):
+        """Test that pages and regions are stored and returned"""
+        pages = [{"page_num": 1, "text": "Glucose 95", "regions": [[10.0, 5.0, "Glucose"], [10.0, 90.0, "95"]]}]
+        cache.put("key1", pages, settings={"dpi": 300})
+
+        assert cache.get("key1") == pages
+
+    def test_lru_eviction(self, tmp_path):
+        """Test that least-recently-used entries are evicted past the size budget"""
+        cache = OCRCache(cache_dir=str(tmp_path / "ocr"), max_size_mb=0.01)  # ~10 KB
+        page = [{"page_num": 1, "text": "x" * 4000, "regions": []}]
+
+        cache.put("old", page)
+        cache.put("recent", page)
+        # Make "old" clearly older, then touch "recent" via a read
+        past = time.time() - 100
+        os.utime(cache._entry_path("old"), (past, past))
+        assert cache.get("recent") is not None
+
+        cache.put("new", page)
+
+        assert cache.get("old") is None
+        assert cache.get("recent") is not None
+        assert cache.get("new") is not None
+
+    def test_clear(self, cache):
+        """Test removing all entries"""
+        cache.put("key1", [])
+        cache.clear()
+
+        assert cache.get("key1") is None
+
+    def test_from_env_disabled(self, monkeypatch):
+        """Test that OCR_CACHE_ENABLED=false disables the cache"""
+        monkeypatch.setenv("OCR_CACHE_ENABLED", "false")
+
+        assert OCRCache.from_env() is None
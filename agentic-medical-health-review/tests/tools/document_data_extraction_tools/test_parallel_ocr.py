@@ -0,0 +1,238 @@
+"""
+Tests for the Parallel OCR Executor
+
+Tests the process-pool OCR building blocks including:
+- Math-library thread caps applied before the libraries load in a worker
+- Results in page and document order whatever order the workers finish in
+- Text-layer and OCR pages merged by plan_document / assemble_document
+- Cached documents never reaching the pool
+- Worker stage timings recorded in the parent's metrics registry
+- Pool shutdown
+
+Except for the thread cap tests, the worker function is a stand-in run on
+threads, so neither PaddleOCR nor poppler is needed.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from tools.src.document_data_extraction_tools import pipeline_metrics
+from tools.src.document_data_extraction_tools.lab_report_parser import parallel_ocr
+from tools.src.document_data_extraction_tools.lab_report_parser.lab_report_parser import LabReportParser
+from tools.src.document_data_extraction_tools.lab_report_parser.ocr_cache import OCRCache
+from tools.src.document_data_extraction_tools.lab_report_parser.parallel_ocr import (
+    THREAD_LIMIT_VARS,
+    ParallelOCRExecutor,
+    _init_worker
+)
+from tools.src.document_data_extraction_tools.pipeline_metrics import OCR_CACHE_TOTAL, MetricsRegistry
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+
+
+class ThreadedExecutor(ParallelOCRExecutor):
+    """Executor that runs the worker function on threads instead of processes"""
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+
+class StubWorker:
+    """Stand-in for _run_task; later pages finish first"""
+
+    def __init__(self):
+        self.tasks = []
+        self.lock = threading.Lock()
+
+    def __call__(self, task):
+        kind, path, page_num = task
+        with self.lock:
+            self.tasks.append(task)
+        time.sleep(0.002 * (10 - page_num))
+        return [(20.0, 5.0, f"ocr {Path(path).stem} {page_num}")], [("ocr_inference", 0.25)]
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    stub = StubWorker()
+    monkeypatch.setattr(parallel_ocr, "_run_task", stub)
+    return stub
+
+
+@pytest.fixture
+def parser(monkeypatch, tmp_path):
+    """Parser singleton with a private cache, fixed page counts and text layers"""
+    parser = LabReportParser()
+    parser.cache = OCRCache(str(tmp_path / "cache"))
+    page_counts = {}
+    text_layers = {}
+    monkeypatch.setattr(parser, "get_pdf_page_count", lambda path: page_counts[Path(path).name])
+    monkeypatch.setattr(parser, "extract_text_layer", lambda path: dict(text_layers.get(Path(path).name, {})))
+    monkeypatch.setattr(LabReportParser, "_instance", parser)
+    parser.page_counts = page_counts
+    parser.text_layers = text_layers
+    return parser
+
+
+def make_file(tmp_path, name, content=None):
+    path = tmp_path / name
+    path.write_bytes(content or name.encode())
+    return str(path)
+
+
+class TestWorkerThreadCap:
+    """Test suite for the worker thread caps"""
+
+    def test_import_does_not_load_math_libraries(self):
+        """Test that unpickling the initializer loads neither numpy nor PaddleOCR"""
+        code = (
+            "import sys\n"
+            "import tools.src.document_data_extraction_tools.lab_report_parser.parallel_ocr\n"
+            "print(sorted(name for name in ('numpy', 'paddle', 'paddleocr') if name in sys.modules))"
+        )
+
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        )
+
+        assert output.stdout.strip() == "[]"
+
+    def test_inherited_values_overridden(self, monkeypatch):
+        """Test that the cap wins over values inherited from the parent"""
+        for var in THREAD_LIMIT_VARS:
+            monkeypatch.setenv(var, "16")
+
+        _init_worker(2)
+
+        assert [os.environ[var] for var in THREAD_LIMIT_VARS] == ["2"] * len(THREAD_LIMIT_VARS)
+
+    def test_spawned_worker_capped(self, monkeypatch):
+        """Test that a spawned worker sees the cap, not the parent's value"""
+        monkeypatch.setenv("OMP_NUM_THREADS", "16")
+
+        with ParallelOCRExecutor(max_workers=1) as executor:
+            value = executor._get_pool().submit(os.getenv, "OMP_NUM_THREADS").result(timeout=60)
+
+        assert value == "1"
+
+
+class TestParallelOCRExecutor:
+    """Test suite for ParallelOCRExecutor"""
+
+    def test_pages_and_documents_in_order(self, tmp_path, parser, worker):
+        """Test that results follow page and input order, not completion order"""
+        parser.page_counts["long.pdf"] = 6
+        documents = [make_file(tmp_path, "long.pdf"), make_file(tmp_path, "scan.png")]
+
+        with ThreadedExecutor(max_workers=4) as executor:
+            pages = executor.extract_documents_pages(documents)
+
+        assert [page["text"] for page in pages[0]] == [f"ocr long {n}" for n in range(1, 7)]
+        assert [page["text"] for page in pages[1]] == ["ocr scan 1"]
+        assert len(worker.tasks) == 7
+
+    def test_text_layer_and_ocr_merged(self, tmp_path, parser, worker):
+        """Test that only pages without a text layer are OCR'd, and all come back in order"""
+        parser.page_counts["mixed.pdf"] = 3
+        parser.text_layers["mixed.pdf"] = {2: [(10.0, 5.0, "layer 2")]}
+        executor = ThreadedExecutor(max_workers=2)
+
+        plan = executor.plan_document(make_file(tmp_path, "mixed.pdf"))
+        pages = executor.extract_planned([plan])[0]
+        executor.close()
+
+        assert [task[2] for task in plan["tasks"]] == [1, 3]
+        assert [(page["page_num"], page["source"], page["text"]) for page in pages] == [
+            (1, "ocr", "ocr mixed 1"), (2, "text_layer", "layer 2"), (3, "ocr", "ocr mixed 3")
+        ]
+
+    def test_async_pages_in_order(self, tmp_path, parser, worker):
+        """Test that the event-loop path assembles pages the same way"""
+        parser.page_counts["long.pdf"] = 4
+        executor = ThreadedExecutor(max_workers=4)
+        plan = executor.plan_document(make_file(tmp_path, "long.pdf"))
+
+        pages = asyncio.run(executor.aextract_document_pages(plan))
+        executor.close()
+
+        assert [page["page_num"] for page in pages] == [1, 2, 3, 4]
+
+    def test_cached_document_skips_pool(self, tmp_path, parser, worker):
+        """Test that a cached document is served from its plan without OCR"""
+        parser.page_counts["report.pdf"] = 2
+        path = make_file(tmp_path, "report.pdf")
+        executor = ThreadedExecutor(max_workers=2)
+        first = executor.extract_documents_pages([path])[0]
+        worker.tasks.clear()
+
+        plan = executor.plan_document(path)
+        second = executor.extract_planned([plan])[0]
+        executor.close()
+
+        assert plan["pages"] is not None and plan["tasks"] == []
+        assert worker.tasks == []
+        assert [page["text"] for page in second] == [page["text"] for page in first]
+
+    def test_worker_stage_timings_recorded(self, tmp_path, parser, worker, monkeypatch):
+        """Test that stage timings measured in the workers land in the parent's registry"""
+        registry = MetricsRegistry()
+        monkeypatch.setattr(pipeline_metrics, "_shared_registry", registry)
+        monkeypatch.setattr(pipeline_metrics, "_shared_registry_loaded", True)
+        parser.page_counts["report.pdf"] = 3
+
+        with ThreadedExecutor(max_workers=2) as executor:
+            executor.extract_documents_pages([make_file(tmp_path, "report.pdf")])
+
+        assert registry.stage_seconds.count(stage="ocr_inference") == 3
+        assert registry.counter(OCR_CACHE_TOTAL).value(result="miss") == 1
+
+    def test_run_task_returns_stage_timings(self, monkeypatch):
+        """Test that the real worker function returns the spans it ran alongside the regions"""
+        monkeypatch.setattr(pipeline_metrics, "_shared_registry", MetricsRegistry())
+        monkeypatch.setattr(pipeline_metrics, "_shared_registry_loaded", True)
+
+        def ocr_page(path, page_num):
+            with pipeline_metrics.span("pdf_convert"):
+                pass
+            with pipeline_metrics.span("ocr_inference"):
+                return [(1.0, 2.0, "text")]
+
+        monkeypatch.setattr(parallel_ocr, "_ocr_pdf_page", ocr_page)
+
+        regions, stages = parallel_ocr._run_task(("pdf_page", "report.pdf", 1))
+
+        assert regions == [(1.0, 2.0, "text")]
+        assert [stage for stage, _ in stages] == ["pdf_convert", "ocr_inference"]
+
+    def test_plan_rejects_missing_and_unsupported(self, tmp_path, parser):
+        """Test that planning validates the file before any work"""
+        executor = ThreadedExecutor(max_workers=1)
+
+        with pytest.raises(FileNotFoundError):
+            executor.plan_document(str(tmp_path / "missing.pdf"))
+        with pytest.raises(ValueError):
+            executor.plan_document(make_file(tmp_path, "notes.txt"))
+
+    def test_close(self, worker):
+        """Test that close() shuts the pool down, is idempotent, and a new pool starts on next use"""
+        executor = ThreadedExecutor(max_workers=1)
+        pool = executor._get_pool()
+
+        executor.close()
+        executor.close()
+
+        assert executor._pool is None
+        with pytest.raises(RuntimeError):
+            pool.submit(print)
+        assert executor._get_pool() is not pool
+        executor.close()
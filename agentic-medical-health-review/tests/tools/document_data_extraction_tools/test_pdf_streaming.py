@@ -0,0 +1,136 @@
+"""
+Tests for streaming PDF OCR in LabReportParser
+
+Tests iter_pdf_pages / _iter_pdf_page_regions / _page_windows including:
+- Window boundaries (remainder windows, window_size=1, empty PDFs)
+- Only one window of page bitmaps alive at a time
+- One pdfinfo call per document in _extract_from_pdf
+
+pdf2image and the OCR engine are replaced by stand-ins.
+"""
+
+import pytest
+
+from tools.src.document_data_extraction_tools.lab_report_parser.lab_report_parser import LabReportParser
+
+
+class FakeImage:
+    """Page bitmap stand-in that tracks how many are open"""
+
+    def __init__(self, pdf2image, page_num):
+        self.pdf2image = pdf2image
+        self.page_num = page_num
+        self.size = (2480, 3508)
+        pdf2image.open_images += 1
+        pdf2image.max_open_images = max(pdf2image.max_open_images, pdf2image.open_images)
+
+    def close(self):
+        self.pdf2image.open_images -= 1
+
+
+class FakePdf2Image:
+    """pdf2image stand-in recording every call"""
+
+    def __init__(self, page_count):
+        self.page_count = page_count
+        self.windows = []
+        self.pdfinfo_calls = 0
+        self.open_images = 0
+        self.max_open_images = 0
+
+    def pdfinfo_from_path(self, path):
+        self.pdfinfo_calls += 1
+        return {"Pages": self.page_count}
+
+    def convert_from_path(self, path, dpi, fmt, first_page, last_page):
+        self.windows.append((first_page, last_page))
+        return [FakeImage(self, page_num) for page_num in range(first_page, last_page + 1)]
+
+
+def make_parser(monkeypatch, page_count):
+    parser = LabReportParser()
+    parser.cache = None
+    parser.text_layer = None
+    pdf2image = FakePdf2Image(page_count)
+    monkeypatch.setattr(parser, "_import_pdf2image", lambda: pdf2image)
+    monkeypatch.setattr(
+        parser, "extract_text_regions", lambda image: [(10.0, 5.0, f"page {image.page_num}")]
+    )
+    return parser, pdf2image
+
+
+class TestPageWindows:
+    """Test suite for LabReportParser._page_windows"""
+
+    @pytest.mark.parametrize("page_numbers, window_size, expected", [
+        ([1, 2, 3, 4, 5, 6, 7], 3, [(1, 3), (4, 6), (7, 7)]),
+        ([1, 2, 3], 1, [(1, 1), (2, 2), (3, 3)]),
+        ([1, 2, 4, 5, 6, 9], 2, [(1, 2), (4, 5), (6, 6), (9, 9)]),
+        ([], 4, [])
+    ])
+    def test_windows(self, page_numbers, window_size, expected):
+        """Test that windows are contiguous, bounded and cover every page once"""
+        assert LabReportParser._page_windows(page_numbers, window_size) == expected
+
+
+class TestIterPdfPages:
+    """Test suite for the streaming PDF path"""
+
+    def test_remainder_window(self, monkeypatch):
+        """Test that a page count not divisible by the window size ends with a short window"""
+        parser, pdf2image = make_parser(monkeypatch, page_count=7)
+
+        pages = list(parser.iter_pdf_pages("report.pdf", window_size=3))
+
+        assert pages == [(n, f"page {n}") for n in range(1, 8)]
+        assert pdf2image.windows == [(1, 3), (4, 6), (7, 7)]
+
+    def test_one_window_alive_at_a_time(self, monkeypatch):
+        """Test that a window is rasterized only after the previous one is consumed and closed"""
+        parser, pdf2image = make_parser(monkeypatch, page_count=5)
+
+        for page_num, _ in parser.iter_pdf_pages("report.pdf", window_size=2):
+            # Rasterized so far: only the windows up to the current page
+            assert pdf2image.windows[-1][0] <= page_num <= pdf2image.windows[-1][1]
+
+        assert pdf2image.max_open_images == 2
+        assert pdf2image.open_images == 0
+
+    def test_window_size_one(self, monkeypatch):
+        """Test that window_size=1 rasterizes page by page"""
+        parser, pdf2image = make_parser(monkeypatch, page_count=3)
+
+        list(parser.iter_pdf_pages("report.pdf", window_size=1))
+
+        assert pdf2image.windows == [(1, 1), (2, 2), (3, 3)]
+        assert pdf2image.max_open_images == 1
+
+    def test_empty_pdf(self, monkeypatch):
+        """Test that a PDF without pages yields nothing and rasterizes nothing"""
+        parser, pdf2image = make_parser(monkeypatch, page_count=0)
+
+        assert list(parser.iter_pdf_pages("report.pdf")) == []
+        assert pdf2image.windows == []
+
+    def test_images_closed_when_consumer_stops(self, monkeypatch):
+        """Test that abandoning the stream mid-window still closes its bitmaps"""
+        parser, pdf2image = make_parser(monkeypatch, page_count=4)
+
+        stream = parser.iter_pdf_pages("report.pdf", window_size=4)
+        next(stream)
+        stream.close()
+
+        assert pdf2image.open_images == 0
+
+
+class TestExtractFromPdf:
+    """Test suite for LabReportParser._extract_from_pdf"""
+
+    def test_single_pdfinfo_call(self, monkeypatch):
+        """Test that the page count is read once per document"""
+        parser, pdf2image = make_parser(monkeypatch, page_count=3)
+
+        pages = parser._extract_from_pdf("report.pdf")
+
+        assert [page["text"] for page in pages] == ["page 1", "page 2", "page 3"]
+        assert pdf2image.pdfinfo_calls == 1
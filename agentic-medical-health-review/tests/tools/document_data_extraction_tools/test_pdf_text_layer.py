@@ -0,0 +1,145 @@
+"""
+Tests for PDF Text Layer Extractor
+
+Tests the PDFTextLayerExtractor functionality including:
+- Parsing of pdftotext -bbox output into positioned regions
+- Scaling of PDF points to the OCR DPI
+- Usable text layer detection, including scanned pages with a text overlay
+- Parsing of pdfimages -list output into per-page image coverage
+- Fallback when pdftotext is unavailable
+"""
+
+import pytest
+from tools.src.document_data_extraction_tools.lab_report_parser.pdf_text_layer import PDFTextLayerExtractor
+
+
+BBOX_OUTPUT = """<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Transitional//EN" "http://www.w3.org/TR/xhtml1/DTD/xhtml1-transitional.dtd">
+<html xmlns="http://www.w3.org/1999/xhtml">
+<head><title></title></head>
+<body>
+<doc>
+  <page width="612.000000" height="792.000000">
+    <word xMin="72.000000" yMin="100.000000" xMax="120.000000" yMax="112.000000">Hemoglobin</word>
+    <word xMin="200.000000" yMin="100.000000" xMax="224.000000" yMax="112.000000">14.5</word>
+    <word xMin="300.000000" yMin="100.000000" xMax="324.000000" yMax="112.000000">g/dL</word>
+    <word xMin="72.000000" yMin="120.000000" xMax="120.000000" yMax="132.000000">LDL&amp;HDL</word>
+  </page>
+  <page width="612.000000" height="792.000000">
+  </page>
+</doc>
+</body>
+</html>
+"""
+
+
+SCANNED_FOOTER_OUTPUT = BBOX_OUTPUT.replace(
+    "  <page width=\"612.000000\" height=\"792.000000\">\n  </page>",
+    "  <page width=\"612.000000\" height=\"792.000000\">\n"
+    "    <word xMin=\"72.000000\" yMin=\"760.000000\" xMax=\"300.000000\" yMax=\"770.000000\">"
+    "Electronically verified by ACME Diagnostics</word>\n  </page>"
+)
+
+IMAGE_LIST_OUTPUT = """page   num  type   width height color comp bpc  enc interp  object ID x-ppi y-ppi size ratio
+--------------------------------------------------------------------------------------------
+   1     0 image     150    75  rgb     3   8  jpeg   no        10  0   300   300 4000B 1.2%
+   2     1 image    2550  3300  gray    1   8  jpeg   no        14  0   300   300  615K 7.5%
+   2     2 smask    2550  3300  gray    1   8  image  no        14  0   300   300 1000B 0.0%
+"""
+
+
+class TestParseBboxOutput:
+    """Test suite for pdftotext -bbox parsing"""
+
+    def test_pages_and_words(self):
+        """Test that words are grouped by page, including empty pages"""
+        pages = PDFTextLayerExtractor.parse_bbox_output(BBOX_OUTPUT, dpi=72)
+
+        assert sorted(pages) == [1, 2]
+        assert [region[2] for region in pages[1]] == ["Hemoglobin", "14.5", "g/dL", "LDL&HDL"]
+        assert pages[2] == []
+
+    def test_word_centers_scaled_to_dpi(self):
+        """Test that coordinates are word centers scaled from points to pixels"""
+        pages = PDFTextLayerExtractor.parse_bbox_output(BBOX_OUTPUT, dpi=300)
+        y_pos, x_pos, _ = pages[1][0]
+
+        assert y_pos == pytest.approx(106.0 * 300 / 72)
+        assert x_pos == pytest.approx(96.0 * 300 / 72)
+
+
+class TestImageCoverage:
+    """Test suite for pdfimages -list parsing and image coverage"""
+
+    def test_image_areas(self):
+        """Test that drawn image sizes are summed per page, skipping soft masks"""
+        areas = PDFTextLayerExtractor.parse_image_list(IMAGE_LIST_OUTPUT)
+
+        assert areas[1] == pytest.approx(36.0 * 18.0)
+        assert areas[2] == pytest.approx(612.0 * 792.0)
+
+    def test_coverage(self):
+        """Test that coverage is the image share of the page size"""
+        sizes = PDFTextLayerExtractor.parse_page_sizes(BBOX_OUTPUT)
+
+        assert sizes == {1: (612.0, 792.0), 2: (612.0, 792.0)}
+        assert PDFTextLayerExtractor.image_coverage(612.0 * 396.0, sizes[1]) == pytest.approx(0.5)
+        assert PDFTextLayerExtractor.image_coverage(1000.0, None) == 0.0
+
+
+class TestIsUsable:
+    """Test suite for text layer usability detection"""
+
+    def test_enough_text(self):
+        """Test that a page with real text is usable"""
+        regions = [(0.0, 0.0, "Hemoglobin"), (0.0, 10.0, "14.5"), (0.0, 20.0, "Hematocrit 42")]
+
+        assert PDFTextLayerExtractor.is_usable(regions) is True
+
+    def test_empty_page(self):
+        """Test that an image-only page is sent to OCR"""
+        assert PDFTextLayerExtractor.is_usable([]) is False
+
+    def test_too_little_text(self):
+        """Test that a scanned page with only a stamp/footer is sent to OCR"""
+        assert PDFTextLayerExtractor.is_usable([(0.0, 0.0, "Page 1")]) is False
+
+    def test_scanned_page_with_text_overlay(self):
+        """Test that a page mostly covered by an image is sent to OCR despite its text"""
+        regions = [(0.0, 0.0, "Electronically"), (0.0, 10.0, "verified by ACME Diagnostics")]
+
+        assert PDFTextLayerExtractor.is_usable(regions, image_coverage=0.1) is True
+        assert PDFTextLayerExtractor.is_usable(regions, image_coverage=1.0) is False
+
+    def test_broken_font_mapping(self):
+        """Test that undecodable glyphs disqualify the text layer"""
+        regions = [(0.0, 0.0, "Hemoglobin Hematocrit"), (0.0, 10.0, "�" * 10)]
+
+        assert PDFTextLayerExtractor.is_usable(regions) is False
+
+
+class TestExtract:
+    """Test suite for extraction fallbacks"""
+
+    def test_missing_pdftotext_falls_back(self, tmp_path):
+        """Test that a missing poppler install returns no text-layer pages"""
+        extractor = PDFTextLayerExtractor(poppler_path=str(tmp_path / "no-poppler"))
+
+        assert extractor.extract(str(tmp_path / "report.pdf")) == {}
+
+    def test_scanned_page_with_text_footer(self, monkeypatch):
+        """Test that a scanned page with a text footer is left to OCR while a text page with a logo is kept"""
+        outputs = {"pdftotext": SCANNED_FOOTER_OUTPUT, "pdfimages": IMAGE_LIST_OUTPUT}
+        extractor = PDFTextLayerExtractor()
+        monkeypatch.setattr(extractor, "_run_poppler", lambda tool, args: outputs[tool])
+
+        pages = extractor.extract("report.pdf", dpi=72)
+
+        assert sorted(pages) == [1]
+
+    def test_missing_pdfimages_judges_text_only(self, monkeypatch):
+        """Test that pages are judged on their text when pdfimages is unavailable"""
+        outputs = {"pdftotext": SCANNED_FOOTER_OUTPUT, "pdfimages": None}
+        extractor = PDFTextLayerExtractor()
+        monkeypatch.setattr(extractor, "_run_poppler", lambda tool, args: outputs[tool])
+
+        assert sorted(extractor.extract("report.pdf", dpi=72)) == [1, 2]
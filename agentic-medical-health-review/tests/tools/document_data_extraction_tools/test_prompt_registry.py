@@ -0,0 +1,145 @@
+"""
+Tests for Prompt Registry
+
+Tests the PromptRegistry functionality including:
+- Parsing of ## [SECTION] markers into named templates
+- Placeholder rendering with literal braces preserved
+- Reload only when the prompt file's mtime changes
+- Missing file handling
+- Loading the shipped extraction prompt file
+"""
+
+import os
+
+import pytest
+from tools.src.document_data_extraction_tools.lab_report_parser.prompt_registry import (
+    PromptRegistry,
+    PromptTemplate,
+    get_extraction_prompt_registry
+)
+
+
+PROMPT_FILE = """# Extraction Prompts
+
+## [PRIMARY_PROMPT]
+
+Extract tests as [{{"test_name": "..."}}] from:
+{ocr_text}
+End of text.
+
+---
+
+## [FALLBACK_PROMPT]
+
+Fallback for {ocr_text}
+
+---
+
+## [EMPTY_SECTION]
+"""
+
+
+@pytest.fixture
+def prompt_path(tmp_path):
+    """Write a sample prompt file"""
+    path = tmp_path / "prompts.md"
+    path.write_text(PROMPT_FILE, encoding="utf-8")
+    return path
+
+
+class TestParseSections:
+    """Test suite for section parsing"""
+
+    def test_sections_split_and_cleaned(self):
+        """Test that sections are named, stripped and lose their --- separator"""
+        sections = PromptRegistry.parse_sections(PROMPT_FILE)
+
+        assert list(sections) == ["PRIMARY_PROMPT", "FALLBACK_PROMPT", "EMPTY_SECTION"]
+        assert sections["FALLBACK_PROMPT"].strip() == "Fallback for {ocr_text}"
+        assert not sections["PRIMARY_PROMPT"].endswith("---")
+        assert sections["EMPTY_SECTION"] == ""
+
+
+class TestPromptTemplate:
+    """Test suite for template rendering"""
+
+    def test_render_matches_replace(self):
+        """Test that rendering equals str.replace and keeps literal braces"""
+        text = PromptRegistry.parse_sections(PROMPT_FILE)["PRIMARY_PROMPT"]
+        template = PromptTemplate("PRIMARY_PROMPT", text)
+
+        rendered = template.render("Glucose 95 mg/dL {x}")
+
+        assert rendered == text.replace("{ocr_text}", "Glucose 95 mg/dL {x}")
+        assert '[{{"test_name"' in rendered
+
+    def test_version_tracks_content(self):
+        """Test that the version changes only when the text changes"""
+        assert PromptTemplate("A", "same").version == PromptTemplate("B", "same").version
+        assert PromptTemplate("A", "one").version != PromptTemplate("A", "two").version
+
+
+class TestPromptRegistry:
+    """Test suite for PromptRegistry loading and reloading"""
+
+    def test_get_template(self, prompt_path):
+        """Test that named templates are available and empty sections are skipped"""
+        registry = PromptRegistry([prompt_path])
+
+        assert registry.get("FALLBACK_PROMPT").render("X").strip() == "Fallback for X"
+        assert registry.get("EMPTY_SECTION") is None
+        assert registry.get("ULTIMATE_FALLBACK") is None
+
+    def test_file_parsed_once(self, prompt_path, monkeypatch):
+        """Test that repeated lookups do not re-parse an unchanged file"""
+        registry = PromptRegistry([prompt_path])
+        registry.get("PRIMARY_PROMPT")
+
+        calls = []
+        original = PromptRegistry.parse_sections
+        monkeypatch.setattr(
+            PromptRegistry, "parse_sections",
+            staticmethod(lambda content: calls.append(1) or original(content))
+        )
+        for _ in range(5):
+            registry.get("PRIMARY_PROMPT")
+
+        assert calls == []
+
+    def test_reload_on_mtime_change(self, prompt_path):
+        """Test that an edited prompt file is picked up"""
+        registry = PromptRegistry([prompt_path])
+        old_version = registry.get("FALLBACK_PROMPT").version
+
+        prompt_path.write_text("## [FALLBACK_PROMPT]\nNew wording {ocr_text}\n", encoding="utf-8")
+        stat = os.stat(prompt_path)
+        os.utime(prompt_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        template = registry.get("FALLBACK_PROMPT")
+        assert template.render("X") == "New wording X"
+        assert template.version != old_version
+        assert registry.get("PRIMARY_PROMPT") is None
+
+    def test_first_existing_candidate_used(self, tmp_path, prompt_path):
+        """Test that missing candidate paths are skipped"""
+        registry = PromptRegistry([tmp_path / "missing.md", prompt_path])
+
+        assert registry.get("FALLBACK_PROMPT") is not None
+
+    def test_missing_file(self, tmp_path):
+        """Test that no templates are returned when no file exists"""
+        registry = PromptRegistry([tmp_path / "missing.md"])
+
+        assert registry.get("PRIMARY_PROMPT") is None
+        assert registry.names() == []
+
+
+class TestExtractionPromptRegistry:
+    """Test suite for the shared extraction prompt registry"""
+
+    def test_shipped_prompt_file_loads(self):
+        """Test that the repository prompt file provides all three sections"""
+        registry = get_extraction_prompt_registry()
+
+        for name in ("PRIMARY_PROMPT", "FALLBACK_PROMPT", "ULTIMATE_FALLBACK"):
+            assert "{ocr_text}" in registry.get(name).text
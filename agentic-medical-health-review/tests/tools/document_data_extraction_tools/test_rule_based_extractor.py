@@ -0,0 +1,127 @@
+"""
+Tests for Rule-Based Lab Data Extractor
+
+Tests the RuleBasedExtractor functionality including:
+- Layout detection from signature lines
+- Row parsing for different column orders
+- Coverage/confidence thresholds and LLM fallback
+- Fast path inside LLMStructuredExtractor
+"""
+
+from tools.src.document_data_extraction_tools.lab_report_parser.rule_based_extractor import (
+    RuleBasedExtractor,
+    ROW_NAME_VALUE_UNIT_RANGE
+)
+
+
+SAMPLE_REPORT = """MEDICAL LABORATORY REPORT
+Patient: John Doe
+DOB: 01/15/1980
+Date Collected: 2024-02-15
+COMPLETE BLOOD COUNT (CBC)
+Test Name Result Unit Reference Range
+Hemoglobin 14.5 g/dL 13.5-17.5
+Hematocrit 42.0 % 38.0-50.0
+RBC Count 4.8 M/uL 4.5-5.5
+Absolute Eosinophil Count 0.04 10^3/L 0.04 - 0.44
+LIPID PANEL
+Cholesterol, Total 185 mg/dL <200
+HDL Cholesterol 55 mg/dL >40
+A/G Ratio 1.5 1.0-2.0
+Reviewed by: Dr. Smith, MD"""
+
+
+class TestParse:
+    """Test suite for layout matching and row parsing"""
+
+    def test_known_layout_rows(self):
+        """Test that every result row of a known layout is parsed"""
+        parsed = RuleBasedExtractor().parse(SAMPLE_REPORT)
+
+        assert parsed["layout"] == "result_unit_reference"
+        assert parsed["coverage"] == 1.0
+        assert parsed["confidence"] == 1.0
+        assert parsed["tests"][0] == {
+            "test_name": "Hemoglobin",
+            "test_value": "14.5",
+            "unit": "g/dL",
+            "reference_range": "13.5-17.5"
+        }
+        by_name = {test["test_name"]: test for test in parsed["tests"]}
+        assert by_name["Absolute Eosinophil Count"]["unit"] == "10^3/L"
+        assert by_name["Absolute Eosinophil Count"]["reference_range"] == "0.04 - 0.44"
+        assert by_name["Cholesterol, Total"]["reference_range"] == "<200"
+        assert by_name["A/G Ratio"]["unit"] == ""
+
+    def test_range_before_unit_layout(self):
+        """Test a layout whose reference range column precedes the unit"""
+        text = "Test Name Result Reference Range Unit\nGlucose 95 70-100 mg/dL\nUrea 30 15-40 mg/dL\nSodium 140 136-145 mmol/L"
+
+        parsed = RuleBasedExtractor().parse(text)
+
+        assert parsed["layout"] == "result_reference_unit"
+        assert [t["unit"] for t in parsed["tests"]] == ["mg/dL", "mg/dL", "mmol/L"]
+
+    def test_unknown_layout(self):
+        """Test that reports without a known signature are not parsed"""
+        assert RuleBasedExtractor().parse("Glucose: 95 mg/dL (70-100)") is None
+
+
+class TestExtract:
+    """Test suite for threshold handling"""
+
+    def test_accepted_result_format(self):
+        """Test that an accepted parse uses the standard result format"""
+        result = RuleBasedExtractor().extract(SAMPLE_REPORT, "report.pdf")
+
+        metadata = result["metadata"]
+        assert metadata["extraction_method"] == "rules"
+        assert metadata["extraction_status"] == "success"
+        assert metadata["total_tests_found"] == len(result["tests"]) == 7
+        assert metadata["file_path"] == "report.pdf"
+
+    def test_low_coverage_falls_back(self):
+        """Test that unparsed result-like lines send the report to the LLM"""
+        text = SAMPLE_REPORT + "\nPlatelets 250 thousand per microlitre see note 3\nESR 12 mm after 1 hour (Westergren) 0-15"
+
+        assert RuleBasedExtractor(min_coverage=0.9).extract(text) is None
+        assert RuleBasedExtractor(min_coverage=0.7).extract(text) is not None
+
+    def test_low_confidence_falls_back(self):
+        """Test that implausible rows reject the parse"""
+        text = "Test Name Result Unit Reference Range\nA 1 mg 10-5\nB 2 mg 20-5\nC 3 mg 30-5"
+
+        assert RuleBasedExtractor().extract(text) is None
+
+    def test_registered_layout(self):
+        """Test that custom layouts are checked first"""
+        extractor = RuleBasedExtractor()
+        extractor.register_layout("acme_labs", [r"ACME DIAGNOSTICS"], [ROW_NAME_VALUE_UNIT_RANGE])
+
+        result = extractor.extract("ACME DIAGNOSTICS\nGlucose 95 mg/dL 70-100\nUrea 30 mg/dL 15-40\nTSH 2.1 mIU/L 0.4-4.0")
+
+        assert result["metadata"]["layout"] == "acme_labs"
+
+    def test_from_env_disabled(self, monkeypatch):
+        """Test that the fast path can be switched off"""
+        monkeypatch.setenv("RULE_EXTRACTOR_ENABLED", "false")
+
+        assert RuleBasedExtractor.from_env() is None
+
+
+class TestLLMFallback:
+    """Test suite for the rule stage inside LLMStructuredExtractor"""
+
+    def test_known_layout_skips_llm(self, monkeypatch):
+        """Test that the LLM is not called for a known layout"""
+        monkeypatch.setenv("LLM_CACHE_ENABLED", "false")
+        from tools.src.document_data_extraction_tools.lab_report_parser.llm_structured_extractor import LLMStructuredExtractor
+
+        class FailingLLM:
+            def invoke(self, prompt):
+                raise AssertionError("LLM should not be called")
+
+        extractor = LLMStructuredExtractor(llm=FailingLLM(), rule_extractor=RuleBasedExtractor())
+        result = extractor.extract_structured_data(SAMPLE_REPORT)
+
+        assert result["metadata"]["extraction_method"] == "rules"
@@ -0,0 +1,187 @@
+"""
+Tests for the Patient Record Store
+
+Tests the PatientRecordStore functionality including:
+- Atomic one-file-per-record writes
+- Duplicate record keys kept under a suffixed key in both layouts
+- JSON Lines segments with an offset index
+- Recovery from a torn segment tail or index line
+- Concurrent writers and batched fsync (records synced before they become visible)
+"""
+
+import os
+import threading
+
+import pytest
+
+from tools.src.intake_validation_tools import patient_record_store
+from tools.src.intake_validation_tools.patient_record_store import PatientRecordStore
+
+
+RECORD = {"user_id": "USER-1", "data": {"name": "Jane Doe", "age": 40}}
+
+
+@pytest.fixture(params=["files", "jsonl"])
+def store(request, tmp_path):
+    return PatientRecordStore(str(tmp_path / "exports"), format=request.param)
+
+
+class TestRecordStoreFormats:
+    """Test suite shared by both layouts"""
+
+    def test_save_and_read(self, store):
+        """Test that a saved record reads back unchanged"""
+        path = store.save("USER-1", "20260101_120000000", RECORD)
+
+        assert os.path.dirname(path) == store.user_dir("USER-1")
+        assert store.read("USER-1", "20260101_120000000") == RECORD
+        assert store.read("USER-1", "missing") is None
+
+    def test_iter_records_in_order(self, store):
+        """Test that a user's records come back in write order"""
+        for i in range(3):
+            store.save("USER-1", f"2026010{i}_120000000", {"n": i})
+
+        assert [record["n"] for _, record in store.iter_records("USER-1")] == [0, 1, 2]
+        assert list(store.iter_records("USER-2")) == []
+
+    def test_duplicate_key_not_replaced(self, store):
+        """Test that saving under an existing key keeps both records"""
+        store.save("USER-1", "20260101_120000000", {"n": 1})
+        store.save("USER-1", "20260101_120000000", {"n": 2})
+        store.save("USER-1", "20260101_120000000", {"n": 3})
+
+        assert store.read("USER-1", "20260101_120000000") == {"n": 1}
+        assert store.read("USER-1", "20260101_120000000_2") == {"n": 2}
+        assert [key for key, _ in store.iter_records("USER-1")] == [
+            "20260101_120000000", "20260101_120000000_2", "20260101_120000000_3"
+        ]
+
+    def test_duplicate_key_from_another_writer(self, store, tmp_path):
+        """Test that a key written by another store instance is not reused"""
+        other = PatientRecordStore(store.root, format=store.format)
+        store.save("USER-1", "a", {"n": 1})
+        other.save("USER-1", "a", {"n": 2})
+        store.save("USER-1", "a", {"n": 3})
+
+        assert [(key, record["n"]) for key, record in store.iter_records("USER-1")] == [
+            ("a", 1), ("a_2", 2), ("a_3", 3)
+        ]
+
+    def test_concurrent_writers(self, store):
+        """Test that records from parallel threads are all kept"""
+        def write(worker):
+            for i in range(20):
+                store.save("USER-1", f"{worker}_{i:02d}", {"worker": worker, "i": i})
+
+        threads = [threading.Thread(target=write, args=(w,)) for w in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(list(store.iter_records("USER-1"))) == 80
+
+    def test_invalid_format(self, tmp_path):
+        """Test that unknown layouts are rejected"""
+        with pytest.raises(ValueError):
+            PatientRecordStore(str(tmp_path), format="xml")
+
+
+class TestFilesLayout:
+    """Test suite for one file per record"""
+
+    def test_pretty_printed_file_without_temp_leftovers(self, tmp_path):
+        """Test the record_<key>.json file and that no temporary file remains"""
+        store = PatientRecordStore(str(tmp_path))
+        path = store.save("USER-1", "20260101_120000000", RECORD)
+
+        assert os.path.basename(path) == "record_20260101_120000000.json"
+        assert '\n  "user_id"' in open(path).read()
+        assert sorted(os.listdir(store.user_dir("USER-1"))) == [".lock", "record_20260101_120000000.json"]
+
+    def test_duplicate_key_path(self, tmp_path):
+        """Test that the returned path names the suffixed file"""
+        store = PatientRecordStore(str(tmp_path))
+        store.save("USER-1", "20260101_120000000", RECORD)
+
+        path = store.save("USER-1", "20260101_120000000", RECORD)
+
+        assert os.path.basename(path) == "record_20260101_120000000_2.json"
+
+
+class TestJsonlLayout:
+    """Test suite for append-only segments"""
+
+    def test_torn_tail_discarded(self, tmp_path):
+        """Test that bytes of an unindexed (crashed) append are overwritten"""
+        store = PatientRecordStore(str(tmp_path), format="jsonl")
+        store.save("USER-1", "a", {"n": 1})
+        with open(os.path.join(store.user_dir("USER-1"), "records.jsonl"), "ab") as f:
+            f.write(b'{"n": 2, "trunc')
+
+        store.save("USER-1", "b", {"n": 3})
+
+        assert [key for key, _ in store.iter_records("USER-1")] == ["a", "b"]
+        assert store.read("USER-1", "b") == {"n": 3}
+
+    def test_torn_index_line_discarded(self, tmp_path):
+        """Test that a partial index entry is ignored and replaced"""
+        store = PatientRecordStore(str(tmp_path), format="jsonl")
+        store.save("USER-1", "a", {"n": 1})
+        with open(os.path.join(store.user_dir("USER-1"), "records.idx"), "ab") as f:
+            f.write(b"b\t99")
+
+        assert [key for key, _ in store.iter_records("USER-1")] == ["a"]
+        store.save("USER-1", "c", {"n": 2})
+        assert [key for key, _ in store.iter_records("USER-1")] == ["a", "c"]
+
+
+class TestBatchedFsync:
+    """Test suite for fsync batching"""
+
+    def test_fsync_every_n_records(self, tmp_path, monkeypatch):
+        """Test that pending files are synced once per batch and on flush"""
+        synced = []
+        monkeypatch.setattr(
+            patient_record_store, "_fsync_path",
+            lambda path, directory=False: synced.append(path)
+        )
+        store = PatientRecordStore(str(tmp_path), format="jsonl", fsync_every=3)
+
+        store.save("USER-1", "a", {"n": 1})
+        store.save("USER-1", "b", {"n": 2})
+        assert synced == []
+
+        store.save("USER-1", "c", {"n": 3})
+        assert any(path.endswith("records.jsonl") for path in synced)
+
+        synced.clear()
+        store.save("USER-1", "d", {"n": 4})
+        store.flush()
+        assert any(path.endswith("records.idx") for path in synced)
+
+    def test_record_file_synced_before_link(self, tmp_path, monkeypatch):
+        """Test that batched "files" writes fsync each record before it becomes visible"""
+        events = []
+        fsync, link = os.fsync, os.link
+        monkeypatch.setattr(patient_record_store, "_fsync_path", lambda path, directory=False: events.append("dir"))
+        monkeypatch.setattr(os, "fsync", lambda fd: (events.append("fsync"), fsync(fd)))
+        monkeypatch.setattr(os, "link", lambda src, dst: (events.append("link"), link(src, dst)))
+        store = PatientRecordStore(str(tmp_path), format="files", fsync_every=3)
+
+        for key in ("a", "b", "c"):
+            store.save("USER-1", key, {"key": key})
+
+        assert events[:6] == ["fsync", "link"] * 3
+        assert "dir" in events[6:]
+
+    @pytest.mark.parametrize("format", PatientRecordStore.FORMATS)
+    def test_nothing_tracked_without_fsync(self, tmp_path, format):
+        """Test that fsync_every=0 does not accumulate pending paths between flushes"""
+        store = PatientRecordStore(str(tmp_path), format=format, fsync_every=0)
+
+        for n in range(5):
+            store.save(f"USER-{n}", "a", {"n": n})
+
+        assert store._pending_files == set() and store._pending_dirs == set()
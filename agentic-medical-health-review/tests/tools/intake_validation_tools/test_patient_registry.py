@@ -0,0 +1,131 @@
+"""
+Tests for the SQLite Patient Registry
+
+Tests the PatientRegistry functionality including:
+- Case-insensitive lookup on name, age and gender
+- Record counting for new and returning patients
+- Several User IDs sharing a name, age and gender (first one found)
+- Import of a legacy user_registry.json
+- Persistence across reopening the database
+"""
+
+import json
+import sqlite3
+
+import pytest
+
+from tools.src.intake_validation_tools.patient_registry import PatientRegistry
+
+
+@pytest.fixture
+def registry(tmp_path):
+    registry = PatientRegistry(str(tmp_path / "registry.db"), legacy_json_path=None)
+    yield registry
+    registry.close()
+
+
+class TestPatientRegistryLookup:
+    """Test suite for patient lookup and registration"""
+
+    def test_find_case_insensitive(self, registry):
+        """Test that name and gender match regardless of case"""
+        registry.register("USER-1", "Jane Doe", 40, "Female")
+
+        assert registry.find("jane doe", 40, "FEMALE") == "USER-1"
+        assert registry.find("Jane Doe", 41, "Female") is None
+        assert registry.find("Jane Roe", 40, "Female") is None
+
+    def test_register_visit_new_then_existing(self, registry):
+        """Test that a returning patient reuses the User ID and counts records"""
+        ids = iter(["USER-1", "USER-2"])
+
+        first = registry.register_visit("Jane Doe", 40, "Female", lambda: next(ids))
+        second = registry.register_visit("JANE DOE", 40, "female", lambda: next(ids))
+
+        assert first == ("USER-1", True)
+        assert second == ("USER-1", False)
+        entry = registry.get("USER-1")
+        assert entry['records_count'] == 2
+        assert entry['name'] == "Jane Doe"
+        assert len(registry) == 1
+
+    def test_same_identity_other_user_id(self, registry):
+        """Test that a second User ID with the same name, age and gender is registered, not rejected"""
+        registry.register("USER-1", "Jane Doe", 40, "Female")
+        registry.register("USER-2", "jane doe", 40, "female")
+        registry.update({"USER-3": {"name": "JANE DOE", "age": 40, "gender": "Female", "records_count": 1}})
+
+        assert len(registry) == 3
+        assert registry.get("USER-2")['records_count'] == 1
+        assert registry.find("Jane Doe", 40, "Female") == "USER-1"
+
+    def test_unknown_user(self, registry):
+        """Test that an unknown User ID returns None"""
+        assert registry.get("USER-404") is None
+
+
+class TestPatientRegistryPersistence:
+    """Test suite for legacy import and persistence"""
+
+    def test_legacy_json_imported(self, tmp_path):
+        """Test that user_registry.json is imported into an empty registry"""
+        legacy = {
+            "USER-A": {"name": "pradeep cr", "age": 40, "gender": "male",
+                       "created_at": "2026-02-19T07:03:55", "records_count": 3,
+                       "last_updated": "2026-02-19T07:03:55"},
+            "USER-B": {"name": "Pradeep CR", "age": 40, "gender": "Male",
+                       "created_at": "2026-02-20T07:03:55", "records_count": 1}
+        }
+        json_path = tmp_path / "user_registry.json"
+        json_path.write_text(json.dumps(legacy))
+
+        registry = PatientRegistry(str(tmp_path / "registry.db"), legacy_json_path=str(json_path))
+        try:
+            # Duplicates are all kept; lookups find the first, like the old linear scan
+            assert registry.find("PRADEEP CR", 40, "male") == "USER-A"
+            assert registry.to_dict() == legacy
+        finally:
+            registry.close()
+
+    def test_reopen_keeps_patients(self, tmp_path):
+        """Test that registrations survive reopening the database"""
+        path = str(tmp_path / "registry.db")
+        registry = PatientRegistry(path, legacy_json_path=None)
+        registry.register("USER-1", "Jane Doe", 40, "Female")
+        registry.close()
+
+        reopened = PatientRegistry(path, legacy_json_path=None)
+        try:
+            assert reopened.find("jane doe", 40, "female") == "USER-1"
+        finally:
+            reopened.close()
+
+    def test_update_replaces_entries(self, registry):
+        """Test that update() inserts or replaces entries by User ID"""
+        registry.register("USER-1", "Jane Doe", 40, "Female")
+        registry.update({"USER-1": {"name": "Jane Doe", "age": 41, "gender": "Female", "records_count": 5}})
+
+        assert registry.find("Jane Doe", 41, "Female") == "USER-1"
+        assert registry.get("USER-1")['records_count'] == 5
+
+    def test_unique_index_of_older_registry_dropped(self, tmp_path):
+        """Test that a registry created with the unique identity index accepts duplicates after reopening"""
+        path = str(tmp_path / "registry.db")
+        conn = sqlite3.connect(path)
+        conn.executescript("""
+            CREATE TABLE patients (
+                user_id TEXT PRIMARY KEY, name TEXT NOT NULL, name_lower TEXT NOT NULL,
+                age INTEGER NOT NULL, gender TEXT NOT NULL, gender_lower TEXT NOT NULL,
+                created_at TEXT NOT NULL, records_count INTEGER NOT NULL DEFAULT 0, last_updated TEXT
+            );
+            CREATE UNIQUE INDEX idx_patients_identity ON patients (name_lower, age, gender_lower);
+        """)
+        conn.close()
+
+        registry = PatientRegistry(path, legacy_json_path=None)
+        try:
+            registry.register("USER-1", "Jane Doe", 40, "Female")
+            registry.register("USER-2", "Jane Doe", 40, "Female")
+            assert len(registry) == 2
+        finally:
+            registry.close()
@@ -5,7 +5,8 @@ Detects deviations from reference ranges by comparing test values against
 their normalized reference ranges.
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Sequence
+import numpy as np
 from models.normalized_parameter import NormalizedParameter
 
 
@@ -153,6 +154,122 @@ def detect_mismatches_batch(normalized_params: List[NormalizedParameter]) -> Dic
     return batch_result
 
 
+# Columnar engine: mismatch types and severities as int8 codes (index into these tuples)
+MISMATCH_TYPE_CODES = (
+    MismatchType.NO_REFERENCE,
+    MismatchType.WITHIN_RANGE,
+    MismatchType.BELOW_RANGE,
+    MismatchType.ABOVE_RANGE
+)
+SEVERITY_LEVELS = ("none", "mild", "moderate", "severe")
+
+MISMATCH_DTYPE = np.dtype([
+    ("has_mismatch", np.bool_),
+    ("mismatch_type", np.int8),
+    ("deviation_percentage", np.float64),
+    ("severity", np.int8)
+])
+
+
+def detect_mismatches_columnar(values, range_min, range_max) -> np.ndarray:
+    """
+    Detect mismatches for whole columns of values at once
+    
+    Same semantics as detect_mismatch and _calculate_severity, evaluated with
+    NumPy array operations instead of per-parameter Python branches. Intended
+    for population-level screens over many normalized rows.
+    
+    Args:
+        values: Normalized values (array-like of float)
+        range_min: Reference range minimums; NaN (or None) for a missing bound
+        range_max: Reference range maximums; NaN (or None) for a missing bound
+    
+    Returns:
+        Structured array (MISMATCH_DTYPE), one record per value:
+            - has_mismatch: bool
+            - mismatch_type: code into MISMATCH_TYPE_CODES
+            - deviation_percentage: float, NaN when there is no mismatch
+            - severity: code into SEVERITY_LEVELS
+        A violated bound of 0 gives an infinite deviation (severe), where
+        detect_mismatch raises ZeroDivisionError.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    range_min = np.broadcast_to(np.asarray(range_min, dtype=np.float64), values.shape)
+    range_max = np.broadcast_to(np.asarray(range_max, dtype=np.float64), values.shape)
+    
+    has_min = ~np.isnan(range_min)
+    has_max = ~np.isnan(range_max)
+    below = has_min & (values < range_min)
+    above = has_max & (values > range_max) & ~below
+    
+    mismatch_type = np.where(has_min | has_max, 1, 0).astype(np.int8)
+    mismatch_type[below] = 2
+    mismatch_type[above] = 3
+    
+    # Same operation order as detect_mismatch, so results are bit-identical
+    with np.errstate(divide="ignore", invalid="ignore"):
+        deviation = np.where(
+            below,
+            ((range_min - values) / range_min) * 100,
+            np.where(above, ((values - range_max) / range_max) * 100, np.nan)
+        )
+    
+    abs_deviation = np.abs(deviation)
+    severity = np.select(
+        [~(below | above), abs_deviation < 10, abs_deviation < 25],
+        [0, 1, 2],
+        default=3
+    ).astype(np.int8)
+    
+    result = np.empty(values.shape, dtype=MISMATCH_DTYPE)
+    result["has_mismatch"] = below | above
+    result["mismatch_type"] = mismatch_type
+    result["deviation_percentage"] = deviation
+    result["severity"] = severity
+    return result
+
+
+def summarize_mismatches(result: np.ndarray) -> Dict[str, int]:
+    """
+    Count a columnar result like detect_mismatches_batch does
+    
+    Args:
+        result: Output of detect_mismatches_columnar
+    
+    Returns:
+        Dict with total, mismatches_found, within_range, no_reference
+    """
+    counts = np.bincount(result["mismatch_type"], minlength=len(MISMATCH_TYPE_CODES))
+    return {
+        "total": int(result.size),
+        "mismatches_found": int(counts[2] + counts[3]),
+        "within_range": int(counts[1]),
+        "no_reference": int(counts[0])
+    }
+
+
+def mismatches_to_frame(result: np.ndarray, index: Optional[Sequence] = None):
+    """
+    Convert a columnar result to a pandas DataFrame with readable labels (requires pandas)
+    
+    Args:
+        result: Output of detect_mismatches_columnar
+        index: Optional row labels (e.g. normalized_parameter_id values)
+    
+    Returns:
+        DataFrame with has_mismatch, mismatch_type and severity (categoricals
+        of the string labels) and deviation_percentage
+    """
+    import pandas as pd
+    
+    return pd.DataFrame({
+        "has_mismatch": result["has_mismatch"],
+        "mismatch_type": pd.Categorical.from_codes(result["mismatch_type"], MISMATCH_TYPE_CODES),
+        "deviation_percentage": result["deviation_percentage"],
+        "severity": pd.Categorical.from_codes(result["severity"], SEVERITY_LEVELS)
+    }, index=index)
+
+
 if __name__ == "__main__":
     # Example usage
     print("=" * 80)
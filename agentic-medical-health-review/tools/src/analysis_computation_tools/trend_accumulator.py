@@ -0,0 +1,290 @@
+"""
+Incremental Trend Accumulator
+
+Keeps running regression sums per (user, canonical parameter), so each new
+measurement updates the trend in constant time instead of re-running
+compute_trend over the full history. The sums are persisted in the
+trend_accumulators table (init-scripts/04-trend-accumulators.sql) next to
+the trends table.
+
+Times are tracked as days since the Unix epoch (naive timestamps are taken
+as UTC) and summed relative to the first measurement received, which keeps
+the sums small. Results follow compute_trend: same slope, statistics,
+classification and TrendResult schema.
+"""
+
+from typing import Any, Dict, Iterable, Optional
+
+from models.database_connection import DatabaseConnection
+from tools.src.analysis_computation_tools.trend_computation import (
+    TrendType,
+    _classify_trend_stats,
+    _parse_timestamp,
+    _to_epoch_day
+)
+
+
+def _epoch_day(timestamp: Any) -> float:
+    """Days since the Unix epoch for a datetime or timestamp string."""
+    return _to_epoch_day(_parse_timestamp(timestamp))
+
+
+class TrendAccumulator:
+    """Running sums n, Σt, Σv, Σt², Σtv, Σv² plus first and last measurement"""
+
+    # Persisted state, in trend_accumulators column order
+    STATE_FIELDS = (
+        'point_count', 'origin_day', 'sum_t', 'sum_v', 'sum_tt', 'sum_tv', 'sum_vv',
+        'first_day', 'first_value', 'last_day', 'last_value'
+    )
+
+    def __init__(self, user_id: str, canonical_name: str):
+        """
+        Initialize an empty accumulator
+
+        Args:
+            user_id: User ID
+            canonical_name: Canonical parameter name
+        """
+        self.user_id = user_id
+        self.canonical_name = canonical_name
+        self.point_count = 0
+        self.origin_day: Optional[float] = None
+        self.sum_t = 0.0
+        self.sum_v = 0.0
+        self.sum_tt = 0.0
+        self.sum_tv = 0.0
+        self.sum_vv = 0.0
+        self.first_day: Optional[float] = None
+        self.first_value: Optional[float] = None
+        self.last_day: Optional[float] = None
+        self.last_value: Optional[float] = None
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "TrendAccumulator":
+        """
+        Restore an accumulator from a trend_accumulators row
+
+        Args:
+            row: Dict with user_id, canonical_name and STATE_FIELDS
+
+        Returns:
+            TrendAccumulator
+        """
+        accumulator = cls(str(row['user_id']), row['canonical_name'])
+        for field in cls.STATE_FIELDS:
+            value = row.get(field)
+            setattr(accumulator, field, float(value) if value is not None else None)
+        accumulator.point_count = int(row.get('point_count') or 0)
+        return accumulator
+
+    def to_row(self) -> Dict[str, Any]:
+        """
+        Serialize the state for persistence
+
+        Returns:
+            Dict with user_id, canonical_name and STATE_FIELDS
+        """
+        row = {'user_id': self.user_id, 'canonical_name': self.canonical_name}
+        row.update({field: getattr(self, field) for field in self.STATE_FIELDS})
+        return row
+
+    def add(self, value: float, timestamp: Any):
+        """
+        Add one measurement in O(1)
+
+        Measurements may arrive out of order; ties keep compute_trend's
+        stable-sort order (the earliest-added point is first, the
+        latest-added is last).
+
+        Args:
+            value: Normalized value
+            timestamp: datetime, ISO string or days since the Unix epoch (float)
+        """
+        day = float(timestamp) if isinstance(timestamp, (int, float)) else _epoch_day(timestamp)
+        value = float(value)
+
+        if self.origin_day is None:
+            self.origin_day = day
+        t = day - self.origin_day
+
+        self.point_count += 1
+        self.sum_t += t
+        self.sum_v += value
+        self.sum_tt += t * t
+        self.sum_tv += t * value
+        self.sum_vv += value * value
+
+        if self.first_day is None or day < self.first_day:
+            self.first_day, self.first_value = day, value
+        if self.last_day is None or day >= self.last_day:
+            self.last_day, self.last_value = day, value
+
+    def add_points(self, data_points: Iterable[Dict[str, Any]]):
+        """
+        Add measurements in compute_trend's data point format
+
+        Args:
+            data_points: Dicts with value and timestamp
+        """
+        for point in data_points:
+            self.add(point['value'], point['timestamp'])
+
+    def mean(self) -> Optional[float]:
+        """Mean value, or None without measurements"""
+        if self.point_count == 0:
+            return None
+        return self.sum_v / self.point_count
+
+    def std_dev(self) -> float:
+        """Sample standard deviation (0 with fewer than 2 measurements)"""
+        n = self.point_count
+        if n < 2:
+            return 0.0
+        variance = (self.sum_vv - self.sum_v * self.sum_v / n) / (n - 1)
+        return max(variance, 0.0) ** 0.5
+
+    def slope(self) -> float:
+        """Least-squares slope in units per day (0 if all times are equal)"""
+        n = self.point_count
+        if n < 2:
+            return 0.0
+        denominator = self.sum_tt - self.sum_t * self.sum_t / n
+        # Rounding leaves a tiny residue when every t is equal
+        if denominator <= 1e-9 * self.sum_tt:
+            return 0.0
+        return (self.sum_tv - self.sum_t * self.sum_v / n) / denominator
+
+    def to_result(self) -> Dict[str, Any]:
+        """
+        Current trend in the compute_trend / TrendResult format
+
+        Returns:
+            Dict with trend_type, confidence_score, data_point_count,
+            value_change, percentage_change, average_value, canonical_name,
+            user_id, time_span_days
+        """
+        result = {
+            "trend_type": TrendType.INSUFFICIENT_DATA,
+            "confidence_score": 0.0,
+            "data_point_count": self.point_count,
+            "value_change": None,
+            "percentage_change": None,
+            "average_value": None,
+            "canonical_name": self.canonical_name,
+            "user_id": self.user_id,
+            "time_span_days": None
+        }
+        if self.point_count < 2:
+            return result
+
+        value_change = self.last_value - self.first_value
+        percentage_change = (value_change / self.first_value * 100) if self.first_value != 0 else 0
+        average_value = self.mean()
+        trend_type, confidence = _classify_trend_stats(
+            self.slope(), self.point_count, average_value, self.std_dev(), percentage_change
+        )
+
+        result.update({
+            "trend_type": trend_type,
+            "confidence_score": confidence,
+            "value_change": value_change,
+            "percentage_change": percentage_change,
+            "average_value": average_value,
+            "time_span_days": self.last_day - self.first_day
+        })
+        return result
+
+
+_STATE_COLUMNS = ", ".join(TrendAccumulator.STATE_FIELDS)
+
+
+def load_accumulator(db, user_id: str, canonical_name: str, for_update: bool = False) -> TrendAccumulator:
+    """
+    Load the accumulator of a user's parameter
+
+    Args:
+        db: Open DatabaseConnection
+        user_id: User ID
+        canonical_name: Canonical parameter name
+        for_update: Lock the row until the transaction ends
+
+    Returns:
+        TrendAccumulator (empty if none is stored)
+    """
+    db.cursor.execute(
+        f"""
+        SELECT user_id, canonical_name, {_STATE_COLUMNS}
+        FROM trend_accumulators
+        WHERE user_id = %s AND canonical_name = %s
+        {"FOR UPDATE" if for_update else ""}
+        """,
+        (user_id, canonical_name)
+    )
+    row = db.cursor.fetchone()
+    if row is None:
+        return TrendAccumulator(user_id, canonical_name)
+    return TrendAccumulator.from_row(row)
+
+
+def save_accumulator(db, accumulator: TrendAccumulator):
+    """
+    Insert or update an accumulator's row
+
+    Args:
+        db: Open DatabaseConnection
+        accumulator: TrendAccumulator to persist
+    """
+    row = accumulator.to_row()
+    fields = TrendAccumulator.STATE_FIELDS
+    db.cursor.execute(
+        f"""
+        INSERT INTO trend_accumulators (user_id, canonical_name, {_STATE_COLUMNS})
+        VALUES (%s, %s, {", ".join(["%s"] * len(fields))})
+        ON CONFLICT (user_id, canonical_name) DO UPDATE SET
+            {", ".join(f"{field} = EXCLUDED.{field}" for field in fields)},
+            updated_at = CURRENT_TIMESTAMP
+        """,
+        (row['user_id'], row['canonical_name'], *(row[field] for field in fields))
+    )
+
+
+def update_trend(
+    user_id: str,
+    canonical_name: str,
+    data_points: Iterable[Dict[str, Any]],
+    db=None
+) -> Dict[str, Any]:
+    """
+    Add new measurements to a stored accumulator and return the updated trend
+
+    The row is created if missing and locked while it is updated, so
+    concurrent updates for the same parameter do not lose measurements.
+    Only the new data points are read; history is not reloaded.
+
+    Args:
+        user_id: User ID
+        canonical_name: Canonical parameter name
+        data_points: New measurements (dicts with value and timestamp)
+        db: Optional open DatabaseConnection (a new one is opened and
+            committed otherwise)
+
+    Returns:
+        Trend result dict (TrendResult schema)
+    """
+    if db is None:
+        with DatabaseConnection() as new_db:
+            return update_trend(user_id, canonical_name, data_points, new_db)
+
+    db.cursor.execute(
+        """
+        INSERT INTO trend_accumulators (user_id, canonical_name)
+        VALUES (%s, %s)
+        ON CONFLICT (user_id, canonical_name) DO NOTHING
+        """,
+        (user_id, canonical_name)
+    )
+    accumulator = load_accumulator(db, user_id, canonical_name, for_update=True)
+    accumulator.add_points(data_points)
+    save_accumulator(db, accumulator)
+    return accumulator.to_result()
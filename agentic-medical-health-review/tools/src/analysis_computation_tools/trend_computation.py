@@ -5,8 +5,10 @@ Computes trends across multiple lab reports or device data points by analyzing
 temporal patterns in normalized parameter values.
 """
 
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+from typing import Callable, Dict, Any, List, Optional, Sequence, Tuple, Union
+from datetime import datetime, timezone
+import re
+import numpy as np
 from models.normalized_parameter import NormalizedParameter
 
 
@@ -29,7 +31,8 @@ class TrendDataPoint:
 def compute_trend(
     data_points: List[Dict[str, Any]],
     canonical_name: str,
-    user_id: str
+    user_id: str,
+    source: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Compute trend across multiple data points for a specific parameter
@@ -41,6 +44,8 @@ def compute_trend(
             - parameter_id: str (optional, for tracking)
         canonical_name: Name of the parameter being analyzed
         user_id: User ID
+        source: Optional data source name (e.g. lab or device); the detected
+            timestamp format is remembered per source
     
     Returns:
         Dict containing:
@@ -70,12 +75,8 @@ def compute_trend(
     if len(data_points) < 2:
         return result
     
-    # Sort data points by timestamp
-    sorted_points = sorted(data_points, key=lambda x: _parse_timestamp(x['timestamp']))
-    
-    # Extract values and timestamps
-    values = [point['value'] for point in sorted_points]
-    timestamps = [_parse_timestamp(point['timestamp']) for point in sorted_points]
+    # Parse each timestamp once, then sort by time
+    values, timestamps, days = _normalize_points(data_points, source)
     
     # Calculate basic statistics
     first_value = values[0]
@@ -89,7 +90,7 @@ def compute_trend(
     time_span_days = time_span.days + (time_span.seconds / 86400)
     
     # Determine trend type using linear regression slope
-    slope = _calculate_slope(values, timestamps)
+    slope = _calculate_slope(values, days)
     trend_type, confidence = _classify_trend(slope, values, percentage_change)
     
     result.update({
@@ -104,28 +105,187 @@ def compute_trend(
     return result
 
 
-def _parse_timestamp(timestamp: Any) -> datetime:
+def _parse_timestamp(timestamp: Any, source: Optional[str] = None) -> datetime:
     """Parse timestamp from various formats"""
     if isinstance(timestamp, datetime):
         return timestamp
     elif isinstance(timestamp, str):
-        # Try ISO format
-        try:
-            return datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-        except:
-            # Try common formats
-            for fmt in ['%Y-%m-%d %H:%M:%S', '%Y-%m-%d', '%Y/%m/%d']:
-                try:
-                    return datetime.strptime(timestamp, fmt)
-                except:
-                    continue
+        return timestamp_parser.parse(timestamp, source)
     raise ValueError(f"Could not parse timestamp: {timestamp}")
 
 
-def _calculate_slope(values: List[float], timestamps: List[datetime]) -> float:
+def _parse_timestamp_slow(timestamp: str) -> datetime:
+    """Parse a string no sniffing rule matched (the general fallback chain)."""
+    # Try ISO format
+    try:
+        return datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    except ValueError:
+        # Try common formats
+        for fmt in ['%Y-%m-%d %H:%M:%S', '%Y-%m-%d', '%Y/%m/%d']:
+            try:
+                return datetime.strptime(timestamp, fmt)
+            except ValueError:
+                continue
+    raise ValueError(f"Could not parse timestamp: {timestamp}")
+
+
+def _parse_iso_utc(timestamp: str) -> datetime:
+    return datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+
+
+def _parse_slashed(timestamp: str) -> datetime:
+    year, month, day = timestamp.split('/')
+    if not (year + month + day).isascii() or not (year + month + day).isdigit():
+        raise ValueError(f"Could not parse timestamp: {timestamp}")
+    return datetime(int(year), int(month), int(day))
+
+
+class TimestampParser:
+    """
+    Timestamp string parser with a compiled format-sniffing table
+    
+    A string is matched against precompiled patterns for the formats seen in
+    lab and device data and parsed with that format's direct parser; strings
+    no pattern matches fall back to the general fromisoformat/strptime chain.
+    The format detected for a data source is remembered, and parse_many()
+    applies it to a whole series without re-sniffing each string.
+    
+    Every direct parser gives the same result as the fallback chain for the
+    strings it accepts, and raises ValueError for the rest.
+    """
+    
+    # (name, pattern, parser), most common first
+    FORMATS: Sequence[Tuple[str, "re.Pattern", Callable[[str], datetime]]] = (
+        ("date", re.compile(r"\d{4}-\d{2}-\d{2}", re.ASCII), datetime.fromisoformat),
+        ("iso_datetime", re.compile(
+            r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d{1,6})?)?(?:[+-]\d{2}:\d{2})?",
+            re.ASCII
+        ), datetime.fromisoformat),
+        ("iso_datetime_utc", re.compile(
+            r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d{1,6})?)?Z",
+            re.ASCII
+        ), _parse_iso_utc),
+        ("slashed_date", re.compile(r"\d{4}/\d{1,2}/\d{1,2}", re.ASCII), _parse_slashed),
+    )
+    
+    def __init__(self):
+        self._source_formats: Dict[str, int] = {}
+    
+    def parse(self, timestamp: str, source: Optional[str] = None) -> datetime:
+        """
+        Parse a timestamp string
+        
+        Args:
+            timestamp: Timestamp string
+            source: Optional data source name for the per-source format memo
+        
+        Returns:
+            datetime
+        
+        Raises:
+            ValueError: If no known format matches
+        """
+        if source is not None:
+            index = self._source_formats.get(source)
+            if index is not None:
+                _, pattern, parser = self.FORMATS[index]
+                if pattern.fullmatch(timestamp):
+                    return parser(timestamp)
+        
+        index = self._sniff(timestamp)
+        if index is None:
+            return _parse_timestamp_slow(timestamp)
+        if source is not None:
+            self._source_formats[source] = index
+        return self.FORMATS[index][2](timestamp)
+    
+    def parse_many(self, timestamps: Sequence[Any], source: Optional[str] = None) -> List[datetime]:
+        """
+        Parse a series of timestamps, each exactly once where possible
+        
+        The source's remembered format (or the format sniffed from the first
+        string) is applied to the whole series in one pass. If any element
+        does not fit it (another format, a datetime), the series is parsed
+        element by element instead.
+        
+        Args:
+            timestamps: datetimes and/or timestamp strings
+            source: Optional data source name for the per-source format memo
+        
+        Returns:
+            List of datetimes in input order
+        
+        Raises:
+            ValueError: If a timestamp cannot be parsed
+        """
+        index = self._source_formats.get(source) if source is not None else None
+        if index is None and timestamps and isinstance(timestamps[0], str):
+            index = self._sniff(timestamps[0])
+            if index is not None and source is not None:
+                self._source_formats[source] = index
+        
+        if index is not None:
+            parser = self.FORMATS[index][2]
+            try:
+                return [parser(timestamp) for timestamp in timestamps]
+            except (TypeError, ValueError, AttributeError):
+                pass
+        return [_parse_timestamp(timestamp, source) for timestamp in timestamps]
+    
+    def source_format(self, source: str) -> Optional[str]:
+        """Name of the format detected for a source, if any"""
+        index = self._source_formats.get(source)
+        return self.FORMATS[index][0] if index is not None else None
+    
+    def _sniff(self, timestamp: str) -> Optional[int]:
+        """Index of the first format whose pattern matches, if any."""
+        for index, (_, pattern, _) in enumerate(self.FORMATS):
+            if pattern.fullmatch(timestamp):
+                return index
+        return None
+
+
+timestamp_parser = TimestampParser()
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = _EPOCH.replace(tzinfo=timezone.utc)
+
+
+def _to_epoch_day(timestamp: datetime) -> float:
+    """Days since the Unix epoch (naive timestamps are taken as UTC)."""
+    epoch = _EPOCH if timestamp.tzinfo is None else _EPOCH_UTC
+    return (timestamp - epoch).total_seconds() / 86400
+
+
+def _normalize_points(
+    data_points: List[Dict[str, Any]],
+    source: Optional[str] = None
+) -> Tuple[List[float], List[datetime], List[float]]:
+    """
+    Parse every timestamp exactly once and order the points by time
+    
+    Args:
+        data_points: compute_trend data points
+        source: Optional data source name for the timestamp format memo
+    
+    Returns:
+        Tuple of (values, timestamps, epoch-day floats), sorted by timestamp
+        (stable for equal timestamps)
+    """
+    parsed = timestamp_parser.parse_many([point['timestamp'] for point in data_points], source)
+    order = sorted(range(len(data_points)), key=parsed.__getitem__)
+    values = [data_points[i]['value'] for i in order]
+    timestamps = [parsed[i] for i in order]
+    return values, timestamps, [_to_epoch_day(t) for t in timestamps]
+
+
+def _calculate_slope(values: List[float], timestamps: List[Union[datetime, float]]) -> float:
     """
     Calculate slope using simple linear regression
     
+    Timestamps are datetimes, or already-converted day floats (e.g.
+    epoch days from _normalize_points).
+    
     Returns slope in units per day
     """
     n = len(values)
@@ -133,7 +293,10 @@ def _calculate_slope(values: List[float], timestamps: List[datetime]) -> float:
         return 0.0
     
     # Convert timestamps to days since first measurement
-    time_days = [(t - timestamps[0]).total_seconds() / 86400 for t in timestamps]
+    if isinstance(timestamps[0], datetime):
+        time_days = [(t - timestamps[0]).total_seconds() / 86400 for t in timestamps]
+    else:
+        time_days = [t - timestamps[0] for t in timestamps]
     
     # Calculate means
     mean_time = sum(time_days) / n
@@ -157,16 +320,34 @@ def _classify_trend(slope: float, values: List[float], percentage_change: float)
     Returns:
         Tuple of (trend_type, confidence_score)
     """
-    # Calculate variability (coefficient of variation)
     mean_value = sum(values) / len(values)
     std_dev = _calculate_std_dev(values, mean_value)
+    return _classify_trend_stats(slope, len(values), mean_value, std_dev, percentage_change)
+
+
+def _classify_trend_stats(
+    slope: float,
+    count: int,
+    mean_value: float,
+    std_dev: float,
+    percentage_change: float
+) -> tuple:
+    """
+    Classify trend type and calculate confidence score from summary statistics
+    
+    Shared by _classify_trend and the incremental TrendAccumulator.
+    
+    Returns:
+        Tuple of (trend_type, confidence_score)
+    """
+    # Calculate variability (coefficient of variation)
     cv = (std_dev / mean_value) if mean_value != 0 else 0
     
     # Base confidence on consistency (lower variability = higher confidence)
     base_confidence = max(0.0, 1.0 - cv)
     
     # Adjust confidence based on number of data points
-    data_point_factor = min(1.0, len(values) / 5.0)  # Max confidence at 5+ points
+    data_point_factor = min(1.0, count / 5.0)  # Max confidence at 5+ points
     confidence = base_confidence * data_point_factor
     
     # Classify trend based on percentage change and slope
@@ -236,6 +417,183 @@ def compute_trends_batch(
     return batch_result
 
 
+# Columnar engine: trend types as int8 codes (index into this tuple)
+TREND_TYPE_CODES = (
+    TrendType.INSUFFICIENT_DATA,
+    TrendType.STABLE,
+    TrendType.INCREASING,
+    TrendType.DECREASING
+)
+
+TREND_DTYPE = np.dtype([
+    ("user_id", object),
+    ("canonical_name", object),
+    ("data_point_count", np.int64),
+    ("trend_type", np.int8),
+    ("confidence_score", np.float64),
+    ("slope", np.float64),
+    ("coefficient_of_variation", np.float64),
+    ("value_change", np.float64),
+    ("percentage_change", np.float64),
+    ("average_value", np.float64),
+    ("time_span_days", np.float64)
+])
+
+
+def _to_epoch_days(timestamps, source: Optional[str] = None) -> np.ndarray:
+    """Convert a timestamp column to float days since the Unix epoch."""
+    timestamps = np.asarray(timestamps)
+    if timestamps.dtype.kind in "fiu":
+        return timestamps.astype(np.float64)
+    strings = timestamps.dtype.kind in "US" or (
+        timestamps.dtype.kind == "O" and timestamps.size and isinstance(timestamps.flat[0], str)
+    )
+    if not strings:
+        return timestamps.astype("datetime64[us]").astype(np.int64) / 86400e6
+    parsed = timestamp_parser.parse_many(timestamps.tolist(), source)
+    return np.array([_to_epoch_day(t) for t in parsed], dtype=np.float64)
+
+
+def compute_trends_columnar(
+    user_ids,
+    canonical_names,
+    timestamps,
+    values,
+    source: Optional[str] = None
+) -> np.ndarray:
+    """
+    Compute trends for every (user_id, canonical_name) group of a long-format table
+    
+    Same results as compute_trend (_calculate_slope, _calculate_std_dev and
+    _classify_trend) for each group, computed with one lexsort and grouped
+    reductions (np.add.reduceat) instead of per-parameter Python loops.
+    
+    Args:
+        user_ids: User ID per measurement
+        canonical_names: Parameter name per measurement
+        timestamps: Measurement times: datetime64, naive datetimes,
+            timestamp strings (any format compute_trend accepts), or float
+            days (any fixed origin)
+        values: Normalized values
+        source: Optional data source name for the timestamp format memo
+    
+    Returns:
+        Structured array (TREND_DTYPE), one record per group, ordered by
+        user_id then canonical_name. trend_type is a code into
+        TREND_TYPE_CODES; groups with fewer than 2 points are
+        insufficient_data with confidence 0 and NaN statistics.
+    """
+    user_ids = np.asarray(user_ids, dtype=object)
+    canonical_names = np.asarray(canonical_names, dtype=object)
+    days = _to_epoch_days(timestamps, source)
+    values = np.asarray(values, dtype=np.float64)
+    
+    if values.size == 0:
+        return np.empty(0, dtype=TREND_DTYPE)
+    
+    user_keys, user_codes = np.unique(user_ids.astype(str), return_inverse=True)
+    name_keys, name_codes = np.unique(canonical_names.astype(str), return_inverse=True)
+    
+    # Sort by user, name, then time (stable, like sorted() in compute_trend)
+    order = np.lexsort((days, name_codes, user_codes))
+    group_key = user_codes[order] * len(name_keys) + name_codes[order]
+    days = days[order]
+    values = values[order]
+    
+    starts = np.flatnonzero(np.r_[True, group_key[1:] != group_key[:-1]])
+    ends = np.r_[starts[1:], values.size]
+    counts = ends - starts
+    group_of = np.repeat(np.arange(starts.size), counts)
+    
+    # Days since each group's first measurement
+    time_days = days - days[starts][group_of]
+    
+    mean_value = np.add.reduceat(values, starts) / counts
+    mean_time = np.add.reduceat(time_days, starts) / counts
+    value_dev = values - mean_value[group_of]
+    time_dev = time_days - mean_time[group_of]
+    
+    numerator = np.add.reduceat(time_dev * value_dev, starts)
+    denominator = np.add.reduceat(time_dev ** 2, starts)
+    squares = np.add.reduceat(value_dev ** 2, starts)
+    
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.where(denominator == 0, 0.0, numerator / denominator)
+        std_dev = np.where(counts >= 2, np.sqrt(squares / (counts - 1)), 0.0)
+        cv = np.where(mean_value != 0, std_dev / mean_value, 0.0)
+        
+        first_value = values[starts]
+        value_change = values[ends - 1] - first_value
+        percentage_change = np.where(first_value != 0, value_change / first_value * 100, 0.0)
+    
+    confidence = np.maximum(0.0, 1.0 - cv) * np.minimum(1.0, counts / 5.0)
+    
+    trend_type = np.select(
+        [np.abs(percentage_change) < 5.0, slope > 0, slope < 0],
+        [1, 2, 3],
+        default=1
+    ).astype(np.int8)
+    
+    sufficient = counts >= 2
+    result = np.empty(starts.size, dtype=TREND_DTYPE)
+    result["user_id"] = user_keys[user_codes[order][starts]]
+    result["canonical_name"] = name_keys[name_codes[order][starts]]
+    result["data_point_count"] = counts
+    result["trend_type"] = np.where(sufficient, trend_type, 0)
+    result["confidence_score"] = np.where(sufficient, confidence, 0.0)
+    result["slope"] = np.where(sufficient, slope, np.nan)
+    result["coefficient_of_variation"] = np.where(sufficient, cv, np.nan)
+    result["value_change"] = np.where(sufficient, value_change, np.nan)
+    result["percentage_change"] = np.where(sufficient, percentage_change, np.nan)
+    result["average_value"] = np.where(sufficient, mean_value, np.nan)
+    result["time_span_days"] = np.where(sufficient, time_days[ends - 1], np.nan)
+    return result
+
+
+def trend_records(result: np.ndarray) -> List[Dict[str, Any]]:
+    """
+    Convert a columnar result to compute_trend-style dicts (TrendResult schema)
+    
+    Args:
+        result: Output of compute_trends_columnar
+    
+    Returns:
+        List of dicts with the compute_trend keys (None for missing statistics)
+    """
+    records = []
+    for row in result:
+        sufficient = row["trend_type"] != 0
+        records.append({
+            "trend_type": TREND_TYPE_CODES[row["trend_type"]],
+            "confidence_score": float(row["confidence_score"]),
+            "data_point_count": int(row["data_point_count"]),
+            "value_change": float(row["value_change"]) if sufficient else None,
+            "percentage_change": float(row["percentage_change"]) if sufficient else None,
+            "average_value": float(row["average_value"]) if sufficient else None,
+            "canonical_name": row["canonical_name"],
+            "user_id": row["user_id"],
+            "time_span_days": float(row["time_span_days"]) if sufficient else None
+        })
+    return records
+
+
+def trends_to_frame(result: np.ndarray):
+    """
+    Convert a columnar result to a pandas DataFrame with readable trend labels (requires pandas)
+    
+    Args:
+        result: Output of compute_trends_columnar
+    
+    Returns:
+        DataFrame with one row per group; trend_type as a categorical of labels
+    """
+    import pandas as pd
+    
+    frame = pd.DataFrame({name: result[name] for name in TREND_DTYPE.names})
+    frame["trend_type"] = pd.Categorical.from_codes(result["trend_type"], TREND_TYPE_CODES)
+    return frame
+
+
 if __name__ == "__main__":
     # Example usage
     print("=" * 80)
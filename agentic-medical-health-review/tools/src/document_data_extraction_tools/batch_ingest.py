@@ -0,0 +1,577 @@
+"""
+Batch Lab Report Ingestion
+
+Backfills many lab reports at once: OCR pages are spread across the
+ParallelOCRExecutor process pool, structured extraction runs as concurrent
+async LLM calls over one shared client, and each batch is written with
+multi-row INSERTs into medical_reports and health_parameters before
+normalize_batch() fills normalized_parameters. OCR of the next batch runs
+while the current batch is being extracted and stored.
+
+Progress is appended to a checkpoint file after every batch, so an
+interrupted run resumes where it stopped: finished documents are skipped,
+documents that were stored but not normalized are only normalized, and
+documents whose trend update failed only have their trends replayed.
+Resuming also holds up when the run stopped between a commit and its
+checkpoint line: reports already stored for the same user and file are not
+inserted again, and reports are marked in report_trend_updates in the same
+transaction as their trend update, so no values are added twice.
+
+Usage (from agentic-medical-health-review/):
+    python -m tools.src.document_data_extraction_tools.batch_ingest --dir reports/ --user-id <uuid>
+    python -m tools.src.document_data_extraction_tools.batch_ingest --dir reports/   # reports/<user_id>/*.pdf
+    python -m tools.src.document_data_extraction_tools.batch_ingest --manifest backfill.csv
+
+A manifest is a CSV file with a header, or a JSON Lines file, with
+file_path, user_id and optionally report_date (ISO format) per document.
+Relative paths are resolved against the manifest's directory.
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from tools.src.document_data_extraction_tools.lab_report_parser.file_validator import FileValidator
+
+
+SUPPORTED_EXTENSIONS = FileValidator.SUPPORTED_PDF_EXTENSIONS | FileValidator.SUPPORTED_IMAGE_EXTENSIONS
+
+
+@dataclass
+class BatchItem:
+    """One document to ingest"""
+    file_path: str
+    user_id: str
+    report_date: Optional[datetime] = None
+
+    @property
+    def key(self) -> str:
+        """Checkpoint key (the same file may be ingested for several users)"""
+        return f"{self.user_id}:{os.path.abspath(self.file_path)}"
+
+    def resolved_report_date(self) -> datetime:
+        """Report date, defaulting to the file's modification time"""
+        if self.report_date is not None:
+            return self.report_date
+        return datetime.fromtimestamp(os.path.getmtime(self.file_path))
+
+
+def scan_directory(directory: str, user_id: Optional[str] = None) -> List[BatchItem]:
+    """
+    Find supported reports under a directory
+
+    Args:
+        directory: Root directory (searched recursively)
+        user_id: Owner of every report; if omitted, each top-level
+            sub-directory name is taken as the user ID of the files below it
+
+    Returns:
+        BatchItems sorted by path
+    """
+    items = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() not in SUPPORTED_EXTENSIONS:
+                continue
+            path = os.path.join(root, name)
+            owner = user_id
+            if owner is None:
+                parts = os.path.relpath(path, directory).split(os.sep)
+                if len(parts) < 2:
+                    continue  # Loose file with no user directory
+                owner = parts[0]
+            items.append(BatchItem(path, owner))
+    return items
+
+
+def load_manifest(path: str) -> List[BatchItem]:
+    """
+    Read a CSV or JSON Lines manifest
+
+    Args:
+        path: Manifest path (.jsonl/.json for JSON Lines, anything else is CSV)
+
+    Returns:
+        BatchItems in manifest order
+
+    Raises:
+        ValueError: If an entry lacks file_path or user_id
+    """
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path, "r", newline="") as f:
+        if path.endswith((".jsonl", ".json")):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+
+    items = []
+    for number, row in enumerate(rows, 1):
+        if not row.get("file_path") or not row.get("user_id"):
+            raise ValueError(f"Manifest entry {number} needs file_path and user_id")
+        report_date = row.get("report_date")
+        items.append(BatchItem(
+            file_path=os.path.join(base, row["file_path"]),
+            user_id=str(row["user_id"]),
+            report_date=datetime.fromisoformat(report_date) if report_date else None
+        ))
+    return items
+
+
+class IngestionCheckpoint:
+    """
+    Append-only JSON Lines record of per-document progress
+
+    Statuses: "stored" (report and parameters committed), "normalized"
+    (normalize_batch() committed, trend update pending), "done" (trends
+    applied) and "failed". The last line for a document wins.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Checkpoint file (created on the first record)
+        """
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Torn last line from an interrupted write
+                    self.entries[entry["key"]] = entry
+
+    def status(self, key: str) -> Optional[str]:
+        entry = self.entries.get(key)
+        return entry["status"] if entry else None
+
+    def record(self, entries: Sequence[Dict[str, Any]]):
+        """
+        Durably append entries (dicts with key, status and details)
+
+        Args:
+            entries: Entries written together, then fsynced once
+        """
+        if not entries:
+            return
+        with open(self.path, "a") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, default=str) + "\n")
+                self.entries[entry["key"]] = entry
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class ThroughputStats:
+    """Running totals and rates for a batch run"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.docs = 0
+        self.pages = 0
+        self.tests = 0
+        self.parameters = 0
+        self.failed = 0
+        self.skipped = 0
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def rates(self) -> Dict[str, float]:
+        """Documents, pages and tests per second since the start"""
+        elapsed = max(self.elapsed, 1e-9)
+        return {
+            "docs_per_s": self.docs / elapsed,
+            "pages_per_s": self.pages / elapsed,
+            "tests_per_s": self.tests / elapsed
+        }
+
+    def format(self) -> str:
+        rates = self.rates()
+        return (
+            f"{self.docs} docs, {self.pages} pages, {self.tests} tests, {self.failed} failed "
+            f"in {self.elapsed:.1f}s | {rates['docs_per_s']:.2f} docs/s, "
+            f"{rates['pages_per_s']:.2f} pages/s, {rates['tests_per_s']:.2f} tests/s"
+        )
+
+
+class BatchIngestor:
+    """Batched OCR -> LLM extraction -> bulk storage and normalization"""
+
+    def __init__(
+        self,
+        checkpoint: Optional[IngestionCheckpoint] = None,
+        batch_size: int = 16,
+        model_name: str = "gpt-4o-mini",
+        ocr_workers: Optional[int] = None,
+        llm_concurrency: int = 8,
+        store: bool = True,
+        update_trends: bool = True,
+        retry_failed: bool = True,
+        report: Callable[[str], None] = print
+    ):
+        """
+        Args:
+            checkpoint: Progress record to resume from and append to
+            batch_size: Documents per batch (OCR, LLM and database round)
+            model_name: LLM used for structured extraction
+            ocr_workers: OCR processes (default: OCR_WORKERS, then CPU count)
+            llm_concurrency: Concurrent LLM requests
+            store: Write to the database (False: dry run, nothing recorded)
+            update_trends: Add normalized values to the trend accumulators
+            retry_failed: Retry documents the checkpoint marks as failed
+            report: Receives one progress line per batch
+        """
+        self.checkpoint = checkpoint
+        self.batch_size = max(1, batch_size)
+        self.model_name = model_name
+        self.ocr_workers = ocr_workers
+        self.llm_concurrency = llm_concurrency
+        self.store = store
+        self.update_trends = update_trends
+        self.retry_failed = retry_failed
+        self.report = report
+        self._ocr_executor = None
+
+    def run(self, items: Sequence[BatchItem]) -> ThroughputStats:
+        """Ingest documents (blocking); see arun()."""
+        return asyncio.run(self.arun(items))
+
+    async def arun(self, items: Sequence[BatchItem]) -> ThroughputStats:
+        """
+        Ingest documents in batches, resuming from the checkpoint
+
+        Args:
+            items: Documents to ingest
+
+        Returns:
+            ThroughputStats of this run
+        """
+        stats = ThroughputStats()
+        todo, stored, normalized = [], [], []
+        for item in items:
+            status = self.checkpoint.status(item.key) if self.checkpoint else None
+            if status == "done" or (status == "failed" and not self.retry_failed):
+                stats.skipped += 1
+            elif status == "stored":
+                stored.append(item)
+            elif status == "normalized":
+                normalized.append(item)
+            else:
+                todo.append(item)
+
+        if stored and self.store:
+            await asyncio.to_thread(self._resume_stored, stored)
+            self.report(f"Normalized {len(stored)} previously stored documents")
+        if normalized and self.store:
+            await asyncio.to_thread(self._resume_normalized, normalized)
+            self.report(f"Replayed trend updates of {len(normalized)} previously normalized documents")
+        if stats.skipped:
+            self.report(f"Skipping {stats.skipped} documents already in the checkpoint")
+
+        batches = [todo[i:i + self.batch_size] for i in range(0, len(todo), self.batch_size)]
+        if not batches:
+            return stats
+
+        # OCR of the next batch overlaps extraction and storage of the current one
+        next_ocr = asyncio.create_task(asyncio.to_thread(self._ocr_batch, batches[0]))
+        for number, batch in enumerate(batches, 1):
+            documents = await next_ocr
+            if number < len(batches):
+                next_ocr = asyncio.create_task(asyncio.to_thread(self._ocr_batch, batches[number]))
+
+            await self._extract_batch(documents)
+            await asyncio.to_thread(self._store_batch, documents)
+
+            for document in documents:
+                if document["error"]:
+                    stats.failed += 1
+                    continue
+                stats.docs += 1
+                stats.pages += len(document["pages"])
+                stats.tests += len(document["tests"])
+                stats.parameters += len(document.get("parameters", []))
+            self.report(f"[batch {number}/{len(batches)}] {stats.format()}")
+        return stats
+
+    def close(self):
+        """Shut down the OCR worker processes"""
+        if self._ocr_executor is not None:
+            self._ocr_executor.close()
+            self._ocr_executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _get_ocr_executor(self):
+        if self._ocr_executor is None:
+            from tools.src.document_data_extraction_tools.lab_report_parser.parallel_ocr import ParallelOCRExecutor
+            self._ocr_executor = ParallelOCRExecutor(max_workers=self.ocr_workers)
+        return self._ocr_executor
+
+    def _ocr_batch(self, batch: Sequence[BatchItem]) -> List[Dict[str, Any]]:
+        """
+        OCR a batch with all of its pages in one pool round
+
+        Returns:
+            Document dicts (item, pages, text, tests, error); unreadable
+            files get an error instead of failing the batch
+        """
+        from tools.src.document_data_extraction_tools.lab_report_parser.lab_report_parser import LabReportParser
+
+        executor = self._get_ocr_executor()
+        documents = [{"item": item, "pages": [], "text": "", "tests": [], "error": None} for item in batch]
+        plans = []
+        for document in documents:
+            try:
+                plans.append((document, executor.plan_document(document["item"].file_path)))
+            except Exception as e:
+                # Missing, unsupported, corrupt or encrypted (pdfinfo fails): this document only
+                document["error"] = str(e) or type(e).__name__
+
+        try:
+            pages = executor.extract_planned([plan for _, plan in plans])
+        except Exception as e:
+            for document, _ in plans:
+                document["error"] = f"OCR failed: {e}"
+            return documents
+
+        for (document, plan), document_pages in zip(plans, pages):
+            document["pages"] = document_pages
+            document["text"] = LabReportParser.pages_to_text(document_pages, plan["file_type"])
+        return documents
+
+    async def _extract_batch(self, documents: List[Dict[str, Any]]):
+        """Extract the tests of every OCR'd document with concurrent LLM calls."""
+        from tools.src.document_data_extraction_tools.lab_report_parser.llm_structured_extractor import (
+            get_default_extractor
+        )
+
+        pending = [document for document in documents if not document["error"]]
+        if not pending:
+            return
+        results = await get_default_extractor(self.model_name).aextract_batch(
+            [document["text"] for document in pending],
+            [document["item"].file_path for document in pending],
+            max_concurrency=self.llm_concurrency
+        )
+        for document, result in zip(pending, results):
+            if result["metadata"].get("extraction_status") == "error":
+                document["error"] = result["metadata"].get("error_message", "extraction failed")
+            else:
+                document["tests"] = result["tests"]
+
+    def _store_batch(self, documents: List[Dict[str, Any]]):
+        """Store, normalize and checkpoint a batch."""
+        from tools.src.document_data_extraction_tools.report_store import build_parameters
+
+        for document in documents:
+            if not document["error"]:
+                item = document["item"]
+                document["parameters"], document["warnings"] = build_parameters(item.user_id, document["tests"])
+                document["report_date"] = item.resolved_report_date()
+        if not self.store:
+            return
+
+        self._store_reports([document for document in documents if not document["error"]])
+        stored = [document for document in documents if document.get("report_id")]
+        if self.checkpoint:
+            self.checkpoint.record([
+                {"key": document["item"].key, "status": "stored", "report_id": document["report_id"]}
+                for document in stored
+            ] + [
+                {"key": document["item"].key, "status": "failed", "error": document["error"]}
+                for document in documents if document["error"]
+            ])
+
+        parameters = [parameter for document in stored for parameter in document["parameters"]]
+        self._normalize_stored([(document["item"], document["report_id"]) for document in stored], parameters)
+
+    def _store_reports(self, documents: List[Dict[str, Any]]):
+        """
+        Insert the batch in one transaction
+
+        Reports already stored for the same user and file (absolute path)
+        are reused, and their still-pending parameters replace the
+        extracted ones. If the batch is rejected (e.g. one report
+        references an unknown user), documents are retried one per
+        transaction so only the bad ones fail.
+        """
+        from models.database_connection import DatabaseConnection
+        from tools.src.document_data_extraction_tools.report_store import store_new_reports
+
+        reports = [
+            {
+                "user_id": document["item"].user_id,
+                "file_path": os.path.abspath(document["item"].file_path),
+                "report_date": document["report_date"],
+                "parameters": document["parameters"]
+            }
+            for document in documents
+        ]
+        try:
+            with DatabaseConnection() as db:
+                stored = store_new_reports(db, reports)
+        except Exception:
+            stored = []
+            for document, report in zip(documents, reports):
+                try:
+                    with DatabaseConnection() as db:
+                        stored.extend(store_new_reports(db, [report]))
+                except Exception as e:
+                    document["error"] = f"Store failed: {e}"
+                    stored.append((None, report["parameters"]))
+        for document, (report_id, parameters) in zip(documents, stored):
+            document["report_id"], document["parameters"] = report_id, parameters
+
+    def _normalize_stored(self, stored: Sequence[Tuple[BatchItem, str]], parameters: List[Dict[str, Any]]):
+        """
+        Normalize the parameters of stored documents, then update their trends
+
+        Documents are checkpointed "normalized" once normalize_batch() has
+        committed and "done" once their trends are applied, so a failed
+        trend update is replayed on the next run instead of being lost.
+
+        Args:
+            stored: (item, report_id) pairs
+            parameters: Their pending parameters
+        """
+        if not self._normalize(parameters):
+            return
+        self._record_status(stored, "normalized")
+        if self._apply_trends([report_id for _, report_id in stored]):
+            self._record_status(stored, "done")
+
+    def _normalize(self, parameters: List[Dict[str, Any]]) -> bool:
+        """
+        Normalize stored parameters as one batch
+
+        Returns:
+            bool: False if the batch was rolled back (documents stay
+            "stored" and are normalized again on the next run)
+        """
+        from tools.src.document_data_extraction_tools.normalize_lab_data import normalize_batch
+
+        if not parameters:
+            return True
+        batch = normalize_batch(parameters)
+        if batch["rolled_back"]:
+            self.report(f"Normalization failed: {batch['error']}")
+            return False
+        return True
+
+    def _apply_trends(self, report_ids: List[str]) -> bool:
+        """
+        Add the normalized values of reports to the trend accumulators
+
+        Values are read back from normalized_parameters, and the reports are
+        claimed in report_trend_updates in the same transaction, so reports
+        whose update already committed are not added again.
+
+        Args:
+            report_ids: Normalized reports
+
+        Returns:
+            bool: False if the update failed and was rolled back
+        """
+        from models.database_connection import DatabaseConnection
+        from tools.src.document_data_extraction_tools.report_store import (
+            claim_trend_updates,
+            normalized_parameters,
+            update_trends
+        )
+
+        if not self.update_trends or not report_ids:
+            return True
+        try:
+            with DatabaseConnection() as db:
+                normalized = normalized_parameters(db, claim_trend_updates(db, report_ids))
+                timestamps = {parameter["original_parameter_id"]: parameter["timestamp"] for parameter in normalized}
+                update_trends(db, normalized, timestamps)
+        except Exception as e:
+            self.report(f"Trend update failed, replayed on the next run: {e}")
+            return False
+        return True
+
+    def _record_status(self, stored: Sequence[Tuple[BatchItem, str]], status: str):
+        if self.checkpoint:
+            self.checkpoint.record([
+                {"key": item.key, "status": status, "report_id": report_id}
+                for item, report_id in stored
+            ])
+
+    def _resume_stored(self, items: Sequence[BatchItem]):
+        """
+        Finish documents stored by an earlier run
+
+        Parameters still pending are normalized; documents with none left
+        (normalization committed before the checkpoint line was written)
+        go on to the trend update.
+        """
+        from models.database_connection import DatabaseConnection
+        from tools.src.document_data_extraction_tools.report_store import pending_parameters
+
+        stored = [(item, self.checkpoint.entries[item.key]["report_id"]) for item in items]
+        with DatabaseConnection() as db:
+            parameters = pending_parameters(db, [report_id for _, report_id in stored])
+        self._normalize_stored(stored, parameters)
+
+    def _resume_normalized(self, items: Sequence[BatchItem]):
+        """Replay the trend update of documents normalized by an earlier run."""
+        stored = [(item, self.checkpoint.entries[item.key]["report_id"]) for item in items]
+        if self._apply_trends([report_id for _, report_id in stored]):
+            self._record_status(stored, "done")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Batch Lab Report Ingestion")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--dir", help="Directory of reports (<dir>/<user_id>/... unless --user-id is given)")
+    source.add_argument("--manifest", help="CSV or JSON Lines manifest (file_path, user_id, report_date)")
+    parser.add_argument("--user-id", help="Owner of every report found with --dir")
+    parser.add_argument("--checkpoint", default="batch_ingest.checkpoint.jsonl",
+                        help="Progress file used to resume (default: %(default)s)")
+    parser.add_argument("--batch-size", type=int, default=16, help="Documents per batch (default: %(default)s)")
+    parser.add_argument("--ocr-workers", type=int, default=None, help="OCR processes (default: OCR_WORKERS or CPU count)")
+    parser.add_argument("--llm-concurrency", type=int, default=8, help="Concurrent LLM requests (default: %(default)s)")
+    parser.add_argument("--model", default=os.getenv("LLM_MODEL", "gpt-4o-mini"), help="LLM model (default: %(default)s)")
+    parser.add_argument("--no-trends", action="store_true", help="Do not update trend accumulators")
+    parser.add_argument("--skip-failed", action="store_true", help="Do not retry documents that failed before")
+    parser.add_argument("--dry-run", action="store_true", help="OCR and extract only; write nothing")
+    args = parser.parse_args(argv)
+
+    items = load_manifest(args.manifest) if args.manifest else scan_directory(args.dir, args.user_id)
+    print(f"Found {len(items)} documents")
+    checkpoint = None if args.dry_run else IngestionCheckpoint(args.checkpoint)
+
+    with BatchIngestor(
+        checkpoint=checkpoint,
+        batch_size=args.batch_size,
+        model_name=args.model,
+        ocr_workers=args.ocr_workers,
+        llm_concurrency=args.llm_concurrency,
+        store=not args.dry_run,
+        update_trends=not args.no_trends,
+        retry_failed=not args.skip_failed
+    ) as ingestor:
+        stats = ingestor.run(items)
+
+    print(f"Done: {stats.format()}, {stats.parameters} parameters stored, {stats.skipped} skipped")
+    return 1 if stats.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
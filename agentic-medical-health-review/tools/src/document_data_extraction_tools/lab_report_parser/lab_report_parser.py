@@ -2,17 +2,37 @@
 Lab Report Parser
 
 Provides OCR text extraction from medical lab reports in PDF or image format.
+
+Progress is reported through the standard logging module (configured by
+app.logging_config in the application) as structured events: the message
+is fixed and the numbers travel in `extra` (page, width, height, regions,
+chars, ms). Per-page and per-image events are DEBUG and are built only
+when DEBUG is enabled.
+
+Stage latencies (text_layer, pdf_convert, ocr_inference, region_sort) and
+page / OCR cache counters are recorded through pipeline_metrics.
 """
 
+import logging
 import os
+import time
 import numpy as np
 from PIL import Image
 
-# Disable PIR to avoid PaddlePaddle compatibility issues
+# Disable PIR to avoid PaddlePaddle compatibility issues (read when paddle is imported)
 os.environ['PADDLE_PIR_ENABLED'] = '0'
 
-from paddleocr import PaddleOCR
 from tools.src.document_data_extraction_tools.lab_report_parser.file_validator import FileValidator
+from tools.src.document_data_extraction_tools.lab_report_parser.ocr_cache import OCRCache
+from tools.src.document_data_extraction_tools.lab_report_parser.pdf_text_layer import PDFTextLayerExtractor
+from tools.src.document_data_extraction_tools.pipeline_metrics import OCR_CACHE_TOTAL, PAGES_TOTAL, increment, span
+
+logger = logging.getLogger(__name__)
+
+
+def _elapsed_ms(started):
+    """Milliseconds since a time.perf_counter() reading."""
+    return round((time.perf_counter() - started) * 1000, 1)
 
 
 class LabReportParser:
@@ -20,10 +40,19 @@ class LabReportParser:
     
     _instance = None
     
+    # Rasterization settings
+    PDF_DPI = 300  # High DPI for better text recognition
+    PAGE_WINDOW_SIZE = 1  # Pages held in memory at once while streaming a PDF
+    
+    # OCR engine settings
+    OCR_LANG = 'en'
+    
     def __init__(self):
         """Private constructor - use get_instance() instead."""
         self._ocr = None
         self._initialized = False
+        self.cache = OCRCache.from_env()
+        self.text_layer = PDFTextLayerExtractor.from_env()
     
     @classmethod
     def get_instance(cls):
@@ -43,20 +72,48 @@ class LabReportParser:
         Only initializes once per instance.
         """
         if not self._initialized:
+            # Imported here so the parser (and the parallel executor that
+            # imports it) loads without PaddleOCR; only OCR itself needs it
+            from paddleocr import PaddleOCR
+            
             # Use absolute minimal configuration - only lang parameter
-            self._ocr = PaddleOCR(lang='en')
+            self._ocr = PaddleOCR(lang=self.OCR_LANG)
             self._initialized = True
     
     def extract_text_from_file(self, file_path):
         """
         Extract text from a PDF or image file.
         
+        Repeat uploads of the same file are served from the OCR cache
+        when one is configured (see OCRCache.from_env()).
+        
         Args:
             file_path: Path to PDF or image file (str or Path)
             
         Returns:
             str: Extracted text from all pages/images
             
+        Raises:
+            ValueError: If file format is not supported
+            FileNotFoundError: If file doesn't exist
+        """
+        file_path_str = str(file_path)
+        file_type = FileValidator.get_file_type(file_path_str)
+        pages = self.extract_pages_from_file(file_path_str)
+        return self.pages_to_text(pages, file_type)
+    
+    def extract_pages_from_file(self, file_path):
+        """
+        Extract per-page text and region layout from a PDF or image file.
+        
+        Args:
+            file_path: Path to PDF or image file (str or Path)
+            
+        Returns:
+            list: One dict per page in page order:
+                {"page_num": int, "text": str, "regions": [(y_pos, x_pos, text), ...],
+                 "source": "text_layer" | "ocr"}
+            
         Raises:
             ValueError: If file format is not supported
             FileNotFoundError: If file doesn't exist
@@ -70,96 +127,352 @@ class LabReportParser:
         
         # Determine file type using FileValidator
         file_type = FileValidator.get_file_type(file_path_str)
+        if file_type not in ("pdf", "image"):
+            raise ValueError(f"Unsupported file format: {file_path_str}")
+        
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.get_cache_key(file_path_str)
+            pages = self.cache.get(cache_key)
+            increment(OCR_CACHE_TOTAL, result="miss" if pages is None else "hit")
+            if pages is not None:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("OCR cache hit", extra={"file": file_path_str, "pages": len(pages)})
+                return pages
         
         if file_type == "pdf":
-            return self._extract_from_pdf(file_path_str)
-        elif file_type == "image":
-            return self._extract_from_image(file_path_str)
+            pages = self._extract_from_pdf(file_path_str)
         else:
-            raise ValueError(f"Unsupported file format: {file_path_str}")
+            pages = self._extract_from_image(file_path_str)
+        
+        if cache_key is not None:
+            self.cache.put(cache_key, pages, settings=self.get_ocr_settings())
+        
+        return pages
+    
+    def get_ocr_settings(self):
+        """
+        OCR settings that affect output; part of the OCR cache key.
+        
+        Returns:
+            dict: {"dpi": int, "lang": str, "engine_version": str, "text_layer": bool}
+        """
+        try:
+            import paddleocr
+            engine_version = getattr(paddleocr, "__version__", "unknown")
+        except ImportError:
+            engine_version = "unknown"
+        return {
+            "dpi": self.PDF_DPI,
+            "lang": self.OCR_LANG,
+            "engine_version": engine_version,
+            "text_layer": self.text_layer is not None
+        }
+    
+    def get_cache_key(self, file_path):
+        """
+        Build the OCR cache key for a file under the current OCR settings.
+        
+        Args:
+            file_path: Path to PDF or image file
+            
+        Returns:
+            str: Cache key
+        """
+        settings = self.get_ocr_settings()
+        return OCRCache.make_key(
+            file_path, settings["dpi"], settings["lang"], settings["engine_version"],
+            extra_settings={"text_layer": settings["text_layer"]}
+        )
     
     def _extract_from_pdf(self, pdf_path):
         """
-        Extract text from all pages of a PDF.
+        Extract text and regions from all pages of a PDF.
+        
+        Pages with a usable embedded text layer are read directly; only
+        scanned or image-only pages are rasterized and OCR'd. OCR pages are
+        streamed through _iter_pdf_page_regions(), so only one page window
+        is held in memory at any time.
         
         Args:
             pdf_path: Path to PDF file
             
         Returns:
-            str: Extracted text from all pages
+            list: Page dicts (see extract_pages_from_file())
         """
+        started = time.perf_counter()
         try:
-            import pdf2image
-        except ImportError:
-            raise ImportError(
-                "pdf2image is required for PDF processing. "
-                "Install with: pip install pdf2image"
-            )
+            text_layer_pages = self.extract_text_layer(pdf_path)
+            page_count = self.get_pdf_page_count(pdf_path)
+            ocr_page_numbers = [
+                page_num for page_num in range(1, page_count + 1)
+                if page_num not in text_layer_pages
+            ]
+            
+            pages_by_num = {
+                page_num: self._make_page(page_num, regions, "text_layer")
+                for page_num, regions in text_layer_pages.items()
+            }
+            if ocr_page_numbers:
+                for page_num, regions in self._iter_pdf_page_regions(
+                    pdf_path, page_numbers=ocr_page_numbers, page_count=page_count
+                ):
+                    pages_by_num[page_num] = self._make_page(page_num, regions, "ocr")
+            
+            pages = [pages_by_num[page_num] for page_num in sorted(pages_by_num)]
+        except Exception:
+            logger.exception("PDF processing failed", extra={"file": str(pdf_path)})
+            raise
         
-        try:
-            # Convert PDF pages to images with higher DPI for better OCR
-            print(f"🔄 Converting PDF to images...")
-            print(f"   File: {pdf_path}")
+        total_chars = sum(len(page["text"]) for page in pages)
+        if total_chars == 0:
+            # Image-only pages without readable text, text too small or low
+            # quality, or an encrypted/protected PDF
+            logger.warning("No text extracted from PDF", extra={"file": str(pdf_path), "pages": len(pages)})
+        elif logger.isEnabledFor(logging.INFO):
+            logger.info("PDF extracted", extra={
+                "file": str(pdf_path), "pages": len(pages), "text_layer_pages": len(text_layer_pages),
+                "ocr_pages": len(ocr_page_numbers), "chars": total_chars, "ms": _elapsed_ms(started)
+            })
+        return pages
+    
+    def extract_text_layer(self, pdf_path):
+        """
+        Read regions from pages that have a usable embedded text layer.
+        
+        Args:
+            pdf_path: Path to PDF file
             
-            images = pdf2image.convert_from_path(
-                pdf_path, 
-                dpi=300,  # High DPI for better text recognition
-                fmt='png'  # PNG format for better quality
-            )
+        Returns:
+            dict: page_num -> (y_pos, x_pos, text) regions, scaled to PDF_DPI;
+                empty if the fast path is disabled
+        """
+        if self.text_layer is None:
+            return {}
+        with span("text_layer"):
+            return self.text_layer.extract(pdf_path, dpi=self.PDF_DPI)
+    
+    def _make_page(self, page_num, regions, source):
+        """Build a page dict from regions (see extract_pages_from_file())."""
+        text = self._organize_text_regions_simple(regions)
+        increment(PAGES_TOTAL, source=source)
+        return {"page_num": page_num, "text": text, "regions": regions, "source": source}
+    
+    def iter_pdf_pages(self, pdf_path, window_size=None):
+        """
+        Stream OCR text from a PDF, one page window at a time.
+        
+        Only `window_size` rasterized pages are alive at once, which bounds
+        memory to roughly window_size * (page bitmap at PDF_DPI) regardless
+        of how many pages the document has.
+        
+        Args:
+            pdf_path: Path to PDF file
+            window_size: Pages rasterized per pdf2image call
+                (default: PAGE_WINDOW_SIZE)
             
-            print(f"✓ Converted {len(images)} page(s)")
+        Yields:
+            tuple: (page_num, text) for each page as soon as its OCR finishes.
+                page_num is 1-based.
+        """
+        for page_num, regions in self._iter_pdf_page_regions(pdf_path, window_size):
+            yield page_num, self._organize_text_regions_simple(regions)
+    
+    def _iter_pdf_page_regions(self, pdf_path, window_size=None, page_numbers=None, page_count=None):
+        """
+        Stream OCR text regions from a PDF, one page window at a time.
+        
+        Args:
+            pdf_path: Path to PDF file
+            window_size: Pages rasterized per pdf2image call
+                (default: PAGE_WINDOW_SIZE)
+            page_numbers: Optional sorted 1-based pages to OCR (default: all)
+            page_count: Page count if the caller already has it
+                (default: read with pdfinfo)
             
-            if not images:
-                print("⚠ Warning: No pages found in PDF")
-                return ""
+        Yields:
+            tuple: (page_num, regions) where regions is a list of
+                (y_pos, x_pos, text) tuples
+        """
+        pdf2image = self._import_pdf2image()
+        window_size = max(1, int(window_size or self.PAGE_WINDOW_SIZE))
+        
+        if page_count is None:
+            page_count = self.get_pdf_page_count(pdf_path)
+        if page_numbers is None:
+            page_numbers = list(range(1, page_count + 1))
+        
+        if page_count == 0:
+            logger.warning("No pages found in PDF", extra={"file": str(pdf_path)})
+            return
+        
+        debug = logger.isEnabledFor(logging.DEBUG)
+        
+        for first_page, last_page in self._page_windows(page_numbers, window_size):
+            with span("pdf_convert"):
+                images = pdf2image.convert_from_path(
+                    str(pdf_path),
+                    dpi=self.PDF_DPI,  # High DPI for better text recognition
+                    fmt='png',  # PNG format for better quality
+                    first_page=first_page,
+                    last_page=last_page
+                )
             
-            # Extract text from each page
-            all_text = []
-            for page_num, image in enumerate(images, 1):
-                print(f"📄 Processing page {page_num}/{len(images)}...")
-                print(f"   Image size: {image.size[0]}x{image.size[1]} pixels")
-                
-                # Extract text from this page
-                text = self.extract_text(image)
-                
-                print(f"   Extracted: {len(text)} characters")
-                
-                if text.strip():
-                    all_text.append(f"--- Page {page_num} ---\n{text}")
-                else:
-                    print(f"   ⚠ No text found on page {page_num}")
+            try:
+                for offset, image in enumerate(images):
+                    page_num = first_page + offset
+                    if debug:
+                        started = time.perf_counter()
+                        regions = self.extract_text_regions(image)
+                        logger.debug("OCR page", extra={
+                            "page": page_num, "page_count": page_count,
+                            "width": image.size[0], "height": image.size[1],
+                            "regions": len(regions), "chars": sum(len(region[2]) for region in regions),
+                            "ms": _elapsed_ms(started)
+                        })
+                    else:
+                        regions = self.extract_text_regions(image)
+                    
+                    yield page_num, regions
+            finally:
+                # Release page bitmaps before rasterizing the next window
+                for image in images:
+                    image.close()
+                del images
+    
+    @staticmethod
+    def _page_windows(page_numbers, window_size):
+        """
+        Group sorted page numbers into contiguous (first, last) windows.
+        
+        Args:
+            page_numbers: Sorted 1-based page numbers
+            window_size: Maximum pages per window
             
-            result = "\n\n".join(all_text)
-            print(f"✓ Total extracted: {len(result)} characters from {len(all_text)} page(s)")
+        Returns:
+            list: (first_page, last_page) tuples, inclusive
+        """
+        windows = []
+        for page_num in page_numbers:
+            if windows:
+                first_page, last_page = windows[-1]
+                if page_num == last_page + 1 and page_num - first_page < window_size:
+                    windows[-1] = (first_page, page_num)
+                    continue
+            windows.append((page_num, page_num))
+        return windows
+    
+    def extract_pdf_page_regions(self, pdf_path, page_num):
+        """
+        Rasterize and OCR a single PDF page.
+        
+        Used by ParallelOCRExecutor workers so that each process rasterizes
+        its own page instead of receiving a bitmap over IPC.
+        
+        Args:
+            pdf_path: Path to PDF file
+            page_num: 1-based page number
             
-            if not result.strip():
-                print("\n⚠ WARNING: No text was extracted from any page")
-                print("   Possible reasons:")
-                print("   - PDF contains only images without text")
-                print("   - Text is too small or low quality")
-                print("   - PDF is encrypted or protected")
+        Returns:
+            list: (y_pos, x_pos, text) regions for the page
+        """
+        pdf2image = self._import_pdf2image()
+        with span("pdf_convert"):
+            images = pdf2image.convert_from_path(
+                str(pdf_path),
+                dpi=self.PDF_DPI,
+                fmt='png',
+                first_page=page_num,
+                last_page=page_num
+            )
+        try:
+            return self.extract_text_regions(images[0]) if images else []
+        finally:
+            for image in images:
+                image.close()
+    
+    @staticmethod
+    def join_page_texts(pages):
+        """
+        Join per-page OCR text into the document format used by the parser.
+        
+        Args:
+            pages: Iterable of (page_num, text) tuples in page order
             
-            return result
+        Returns:
+            str: Text with "--- Page N ---" markers; empty pages are skipped
+        """
+        all_text = []
+        for page_num, text in pages:
+            if text.strip():
+                all_text.append(f"--- Page {page_num} ---\n{text}")
+            elif logger.isEnabledFor(logging.DEBUG):
+                logger.debug("No text found on page", extra={"page": page_num})
+        return "\n\n".join(all_text)
+    
+    @classmethod
+    def pages_to_text(cls, pages, file_type):
+        """
+        Render page dicts as the text returned by extract_text_from_file().
+        
+        Args:
+            pages: Page dicts (see extract_pages_from_file())
+            file_type: "pdf" or "image"
             
-        except Exception as e:
-            print(f"\n❌ Error during PDF processing: {e}")
-            print(f"   Error type: {type(e).__name__}")
-            import traceback
-            traceback.print_exc()
-            raise
+        Returns:
+            str: PDF text with page markers, or the plain text of an image
+        """
+        if file_type == "pdf":
+            return cls.join_page_texts((page["page_num"], page["text"]) for page in pages)
+        return pages[0]["text"] if pages else ""
+    
+    def get_pdf_page_count(self, pdf_path):
+        """
+        Get the number of pages in a PDF without rasterizing it.
+        
+        Args:
+            pdf_path: Path to PDF file
+            
+        Returns:
+            int: Number of pages
+        """
+        pdf2image = self._import_pdf2image()
+        info = pdf2image.pdfinfo_from_path(str(pdf_path))
+        return int(info.get("Pages", 0))
+    
+    @staticmethod
+    def _import_pdf2image():
+        """Import pdf2image, raising a helpful error if it is missing."""
+        try:
+            import pdf2image
+        except ImportError:
+            raise ImportError(
+                "pdf2image is required for PDF processing. "
+                "Install with: pip install pdf2image"
+            )
+        return pdf2image
     
     def _extract_from_image(self, image_path):
         """
-        Extract text from an image file.
+        Extract text and regions from an image file.
         
         Args:
             image_path: Path to image file
             
         Returns:
-            str: Extracted text
+            list: A single page dict (see extract_pages_from_file())
         """
-        image = Image.open(image_path)
-        return self.extract_text(image)
+        started = time.perf_counter()
+        with Image.open(image_path) as image:
+            regions = self.extract_text_regions(image)
+            size = image.size
+        page = self._make_page(1, regions, "ocr")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Image extracted", extra={
+                "file": str(image_path), "width": size[0], "height": size[1],
+                "regions": len(regions), "chars": len(page["text"]), "ms": _elapsed_ms(started)
+            })
+        return [page]
     
     def extract_text(self, image):
         """
@@ -171,36 +484,42 @@ class LabReportParser:
         Returns:
             str: Extracted text with preserved spatial ordering
         """
+        return self._organize_text_regions_simple(self.extract_text_regions(image))
+    
+    def extract_text_regions(self, image):
+        """
+        Run OCR on a single image and return positioned text regions.
+        
+        Args:
+            image: PIL.Image object or numpy array
+            
+        Returns:
+            list: (y_pos, x_pos, text) tuples, one per detected text region
+        """
         # Ensure engine is initialized
         if not self._initialized:
-            print("   Initializing OCR engine (first time only)...")
+            started = time.perf_counter()
             self._initialize_engine()
-            print("   ✓ OCR engine ready")
+            logger.info("OCR engine ready", extra={"lang": self.OCR_LANG, "ms": _elapsed_ms(started)})
         
         # Convert PIL Image to numpy array if needed
         if isinstance(image, Image.Image):
             image = np.array(image)
         
         # Run OCR - remove cls parameter as it's not supported in newer versions
-        print(f"   Running OCR on image shape: {image.shape}")
-        results = self._ocr.ocr(image)
+        with span("ocr_inference"):
+            results = self._ocr.ocr(image)
         
-        # Handle empty results
+        # Handle empty results (no result, or no text regions in it)
         if not results or not results[0]:
-            print("   ⚠ OCR returned no results")
-            return ""
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("OCR found no text regions", extra={"height": image.shape[0], "width": image.shape[1]})
+            return []
         
         # Get the first result (for single image)
         result = results[0]
         
-        # Check if we have text regions
-        if not result:
-            print("   ⚠ No text regions found")
-            return ""
-        
-        print(f"   Found {len(result)} text regions")
-        
-        # Extract and organize text regions
+        # Extract text regions with their positions
         # Format: [[bbox, (text, confidence)], ...]
         text_regions = []
         for item in result:
@@ -215,9 +534,9 @@ class LabReportParser:
                 x_coords = [bbox[0][0], bbox[1][0], bbox[2][0], bbox[3][0]]
                 x_pos = sum(x_coords) / len(x_coords)
                 
-                text_regions.append((y_pos, x_pos, text))
+                text_regions.append((float(y_pos), float(x_pos), text))
         
-        return self._organize_text_regions_simple(text_regions)
+        return text_regions
     
     def _organize_text_regions(self, ocr_text):
         """
@@ -280,30 +599,31 @@ class LabReportParser:
         Returns:
             str: Organized text with proper line breaks
         """
-        # Sort by vertical position (top to bottom), then horizontal (left to right)
-        text_regions.sort(key=lambda region: (region[0], region[1]))
-        
-        # Group by lines and concatenate
-        lines = []
-        current_line = []
-        current_y = None
-        y_threshold = 10  # Pixels threshold for same line
-        
-        for y_pos, x_pos, text in text_regions:
-            if current_y is None or abs(y_pos - current_y) < y_threshold:
-                current_line.append(text)
-                if current_y is None:
+        with span("region_sort"):
+            # Sort by vertical position (top to bottom), then horizontal (left to right)
+            text_regions.sort(key=lambda region: (region[0], region[1]))
+        
+            # Group by lines and concatenate
+            lines = []
+            current_line = []
+            current_y = None
+            y_threshold = 10  # Pixels threshold for same line
+        
+            for y_pos, x_pos, text in text_regions:
+                if current_y is None or abs(y_pos - current_y) < y_threshold:
+                    current_line.append(text)
+                    if current_y is None:
+                        current_y = y_pos
+                else:
+                    if current_line:
+                        lines.append(' '.join(current_line))
+                    current_line = [text]
                     current_y = y_pos
-            else:
-                if current_line:
-                    lines.append(' '.join(current_line))
-                current_line = [text]
-                current_y = y_pos
         
-        if current_line:
-            lines.append(' '.join(current_line))
+            if current_line:
+                lines.append(' '.join(current_line))
         
-        return '\n'.join(lines)
+            return '\n'.join(lines)
 
 
 # Convenience function for quick usage
@@ -321,7 +641,7 @@ def extract_text_from_lab_report(file_path):
     return parser.extract_text_from_file(file_path)
 
 
-def extract_structured_lab_data(file_path, llm=None, model_name="gpt-4o-mini"):
+def extract_structured_lab_data(file_path, llm=None, model_name="gpt-4o-mini", chunked=False):
     """
     Extract structured lab data from a lab report file using LLM.
     
@@ -329,6 +649,8 @@ def extract_structured_lab_data(file_path, llm=None, model_name="gpt-4o-mini"):
         file_path: Path to the lab report file
         llm: Optional pre-configured LLM instance (LangChain compatible)
         model_name: Model name to use if llm is not provided (default: gpt-4o-mini)
+        chunked: Extract pages in concurrent chunks and merge the tests
+            (recommended for long multi-page reports)
         
     Returns:
         dict: Structured lab data with format:
@@ -361,7 +683,7 @@ def extract_structured_lab_data(file_path, llm=None, model_name="gpt-4o-mini"):
         # Use LLM-based extraction
         from tools.src.document_data_extraction_tools.lab_report_parser.llm_structured_extractor import extract_with_llm
         
-        return extract_with_llm(raw_text, str(file_path), llm=llm, model_name=model_name)
+        return extract_with_llm(raw_text, str(file_path), llm=llm, model_name=model_name, chunked=chunked)
         
     except Exception as e:
         # Preserve raw_text even if extraction fails
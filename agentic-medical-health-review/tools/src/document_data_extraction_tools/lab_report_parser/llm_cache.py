@@ -0,0 +1,205 @@
+"""
+LLM Response Cache
+
+Persistent cache of LLM extraction responses. Extraction runs with
+temperature=0, so the same model, prompt template and OCR text produce the
+same answer; re-processing a document (e.g. after a normalization rule
+change) is served from the cache instead of the API.
+
+Entries are keyed by model name, prompt template version and the SHA-256 of
+the whitespace-normalized OCR text. They expire after a TTL, and the least
+recently used entries are evicted beyond a maximum entry count.
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+
+class LLMResponseCache:
+    """TTL- and size-bounded LLM response cache stored in SQLite."""
+
+    def __init__(
+        self,
+        db_path: str = "./cache/llm/responses.sqlite3",
+        ttl_hours: float = 720,
+        max_entries: int = 10000
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            db_path: SQLite database file (parent directory created if missing)
+            ttl_hours: Entry lifetime; expired entries are ignored and purged
+            max_entries: Entry budget; least recently used entries are evicted beyond it
+        """
+        self.db_path = Path(db_path)
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_entries = max_entries
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_responses (
+                    cache_key TEXT PRIMARY KEY,
+                    model_name TEXT NOT NULL,
+                    prompt_version TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_responses_accessed_at ON llm_responses (accessed_at)"
+            )
+
+    @classmethod
+    def from_env(cls) -> Optional["LLMResponseCache"]:
+        """
+        Build a cache from environment variables.
+
+        LLM_CACHE_ENABLED (default: true), LLM_CACHE_PATH (default:
+        ./cache/llm/responses.sqlite3), LLM_CACHE_TTL_HOURS (default: 720),
+        LLM_CACHE_MAX_ENTRIES (default: 10000).
+
+        Returns:
+            LLMResponseCache instance, or None if caching is disabled
+        """
+        if os.getenv("LLM_CACHE_ENABLED", "true").lower() != "true":
+            return None
+        return cls(
+            db_path=os.getenv("LLM_CACHE_PATH", "./cache/llm/responses.sqlite3"),
+            ttl_hours=float(os.getenv("LLM_CACHE_TTL_HOURS", "720")),
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+        )
+
+    @contextmanager
+    def _connect(self):
+        """
+        Open a connection for one operation (keeps the cache thread-safe).
+
+        Commits on success, rolls back on error and always closes.
+        """
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def normalize_text(raw_text: str) -> str:
+        """
+        Normalize OCR text so insignificant whitespace differences share an entry.
+
+        Args:
+            raw_text: OCR text
+
+        Returns:
+            str: Text with runs of spaces/tabs collapsed, lines stripped and
+                blank lines removed
+        """
+        lines = (" ".join(line.split()) for line in raw_text.splitlines())
+        return "\n".join(line for line in lines if line)
+
+    @classmethod
+    def make_key(cls, model_name: str, prompt_version: str, raw_text: str) -> str:
+        """
+        Build the cache key for a request.
+
+        Args:
+            model_name: LLM model name
+            prompt_version: Version of the prompt template (see PromptTemplate.version)
+            raw_text: OCR text inserted into the prompt
+
+        Returns:
+            str: Hex cache key
+        """
+        text_hash = hashlib.sha256(cls.normalize_text(raw_text).encode("utf-8")).hexdigest()
+        return hashlib.sha256(
+            f"{model_name}|{prompt_version}|{text_hash}".encode("utf-8")
+        ).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a response.
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            str: Cached response content, or None on miss or expiry
+        """
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT response, created_at FROM llm_responses WHERE cache_key = ?",
+                (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM llm_responses WHERE cache_key = ?", (key,))
+                return None
+            conn.execute(
+                "UPDATE llm_responses SET accessed_at = ? WHERE cache_key = ?",
+                (now, key)
+            )
+        return row[0]
+
+    def put(self, key: str, response: str, model_name: str = "", prompt_version: str = ""):
+        """
+        Store a response, then evict expired and excess entries.
+
+        Args:
+            key: Cache key from make_key()
+            response: Raw response content from the LLM
+            model_name: Model name recorded alongside the entry
+            prompt_version: Prompt version recorded alongside the entry
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO llm_responses
+                    (cache_key, model_name, prompt_version, response, created_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (key, model_name, prompt_version, response, now, now)
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """Delete expired entries and the least recently used beyond max_entries."""
+        conn.execute("DELETE FROM llm_responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        conn.execute(
+            """
+            DELETE FROM llm_responses WHERE cache_key IN (
+                SELECT cache_key FROM llm_responses
+                ORDER BY accessed_at DESC
+                LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,)
+        )
+
+    def evict(self):
+        """Remove expired entries and trim the cache to max_entries."""
+        with self._connect() as conn:
+            self._evict(conn, time.time())
+
+    def clear(self):
+        """Remove all cache entries."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM llm_responses")
+
+    def __len__(self) -> int:
+        """Number of stored entries, including expired ones not yet purged."""
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
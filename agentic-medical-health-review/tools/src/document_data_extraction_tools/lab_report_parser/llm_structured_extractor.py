@@ -5,9 +5,21 @@ Uses an LLM to extract structured lab test data from OCR text.
 Much more robust than regex patterns for handling varied formats.
 """
 
+import asyncio
 import json
 import os
-from typing import Dict, List, Optional, Any
+import random
+import re
+import time
+from typing import Dict, List, Optional, Any, Sequence
+
+from tools.src.document_data_extraction_tools.lab_report_parser.llm_cache import LLMResponseCache
+from tools.src.document_data_extraction_tools.lab_report_parser.prompt_registry import (
+    PromptRegistry,
+    get_extraction_prompt_registry
+)
+from tools.src.document_data_extraction_tools.lab_report_parser.rule_based_extractor import RuleBasedExtractor
+from tools.src.document_data_extraction_tools.pipeline_metrics import LLM_REQUESTS_TOTAL, increment, span
 
 # Load environment variables from .env file
 try:
@@ -21,16 +33,50 @@ except ImportError:
 class LLMStructuredExtractor:
     """Extract structured lab data using an LLM."""
     
-    def __init__(self, llm=None, model_name: str = "gpt-4o-mini"):
+    # Async batch defaults
+    DEFAULT_MAX_CONCURRENCY = 8
+    DEFAULT_REQUEST_TIMEOUT = 60.0  # Seconds per LLM request
+    DEFAULT_MAX_RETRIES = 3
+    DEFAULT_BACKOFF_BASE = 0.5  # Seconds; doubled on every retry
+    # HTTP statuses below 500 that are worth retrying (timeout, conflict, rate limit)
+    RETRYABLE_STATUS_CODES = frozenset({408, 409, 429})
+    
+    # Chunked extraction defaults
+    DEFAULT_CHUNK_TOKENS = 3000  # OCR text budget per chunk (prompt excluded)
+    CHARS_PER_TOKEN = 4  # Rough estimate for English lab report text
+    PAGE_MARKER_PATTERN = re.compile(r'^--- Page (\d+) ---$', re.MULTILINE)
+    
+    def __init__(
+        self,
+        llm=None,
+        model_name: str = "gpt-4o-mini",
+        base_url: Optional[str] = None,
+        prompt_registry: Optional[PromptRegistry] = None,
+        rule_extractor: Optional[RuleBasedExtractor] = None,
+        response_cache: Optional[LLMResponseCache] = None
+    ):
         """
         Initialize the LLM extractor.
         
         Args:
             llm: Optional pre-configured LLM instance (LangChain compatible)
             model_name: Model name to use if llm is not provided
+            base_url: Optional OpenAI-compatible endpoint (default: OPENAI_BASE_URL
+                or the OpenAI API). Point it at a local stub server in tests.
+            prompt_registry: Optional prompt registry (default: the shared registry
+                for tool_medical_report_extraction_prompt.md)
+            rule_extractor: Optional rule-based extractor tried before the LLM
+                (default: RuleBasedExtractor.from_env())
+            response_cache: Optional LLM response cache (default: LLMResponseCache.from_env())
         """
         self.llm = llm
         self.model_name = model_name
+        self.base_url = base_url or os.getenv("OPENAI_BASE_URL") or None
+        self._async_client = None
+        self._async_client_loop = None
+        self.prompt_registry = prompt_registry or get_extraction_prompt_registry()
+        self.rule_extractor = rule_extractor if rule_extractor is not None else RuleBasedExtractor.from_env()
+        self.response_cache = response_cache if response_cache is not None else LLMResponseCache.from_env()
         
         if self.llm is None:
             self._initialize_default_llm()
@@ -41,7 +87,10 @@ class LLMStructuredExtractor:
             # Use OpenAI directly (avoids PyTorch dependency issues with LangChain)
             import openai
             self.llm = "openai_direct"  # Flag to use direct OpenAI API
-            self.openai_client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+            self.openai_client = openai.OpenAI(
+                api_key=os.getenv("OPENAI_API_KEY"),
+                base_url=self.base_url
+            )
         except ImportError:
             try:
                 # Fallback to LangChain if OpenAI package not available
@@ -62,6 +111,8 @@ class LLMStructuredExtractor:
         """
         Extract structured lab test data from raw OCR text using LLM.
         
+        Reports in a known layout are parsed by the rule-based extractor instead.
+        
         Args:
             raw_text: Raw text extracted from lab report
             file_path: Optional file path for metadata
@@ -82,155 +133,608 @@ class LLMStructuredExtractor:
                     "file_path": str,
                     "extraction_status": str,
                     "total_tests_found": int,
-                    "extraction_method": "llm"
+                    "extraction_method": "llm" or "rules"
                 }
             }
         """
-        if not self.llm:
-            return {
-                "raw_text": raw_text,
-                "tests": [],
-                "metadata": {
-                    "file_path": file_path,
-                    "extraction_status": "error",
-                    "error_message": "LLM not initialized. Please configure OPENAI_API_KEY in .env file.",
-                    "total_tests_found": 0,
-                    "extraction_method": "llm"
-                }
-            }
-        
-        if not raw_text or not raw_text.strip():
-            return {
-                "raw_text": raw_text,
-                "tests": [],
-                "metadata": {
-                    "file_path": file_path,
-                    "extraction_status": "no_text",
-                    "total_tests_found": 0,
-                    "extraction_method": "llm"
-                }
-            }
+        precheck = self._precheck(raw_text, file_path)
+        if precheck is not None:
+            return precheck
         
         try:
             # Create extraction prompt
             prompt = self._create_extraction_prompt(raw_text)
             
+            # Identical requests are answered from the response cache
+            cache_key = self._get_cache_key(raw_text)
+            cached_response = self._get_cached_response(cache_key)
+            if cached_response is not None:
+                return self._cached_result(raw_text, file_path, cached_response)
+            
             # Call LLM based on type
-            if self.llm == "openai_direct":
-                # Use OpenAI API directly
-                response = self.openai_client.chat.completions.create(
-                    model=self.model_name,
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=0
-                )
-                response_content = response.choices[0].message.content
-            else:
-                # Use LangChain LLM
-                response = self.llm.invoke(prompt)
-                response_content = response.content
+            with span("llm_call"):
+                if self.llm == "openai_direct":
+                    # Use OpenAI API directly
+                    response = self.openai_client.chat.completions.create(
+                        model=self.model_name,
+                        messages=[{"role": "user", "content": prompt}],
+                        temperature=0
+                    )
+                    response_content = response.choices[0].message.content
+                else:
+                    # Use LangChain LLM
+                    response = self.llm.invoke(prompt)
+                    response_content = response.content
             
             # Parse response
             tests = self._parse_llm_response(response_content)
+            self._store_response(cache_key, response_content, tests)
+            increment(LLM_REQUESTS_TOTAL, result="success")
+            return self._success_result(raw_text, file_path, tests)
             
-            return {
-                "raw_text": raw_text,
-                "tests": tests,
-                "metadata": {
-                    "file_path": file_path,
-                    "extraction_status": "success" if tests else "no_tests_found",
-                    "total_tests_found": len(tests),
-                    "extraction_method": "llm",
-                    "model": self.model_name
-                }
-            }
+        except Exception as e:
+            increment(LLM_REQUESTS_TOTAL, result="error")
+            return self._error_result(raw_text, file_path, str(e))
+    
+    async def aextract_batch(
+        self,
+        raw_texts: Sequence[str],
+        file_paths: Optional[Sequence[str]] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        timeout: float = DEFAULT_REQUEST_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_base: float = DEFAULT_BACKOFF_BASE
+    ) -> List[Dict[str, Any]]:
+        """
+        Extract structured data from many OCR texts concurrently.
+        
+        At most `max_concurrency` requests are in flight at once, all over one
+        shared async client. Each request gets `timeout` seconds and up to
+        `max_retries` retries with exponential backoff and jitter.
+        
+        Args:
+            raw_texts: OCR texts, one per document
+            file_paths: Optional file paths for metadata (same length as raw_texts)
+            max_concurrency: Maximum concurrent LLM requests
+            timeout: Per-request timeout in seconds
+            max_retries: Retries after the first failed attempt
+            backoff_base: Initial backoff in seconds, doubled per retry
             
+        Returns:
+            list: One result dict per input (same format as extract_structured_data),
+                in input order
+        """
+        if file_paths is None:
+            file_paths = [""] * len(raw_texts)
+        if len(file_paths) != len(raw_texts):
+            raise ValueError("file_paths must have the same length as raw_texts")
+        
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        
+        # gather() returns results in submission order
+        return await asyncio.gather(
+            *(
+                self._aextract_one(text, path, semaphore, timeout, max_retries, backoff_base)
+                for text, path in zip(raw_texts, file_paths)
+            )
+        )
+    
+    async def _aextract_one(
+        self,
+        raw_text: str,
+        file_path: str,
+        semaphore: asyncio.Semaphore,
+        timeout: float,
+        max_retries: int,
+        backoff_base: float
+    ) -> Dict[str, Any]:
+        """
+        Extract one text while holding a slot of the shared semaphore.
+        
+        Returns:
+            dict: Result dict; LLM results carry metadata["duration_seconds"]
+                (time spent in the request, excluding the wait for a slot);
+                cached results carry metadata["cached"] instead
+        """
+        precheck = self._precheck(raw_text, file_path)
+        if precheck is not None:
+            return precheck
+        
+        prompt = self._create_extraction_prompt(raw_text)
+        cache_key = self._get_cache_key(raw_text)
+        # SQLite can block on a locked database (up to its timeout); keep it off the event loop
+        if cache_key is not None:
+            cached_response = await asyncio.to_thread(self._get_cached_response, cache_key)
+            if cached_response is not None:
+                return self._cached_result(raw_text, file_path, cached_response)
+        
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response_content = await self._acomplete_with_retries(
+                    prompt, timeout, max_retries, backoff_base
+                )
+            except Exception as e:
+                increment(LLM_REQUESTS_TOTAL, result="error")
+                result = self._error_result(raw_text, file_path, str(e) or type(e).__name__)
+                result["metadata"]["duration_seconds"] = round(time.perf_counter() - started, 3)
+                return result
+            duration = time.perf_counter() - started
+        
+        # A malformed answer fails this document only, not the whole gather()
+        try:
+            tests = self._parse_llm_response(response_content)
+            if cache_key is not None:
+                await asyncio.to_thread(self._store_response, cache_key, response_content, tests)
         except Exception as e:
+            increment(LLM_REQUESTS_TOTAL, result="error")
+            result = self._error_result(raw_text, file_path, str(e) or type(e).__name__)
+            result["metadata"]["duration_seconds"] = round(duration, 3)
+            return result
+        
+        increment(LLM_REQUESTS_TOTAL, result="success")
+        result = self._success_result(raw_text, file_path, tests)
+        result["metadata"]["duration_seconds"] = round(duration, 3)
+        return result
+    
+    async def aextract_chunked(
+        self,
+        raw_text: str,
+        file_path: str = "",
+        max_chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        timeout: float = DEFAULT_REQUEST_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_base: float = DEFAULT_BACKOFF_BASE
+    ) -> Dict[str, Any]:
+        """
+        Extract structured data from a long report in concurrent chunks.
+        
+        The text is split on the "--- Page N ---" markers emitted by the PDF
+        parser (consecutive pages are packed together up to the token budget),
+        or on line boundaries when there are no markers. Chunks are extracted
+        concurrently and their tests merged, with duplicates removed.
+        
+        Args:
+            raw_text: Raw OCR text from lab report
+            file_path: Optional file path for metadata
+            max_chunk_tokens: Approximate OCR text budget per chunk
+            max_concurrency: Maximum concurrent LLM requests
+            timeout: Per-request timeout in seconds
+            max_retries: Retries after the first failed attempt
+            backoff_base: Initial backoff in seconds, doubled per retry
+            
+        Returns:
+            dict: Same format as extract_structured_data(), with extra metadata:
+                "extraction_mode": "chunked",
+                "chunks": [{"chunk_index", "pages", "chars", "extraction_status",
+                            "tests_found", "duration_seconds"}],
+                "duration_seconds": wall time for the whole document
+        """
+        precheck = self._precheck(raw_text, file_path)
+        if precheck is not None:
+            return precheck
+        
+        started = time.perf_counter()
+        chunks = self.split_into_chunks(raw_text, max_chunk_tokens)
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        chunk_results = await asyncio.gather(
+            *(
+                self._aextract_one(chunk["text"], file_path, semaphore, timeout, max_retries, backoff_base)
+                for chunk in chunks
+            )
+        )
+        
+        chunk_metadata = []
+        for index, (chunk, chunk_result) in enumerate(zip(chunks, chunk_results)):
+            metadata = chunk_result["metadata"]
+            chunk_metadata.append({
+                "chunk_index": index,
+                "pages": chunk["pages"],
+                "chars": len(chunk["text"]),
+                "extraction_status": metadata["extraction_status"],
+                "tests_found": metadata["total_tests_found"],
+                "duration_seconds": metadata.get("duration_seconds", 0.0)
+            })
+        
+        errors = [r["metadata"]["error_message"] for r in chunk_results
+                  if r["metadata"]["extraction_status"] == "error"]
+        if len(errors) == len(chunk_results):
+            result = self._error_result(raw_text, file_path, errors[0])
+        else:
+            tests = self.merge_chunk_tests([r["tests"] for r in chunk_results])
+            result = self._success_result(raw_text, file_path, tests)
+            if errors:
+                result["metadata"]["failed_chunks"] = len(errors)
+        
+        result["metadata"]["extraction_mode"] = "chunked"
+        result["metadata"]["chunks"] = chunk_metadata
+        result["metadata"]["duration_seconds"] = round(time.perf_counter() - started, 3)
+        return result
+    
+    def extract_chunked(self, raw_text: str, file_path: str = "", **kwargs) -> Dict[str, Any]:
+        """
+        Blocking wrapper around aextract_chunked() for non-async callers.
+        
+        Starts its own event loop, so it cannot be called from async code
+        (e.g. a FastAPI handler); await aextract_chunked() there instead.
+        
+        Args:
+            raw_text: Raw OCR text from lab report
+            file_path: Optional file path for metadata
+            **kwargs: Forwarded to aextract_chunked()
+            
+        Returns:
+            dict: Structured lab data with per-chunk metadata
+            
+        Raises:
+            RuntimeError: If called while an event loop is running
+        """
+        self._check_no_running_loop("aextract_chunked")
+        return asyncio.run(self.aextract_chunked(raw_text, file_path, **kwargs))
+    
+    @classmethod
+    def split_into_chunks(cls, raw_text: str, max_chunk_tokens: int = DEFAULT_CHUNK_TOKENS) -> List[Dict[str, Any]]:
+        """
+        Split OCR text into chunks that fit the token budget.
+        
+        Args:
+            raw_text: OCR text, optionally with "--- Page N ---" markers
+            max_chunk_tokens: Approximate token budget per chunk
+            
+        Returns:
+            list: [{"text": str, "pages": [int, ...]}, ...] in document order;
+                "pages" is empty when the text has no page markers
+        """
+        max_chars = max(1, max_chunk_tokens * cls.CHARS_PER_TOKEN)
+        
+        # Page sections, each starting with its marker
+        markers = list(cls.PAGE_MARKER_PATTERN.finditer(raw_text))
+        preamble = raw_text[:markers[0].start()] if markers else raw_text
+        sections = [(None, preamble)] if preamble.strip() else []
+        for index, marker in enumerate(markers):
+            end = markers[index + 1].start() if index + 1 < len(markers) else len(raw_text)
+            sections.append((int(marker.group(1)), raw_text[marker.start():end]))
+        
+        chunks = []
+        current_parts, current_pages, current_size = [], [], 0
+        
+        def _flush():
+            if current_parts:
+                chunks.append({"text": "".join(current_parts).strip(), "pages": list(current_pages)})
+                current_parts.clear()
+                current_pages.clear()
+        
+        for page_num, section in sections:
+            # Oversized pages are cut on line boundaries
+            for piece in cls._split_lines(section, max_chars):
+                if current_size + len(piece) > max_chars:
+                    _flush()
+                    current_size = 0
+                current_parts.append(piece)
+                current_size += len(piece)
+                if page_num is not None and page_num not in current_pages:
+                    current_pages.append(page_num)
+        _flush()
+        
+        return [chunk for chunk in chunks if chunk["text"]]
+    
+    @staticmethod
+    def _split_lines(text: str, max_chars: int) -> List[str]:
+        """Cut text into pieces of at most max_chars, breaking between lines where possible."""
+        if len(text) <= max_chars:
+            return [text]
+        
+        pieces, current = [], ""
+        for line in text.splitlines(keepends=True):
+            while len(line) > max_chars:
+                # A single line longer than the budget
+                if current:
+                    pieces.append(current)
+                    current = ""
+                pieces.append(line[:max_chars])
+                line = line[max_chars:]
+            if len(current) + len(line) > max_chars:
+                pieces.append(current)
+                current = ""
+            current += line
+        if current:
+            pieces.append(current)
+        return pieces
+    
+    @staticmethod
+    def merge_chunk_tests(chunk_tests: Sequence[List[Dict[str, str]]]) -> List[Dict[str, str]]:
+        """
+        Merge tests from several chunks, dropping duplicates.
+        
+        Tests are duplicates when name, value and unit match after lowercasing
+        and whitespace normalization (chunk overlap, repeated summary tables).
+        
+        Args:
+            chunk_tests: Test lists in chunk order
+            
+        Returns:
+            list: Unique tests, first occurrence kept
+        """
+        def _normalize(value: str) -> str:
+            return " ".join(str(value).lower().split())
+        
+        seen = set()
+        merged = []
+        for tests in chunk_tests:
+            for test in tests:
+                key = (_normalize(test["test_name"]), _normalize(test["test_value"]), _normalize(test["unit"]))
+                if key not in seen:
+                    seen.add(key)
+                    merged.append(test)
+        return merged
+    
+    def extract_batch(
+        self,
+        raw_texts: Sequence[str],
+        file_paths: Optional[Sequence[str]] = None,
+        **kwargs
+    ) -> List[Dict[str, Any]]:
+        """
+        Blocking wrapper around aextract_batch() for non-async callers.
+        
+        Starts its own event loop, so it cannot be called from async code
+        (e.g. a FastAPI handler); await aextract_batch() there instead.
+        
+        Args:
+            raw_texts: OCR texts, one per document
+            file_paths: Optional file paths for metadata
+            **kwargs: Forwarded to aextract_batch()
+            
+        Returns:
+            list: One result dict per input, in input order
+            
+        Raises:
+            RuntimeError: If called while an event loop is running
+        """
+        self._check_no_running_loop("aextract_batch")
+        return asyncio.run(self.aextract_batch(raw_texts, file_paths, **kwargs))
+    
+    @staticmethod
+    def _check_no_running_loop(async_method: str):
+        """Fail with a pointer to the async variant instead of asyncio.run()'s generic error."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return  # No loop in this thread: asyncio.run() can start one
+        raise RuntimeError(
+            f"{async_method[1:]}() cannot be called from a running event loop; "
+            f"await {async_method}() instead"
+        )
+    
+    async def _acomplete_with_retries(
+        self,
+        prompt: str,
+        timeout: float,
+        max_retries: int,
+        backoff_base: float
+    ) -> str:
+        """
+        Send one prompt with a timeout, retrying transient failures with exponential backoff.
+        
+        Timeouts, connection errors, rate limits and 5xx responses are retried;
+        other errors (bad key, bad request, unknown model) are raised at once.
+        
+        Returns:
+            str: Response content
+            
+        Raises:
+            Exception: A non-retryable error, or the last error once retries are exhausted
+        """
+        attempt = 0
+        while True:
+            try:
+                return await asyncio.wait_for(self._acomplete(prompt), timeout=timeout)
+            except Exception as e:
+                if attempt >= max_retries or not self._is_retryable(e):
+                    raise
+                delay = backoff_base * (2 ** attempt)
+                await asyncio.sleep(delay + random.uniform(0, delay))
+                attempt += 1
+    
+    @classmethod
+    def _is_retryable(cls, error: Exception) -> bool:
+        """Whether a failed LLM request may succeed if sent again."""
+        if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+            return True
+        
+        # openai.APIStatusError and httpx.HTTPStatusError carry the response status
+        status_code = getattr(error, "status_code", None)
+        if status_code is None:
+            status_code = getattr(getattr(error, "response", None), "status_code", None)
+        if isinstance(status_code, int):
+            return status_code >= 500 or status_code in cls.RETRYABLE_STATUS_CODES
+        
+        try:
+            import openai
+        except ImportError:
+            return False
+        # Includes APITimeoutError
+        return isinstance(error, openai.APIConnectionError)
+    
+    async def _acomplete(self, prompt: str) -> str:
+        """Send one prompt to the LLM without blocking the event loop."""
+        with span("llm_call"):
+            if self.llm == "openai_direct":
+                response = await self._get_async_client().chat.completions.create(
+                    model=self.model_name,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0
+                )
+                return response.choices[0].message.content
+        
+            if hasattr(self.llm, "ainvoke"):
+                response = await self.llm.ainvoke(prompt)
+            else:
+                # Sync-only LLM: run it in a worker thread
+                response = await asyncio.to_thread(self.llm.invoke, prompt)
+            return response.content
+    
+    def _get_async_client(self):
+        """
+        Get the shared AsyncOpenAI client, creating it on first use.
+        
+        The client's connection pool is tied to the event loop it was created
+        on, so a new client is built if extract_batch() starts a fresh loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            import openai
+            self._async_client_loop = loop
+            # Retries are handled by _acomplete_with_retries
+            self._async_client = openai.AsyncOpenAI(
+                api_key=os.getenv("OPENAI_API_KEY"),
+                base_url=self.base_url,
+                max_retries=0
+            )
+        return self._async_client
+    
+    def _precheck(self, raw_text: str, file_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Return an early result when extraction cannot or need not run.
+        
+        Known layouts are parsed by the rule-based extractor here, so the LLM
+        is only called when the rules do not cover the report.
+        
+        Returns:
+            dict if the rules extracted the report, the LLM is missing or the
+            text is empty, otherwise None
+        """
+        if self.rule_extractor is not None and raw_text and raw_text.strip():
+            rule_result = self.rule_extractor.extract(raw_text, file_path)
+            if rule_result is not None:
+                return rule_result
+        
+        if not self.llm:
+            return self._error_result(
+                raw_text, file_path,
+                "LLM not initialized. Please configure OPENAI_API_KEY in .env file."
+            )
+        
+        if not raw_text or not raw_text.strip():
             return {
                 "raw_text": raw_text,
                 "tests": [],
                 "metadata": {
                     "file_path": file_path,
-                    "extraction_status": "error",
-                    "error_message": str(e),
+                    "extraction_status": "no_text",
                     "total_tests_found": 0,
                     "extraction_method": "llm"
                 }
             }
+        
+        return None
     
-    def _create_extraction_prompt(self, raw_text: str) -> str:
+    def _success_result(self, raw_text: str, file_path: str, tests: List[Dict[str, str]]) -> Dict[str, Any]:
+        """Build the result dict for a completed extraction."""
+        return {
+            "raw_text": raw_text,
+            "tests": tests,
+            "metadata": {
+                "file_path": file_path,
+                "extraction_status": "success" if tests else "no_tests_found",
+                "total_tests_found": len(tests),
+                "extraction_method": "llm",
+                "model": self.model_name
+            }
+        }
+    
+    @staticmethod
+    def _error_result(raw_text: str, file_path: str, error_message: str) -> Dict[str, Any]:
+        """Build the result dict for a failed extraction."""
+        return {
+            "raw_text": raw_text,
+            "tests": [],
+            "metadata": {
+                "file_path": file_path,
+                "extraction_status": "error",
+                "error_message": error_message,
+                "total_tests_found": 0,
+                "extraction_method": "llm"
+            }
+        }
+    
+    def _get_cache_key(self, raw_text: str) -> Optional[str]:
         """
-        Create the extraction prompt for the LLM by loading from template file.
+        Build the response cache key for a text.
         
-        Args:
-            raw_text: The OCR text to extract from
-            
         Returns:
-            str: The complete prompt with OCR text inserted
+            str: Key from model, prompt template version and OCR text hash,
+                or None if caching is disabled
         """
-        try:
-            # Try to load prompt from file
-            from pathlib import Path
-            
-            # Get the path to the prompt file
-            # Try multiple possible locations
-            possible_paths = [
-                # Relative to this file
-                Path(__file__).parent.parent.parent.parent / "prompts" / "tool_medical_report_extraction_prompt.md",
-                # Relative to current directory
-                Path("agentic-medical-health-review/prompts/tool_medical_report_extraction_prompt.md"),
-                Path("prompts/tool_medical_report_extraction_prompt.md"),
-            ]
-            
-            prompt_template = None
-            for prompt_path in possible_paths:
-                if prompt_path.exists():
-                    with open(prompt_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    # Extract PRIMARY_PROMPT section
-                    prompt_template = self._extract_section(content, "PRIMARY_PROMPT")
-                    break
-            
-            if prompt_template:
-                # Replace the placeholder with actual OCR text
-                return prompt_template.replace("{ocr_text}", raw_text)
-            else:
-                # Fallback to inline prompt if file not found
-                return self._get_fallback_prompt(raw_text)
-                
-        except Exception as e:
-            # If any error occurs, use fallback prompt
-            return self._get_fallback_prompt(raw_text)
+        if self.response_cache is None:
+            return None
+        return self.response_cache.make_key(self._get_model_id(), self.get_prompt_version(), raw_text)
     
-    def _extract_section(self, content: str, section_name: str) -> str:
+    def _get_model_id(self) -> str:
+        """Identify the model answering requests (custom LLMs may ignore model_name)."""
+        if self.llm == "openai_direct":
+            return self.model_name
+        model = getattr(self.llm, "model_name", None) or getattr(self.llm, "model", None)
+        return f"{type(self.llm).__name__}:{model or self.model_name}"
+    
+    def _get_cached_response(self, cache_key: Optional[str]) -> Optional[str]:
+        """Look up a cached response; None on miss or when caching is disabled."""
+        if cache_key is None:
+            return None
+        return self.response_cache.get(cache_key)
+    
+    def _store_response(self, cache_key: Optional[str], response_content: str, tests: List[Dict[str, str]]):
+        """Cache a response that produced tests (unparseable answers are retried next time)."""
+        if cache_key is None or not tests:
+            return
+        self.response_cache.put(
+            cache_key, response_content, self._get_model_id(), self.get_prompt_version()
+        )
+    
+    def _cached_result(self, raw_text: str, file_path: str, response_content: str) -> Dict[str, Any]:
+        """Build the result dict for a response served from the cache."""
+        result = self._success_result(raw_text, file_path, self._parse_llm_response(response_content))
+        result["metadata"]["cached"] = True
+        increment(LLM_REQUESTS_TOTAL, result="cached")
+        return result
+    
+    def get_prompt_version(self) -> str:
         """
-        Extract a specific section from the prompt file.
+        Version of the prompt template used for extraction.
+        
+        Returns:
+            str: Content hash of the first available template (PRIMARY_PROMPT,
+                FALLBACK_PROMPT, ULTIMATE_FALLBACK), or "inline" for the built-in prompt
+        """
+        for section_name in ("PRIMARY_PROMPT", "FALLBACK_PROMPT", "ULTIMATE_FALLBACK"):
+            template = self.prompt_registry.get(section_name)
+            if template is not None:
+                return template.version
+        return "inline"
+    
+    def _create_extraction_prompt(self, raw_text: str) -> str:
+        """
+        Create the extraction prompt for the LLM from the cached template file.
         
         Args:
-            content: Full content of the prompt file
-            section_name: Name of the section to extract (e.g., "PRIMARY_PROMPT")
+            raw_text: The OCR text to extract from
             
         Returns:
-            str: The extracted section content, or empty string if not found
+            str: The complete prompt with OCR text inserted
         """
-        import re
-        
-        # Pattern to match section: ## [SECTION_NAME] ... (until next ## [ or end)
-        pattern = rf'## \[{section_name}\](.*?)(?=## \[|$)'
-        match = re.search(pattern, content, re.DOTALL)
+        template = self.prompt_registry.get("PRIMARY_PROMPT")
+        if template is not None:
+            # Replace the placeholder with actual OCR text
+            return template.render(raw_text)
         
-        if match:
-            # Get the section content and clean it up
-            section_content = match.group(1).strip()
-            # Remove the "---" separator if present at the end
-            section_content = re.sub(r'\n---\s*$', '', section_content)
-            return section_content
-        
-        return ""
+        # Fallback to inline prompt if file not found
+        return self._get_fallback_prompt(raw_text)
     
     def _get_fallback_prompt(self, raw_text: str) -> str:
         """
-        Fallback prompt if template file cannot be loaded.
-        Tries to load from FALLBACK_PROMPT section first, then ULTIMATE_FALLBACK, then uses inline.
+        Fallback prompt if the PRIMARY_PROMPT section cannot be loaded.
+        Tries the FALLBACK_PROMPT section first, then ULTIMATE_FALLBACK, then uses inline.
         
         Args:
             raw_text: The OCR text to extract from
@@ -238,32 +742,10 @@ class LLMStructuredExtractor:
         Returns:
             str: The complete prompt
         """
-        try:
-            # Try to load fallback from file
-            from pathlib import Path
-            
-            possible_paths = [
-                Path(__file__).parent.parent.parent.parent / "prompts" / "tool_medical_report_extraction_prompt.md",
-                Path("agentic-medical-health-review/prompts/tool_medical_report_extraction_prompt.md"),
-                Path("prompts/tool_medical_report_extraction_prompt.md"),
-            ]
-            
-            for prompt_path in possible_paths:
-                if prompt_path.exists():
-                    with open(prompt_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    
-                    # Try FALLBACK_PROMPT first
-                    fallback_template = self._extract_section(content, "FALLBACK_PROMPT")
-                    if fallback_template:
-                        return fallback_template.replace("{ocr_text}", raw_text)
-                    
-                    # Try ULTIMATE_FALLBACK if FALLBACK_PROMPT not found
-                    ultimate_template = self._extract_section(content, "ULTIMATE_FALLBACK")
-                    if ultimate_template:
-                        return ultimate_template.replace("{ocr_text}", raw_text)
-        except:
-            pass
+        for section_name in ("FALLBACK_PROMPT", "ULTIMATE_FALLBACK"):
+            template = self.prompt_registry.get(section_name)
+            if template is not None:
+                return template.render(raw_text)
         
         # Ultimate fallback: inline prompt (only if file completely inaccessible)
         return f"""You are a medical lab report data extraction assistant. Extract all lab test results from the following OCR text.
@@ -299,43 +781,71 @@ Extract all lab tests as JSON array:"""
     
     def _parse_llm_response(self, response: str) -> List[Dict[str, str]]:
         """Parse the LLM response into structured test data."""
-        try:
-            # Remove markdown code blocks if present
-            response = response.strip()
-            if response.startswith("```json"):
-                response = response[7:]
-            if response.startswith("```"):
-                response = response[3:]
-            if response.endswith("```"):
-                response = response[:-3]
-            response = response.strip()
+        with span("llm_parse"):
+            try:
+                # Remove markdown code blocks if present
+                response = response.strip()
+                if response.startswith("```json"):
+                    response = response[7:]
+                if response.startswith("```"):
+                    response = response[3:]
+                if response.endswith("```"):
+                    response = response[:-3]
+                response = response.strip()
             
-            # Parse JSON
-            tests = json.loads(response)
+                # Parse JSON
+                tests = json.loads(response)
             
-            # Validate structure
-            if not isinstance(tests, list):
-                return []
+                # Validate structure
+                if not isinstance(tests, list):
+                    return []
             
-            # Ensure all required fields are present
-            validated_tests = []
-            for test in tests:
-                if all(key in test for key in ["test_name", "test_value", "unit", "reference_range"]):
-                    validated_tests.append({
-                        "test_name": str(test["test_name"]),
-                        "test_value": str(test["test_value"]),
-                        "unit": str(test["unit"]),
-                        "reference_range": str(test["reference_range"])
-                    })
+                # Ensure all required fields are present
+                validated_tests = []
+                for test in tests:
+                    if all(key in test for key in ["test_name", "test_value", "unit", "reference_range"]):
+                        validated_tests.append({
+                            "test_name": str(test["test_name"]),
+                            "test_value": str(test["test_value"]),
+                            "unit": str(test["unit"]),
+                            "reference_range": str(test["reference_range"])
+                        })
             
-            return validated_tests
+                return validated_tests
             
-        except json.JSONDecodeError:
-            # If JSON parsing fails, return empty list
-            return []
+            except json.JSONDecodeError:
+                # If JSON parsing fails, return empty list
+                return []
+
+# Shared default extractors, one per model, so repeated calls reuse one client
+_default_extractors: Dict[str, LLMStructuredExtractor] = {}
+
+
+def get_default_extractor(model_name: str = "gpt-4o-mini") -> LLMStructuredExtractor:
+    """
+    Get the shared extractor for a model, creating it on first use.
+    
+    Args:
+        model_name: Model name
+        
+    Returns:
+        LLMStructuredExtractor: Process-wide instance for this model
+    """
+    extractor = _default_extractors.get(model_name)
+    if extractor is None:
+        extractor = LLMStructuredExtractor(model_name=model_name)
+        _default_extractors[model_name] = extractor
+    return extractor
+
 
 # Convenience function
-def extract_with_llm(raw_text: str, file_path: str = "", llm=None, model_name: str = "gpt-4o-mini") -> Dict[str, Any]:
+def extract_with_llm(
+    raw_text: str,
+    file_path: str = "",
+    llm=None,
+    model_name: str = "gpt-4o-mini",
+    chunked: bool = False
+) -> Dict[str, Any]:
     """
     Convenience function to extract structured data using LLM.
     
@@ -344,9 +854,38 @@ def extract_with_llm(raw_text: str, file_path: str = "", llm=None, model_name: s
         file_path: Optional file path for metadata
         llm: Optional pre-configured LLM instance
         model_name: Model name to use if llm is not provided
+        chunked: Extract page chunks concurrently (for long multi-page reports);
+            not available from a running event loop, see extract_chunked()
         
     Returns:
         dict: Structured lab data
     """
-    extractor = LLMStructuredExtractor(llm=llm, model_name=model_name)
+    if llm is None:
+        extractor = get_default_extractor(model_name)
+    else:
+        extractor = LLMStructuredExtractor(llm=llm, model_name=model_name)
+    if chunked:
+        return extractor.extract_chunked(raw_text, file_path)
     return extractor.extract_structured_data(raw_text, file_path)
+
+
+async def aextract_batch_with_llm(
+    raw_texts: Sequence[str],
+    file_paths: Optional[Sequence[str]] = None,
+    model_name: str = "gpt-4o-mini",
+    **kwargs
+) -> List[Dict[str, Any]]:
+    """
+    Convenience function to extract many OCR texts concurrently.
+    
+    Args:
+        raw_texts: OCR texts, one per document
+        file_paths: Optional file paths for metadata
+        model_name: Model name
+        **kwargs: Forwarded to LLMStructuredExtractor.aextract_batch()
+        
+    Returns:
+        list: One result dict per input, in input order
+    """
+    extractor = get_default_extractor(model_name)
+    return await extractor.aextract_batch(raw_texts, file_paths, **kwargs)
@@ -0,0 +1,179 @@
+"""
+OCR Result Cache
+
+Content-addressed on-disk cache for OCR output. Entries are keyed by the
+SHA-256 of the file bytes plus the OCR settings (DPI, language, engine
+version), so re-uploads of the same document skip rasterization and OCR.
+Each entry stores the per-page text and the region layout. The cache is
+bounded by total size and evicts least-recently-used entries first.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+class OCRCache:
+    """Size-bounded LRU cache of OCR results stored as JSON files."""
+
+    HASH_CHUNK_SIZE = 1024 * 1024  # 1 MiB reads when hashing files
+
+    def __init__(self, cache_dir: str = "./cache/ocr", max_size_mb: float = 512):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding cache entries (created if missing)
+            max_size_mb: Total size budget; LRU entries are evicted beyond it
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_env(cls) -> Optional["OCRCache"]:
+        """
+        Build a cache from environment variables.
+
+        OCR_CACHE_ENABLED (default: true), OCR_CACHE_DIR (default: ./cache/ocr),
+        OCR_CACHE_MAX_MB (default: 512).
+
+        Returns:
+            OCRCache instance, or None if caching is disabled
+        """
+        if os.getenv("OCR_CACHE_ENABLED", "true").lower() != "true":
+            return None
+        return cls(
+            cache_dir=os.getenv("OCR_CACHE_DIR", "./cache/ocr"),
+            max_size_mb=float(os.getenv("OCR_CACHE_MAX_MB", "512"))
+        )
+
+    @classmethod
+    def hash_file(cls, file_path) -> str:
+        """
+        Compute the SHA-256 hex digest of a file's bytes.
+
+        Args:
+            file_path: Path to the file
+
+        Returns:
+            str: Hex digest
+        """
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(cls.HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @classmethod
+    def make_key(
+        cls,
+        file_path,
+        dpi: int,
+        lang: str,
+        engine_version: str,
+        extra_settings: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Build the cache key for a file and OCR settings.
+
+        Args:
+            file_path: Path to the document
+            dpi: Rasterization DPI
+            lang: OCR language
+            engine_version: OCR engine version string
+            extra_settings: Other settings that change the output (e.g. text-layer mode)
+
+        Returns:
+            str: Hex cache key
+        """
+        settings = f"dpi={dpi};lang={lang};engine={engine_version}"
+        for name, value in sorted((extra_settings or {}).items()):
+            settings += f";{name}={value}"
+        return hashlib.sha256(
+            f"{cls.hash_file(file_path)}|{settings}".encode("utf-8")
+        ).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        """Path of the JSON file for a key."""
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Look up cached pages.
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            list of page dicts ({"page_num", "text", "regions"}) or None on miss
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        # Touch the entry so eviction sees it as recently used
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return entry.get("pages")
+
+    def put(self, key: str, pages: List[Dict[str, Any]], settings: Optional[Dict[str, Any]] = None):
+        """
+        Store OCR pages for a key, then evict down to the size budget.
+
+        Args:
+            key: Cache key from make_key()
+            pages: List of {"page_num": int, "text": str, "regions": [(y, x, text), ...]}
+            settings: Optional OCR settings recorded alongside the entry
+        """
+        entry = {"key": key, "settings": settings or {}, "pages": pages}
+
+        # Write to a temp file and rename so readers never see partial entries
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._entry_path(key))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self.evict()
+
+    def evict(self):
+        """Remove least-recently-used entries until the cache fits its budget."""
+        entries = []
+        total_size = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(".json"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total_size += stat.st_size
+
+        if total_size <= self.max_size_bytes:
+            return
+
+        entries.sort()  # Oldest access first
+        for _, size, path in entries:
+            if total_size <= self.max_size_bytes:
+                break
+            try:
+                os.remove(path)
+                total_size -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        """Remove all cache entries."""
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(".json"):
+                os.remove(entry.path)
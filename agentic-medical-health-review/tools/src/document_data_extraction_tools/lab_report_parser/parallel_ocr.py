@@ -0,0 +1,326 @@
+"""
+Parallel OCR Executor
+
+Spreads PDF pages and image documents across a pool of worker processes.
+Each worker holds its own LabReportParser singleton, so the PaddleOCR engine
+is initialized lazily once per process and stays warm for later tasks.
+
+LabReportParser (and with it numpy and PaddleOCR) is imported inside the
+functions that use it: a spawned worker imports this module to unpickle
+its initializer, and the math libraries must not load before
+_init_worker() has capped their thread counts.
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from PIL import Image
+
+from tools.src.document_data_extraction_tools.lab_report_parser.file_validator import FileValidator
+from tools.src.document_data_extraction_tools.pipeline_metrics import (
+    OCR_CACHE_TOTAL,
+    collect_stages,
+    increment,
+    observe_stage
+)
+
+# Read by OpenMP, MKL and OpenBLAS when the library loads
+THREAD_LIMIT_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+
+def _get_parser():
+    """The process's LabReportParser singleton (imported on first use)."""
+    from tools.src.document_data_extraction_tools.lab_report_parser.lab_report_parser import LabReportParser
+    return LabReportParser.get_instance()
+
+
+def _init_worker(threads_per_worker: int):
+    """
+    Worker process initializer.
+
+    Caps the math-library thread count so N workers do not oversubscribe
+    the host. It runs before the first task imports numpy and PaddleOCR,
+    so the libraries read the capped values when they load; values
+    inherited from the parent are overridden. The OCR engine itself is
+    created on the worker's first task.
+    """
+    for var in THREAD_LIMIT_VARS:
+        os.environ[var] = str(threads_per_worker)
+
+
+def _ocr_pdf_page(pdf_path: str, page_num: int) -> List[Tuple[float, float, str]]:
+    """Rasterize and OCR one PDF page inside a worker process."""
+    return _get_parser().extract_pdf_page_regions(pdf_path, page_num)
+
+
+def _ocr_image_file(image_path: str) -> List[Tuple[float, float, str]]:
+    """OCR one image file inside a worker process."""
+    with Image.open(image_path) as image:
+        return _get_parser().extract_text_regions(image)
+
+
+def _run_task(task: Tuple[str, str, int]) -> Tuple[List[Tuple[float, float, str]], List[Tuple[str, float]]]:
+    """
+    Dispatch a (kind, path, page_num) task to the matching worker function.
+
+    Returns:
+        tuple: (regions, stage timings); the timings are recorded by the
+            parent, since the worker's metrics registry is never scraped
+    """
+    kind, path, page_num = task
+    with collect_stages() as stages:
+        if kind == "pdf_page":
+            regions = _ocr_pdf_page(path, page_num)
+        else:
+            regions = _ocr_image_file(path)
+    return regions, stages
+
+
+class ParallelOCRExecutor:
+    """
+    Process pool of warm PaddleOCR engines.
+
+    Results are always returned in input order: pages in page order and
+    documents in the order they were passed in. Workers return region
+    layouts and their stage timings; the parent organizes the regions into
+    text, records the timings and reads/writes the parser's OCR cache, so
+    cached documents never reach the pool.
+
+    Example:
+        >>> with ParallelOCRExecutor(max_workers=8) as executor:
+        ...     texts = executor.extract_documents(["a.pdf", "b.pdf", "c.png"])
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, threads_per_worker: int = 1):
+        """
+        Initialize the executor.
+
+        Args:
+            max_workers: Number of worker processes
+                (default: OCR_WORKERS env var, then os.cpu_count())
+            threads_per_worker: Math-library threads allowed per worker
+        """
+        if max_workers is None:
+            max_workers = int(os.getenv("OCR_WORKERS", "0")) or os.cpu_count() or 1
+        self.max_workers = max(1, int(max_workers))
+        self.threads_per_worker = threads_per_worker
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Create the process pool on first use."""
+        if self._pool is None:
+            # spawn: PaddleOCR/OpenMP state is not safe to inherit via fork
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.threads_per_worker,)
+            )
+        return self._pool
+
+    def extract_pdf_pages(self, pdf_path) -> List[str]:
+        """
+        OCR every page of a PDF in parallel.
+
+        Args:
+            pdf_path: Path to PDF file
+
+        Returns:
+            list: Page texts, index 0 is page 1
+        """
+        return [page["text"] for page in self.extract_documents_pages([pdf_path])[0]]
+
+    def extract_text_from_file(self, file_path) -> str:
+        """
+        Parallel equivalent of LabReportParser.extract_text_from_file().
+
+        Args:
+            file_path: Path to PDF or image file
+
+        Returns:
+            str: Extracted text (PDF pages joined with page markers)
+        """
+        return self.extract_documents([file_path])[0]
+
+    def extract_documents(self, file_paths: Sequence) -> List[str]:
+        """
+        OCR many documents, spreading all of their pages across the pool.
+
+        Args:
+            file_paths: Paths to PDF or image files
+
+        Returns:
+            list: One text per document, in input order
+        """
+        from tools.src.document_data_extraction_tools.lab_report_parser.lab_report_parser import LabReportParser
+
+        return [
+            LabReportParser.pages_to_text(pages, FileValidator.get_file_type(str(file_path)))
+            for file_path, pages in zip(file_paths, self.extract_documents_pages(file_paths))
+        ]
+
+    def extract_documents_pages(self, file_paths: Sequence) -> List[List[Dict[str, Any]]]:
+        """
+        OCR many documents and keep the per-page split.
+
+        Args:
+            file_paths: Paths to PDF or image files
+
+        Returns:
+            list: For each document, its page dicts in page order
+                ({"page_num", "text", "regions"}; images count as one page)
+
+        Raises:
+            FileNotFoundError: If a file doesn't exist
+            ValueError: If a file format is not supported
+        """
+        return self.extract_planned([self.plan_document(file_path) for file_path in file_paths])
+
+    def extract_planned(self, plans: Sequence[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """
+        OCR already planned documents, spreading all of their pages across the pool.
+
+        Args:
+            plans: Outputs of plan_document()
+
+        Returns:
+            list: For each plan, its page dicts in page order
+        """
+        tasks = [task for plan in plans if plan["pages"] is None for task in plan["tasks"]]
+
+        # map() preserves submission order, so results line up with tasks
+        results = list(self._get_pool().map(_run_task, tasks)) if tasks else []
+
+        documents = []
+        offset = 0
+        for plan in plans:
+            if plan["pages"] is not None:
+                documents.append(plan["pages"])
+                continue
+            count = len(plan["tasks"])
+            documents.append(self.assemble_document(plan, results[offset:offset + count]))
+            offset += count
+        return documents
+
+    async def aextract_document_pages(self, plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        OCR a planned document from a running event loop.
+
+        The page tasks run in the worker processes; the event loop only
+        awaits them, so it stays free for I/O-bound work meanwhile.
+
+        Args:
+            plan: Output of plan_document()
+
+        Returns:
+            list: The document's page dicts in page order
+        """
+        if plan["pages"] is not None:
+            return plan["pages"]
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        results = await asyncio.gather(
+            *(loop.run_in_executor(pool, _run_task, task) for task in plan["tasks"])
+        )
+        return self.assemble_document(plan, results)
+
+    def plan_document(self, file_path) -> Dict[str, Any]:
+        """
+        Work out what a document needs before any page is OCR'd.
+
+        Validates the file, looks it up in the OCR cache and reads the
+        embedded PDF text layer; the remaining pages become worker tasks
+        (each worker rasterizes its own page, so no bitmap crosses IPC).
+
+        Args:
+            file_path: Path to PDF or image file
+
+        Returns:
+            dict: file_path, file_type, cache_key, pages (cached page dicts,
+                or None), text_layer_pages ({page_num: regions}) and tasks
+                ((kind, path, page_num) tuples for the OCR workers)
+
+        Raises:
+            FileNotFoundError: If the file doesn't exist
+            ValueError: If the file format is not supported
+        """
+        parser = _get_parser()
+        file_path_str = str(file_path)
+        is_valid, error_msg = FileValidator.validate_file(file_path_str)
+        if not is_valid:
+            raise FileNotFoundError(error_msg)
+
+        file_type = FileValidator.get_file_type(file_path_str)
+        if file_type not in ("pdf", "image"):
+            raise ValueError(f"Unsupported file format: {file_path_str}")
+
+        plan = {
+            "file_path": file_path_str,
+            "file_type": file_type,
+            "cache_key": None,
+            "pages": None,
+            "text_layer_pages": {},
+            "tasks": []
+        }
+        if parser.cache is not None:
+            plan["cache_key"] = parser.get_cache_key(file_path_str)
+            plan["pages"] = parser.cache.get(plan["cache_key"])
+            increment(OCR_CACHE_TOTAL, result="miss" if plan["pages"] is None else "hit")
+            if plan["pages"] is not None:
+                return plan
+
+        if file_type == "pdf":
+            # Pages with an embedded text layer are read here, not OCR'd
+            plan["text_layer_pages"] = parser.extract_text_layer(file_path_str)
+            page_count = parser.get_pdf_page_count(file_path_str)
+            plan["tasks"] = [
+                ("pdf_page", file_path_str, page)
+                for page in range(1, page_count + 1) if page not in plan["text_layer_pages"]
+            ]
+        else:
+            plan["tasks"] = [("image", file_path_str, 1)]
+        return plan
+
+    def assemble_document(self, plan: Dict[str, Any], results: Sequence) -> List[Dict[str, Any]]:
+        """
+        Combine text-layer pages and OCR results into page dicts.
+
+        Args:
+            plan: Output of plan_document()
+            results: Worker (regions, stage timings) results, one per
+                plan["tasks"] entry (same order)
+
+        Returns:
+            list: Page dicts in page order (also written to the OCR cache)
+        """
+        parser = _get_parser()
+        pages_by_num = {
+            page_num: parser._make_page(page_num, regions, "text_layer")
+            for page_num, regions in plan["text_layer_pages"].items()
+        }
+        for (_, _, page_num), (regions, stages) in zip(plan["tasks"], results):
+            for stage, seconds in stages:
+                observe_stage(stage, seconds)
+            pages_by_num[page_num] = parser._make_page(page_num, list(regions), "ocr")
+
+        pages = [pages_by_num[page_num] for page_num in sorted(pages_by_num)]
+        if plan["cache_key"] is not None:
+            parser.cache.put(plan["cache_key"], pages, settings=parser.get_ocr_settings())
+        return pages
+
+    def close(self):
+        """Shut down the worker processes."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def __enter__(self):
+        """Context manager entry"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit - shut down the pool"""
+        self.close()
@@ -0,0 +1,222 @@
+"""
+PDF Text Layer Extractor
+
+Reads the embedded text layer of digitally generated PDFs (lab information
+system exports) so those pages can skip rasterization and OCR entirely.
+
+Uses poppler's `pdftotext -bbox`, which is already installed wherever
+pdf2image works, and `pdfimages -list` to tell scanned pages that carry a
+small text overlay (footer, stamp) from real text pages. Word positions are scaled from PDF points to pixels at the
+parser's rasterization DPI, so the regions line up with OCR regions and can
+be organized by the same line-grouping logic.
+"""
+
+import html
+import os
+import re
+import subprocess
+from typing import Dict, List, Optional, Tuple
+
+# <page width=".." height=".."> and <word xMin=".." yMin=".." xMax=".." yMax="..">text</word>
+_BBOX_PATTERN = re.compile(
+    r'<page\b[^>]*>'
+    r'|<word xMin="([\d.]+)" yMin="([\d.]+)" xMax="([\d.]+)" yMax="([\d.]+)">(.*?)</word>',
+    re.DOTALL
+)
+_PAGE_SIZE_PATTERN = re.compile(r'<page width="([\d.]+)" height="([\d.]+)"')
+
+PDF_POINTS_PER_INCH = 72.0
+
+
+class PDFTextLayerExtractor:
+    """Extract positioned words from PDF pages that have a usable text layer."""
+
+    MIN_TEXT_CHARS = 20  # Alphanumeric chars a page needs to skip OCR
+    MAX_REPLACEMENT_RATIO = 0.05  # Share of U+FFFD chars tolerated (broken font maps)
+    MAX_IMAGE_COVERAGE = 0.5  # Share of the page covered by images that marks it as scanned
+
+    def __init__(self, poppler_path: Optional[str] = None, timeout: float = 30.0):
+        """
+        Initialize the extractor.
+
+        Args:
+            poppler_path: Directory containing poppler binaries (same meaning as
+                pdf2image's poppler_path); None uses PATH
+            timeout: Seconds allowed for pdftotext and pdfimages
+        """
+        self.poppler_path = poppler_path
+        self.timeout = timeout
+
+    @classmethod
+    def from_env(cls) -> Optional["PDFTextLayerExtractor"]:
+        """
+        Build an extractor from environment variables.
+
+        PDF_TEXT_LAYER_ENABLED (default: true), POPPLER_PATH (default: PATH lookup).
+
+        Returns:
+            PDFTextLayerExtractor instance, or None if the fast path is disabled
+        """
+        if os.getenv("PDF_TEXT_LAYER_ENABLED", "true").lower() != "true":
+            return None
+        return cls(poppler_path=os.getenv("POPPLER_PATH") or None)
+
+    def extract(self, pdf_path, dpi: int = 300) -> Dict[int, List[Tuple[float, float, str]]]:
+        """
+        Extract text regions for every page with a usable text layer.
+
+        Args:
+            pdf_path: Path to PDF file
+            dpi: Rasterization DPI the regions should be scaled to
+
+        Returns:
+            dict: page_num (1-based) -> list of (y_pos, x_pos, text) regions.
+                Scanned or image-only pages are omitted, as is everything if
+                pdftotext is unavailable or fails. If pdfimages fails, pages
+                are judged on their text alone.
+        """
+        output = self._run_poppler("pdftotext", ["-bbox", "-enc", "UTF-8", str(pdf_path), "-"])
+        if output is None:
+            return {}
+
+        pages = self.parse_bbox_output(output, dpi)
+        page_sizes = self.parse_page_sizes(output)
+        image_list = self._run_poppler("pdfimages", ["-list", str(pdf_path)])
+        image_areas = self.parse_image_list(image_list) if image_list else {}
+        return {
+            page_num: regions
+            for page_num, regions in pages.items()
+            if self.is_usable(regions, self.image_coverage(image_areas.get(page_num, 0.0), page_sizes.get(page_num)))
+        }
+
+    def _run_poppler(self, tool: str, args: List[str]) -> Optional[str]:
+        """Run a poppler command line tool and return its output, or None on failure."""
+        executable = tool
+        if self.poppler_path:
+            executable = os.path.join(self.poppler_path, executable)
+
+        try:
+            completed = subprocess.run(
+                [executable] + args,
+                capture_output=True,
+                timeout=self.timeout,
+                check=True
+            )
+        except (OSError, subprocess.SubprocessError):
+            # Missing binary, encrypted PDF, timeout... fall back to OCR
+            return None
+        return completed.stdout.decode("utf-8", errors="replace")
+
+    @staticmethod
+    def parse_bbox_output(output: str, dpi: int = 300) -> Dict[int, List[Tuple[float, float, str]]]:
+        """
+        Parse `pdftotext -bbox` XHTML into per-page word regions.
+
+        Args:
+            output: XHTML produced by pdftotext -bbox
+            dpi: DPI to scale PDF point coordinates to
+
+        Returns:
+            dict: page_num (1-based) -> list of (y_pos, x_pos, text) word regions,
+                using word centers like the OCR regions do
+        """
+        scale = dpi / PDF_POINTS_PER_INCH
+        pages: Dict[int, List[Tuple[float, float, str]]] = {}
+        page_num = 0
+
+        for match in _BBOX_PATTERN.finditer(output):
+            if match.group(5) is None:
+                page_num += 1
+                pages[page_num] = []
+                continue
+            if page_num == 0:
+                continue
+
+            x_min, y_min, x_max, y_max = (float(match.group(i)) for i in range(1, 5))
+            text = html.unescape(match.group(5))
+            y_pos = (y_min + y_max) / 2 * scale
+            x_pos = (x_min + x_max) / 2 * scale
+            pages[page_num].append((y_pos, x_pos, text))
+
+        return pages
+
+    @staticmethod
+    def parse_page_sizes(output: str) -> Dict[int, Tuple[float, float]]:
+        """
+        Page sizes from `pdftotext -bbox` XHTML.
+
+        Returns:
+            dict: page_num (1-based) -> (width, height) in PDF points
+        """
+        return {
+            page_num: (float(match.group(1)), float(match.group(2)))
+            for page_num, match in enumerate(_PAGE_SIZE_PATTERN.finditer(output), 1)
+        }
+
+    @staticmethod
+    def parse_image_list(output: str) -> Dict[int, float]:
+        """
+        Parse `pdfimages -list` output into the image area drawn on each page.
+
+        Soft masks are skipped, since they only add transparency to an image
+        that is listed on its own.
+
+        Args:
+            output: Table printed by pdfimages -list
+
+        Returns:
+            dict: page_num (1-based) -> total image area in square PDF points
+        """
+        areas: Dict[int, float] = {}
+        for line in output.splitlines()[2:]:  # Column names, then a dashed rule
+            fields = line.split()
+            if len(fields) < 14 or fields[2] == "smask":
+                continue
+            try:
+                page_num = int(fields[0])
+                width, height = int(fields[3]), int(fields[4])
+                x_ppi, y_ppi = float(fields[12]), float(fields[13])
+            except ValueError:
+                continue
+            if x_ppi <= 0 or y_ppi <= 0:
+                continue
+            drawn = (width / x_ppi * PDF_POINTS_PER_INCH) * (height / y_ppi * PDF_POINTS_PER_INCH)
+            areas[page_num] = areas.get(page_num, 0.0) + drawn
+        return areas
+
+    @staticmethod
+    def image_coverage(image_area: float, page_size: Optional[Tuple[float, float]]) -> float:
+        """
+        Share of a page covered by images.
+
+        Args:
+            image_area: Image area drawn on the page in square PDF points
+            page_size: (width, height) of the page in PDF points, if known
+
+        Returns:
+            float: Coverage between 0 and 1 (0 if the page size is unknown)
+        """
+        if not page_size or page_size[0] <= 0 or page_size[1] <= 0:
+            return 0.0
+        return min(1.0, image_area / (page_size[0] * page_size[1]))
+
+    @classmethod
+    def is_usable(cls, regions: List[Tuple[float, float, str]], image_coverage: float = 0.0) -> bool:
+        """
+        Decide whether a page's text layer can replace OCR.
+
+        Args:
+            regions: Word regions for the page
+            image_coverage: Share of the page covered by images (see image_coverage())
+
+        Returns:
+            bool: True if the page has enough real text, few undecodable glyphs
+                and is not mostly an image (a scan with a text footer or stamp)
+        """
+        text = "".join(region[2] for region in regions)
+        if not text or image_coverage >= cls.MAX_IMAGE_COVERAGE:
+            return False
+
+        alnum_chars = sum(1 for char in text if char.isalnum())
+        replacement_ratio = text.count("\ufffd") / len(text)
+        return alnum_chars >= cls.MIN_TEXT_CHARS and replacement_ratio <= cls.MAX_REPLACEMENT_RATIO
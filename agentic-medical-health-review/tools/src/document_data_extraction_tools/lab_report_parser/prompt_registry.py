@@ -0,0 +1,173 @@
+"""
+Prompt Registry
+
+Parses a sectioned prompt markdown file (## [SECTION_NAME] markers, see
+prompts/README_PROMPT_MANAGEMENT.md) once into named, precompiled templates.
+The file is re-read only when its modification time changes, so the
+per-document path does no disk reads or regex scans.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+# ## [SECTION_NAME] ... up to the next section marker or end of file
+_SECTION_PATTERN = re.compile(r'## \[([A-Za-z0-9_]+)\](.*?)(?=## \[|\Z)', re.DOTALL)
+_TRAILING_SEPARATOR = re.compile(r'\n---\s*$')
+
+
+class PromptTemplate:
+    """A prompt section split around its placeholder for fast rendering."""
+
+    def __init__(self, name: str, text: str, placeholder: str = "{ocr_text}"):
+        """
+        Compile a template.
+
+        Args:
+            name: Section name (e.g. "PRIMARY_PROMPT")
+            text: Section content
+            placeholder: Literal placeholder substituted by render()
+        """
+        self.name = name
+        self.text = text
+        self.placeholder = placeholder
+        self._parts: List[str] = text.split(placeholder)
+        # Short content hash; changes whenever the prompt wording changes
+        self.version = hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+
+    def render(self, value: str) -> str:
+        """
+        Substitute the placeholder with a value.
+
+        Equivalent to text.replace(placeholder, value) without rescanning the template.
+
+        Args:
+            value: Text to insert (e.g. OCR text)
+
+        Returns:
+            str: Rendered prompt
+        """
+        return value.join(self._parts)
+
+
+class PromptRegistry:
+    """Named prompt templates loaded from a markdown file, reloaded on change."""
+
+    def __init__(self, candidate_paths: Sequence, placeholder: str = "{ocr_text}"):
+        """
+        Initialize the registry.
+
+        Args:
+            candidate_paths: Paths probed in order; the first existing one is used
+            placeholder: Placeholder used by every template in the file
+        """
+        self.candidate_paths = [Path(path) for path in candidate_paths]
+        self.placeholder = placeholder
+        self._path: Optional[Path] = None
+        self._mtime: Optional[float] = None
+        self._templates: Dict[str, PromptTemplate] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def parse_sections(content: str) -> Dict[str, str]:
+        """
+        Split prompt file content into sections.
+
+        Args:
+            content: Full content of the prompt file
+
+        Returns:
+            dict: section name -> cleaned section content (trailing --- removed)
+        """
+        sections = {}
+        for match in _SECTION_PATTERN.finditer(content):
+            section_content = _TRAILING_SEPARATOR.sub('', match.group(2).strip())
+            # First occurrence wins, matching a top-down search of the file
+            sections.setdefault(match.group(1), section_content)
+        return sections
+
+    def get(self, name: str) -> Optional[PromptTemplate]:
+        """
+        Get a template by section name.
+
+        Args:
+            name: Section name (e.g. "PRIMARY_PROMPT")
+
+        Returns:
+            PromptTemplate, or None if the file or section is missing/empty
+        """
+        self._refresh()
+        return self._templates.get(name)
+
+    def names(self) -> List[str]:
+        """
+        List the available section names.
+
+        Returns:
+            list: Section names in the current file
+        """
+        self._refresh()
+        return list(self._templates)
+
+    def _refresh(self):
+        """Re-parse the prompt file if it is new or its mtime changed."""
+        path, mtime = self._stat()
+        if path == self._path and mtime == self._mtime:
+            return
+
+        with self._lock:
+            if path == self._path and mtime == self._mtime:
+                return
+
+            templates = {}
+            if path is not None:
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        sections = self.parse_sections(f.read())
+                    templates = {
+                        name: PromptTemplate(name, text, self.placeholder)
+                        for name, text in sections.items() if text
+                    }
+                except OSError:
+                    path, mtime = None, None
+
+            self._templates = templates
+            self._path, self._mtime = path, mtime
+
+    def _stat(self):
+        """Return (path, mtime) of the prompt file, or (None, None) if not found."""
+        paths = self.candidate_paths
+        if self._path is not None:
+            # Check the known location first; fall back to probing if it vanished
+            paths = [self._path] + [p for p in paths if p != self._path]
+        for path in paths:
+            try:
+                return path, os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+        return None, None
+
+
+_extraction_registry: Optional[PromptRegistry] = None
+
+
+def get_extraction_prompt_registry() -> PromptRegistry:
+    """
+    Get the process-wide registry for tool_medical_report_extraction_prompt.md.
+
+    Returns:
+        PromptRegistry: Shared registry instance
+    """
+    global _extraction_registry
+    if _extraction_registry is None:
+        _extraction_registry = PromptRegistry([
+            # Relative to this file
+            Path(__file__).parent.parent.parent.parent.parent / "prompts" / "tool_medical_report_extraction_prompt.md",
+            # Relative to current directory
+            Path("agentic-medical-health-review/prompts/tool_medical_report_extraction_prompt.md"),
+            Path("prompts/tool_medical_report_extraction_prompt.md"),
+        ])
+    return _extraction_registry
@@ -0,0 +1,290 @@
+"""
+Rule-Based Lab Data Extractor
+
+Deterministic fast path for known lab report layouts. A layout is identified
+by signature patterns (e.g. its column header line) and its result rows are
+parsed with precompiled row patterns from the line-organized OCR text
+produced by LabReportParser._organize_text_regions_simple.
+
+The result is only accepted when enough candidate lines were parsed
+(coverage) and the parsed rows look valid (confidence); otherwise the
+caller falls back to LLM extraction.
+"""
+
+import os
+import re
+from typing import Any, Dict, Optional, Sequence
+
+# Building blocks for row patterns
+_NAME = r'(?P<test_name>[A-Za-z][A-Za-z0-9 ,()/%.+\-]*?)\s*:?'
+_VALUE = r'(?P<test_value>[<>]?\s?\d+(?:\.\d+)?)'
+_UNIT = r'(?P<unit>%|[A-Za-zµ][A-Za-z0-9µ/.^*]*(?:/[A-Za-z0-9.]+)?|10\^\d+/[A-Za-zµ]+)'
+_RANGE = r'(?P<reference_range>[<>]=?\s?\d+(?:\.\d+)?|\d+(?:\.\d+)?\s?-\s?\d+(?:\.\d+)?)'
+
+# Column orders seen in our lab templates
+ROW_NAME_VALUE_UNIT_RANGE = rf'^{_NAME}\s+{_VALUE}\s+{_UNIT}\s+{_RANGE}$'
+ROW_NAME_VALUE_RANGE_UNIT = rf'^{_NAME}\s+{_VALUE}\s+{_RANGE}\s+{_UNIT}$'
+ROW_NAME_VALUE_RANGE = rf'^{_NAME}\s+{_VALUE}\s+{_RANGE}$'  # Unitless tests (ratios, pH)
+
+# Lines that are never result rows (patient header, page markers, footers)
+COMMON_SKIP_PATTERNS = [
+    r'^--- Page \d+ ---$',
+    r'(?i)^(patient|name|dob|age|sex|gender|date|collected|received|reported|report date|'
+    r'sample|specimen|ref\.? by|referred|lab no|reg\.? no|uhid|id|page|reviewed|'
+    r'verified|signature|printed)\b',
+    r'^[-=_*\s]+$',
+]
+
+# Known layouts: a report matches a layout if any signature is found
+DEFAULT_LAYOUTS = [
+    {
+        "name": "result_unit_reference",
+        "signatures": [
+            r'(?im)^\s*test(?:\s+name)?\s+result\s+units?\s+(?:reference|ref\.?|normal)\b',
+        ],
+        "rows": [ROW_NAME_VALUE_UNIT_RANGE, ROW_NAME_VALUE_RANGE],
+    },
+    {
+        "name": "investigation_value_unit_interval",
+        "signatures": [
+            r'(?im)^\s*(?:investigation|test description)\s+(?:observed\s+)?(?:value|result)\s+units?\s+'
+            r'(?:biological\s+)?reference',
+        ],
+        "rows": [ROW_NAME_VALUE_UNIT_RANGE, ROW_NAME_VALUE_RANGE],
+    },
+    {
+        "name": "result_reference_unit",
+        "signatures": [
+            r'(?im)^\s*test(?:\s+name)?\s+result\s+(?:reference|ref\.?|normal)(?:\s+(?:range|interval|value))?\s+units?\s*$',
+        ],
+        "rows": [ROW_NAME_VALUE_RANGE_UNIT, ROW_NAME_VALUE_RANGE],
+    },
+]
+
+
+class LayoutRule:
+    """A known lab layout with precompiled signature, row and skip patterns."""
+
+    def __init__(
+        self,
+        name: str,
+        signatures: Sequence[str],
+        rows: Sequence[str],
+        skip: Sequence[str] = ()
+    ):
+        """
+        Compile a layout.
+
+        Args:
+            name: Layout name reported in metadata
+            signatures: Patterns that identify the layout (any match is enough)
+            rows: Row patterns with test_name/test_value/reference_range and
+                optional unit groups, tried in order
+            skip: Extra patterns for non-result lines, on top of COMMON_SKIP_PATTERNS
+        """
+        self.name = name
+        self.signatures = [re.compile(pattern) for pattern in signatures]
+        self.rows = [re.compile(pattern) for pattern in rows]
+        self.skip = [re.compile(pattern) for pattern in list(COMMON_SKIP_PATTERNS) + list(skip)]
+
+    def matches(self, text: str) -> bool:
+        """Check whether the text has one of this layout's signatures."""
+        return any(signature.search(text) for signature in self.signatures)
+
+    def parse_line(self, line: str) -> Optional[Dict[str, str]]:
+        """
+        Parse one result row.
+
+        Args:
+            line: A line of organized OCR text
+
+        Returns:
+            dict with test_name, test_value, unit, reference_range, or None
+        """
+        for pattern in self.rows:
+            match = pattern.match(line)
+            if match:
+                groups = match.groupdict()
+                return {
+                    "test_name": groups["test_name"].strip(),
+                    "test_value": groups["test_value"].replace(" ", ""),
+                    "unit": (groups.get("unit") or "").strip(),
+                    "reference_range": " ".join(groups["reference_range"].split())
+                }
+        return None
+
+    def is_candidate(self, line: str) -> bool:
+        """Check whether a line might be a result row (has letters and digits, not skipped)."""
+        if not any(char.isdigit() for char in line) or not any(char.isalpha() for char in line):
+            return False
+        return not any(pattern.search(line) for pattern in self.skip)
+
+
+class RuleBasedExtractor:
+    """Extract lab tests from known layouts without calling the LLM."""
+
+    DEFAULT_MIN_COVERAGE = 0.8  # Share of candidate lines that must parse
+    DEFAULT_MIN_CONFIDENCE = 0.9  # Mean row validity score required
+    MIN_TESTS = 3  # Fewer rows than this is not worth trusting
+
+    def __init__(
+        self,
+        layouts: Optional[Sequence[Dict[str, Any]]] = None,
+        min_coverage: float = DEFAULT_MIN_COVERAGE,
+        min_confidence: float = DEFAULT_MIN_CONFIDENCE
+    ):
+        """
+        Initialize the extractor.
+
+        Args:
+            layouts: Layout definitions ({"name", "signatures", "rows", optional "skip"});
+                default: DEFAULT_LAYOUTS
+            min_coverage: Minimum share of candidate lines parsed as rows
+            min_confidence: Minimum mean row validity score
+        """
+        self.layouts = [
+            LayoutRule(layout["name"], layout["signatures"], layout["rows"], layout.get("skip", ()))
+            for layout in (DEFAULT_LAYOUTS if layouts is None else layouts)
+        ]
+        self.min_coverage = min_coverage
+        self.min_confidence = min_confidence
+
+    @classmethod
+    def from_env(cls) -> Optional["RuleBasedExtractor"]:
+        """
+        Build an extractor from environment variables.
+
+        RULE_EXTRACTOR_ENABLED (default: true), RULE_EXTRACTOR_MIN_COVERAGE
+        (default: 0.8), RULE_EXTRACTOR_MIN_CONFIDENCE (default: 0.9).
+
+        Returns:
+            RuleBasedExtractor instance, or None if the fast path is disabled
+        """
+        if os.getenv("RULE_EXTRACTOR_ENABLED", "true").lower() != "true":
+            return None
+        return cls(
+            min_coverage=float(os.getenv("RULE_EXTRACTOR_MIN_COVERAGE", str(cls.DEFAULT_MIN_COVERAGE))),
+            min_confidence=float(os.getenv("RULE_EXTRACTOR_MIN_CONFIDENCE", str(cls.DEFAULT_MIN_CONFIDENCE)))
+        )
+
+    def register_layout(self, name: str, signatures: Sequence[str], rows: Sequence[str], skip: Sequence[str] = ()):
+        """
+        Add a layout, checked before the existing ones.
+
+        Args:
+            name: Layout name
+            signatures: Signature patterns
+            rows: Row patterns
+            skip: Extra non-result line patterns
+        """
+        self.layouts.insert(0, LayoutRule(name, signatures, rows, skip))
+
+    def match_layout(self, raw_text: str) -> Optional[LayoutRule]:
+        """
+        Find the layout whose signature appears in the text.
+
+        Args:
+            raw_text: Organized OCR text
+
+        Returns:
+            LayoutRule, or None for unknown layouts
+        """
+        for layout in self.layouts:
+            if layout.matches(raw_text):
+                return layout
+        return None
+
+    def parse(self, raw_text: str) -> Optional[Dict[str, Any]]:
+        """
+        Parse the text with the matching layout, without applying thresholds.
+
+        Args:
+            raw_text: Organized OCR text
+
+        Returns:
+            dict: {"layout": str, "tests": [...], "coverage": float, "confidence": float},
+                or None for unknown layouts
+        """
+        layout = self.match_layout(raw_text)
+        if layout is None:
+            return None
+
+        tests = []
+        candidates = 0
+        for line in raw_text.splitlines():
+            line = " ".join(line.split())
+            if not line or any(signature.search(line) for signature in layout.signatures):
+                continue
+            row = layout.parse_line(line)
+            if row is not None:
+                tests.append(row)
+                candidates += 1
+            elif layout.is_candidate(line):
+                candidates += 1
+
+        coverage = len(tests) / candidates if candidates else 0.0
+        confidence = sum(self.score_row(test) for test in tests) / len(tests) if tests else 0.0
+        return {
+            "layout": layout.name,
+            "tests": tests,
+            "coverage": round(coverage, 3),
+            "confidence": round(confidence, 3)
+        }
+
+    def extract(self, raw_text: str, file_path: str = "") -> Optional[Dict[str, Any]]:
+        """
+        Extract structured data if the layout is known and the parse is trustworthy.
+
+        Args:
+            raw_text: Organized OCR text
+            file_path: Optional file path for metadata
+
+        Returns:
+            dict in the extract_structured_data() format with extraction_method
+            "rules", or None when the caller should fall back to the LLM
+        """
+        parsed = self.parse(raw_text)
+        if parsed is None:
+            return None
+        if (len(parsed["tests"]) < self.MIN_TESTS
+                or parsed["coverage"] < self.min_coverage
+                or parsed["confidence"] < self.min_confidence):
+            return None
+
+        return {
+            "raw_text": raw_text,
+            "tests": parsed["tests"],
+            "metadata": {
+                "file_path": file_path,
+                "extraction_status": "success",
+                "total_tests_found": len(parsed["tests"]),
+                "extraction_method": "rules",
+                "layout": parsed["layout"],
+                "coverage": parsed["coverage"],
+                "confidence": parsed["confidence"]
+            }
+        }
+
+    @staticmethod
+    def score_row(test: Dict[str, str]) -> float:
+        """
+        Score how plausible a parsed row is.
+
+        Args:
+            test: Parsed row
+
+        Returns:
+            float: 0.0-1.0; one point each for a numeric value and a
+                well-formed reference range (low <= high)
+        """
+        score = 0.0
+        try:
+            float(test["test_value"].lstrip("<>"))
+            score += 0.5
+        except ValueError:
+            pass
+
+        bounds = re.findall(r'\d+(?:\.\d+)?', test["reference_range"])
+        if len(bounds) == 1 or (len(bounds) == 2 and float(bounds[0]) <= float(bounds[1])):
+            score += 0.5
+        return score
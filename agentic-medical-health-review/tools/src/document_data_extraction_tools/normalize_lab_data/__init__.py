@@ -6,5 +6,10 @@ Provides tools for normalizing lab test parameters to standard formats.
 
 from .normalize_lab_data import normalize_lab_data, normalize_batch
 from .lab_data_normalizer import LabDataNormalizer
+from .normalization_rule_index import NormalizationRuleIndex, get_rule_index
+from .audit_log_writer import AuditLogWriter, get_audit_writer
 
-__all__ = ['normalize_lab_data', 'normalize_batch', 'LabDataNormalizer']
+__all__ = [
+    'normalize_lab_data', 'normalize_batch', 'LabDataNormalizer',
+    'NormalizationRuleIndex', 'get_rule_index', 'AuditLogWriter', 'get_audit_writer'
+]
@@ -0,0 +1,177 @@
+"""
+Audit Log Writer
+
+Background writer for normalization audit logs. LabDataNormalizer hands its
+buffered entries to the writer, which persists them on its own connection
+with multi-row INSERTs, so audit persistence stays off the request's
+critical path. Entries submitted within a short window are coalesced into
+one transaction.
+
+Entries are submitted only after the normalization transaction commits,
+so a rolled-back batch leaves no audit rows, as with synchronous writes.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from models.database_connection import DatabaseConnection
+from tools.src.document_data_extraction_tools.normalize_lab_data.lab_data_normalizer import write_audit_logs
+
+logger = logging.getLogger(__name__)
+
+
+class AuditLogWriter:
+    """Queue-backed background thread that bulk-inserts audit log entries"""
+
+    def __init__(self, batch_size: int = 1000, flush_interval: float = 0.5, max_queue: int = 10000):
+        """
+        Start the writer thread
+
+        Args:
+            batch_size: Maximum entries written per transaction
+            flush_interval: Seconds to wait for more entries before writing a partial batch
+            max_queue: Maximum queued submissions; submit() blocks when full (backpressure)
+        """
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.failed = 0
+        self._queue: "queue.Queue[Optional[List[Dict[str, Any]]]]" = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_env(cls) -> Optional["AuditLogWriter"]:
+        """
+        Build a writer from environment variables
+
+        AUDIT_LOG_ASYNC (default: false), AUDIT_LOG_BATCH_SIZE (default: 1000),
+        AUDIT_LOG_FLUSH_INTERVAL (default: 0.5 seconds).
+
+        Returns:
+            AuditLogWriter instance, or None if audit logs are written synchronously
+        """
+        if os.getenv("AUDIT_LOG_ASYNC", "false").lower() != "true":
+            return None
+        return cls(
+            batch_size=int(os.getenv("AUDIT_LOG_BATCH_SIZE", "1000")),
+            flush_interval=float(os.getenv("AUDIT_LOG_FLUSH_INTERVAL", "0.5"))
+        )
+
+    def submit(self, entries: List[Dict[str, Any]]):
+        """
+        Queue entries for writing
+
+        Args:
+            entries: Audit entries (LabDataNormalizer.operations_log format)
+
+        Raises:
+            RuntimeError: If the writer has been closed
+        """
+        if self._closed:
+            raise RuntimeError("AuditLogWriter is closed")
+        if entries:
+            self._queue.put(list(entries))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every submitted entry has been written (or has failed)
+
+        Args:
+            timeout: Maximum seconds to wait (None: wait indefinitely)
+
+        Returns:
+            bool: True if the queue drained in time
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = 10.0):
+        """
+        Write pending entries and stop the thread
+
+        Args:
+            timeout: Maximum seconds to wait for pending entries
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self):
+        """Thread loop: coalesce submissions into batches and write them."""
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                break
+
+            batch = list(item)
+            taken = 1
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                taken += 1
+                if item is None:
+                    stopping = True
+                    break
+                batch.extend(item)
+
+            self._write(batch)
+            for _ in range(taken):
+                self._queue.task_done()
+
+    def _write(self, entries: List[Dict[str, Any]]):
+        """Write a batch in its own transaction; failures are counted, not raised."""
+        try:
+            with DatabaseConnection() as db:
+                if db.cursor is None:
+                    raise RuntimeError("database connection failed")
+                write_audit_logs(db.cursor, entries, page_size=self.batch_size)
+            self.written += len(entries)
+        except Exception:
+            self.failed += len(entries)
+            logger.exception("Audit log write failed", extra={"entries": len(entries)})
+
+
+_shared_writer: Optional[AuditLogWriter] = None
+_shared_writer_lock = threading.Lock()
+
+
+def get_audit_writer() -> Optional[AuditLogWriter]:
+    """
+    Get the process-wide background audit writer, starting it on first use
+
+    Pending entries are flushed at interpreter exit.
+
+    Returns:
+        AuditLogWriter, or None if AUDIT_LOG_ASYNC is not enabled
+    """
+    global _shared_writer
+    if _shared_writer is None:
+        with _shared_writer_lock:
+            if _shared_writer is None:
+                _shared_writer = AuditLogWriter.from_env()
+                if _shared_writer is not None:
+                    atexit.register(_shared_writer.close)
+    return _shared_writer
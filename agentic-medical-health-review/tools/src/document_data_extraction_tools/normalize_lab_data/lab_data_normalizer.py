@@ -5,24 +5,102 @@ Core normalization logic for lab parameters including:
 - Parameter name standardization
 - Unit conversion
 - Reference range alignment
+
+Rule lookups (rule_lookup_name, rule_lookup_unit, rule_lookup_range) and
+audit writes (audit_write) are timed through pipeline_metrics.
 """
 
 from typing import Tuple, Optional, List, Dict, Any
+import logging
 import uuid
+from psycopg2.extras import execute_values
+from tools.src.document_data_extraction_tools.pipeline_metrics import span
+
+logger = logging.getLogger(__name__)
+
+# Columns written to normalization_audit_logs, in buffer-entry key order
+AUDIT_LOG_COLUMNS = (
+    'parameter_id', 'operation', 'status',
+    'original_value', 'original_unit', 'original_name',
+    'normalized_value', 'standard_unit', 'canonical_name',
+    'conversion_factor', 'failure_reason'
+)
+
+
+def write_audit_logs(cursor, entries: List[Dict[str, Any]], page_size: int = 1000):
+    """
+    Insert audit log entries with multi-row INSERT statements
+    
+    Args:
+        cursor: Open database cursor (caller owns the transaction)
+        entries: Buffered entries from LabDataNormalizer.operations_log
+        page_size: Rows per INSERT statement
+    """
+    if not entries:
+        return
+    with span("audit_write"):
+        execute_values(
+            cursor,
+            f"INSERT INTO normalization_audit_logs ({', '.join(AUDIT_LOG_COLUMNS)}) VALUES %s",
+            [tuple(entry[column] for column in AUDIT_LOG_COLUMNS) for entry in entries],
+            page_size=page_size
+        )
 
 
 class LabDataNormalizer:
     """Core normalization logic for lab parameters"""
     
-    def __init__(self, db_connection):
+    # Buffered audit entries are flushed once this many are pending
+    DEFAULT_AUDIT_FLUSH_THRESHOLD = 500
+    
+    def __init__(
+        self,
+        db_connection,
+        rule_index=None,
+        audit_writer=None,
+        audit_flush_threshold: Optional[int] = DEFAULT_AUDIT_FLUSH_THRESHOLD
+    ):
         """
         Initialize normalizer with database connection
         
         Args:
             db_connection: DatabaseConnection instance
+            rule_index: Optional NormalizationRuleIndex; when given, rules are
+                looked up in memory instead of querying the reference tables
+            audit_writer: Optional AuditLogWriter; when given, audit entries are
+                handed to its background thread instead of written on db_connection.
+                Call save_audit_logs() only after the transaction commits.
+            audit_flush_threshold: Pending entries that trigger a flush
+                (None: only flush on save_audit_logs()); ignored with an
+                audit_writer, which must not see uncommitted operations
         """
         self.db = db_connection
+        self.rule_index = rule_index
+        self.audit_writer = audit_writer
+        self.audit_flush_threshold = audit_flush_threshold
         self.operations_log: List[Dict[str, Any]] = []
+        self.operations_count = 0  # All entries logged, including flushed ones
+        self.audit_logs_saved = 0
+        self.audit_logs_failed = 0  # Entries dropped by failed bulk writes
+        self._parameter_context: Dict[str, Dict[str, Any]] = {}
+    
+    def set_parameter_context(self, parameter_id: str, original_name: str, original_value: float):
+        """
+        Record the source name and value of a parameter
+        
+        Audit entries for the parameter that do not carry them (e.g. range
+        alignment) are filled in from this context, since both columns are
+        required in normalization_audit_logs.
+        
+        Args:
+            parameter_id: UUID of the health parameter
+            original_name: Original parameter name from lab report
+            original_value: Original measured value
+        """
+        self._parameter_context[parameter_id] = {
+            'original_name': original_name,
+            'original_value': original_value
+        }
     
     def normalize_parameter_name(self, original_name: str, parameter_id: str) -> Tuple[Optional[str], float]:
         """
@@ -37,16 +115,20 @@ class LabDataNormalizer:
             Returns (None, 0.0) if no mapping found
         """
         try:
-            # Query parameter_name_mappings table
-            self.db.cursor.execute("""
-                SELECT canonical_name, confidence_score
-                FROM parameter_name_mappings
-                WHERE LOWER(variant_name) = LOWER(%s)
-                ORDER BY confidence_score DESC
-                LIMIT 1
-            """, (original_name,))
-            
-            result = self.db.cursor.fetchone()
+            with span("rule_lookup_name"):
+                if self.rule_index is not None:
+                    result = self.rule_index.get_name_mapping(original_name)
+                else:
+                    # Query parameter_name_mappings table
+                    self.db.cursor.execute("""
+                        SELECT canonical_name, confidence_score
+                        FROM parameter_name_mappings
+                        WHERE LOWER(variant_name) = LOWER(%s)
+                        ORDER BY confidence_score DESC
+                        LIMIT 1
+                    """, (original_name,))
+                
+                    result = self.db.cursor.fetchone()
             
             if result:
                 canonical_name = result['canonical_name']
@@ -116,16 +198,20 @@ class LabDataNormalizer:
             return value, None, None, 0.5
         
         try:
-            # Query unit_conversion_rules table
-            self.db.cursor.execute("""
-                SELECT target_unit, conversion_factor, confidence_score
-                FROM unit_conversion_rules
-                WHERE canonical_parameter_name = %s
-                  AND LOWER(source_unit) = LOWER(%s)
-                LIMIT 1
-            """, (canonical_name, original_unit))
-            
-            result = self.db.cursor.fetchone()
+            with span("rule_lookup_unit"):
+                if self.rule_index is not None:
+                    result = self.rule_index.get_unit_conversion(canonical_name, original_unit)
+                else:
+                    # Query unit_conversion_rules table
+                    self.db.cursor.execute("""
+                        SELECT target_unit, conversion_factor, confidence_score
+                        FROM unit_conversion_rules
+                        WHERE canonical_parameter_name = %s
+                          AND LOWER(source_unit) = LOWER(%s)
+                        LIMIT 1
+                    """, (canonical_name, original_unit))
+                
+                    result = self.db.cursor.fetchone()
             
             if result:
                 target_unit = result['target_unit']
@@ -148,14 +234,18 @@ class LabDataNormalizer:
                 return normalized_value, target_unit, conversion_factor, confidence
             else:
                 # Check if original unit IS the standard unit
-                self.db.cursor.execute("""
-                    SELECT target_unit
-                    FROM unit_conversion_rules
-                    WHERE canonical_parameter_name = %s
-                    LIMIT 1
-                """, (canonical_name,))
-                
-                standard_result = self.db.cursor.fetchone()
+                with span("rule_lookup_unit"):
+                    if self.rule_index is not None:
+                        standard_result = self.rule_index.get_standard_unit(canonical_name)
+                    else:
+                        self.db.cursor.execute("""
+                            SELECT target_unit
+                            FROM unit_conversion_rules
+                            WHERE canonical_parameter_name = %s
+                            LIMIT 1
+                        """, (canonical_name,))
+                    
+                        standard_result = self.db.cursor.fetchone()
                 
                 if standard_result and standard_result['target_unit'].lower() == original_unit.lower():
                     # Already in standard unit
@@ -212,16 +302,20 @@ class LabDataNormalizer:
             Returns (None, None, 0.5) if no range found
         """
         try:
-            # Query standard_reference_ranges table
-            self.db.cursor.execute("""
-                SELECT range_min, range_max, confidence_score
-                FROM standard_reference_ranges
-                WHERE canonical_parameter_name = %s
-                  AND standard_unit = %s
-                LIMIT 1
-            """, (canonical_name, standard_unit))
-            
-            result = self.db.cursor.fetchone()
+            with span("rule_lookup_range"):
+                if self.rule_index is not None:
+                    result = self.rule_index.get_reference_range(canonical_name, standard_unit)
+                else:
+                    # Query standard_reference_ranges table
+                    self.db.cursor.execute("""
+                        SELECT range_min, range_max, confidence_score
+                        FROM standard_reference_ranges
+                        WHERE canonical_parameter_name = %s
+                          AND standard_unit = %s
+                        LIMIT 1
+                    """, (canonical_name, standard_unit))
+                
+                    result = self.db.cursor.fetchone()
             
             if result:
                 range_min = float(result['range_min']) if result['range_min'] else None
@@ -289,50 +383,53 @@ class LabDataNormalizer:
             conversion_factor: Unit conversion factor
             failure_reason: Reason for failure if status is failed or flagged
         """
+        context = self._parameter_context.get(parameter_id, {})
+        self.operations_count += 1
         self.operations_log.append({
             'parameter_id': parameter_id,
             'operation': operation,
             'status': status,
-            'original_value': original_value,
+            'original_value': original_value if original_value is not None else context.get('original_value'),
             'original_unit': original_unit,
-            'original_name': original_name,
+            'original_name': original_name if original_name is not None else context.get('original_name'),
             'normalized_value': normalized_value,
             'standard_unit': standard_unit,
             'canonical_name': canonical_name,
             'conversion_factor': conversion_factor,
             'failure_reason': failure_reason
         })
+        
+        if (self.audit_writer is None and self.audit_flush_threshold
+                and len(self.operations_log) >= self.audit_flush_threshold):
+            self.save_audit_logs()
     
     def save_audit_logs(self):
         """
-        Persist all operation logs to normalization_audit_logs table
+        Persist buffered operation logs to normalization_audit_logs table
         
         This should be called after all normalization operations are complete
-        to ensure audit trail is saved to database
+        to ensure audit trail is saved to database. Entries are written with
+        multi-row INSERTs inside a savepoint, so a failed audit write does not
+        abort the caller's transaction. With an audit_writer, entries are
+        queued for its background thread instead, so call it after the
+        commit. The buffer is cleared.
         """
-        for log in self.operations_log:
-            try:
-                self.db.cursor.execute("""
-                    INSERT INTO normalization_audit_logs (
-                        parameter_id, operation, status,
-                        original_value, original_unit, original_name,
-                        normalized_value, standard_unit, canonical_name,
-                        conversion_factor, failure_reason
-                    ) VALUES (
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                    )
-                """, (
-                    log['parameter_id'],
-                    log['operation'],
-                    log['status'],
-                    log['original_value'],
-                    log['original_unit'],
-                    log['original_name'],
-                    log['normalized_value'],
-                    log['standard_unit'],
-                    log['canonical_name'],
-                    log['conversion_factor'],
-                    log['failure_reason']
-                ))
-            except Exception as e:
-                print(f"Error saving audit log: {e}")
+        entries = self.operations_log
+        if not entries:
+            return
+        self.operations_log = []
+        
+        if self.audit_writer is not None:
+            self.audit_writer.submit(entries)
+            self.audit_logs_saved += len(entries)
+            return
+        
+        try:
+            self.db.cursor.execute("SAVEPOINT save_audit_logs")
+            write_audit_logs(self.db.cursor, entries)
+            self.db.cursor.execute("RELEASE SAVEPOINT save_audit_logs")
+            self.audit_logs_saved += len(entries)
+        except Exception:
+            self.db.cursor.execute("ROLLBACK TO SAVEPOINT save_audit_logs")
+            self.audit_logs_failed += len(entries)
+            logger.exception("Audit log write failed", extra={"entries": len(entries)})
@@ -0,0 +1,276 @@
+"""
+Normalization Rule Index
+
+In-memory index of the normalization reference tables:
+- parameter_name_mappings   (variant name -> canonical name)
+- unit_conversion_rules     (canonical name + source unit -> target unit, factor)
+- standard_reference_ranges (canonical name + standard unit -> range)
+
+Rules are loaded once into dicts with pre-lowercased keys, so normalizing a
+parameter needs no SQL round trips. The index reloads when a watermark
+(row counts and MAX(updated_at) of the three tables) changes; the watermark
+is checked at most once per refresh interval.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from models.database_connection import DatabaseConnection
+
+
+class NormalizationRuleIndex:
+    """Hashed in-memory lookup tables for lab data normalization rules"""
+
+    # Row counts catch deletes, MAX(updated_at) catches inserts and updates
+    WATERMARK_QUERY = """
+        SELECT
+            (SELECT COUNT(*) FROM parameter_name_mappings) AS name_count,
+            (SELECT MAX(updated_at) FROM parameter_name_mappings) AS name_updated_at,
+            (SELECT COUNT(*) FROM unit_conversion_rules) AS unit_count,
+            (SELECT MAX(updated_at) FROM unit_conversion_rules) AS unit_updated_at,
+            (SELECT COUNT(*) FROM standard_reference_ranges) AS range_count,
+            (SELECT MAX(updated_at) FROM standard_reference_ranges) AS range_updated_at
+    """
+
+    # Rule queries; {join} restricts them to a batch (see load_for_names())
+    NAME_QUERY = """
+        SELECT m.variant_name, m.canonical_name, m.confidence_score
+        FROM parameter_name_mappings m {join}
+        ORDER BY m.confidence_score DESC
+    """
+    UNIT_QUERY = """
+        SELECT r.canonical_parameter_name, r.source_unit, r.target_unit,
+               r.conversion_factor, r.confidence_score
+        FROM unit_conversion_rules r {join}
+        ORDER BY r.confidence_score DESC, r.created_at
+    """
+    RANGE_QUERY = """
+        SELECT r.canonical_parameter_name, r.standard_unit,
+               r.range_min, r.range_max, r.confidence_score
+        FROM standard_reference_ranges r {join}
+        ORDER BY (r.age_min IS NULL AND r.age_max IS NULL AND r.gender IS NULL) DESC,
+                 r.confidence_score DESC, r.created_at
+    """
+
+    def __init__(self, refresh_interval: float = 60.0):
+        """
+        Initialize an empty index (loaded on first refresh)
+
+        Args:
+            refresh_interval: Minimum seconds between watermark checks
+        """
+        self.refresh_interval = refresh_interval
+        self.watermark: Optional[Tuple] = None
+        self.loaded_at: Optional[float] = None
+        self._checked_at: Optional[float] = None
+        self._name_mappings: Dict[str, Dict[str, Any]] = {}
+        self._unit_conversions: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._standard_units: Dict[str, Dict[str, Any]] = {}
+        self._reference_ranges: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional["NormalizationRuleIndex"]:
+        """
+        Build an index from environment variables
+
+        NORMALIZATION_RULE_INDEX_ENABLED (default: true),
+        NORMALIZATION_RULE_REFRESH_SECONDS (default: 60).
+
+        Returns:
+            NormalizationRuleIndex instance, or None if disabled (per-parameter SQL lookups)
+        """
+        if os.getenv("NORMALIZATION_RULE_INDEX_ENABLED", "true").lower() != "true":
+            return None
+        return cls(refresh_interval=float(os.getenv("NORMALIZATION_RULE_REFRESH_SECONDS", "60")))
+
+    def ensure_fresh(self, db=None):
+        """
+        Reload the rules if the index is empty or the tables changed
+
+        The watermark query runs at most once per refresh_interval.
+
+        Args:
+            db: Optional open DatabaseConnection to reuse (a new one is opened otherwise)
+        """
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.refresh_interval:
+            return
+
+        if db is None:
+            with DatabaseConnection() as new_db:
+                self._refresh(new_db, now)
+        else:
+            self._refresh(db, now)
+
+    def _refresh(self, db, now: float):
+        """Check the watermark and reload if it moved."""
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.refresh_interval:
+                return
+
+            db.cursor.execute(self.WATERMARK_QUERY)
+            row = db.cursor.fetchone()
+            watermark = tuple(row.values())
+            if watermark != self.watermark:
+                self._load(db)
+                self.watermark = watermark
+                self.loaded_at = time.time()
+            self._checked_at = now
+
+    def _load(self, db):
+        """Load all three rule tables and swap in the new maps."""
+        db.cursor.execute(self.NAME_QUERY.format(join=""))
+        name_rows = db.cursor.fetchall()
+        db.cursor.execute(self.UNIT_QUERY.format(join=""))
+        unit_rows = db.cursor.fetchall()
+        db.cursor.execute(self.RANGE_QUERY.format(join=""))
+        self._populate(name_rows, unit_rows, db.cursor.fetchall())
+
+    @classmethod
+    def load_for_names(cls, db, parameter_names) -> "NormalizationRuleIndex":
+        """
+        Build a one-off index holding only the rules a batch needs
+
+        Runs three set-based queries joined against unnest() arrays: name
+        mappings for the batch's names, then unit and range rules for the
+        canonical names they map to. Used when the shared index is disabled.
+
+        Args:
+            db: Open DatabaseConnection
+            parameter_names: Original parameter names in the batch
+
+        Returns:
+            NormalizationRuleIndex that never refreshes
+        """
+        index = cls(refresh_interval=float("inf"))
+        names = sorted({name.lower() for name in parameter_names if name})
+
+        db.cursor.execute(
+            cls.NAME_QUERY.format(join="JOIN unnest(%s::text[]) AS b(name) ON LOWER(m.variant_name) = b.name"),
+            (names,)
+        )
+        name_rows = db.cursor.fetchall()
+        canonical_names = sorted({row['canonical_name'] for row in name_rows})
+
+        join = "JOIN unnest(%s::text[]) AS b(name) ON r.canonical_parameter_name = b.name"
+        db.cursor.execute(cls.UNIT_QUERY.format(join=join), (canonical_names,))
+        unit_rows = db.cursor.fetchall()
+        db.cursor.execute(cls.RANGE_QUERY.format(join=join), (canonical_names,))
+        index._populate(name_rows, unit_rows, db.cursor.fetchall())
+
+        index.loaded_at = time.time()
+        index._checked_at = time.monotonic()
+        return index
+
+    def _populate(self, name_rows, unit_rows, range_rows):
+        """Build the lookup maps from rule rows and swap them in."""
+        name_mappings = {}
+        for row in name_rows:
+            # Highest confidence wins, like ORDER BY confidence_score DESC LIMIT 1
+            name_mappings.setdefault(row['variant_name'].lower(), {
+                'canonical_name': row['canonical_name'],
+                'confidence_score': row['confidence_score']
+            })
+
+        unit_conversions = {}
+        standard_units = {}
+        for row in unit_rows:
+            canonical_name = row['canonical_parameter_name']
+            unit_conversions.setdefault((canonical_name, row['source_unit'].lower()), {
+                'target_unit': row['target_unit'],
+                'conversion_factor': row['conversion_factor'],
+                'confidence_score': row['confidence_score']
+            })
+            standard_units.setdefault(canonical_name, {'target_unit': row['target_unit']})
+
+        reference_ranges = {}
+        for row in range_rows:
+            # General (not age/gender-specific) ranges come first
+            reference_ranges.setdefault((row['canonical_parameter_name'], row['standard_unit']), {
+                'range_min': row['range_min'],
+                'range_max': row['range_max'],
+                'confidence_score': row['confidence_score']
+            })
+
+        # Rebinding the attributes is atomic; readers see the old or the new maps
+        self._name_mappings = name_mappings
+        self._unit_conversions = unit_conversions
+        self._standard_units = standard_units
+        self._reference_ranges = reference_ranges
+
+    def invalidate(self):
+        """Force a watermark check on the next ensure_fresh() call"""
+        self._checked_at = None
+        self.watermark = None
+
+    def get_name_mapping(self, original_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up the canonical name for a parameter name (case-insensitive)
+
+        Returns:
+            Dict with canonical_name, confidence_score, or None
+        """
+        return self._name_mappings.get(original_name.lower())
+
+    def get_unit_conversion(self, canonical_name: str, original_unit: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up the conversion rule for a parameter's unit (unit is case-insensitive)
+
+        Returns:
+            Dict with target_unit, conversion_factor, confidence_score, or None
+        """
+        return self._unit_conversions.get((canonical_name, original_unit.lower()))
+
+    def get_standard_unit(self, canonical_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up the standard (target) unit of a parameter
+
+        Returns:
+            Dict with target_unit, or None
+        """
+        return self._standard_units.get(canonical_name)
+
+    def get_reference_range(self, canonical_name: str, standard_unit: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up the standard reference range of a parameter in a unit
+
+        Returns:
+            Dict with range_min, range_max, confidence_score, or None
+        """
+        return self._reference_ranges.get((canonical_name, standard_unit))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Sizes of the loaded maps
+
+        Returns:
+            Dict with entry counts and the load timestamp
+        """
+        return {
+            'name_mappings': len(self._name_mappings),
+            'unit_conversions': len(self._unit_conversions),
+            'reference_ranges': len(self._reference_ranges),
+            'loaded_at': self.loaded_at
+        }
+
+
+_shared_index: Optional[NormalizationRuleIndex] = None
+_shared_index_lock = threading.Lock()
+
+
+def get_rule_index() -> Optional[NormalizationRuleIndex]:
+    """
+    Get the process-wide rule index, creating it on first use
+
+    Returns:
+        NormalizationRuleIndex, or None if disabled via NORMALIZATION_RULE_INDEX_ENABLED
+    """
+    global _shared_index
+    if _shared_index is None:
+        with _shared_index_lock:
+            if _shared_index is None:
+                _shared_index = NormalizationRuleIndex.from_env()
+    return _shared_index
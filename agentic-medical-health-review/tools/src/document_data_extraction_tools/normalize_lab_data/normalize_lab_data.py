@@ -11,12 +11,46 @@ This tool integrates with PostgreSQL database to:
 - Write normalized data to normalized_parameters table
 - Log all operations to normalization_audit_logs table
 - Update health_parameters status
+
+Stage latencies (resolve_rules, insert_normalized, update_status) and
+per-status parameter counts are recorded through pipeline_metrics.
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Tuple
+import logging
+import os
+import time
 import uuid
+from psycopg2.extras import execute_values
 from models.database_connection import DatabaseConnection
 from tools.src.document_data_extraction_tools.normalize_lab_data.lab_data_normalizer import LabDataNormalizer
+from tools.src.document_data_extraction_tools.normalize_lab_data.normalization_rule_index import (
+    NormalizationRuleIndex,
+    get_rule_index
+)
+from tools.src.document_data_extraction_tools.normalize_lab_data.audit_log_writer import get_audit_writer
+from tools.src.document_data_extraction_tools.pipeline_metrics import (
+    NORMALIZED_PARAMETERS_TOTAL,
+    increment,
+    observe_stage,
+    span
+)
+
+logger = logging.getLogger(__name__)
+
+# Rows per multi-row INSERT in normalize_batch
+BATCH_PAGE_SIZE = 1000
+
+# normalize_batch stages reported to pipeline_metrics; "normalize" and
+# "audit_logs" are already covered by the normalizer's own spans
+METERED_BATCH_STAGES = ("resolve_rules", "insert_normalized", "update_status")
+
+NORMALIZED_PARAMETER_COLUMNS = """
+    normalized_parameter_id, original_parameter_id, user_id,
+    canonical_name, original_value, original_unit,
+    normalized_value, standard_unit, conversion_factor,
+    reference_range_min, reference_range_max, normalization_confidence
+"""
 
 
 def normalize_lab_data(
@@ -67,133 +101,207 @@ def normalize_lab_data(
         >>> print(result['normalized_parameter']['normalized_value'])
         6.4935
     """
-    result = {
-        "success": False,
-        "normalized_parameter": None,
-        "operations_logged": 0,
-        "errors": [],
-        "warnings": [],
-        "flagged_for_review": False
-    }
+    result = _new_result()
     
     try:
         with DatabaseConnection() as db:
-            normalizer = LabDataNormalizer(db)
+            # Rules come from the in-memory index (reloaded when the tables change)
+            rule_index = get_rule_index()
+            if rule_index is not None:
+                with span("resolve_rules"):
+                    rule_index.ensure_fresh(db)
+            normalizer = _new_normalizer(db, rule_index)
             
-            # Step 1: Normalize parameter name
-            canonical_name, name_confidence = normalizer.normalize_parameter_name(
-                parameter_name, parameter_id
+            # Steps 1-3: name, unit and reference range
+            status, normalized_row = _normalize_parameter(
+                normalizer, result, parameter_id, user_id, parameter_name, value, unit
             )
             
-            if not canonical_name:
-                result["errors"].append(f"Could not map parameter name: {parameter_name}")
-                result["flagged_for_review"] = True
-                normalizer.save_audit_logs()
-                result["operations_logged"] = len(normalizer.operations_log)
-                
-                # Update health_parameters status to 'flagged'
-                db.cursor.execute("""
-                    UPDATE health_parameters
-                    SET normalization_status = 'flagged'
-                    WHERE parameter_id = %s
-                """, (parameter_id,))
-                
-                return result
-            
-            # Step 2: Convert unit
-            normalized_value, standard_unit, conversion_factor, unit_confidence = normalizer.convert_unit(
-                value, unit, canonical_name, parameter_id
-            )
+            # Step 4: Save normalized parameter to normalized_parameters table
+            if normalized_row is not None:
+                with span("insert_normalized"):
+                    db.cursor.execute(f"""
+                        INSERT INTO normalized_parameters ({NORMALIZED_PARAMETER_COLUMNS})
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    """, normalized_row)
             
-            if normalized_value is None:
-                result["errors"].append(f"Could not convert unit: {unit}")
-                result["flagged_for_review"] = True
-                normalizer.save_audit_logs()
-                result["operations_logged"] = len(normalizer.operations_log)
-                
-                # Update health_parameters status to 'flagged'
+            # Step 5: Update health_parameters status ('normalized' or 'flagged')
+            with span("update_status"):
                 db.cursor.execute("""
                     UPDATE health_parameters
-                    SET normalization_status = 'flagged'
+                    SET normalization_status = %s
                     WHERE parameter_id = %s
-                """, (parameter_id,))
-                
-                return result
-            
-            # Step 3: Align reference range
-            range_min, range_max, range_confidence = normalizer.align_reference_range(
-                canonical_name, standard_unit, parameter_id
-            )
-            
-            if range_min is None and range_max is None:
-                result["warnings"].append(f"No reference range available for {canonical_name}")
-            
-            # Calculate overall confidence (average of all three operations)
-            overall_confidence = (name_confidence + unit_confidence + range_confidence) / 3.0
-            
-            # Step 4: Save normalized parameter to normalized_parameters table
-            normalized_param_id = str(uuid.uuid4())
-            
-            db.cursor.execute("""
-                INSERT INTO normalized_parameters (
-                    normalized_parameter_id, original_parameter_id, user_id,
-                    canonical_name, original_value, original_unit,
-                    normalized_value, standard_unit, conversion_factor,
-                    reference_range_min, reference_range_max, normalization_confidence
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                )
-            """, (
-                normalized_param_id, parameter_id, user_id,
-                canonical_name, value, unit,
-                normalized_value, standard_unit, conversion_factor,
-                range_min, range_max, overall_confidence
-            ))
-            
-            # Step 5: Update health_parameters status to 'normalized'
-            db.cursor.execute("""
-                UPDATE health_parameters
-                SET normalization_status = 'normalized'
-                WHERE parameter_id = %s
-            """, (parameter_id,))
+                """, (status, parameter_id))
             
             # Step 6: Save audit logs to normalization_audit_logs table
-            normalizer.save_audit_logs()
-            
-            # Build success result
-            result["success"] = True
-            result["normalized_parameter"] = {
-                "normalized_parameter_id": normalized_param_id,
-                "original_parameter_id": parameter_id,
-                "user_id": user_id,
-                "canonical_name": canonical_name,
-                "original_value": value,
-                "original_unit": unit,
-                "normalized_value": normalized_value,
-                "standard_unit": standard_unit,
-                "conversion_factor": conversion_factor,
-                "reference_range_min": range_min,
-                "reference_range_max": range_max,
-                "normalization_confidence": overall_confidence
-            }
-            result["operations_logged"] = len(normalizer.operations_log)
-            
-            # Flag for review if confidence is low
-            if overall_confidence < 0.7:
-                result["flagged_for_review"] = True
-                result["warnings"].append(f"Low confidence score: {overall_confidence:.2f}")
+            if normalizer.audit_writer is None:
+                normalizer.save_audit_logs()
             
     except Exception as e:
         result["errors"].append(f"Unexpected error: {str(e)}")
         result["flagged_for_review"] = True
+        increment(NORMALIZED_PARAMETERS_TOTAL, status="failed")
+    else:
+        increment(NORMALIZED_PARAMETERS_TOTAL, status=status)
+        _submit_committed_audit_logs(normalizer)
     
     return result
 
 
+def _submit_committed_audit_logs(normalizer: LabDataNormalizer):
+    """
+    Hand committed operations to the background audit writer
+    
+    Runs after the normalization transaction has committed, so a failure
+    here (e.g. the writer was closed at shutdown) loses audit rows only
+    and is logged instead of failing the saved results.
+    """
+    if normalizer.audit_writer is None:
+        return
+    entries = len(normalizer.operations_log)
+    try:
+        normalizer.save_audit_logs()
+    except Exception:
+        logger.exception("Audit log submission failed after commit", extra={"entries": entries})
+
+
+def _new_normalizer(db, rule_index) -> LabDataNormalizer:
+    """
+    Create a normalizer with the configured audit log persistence
+    
+    AUDIT_LOG_FLUSH_THRESHOLD (default: 500) sets how many buffered entries
+    trigger a bulk write; AUDIT_LOG_ASYNC=true hands them to the background
+    AuditLogWriter.
+    """
+    return LabDataNormalizer(
+        db,
+        rule_index=rule_index,
+        audit_writer=get_audit_writer(),
+        audit_flush_threshold=int(os.getenv(
+            "AUDIT_LOG_FLUSH_THRESHOLD", str(LabDataNormalizer.DEFAULT_AUDIT_FLUSH_THRESHOLD)
+        ))
+    )
+
+
+def _new_result() -> Dict[str, Any]:
+    """Empty per-parameter result dict"""
+    return {
+        "success": False,
+        "normalized_parameter": None,
+        "operations_logged": 0,
+        "errors": [],
+        "warnings": [],
+        "flagged_for_review": False
+    }
+
+
+def _normalize_parameter(
+    normalizer: LabDataNormalizer,
+    result: Dict[str, Any],
+    parameter_id: str,
+    user_id: str,
+    parameter_name: str,
+    value: float,
+    unit: Optional[str]
+) -> Tuple[str, Optional[tuple]]:
+    """
+    Run the name, unit and reference range steps for one parameter
+    
+    Fills in `result` and buffers audit entries on the normalizer; nothing
+    is written to the database here.
+    
+    Args:
+        normalizer: LabDataNormalizer (shared across a batch)
+        result: Result dict from _new_result(), updated in place
+        parameter_id: UUID of the health parameter
+        user_id: User ID
+        parameter_name: Original parameter name
+        value: Measured value
+        unit: Original unit (optional)
+    
+    Returns:
+        Tuple of (health_parameters status, normalized_parameters row or None)
+    """
+    logs_before = normalizer.operations_count
+    normalizer.set_parameter_context(parameter_id, parameter_name, value)
+    
+    # Step 1: Normalize parameter name
+    canonical_name, name_confidence = normalizer.normalize_parameter_name(
+        parameter_name, parameter_id
+    )
+    
+    if not canonical_name:
+        result["errors"].append(f"Could not map parameter name: {parameter_name}")
+        result["flagged_for_review"] = True
+        result["operations_logged"] = normalizer.operations_count - logs_before
+        return 'flagged', None
+    
+    # Step 2: Convert unit
+    normalized_value, standard_unit, conversion_factor, unit_confidence = normalizer.convert_unit(
+        value, unit, canonical_name, parameter_id
+    )
+    
+    if normalized_value is None:
+        result["errors"].append(f"Could not convert unit: {unit}")
+        result["flagged_for_review"] = True
+        result["operations_logged"] = normalizer.operations_count - logs_before
+        return 'flagged', None
+    
+    # Step 3: Align reference range
+    range_min, range_max, range_confidence = normalizer.align_reference_range(
+        canonical_name, standard_unit, parameter_id
+    )
+    
+    if range_min is None and range_max is None:
+        result["warnings"].append(f"No reference range available for {canonical_name}")
+    
+    # Calculate overall confidence (average of all three operations)
+    overall_confidence = (name_confidence + unit_confidence + range_confidence) / 3.0
+    
+    normalized_param_id = str(uuid.uuid4())
+    
+    # Build success result
+    result["success"] = True
+    result["normalized_parameter"] = {
+        "normalized_parameter_id": normalized_param_id,
+        "original_parameter_id": parameter_id,
+        "user_id": user_id,
+        "canonical_name": canonical_name,
+        "original_value": value,
+        "original_unit": unit,
+        "normalized_value": normalized_value,
+        "standard_unit": standard_unit,
+        "conversion_factor": conversion_factor,
+        "reference_range_min": range_min,
+        "reference_range_max": range_max,
+        "normalization_confidence": overall_confidence
+    }
+    result["operations_logged"] = normalizer.operations_count - logs_before
+    
+    # Flag for review if confidence is low
+    if overall_confidence < 0.7:
+        result["flagged_for_review"] = True
+        result["warnings"].append(f"Low confidence score: {overall_confidence:.2f}")
+    
+    normalized_row = (
+        normalized_param_id, parameter_id, user_id,
+        canonical_name, value, unit,
+        normalized_value, standard_unit, conversion_factor,
+        range_min, range_max, overall_confidence
+    )
+    return 'normalized', normalized_row
+
+
 def normalize_batch(parameters: list) -> Dict[str, Any]:
     """
     Normalize multiple lab parameters in batch
     
+    All parameters share one connection and one transaction. Rules are
+    resolved once for the whole batch (rule index, or three set-based queries
+    when the index is disabled), normalized rows are written with multi-row
+    INSERTs, statuses are updated in a single UPDATE and audit logs are
+    saved together. If any write fails the whole batch is rolled back.
+    
     Args:
         parameters: List of dicts, each containing:
             - parameter_id, user_id, parameter_name, value, unit (optional)
@@ -204,26 +312,113 @@ def normalize_batch(parameters: list) -> Dict[str, Any]:
             - successful: Number of successful normalizations
             - failed: Number of failed normalizations
             - flagged: Number flagged for review
-            - results: List of individual results
+            - results: List of individual results (same order as parameters)
+            - rolled_back: True if the transaction was rolled back and nothing
+              in the batch was saved (every result then carries the error)
+            - error: The error that rolled the batch back, else None
+            - timings: Seconds spent per stage (resolve_rules, normalize,
+              insert_normalized, update_status, audit_logs, total)
     """
     batch_result = {
         "total": len(parameters),
         "successful": 0,
         "failed": 0,
         "flagged": 0,
-        "results": []
+        "results": [],
+        "rolled_back": False,
+        "error": None,
+        "timings": {}
     }
+    timings = batch_result["timings"]
+    started = stage_started = time.perf_counter()
     
-    for param in parameters:
-        result = normalize_lab_data(
-            parameter_id=param['parameter_id'],
-            user_id=param['user_id'],
-            parameter_name=param['parameter_name'],
-            value=param['value'],
-            unit=param.get('unit'),
-            reference_range=param.get('reference_range')
-        )
-        
+    def _finish_stage(stage: str):
+        nonlocal stage_started
+        now = time.perf_counter()
+        timings[stage] = round(now - stage_started, 6)
+        if stage in METERED_BATCH_STAGES:
+            observe_stage(stage, now - stage_started)
+        stage_started = now
+    
+    results: List[Dict[str, Any]] = []
+    try:
+        with DatabaseConnection() as db:
+            # Stage 1: resolve the rules for the whole batch
+            rule_index = get_rule_index()
+            if rule_index is not None:
+                rule_index.ensure_fresh(db)
+            else:
+                rule_index = NormalizationRuleIndex.load_for_names(
+                    db, [param['parameter_name'] for param in parameters]
+                )
+            normalizer = _new_normalizer(db, rule_index)
+            _finish_stage("resolve_rules")
+            
+            # Stage 2: normalize in memory
+            parameter_ids = []
+            statuses = []
+            normalized_rows = []
+            for param in parameters:
+                result = _new_result()
+                status, normalized_row = _normalize_parameter(
+                    normalizer, result,
+                    param['parameter_id'], param['user_id'], param['parameter_name'],
+                    param['value'], param.get('unit')
+                )
+                results.append(result)
+                parameter_ids.append(param['parameter_id'])
+                statuses.append(status)
+                if normalized_row is not None:
+                    normalized_rows.append(normalized_row)
+            _finish_stage("normalize")
+            
+            # Stage 3: multi-row INSERT into normalized_parameters
+            if normalized_rows:
+                execute_values(
+                    db.cursor,
+                    f"INSERT INTO normalized_parameters ({NORMALIZED_PARAMETER_COLUMNS}) VALUES %s",
+                    normalized_rows,
+                    page_size=BATCH_PAGE_SIZE
+                )
+            _finish_stage("insert_normalized")
+            
+            # Stage 4: one UPDATE for all statuses
+            if parameter_ids:
+                db.cursor.execute("""
+                    UPDATE health_parameters AS hp
+                    SET normalization_status = batch.status::normalization_status
+                    FROM unnest(%s::uuid[], %s::text[]) AS batch(parameter_id, status)
+                    WHERE hp.parameter_id = batch.parameter_id
+                """, (parameter_ids, statuses))
+            _finish_stage("update_status")
+            
+            # Stage 5: audit trail
+            if normalizer.audit_writer is None:
+                normalizer.save_audit_logs()
+            _finish_stage("audit_logs")
+            
+    except Exception as e:
+        # The transaction was rolled back, so nothing in the batch was saved
+        batch_result["rolled_back"] = True
+        batch_result["error"] = str(e) or type(e).__name__
+        results = []
+        for _ in parameters:
+            result = _new_result()
+            result["errors"].append(f"Unexpected error: {str(e)}")
+            result["flagged_for_review"] = True
+            results.append(result)
+        increment(NORMALIZED_PARAMETERS_TOTAL, len(parameters), status="failed")
+    else:
+        # Counted only once the rows are committed
+        for status in ("normalized", "flagged"):
+            count = statuses.count(status)
+            if count:
+                increment(NORMALIZED_PARAMETERS_TOTAL, count, status=status)
+        _submit_committed_audit_logs(normalizer)
+    
+    timings["total"] = round(time.perf_counter() - started, 6)
+    
+    for result in results:
         batch_result["results"].append(result)
         
         if result['success']:
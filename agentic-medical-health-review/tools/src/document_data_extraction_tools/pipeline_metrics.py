@@ -0,0 +1,373 @@
+"""
+Document Pipeline Metrics
+
+Per-stage latency histograms and counters for the document pipeline
+(PDF conversion, OCR, region sorting, LLM extraction, normalization SQL and
+audit writes), rendered in the Prometheus text exposition format (0.0.4)
+for the app's /metrics endpoint.
+
+Instrumented code uses the module-level helpers:
+
+    with span("ocr_inference"):
+        results = self._ocr.ocr(image)
+    increment(PAGES_TOTAL, source="ocr")
+
+With METRICS_ENABLED=false, span() returns a shared no-op context manager
+and increment()/observe_stage() return immediately, so instrumentation costs
+one function call per site.
+
+Metrics are kept per process. ParallelOCRExecutor workers run their tasks
+inside collect_stages() and return the durations with the result; the
+parent records them with observe_stage().
+"""
+
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Metric names
+STAGE_SECONDS = "document_pipeline_stage_seconds"
+PAGES_TOTAL = "document_pipeline_pages_total"
+OCR_CACHE_TOTAL = "document_pipeline_ocr_cache_total"
+LLM_REQUESTS_TOTAL = "document_pipeline_llm_requests_total"
+NORMALIZED_PARAMETERS_TOTAL = "document_pipeline_normalized_parameters_total"
+
+# Counters registered up front: name -> (help, label names)
+PIPELINE_COUNTERS = {
+    PAGES_TOTAL: ("Pages extracted, by source (text_layer or ocr)", ("source",)),
+    OCR_CACHE_TOTAL: ("OCR cache lookups, by result (hit or miss)", ("result",)),
+    LLM_REQUESTS_TOTAL: ("Structured extractions, by result (success, error or cached)", ("result",)),
+    NORMALIZED_PARAMETERS_TOTAL: (
+        "Parameters through normalization, by status (normalized, flagged, or failed when rolled back)",
+        ("status",)
+    ),
+}
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value the way Prometheus expects."""
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(labels: Sequence[Tuple[str, str]]) -> str:
+    """Format label pairs as {name="value",...}; empty string if none."""
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(name, value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for name, value in labels
+    )
+    return "{" + pairs + "}"
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    TYPE = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def inc(self, amount: float = 1, **labels):
+        """
+        Add to the counter
+
+        Args:
+            amount: Non-negative increment
+            **labels: Label values, one per label name
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        """Current value for the given labels (0 if never incremented)."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> Iterator[Tuple[str, List[Tuple[str, str]], float]]:
+        """Yield (sample name, label pairs, value) tuples."""
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield self.name, list(zip(self.labelnames, key)), value
+
+
+class Histogram:
+    """Bucketed distribution of observed values with optional labels"""
+
+    TYPE = "histogram"
+
+    # Seconds; spans OCR/LLM calls (seconds) down to rule lookups (sub-millisecond)
+    DEFAULT_BUCKETS = (
+        0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+        0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+    )
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(float(bound) for bound in buckets if bound != math.inf))
+        # label key -> [per-bucket counts (last is +Inf), sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def observe(self, value: float, **labels):
+        """
+        Record one observation
+
+        Args:
+            value: Observed value (seconds for latency histograms)
+            **labels: Label values, one per label name
+        """
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels) -> int:
+        """Number of observations for the given labels."""
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state[2] if state else 0
+
+    def samples(self) -> Iterator[Tuple[str, List[Tuple[str, str]], float]]:
+        """Yield cumulative _bucket, _sum and _count samples per label set."""
+        with self._lock:
+            values = sorted((key, (list(state[0]), state[1], state[2])) for key, state in self._values.items())
+        for key, (counts, total, count) in values:
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket", labels + [("le", _format_value(bound))], cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+
+class MetricsRegistry:
+    """Named counters and histograms with Prometheus text rendering"""
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        """Create a registry with the document pipeline metrics registered"""
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+        self.stage_seconds = self.histogram(
+            STAGE_SECONDS, "Time spent in each document pipeline stage", ("stage",)
+        )
+        for name, (documentation, labelnames) in PIPELINE_COUNTERS.items():
+            self.counter(name, documentation, labelnames)
+
+    @classmethod
+    def from_env(cls) -> Optional["MetricsRegistry"]:
+        """
+        Build a registry from environment variables
+
+        METRICS_ENABLED (default: true).
+
+        Returns:
+            MetricsRegistry instance, or None if metrics are disabled
+        """
+        if os.getenv("METRICS_ENABLED", "true").lower() != "true":
+            return None
+        return cls()
+
+    def _get_or_create(self, metric_class, name: str, documentation: str, labelnames: Sequence[str], **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = self._metrics[name] = metric_class(name, documentation, labelnames, **kwargs)
+        if not isinstance(metric, metric_class):
+            raise ValueError(f"Metric {name} is already registered as a {metric.TYPE}")
+        return metric
+
+    def counter(self, name: str, documentation: str = "", labelnames: Sequence[str] = ()) -> Counter:
+        """Get or register a counter."""
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str = "",
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = Histogram.DEFAULT_BUCKETS
+    ) -> Histogram:
+        """Get or register a histogram."""
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format
+
+        Returns:
+            str: HELP/TYPE lines and samples for every registered metric
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+        lines = []
+        for name, metric in metrics:
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.TYPE}")
+            for sample_name, labels, value in metric.samples():
+                lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Per-thread list that collect_stages() points spans at
+_collector = threading.local()
+
+
+class _Span:
+    """Context manager that records its duration in the stage histogram"""
+
+    __slots__ = ("histogram", "stage", "started")
+
+    def __init__(self, histogram: Histogram, stage: str):
+        self.histogram = histogram
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.started
+        self.histogram.observe(seconds, stage=self.stage)
+        stages = getattr(_collector, "stages", None)
+        if stages is not None:
+            stages.append((self.stage, seconds))
+        return False
+
+
+class _NoopSpan:
+    """Shared stand-in for _Span when metrics are disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+_shared_registry: Optional[MetricsRegistry] = None
+_shared_registry_loaded = False
+_shared_registry_lock = threading.Lock()
+
+
+def get_registry() -> Optional[MetricsRegistry]:
+    """
+    Get the process-wide metrics registry, creating it on first use
+
+    Returns:
+        MetricsRegistry, or None if METRICS_ENABLED is false
+    """
+    global _shared_registry, _shared_registry_loaded
+    if not _shared_registry_loaded:
+        with _shared_registry_lock:
+            if not _shared_registry_loaded:
+                _shared_registry = MetricsRegistry.from_env()
+                _shared_registry_loaded = True
+    return _shared_registry
+
+
+def span(stage: str):
+    """
+    Time a block into document_pipeline_stage_seconds{stage=...}
+
+    The duration is recorded whether the block returns or raises.
+
+    Args:
+        stage: Stage label (e.g. "pdf_convert", "ocr_inference", "llm_call")
+
+    Returns:
+        Context manager; a shared no-op when metrics are disabled
+    """
+    registry = _shared_registry if _shared_registry_loaded else get_registry()
+    if registry is None:
+        return _NOOP_SPAN
+    return _Span(registry.stage_seconds, stage)
+
+
+def observe_stage(stage: str, seconds: float):
+    """
+    Record a stage duration measured by the caller
+
+    Args:
+        stage: Stage label
+        seconds: Duration in seconds
+    """
+    registry = _shared_registry if _shared_registry_loaded else get_registry()
+    if registry is not None:
+        registry.stage_seconds.observe(seconds, stage=stage)
+
+
+@contextmanager
+def collect_stages() -> Iterator[List[Tuple[str, float]]]:
+    """
+    Collect the span() durations of the calling thread
+
+    Used by OCR worker processes, whose own registry is never scraped:
+    the collected pairs travel back with the task result.
+
+    Yields:
+        list: (stage, seconds) pairs, appended as spans finish (stays
+            empty when metrics are disabled)
+    """
+    previous = getattr(_collector, "stages", None)
+    _collector.stages = stages = []
+    try:
+        yield stages
+    finally:
+        _collector.stages = previous
+
+
+def increment(name: str, amount: float = 1, **labels):
+    """
+    Increment one of the PIPELINE_COUNTERS
+
+    Args:
+        name: Counter name (e.g. PAGES_TOTAL)
+        amount: Increment
+        **labels: Label values
+    """
+    registry = _shared_registry if _shared_registry_loaded else get_registry()
+    if registry is not None:
+        registry.counter(name).inc(amount, **labels)
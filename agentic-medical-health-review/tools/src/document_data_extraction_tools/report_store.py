@@ -0,0 +1,291 @@
+"""
+Lab Report Store
+
+Bulk writes for extracted lab reports, shared by the API ingestion
+pipeline and the batch ingestion CLI:
+
+- build_parameters(): extracted tests -> health_parameters rows
+- store_reports(): medical_reports and health_parameters rows for many
+  reports with two multi-row INSERTs
+- find_reports() / store_new_reports(): the same, skipping reports already
+  stored for the same user and file (resume)
+- pending_parameters(): stored parameters not normalized yet (resume)
+- normalized_parameters(): normalized values of stored reports (trend replay)
+- update_trends(): fold normalized values into the trend accumulators
+- claim_trend_updates(): mark reports as applied to the trend accumulators
+
+Normalization itself goes through normalize_batch(), which writes
+normalized_parameters and audit logs in bulk.
+"""
+
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from psycopg2.extras import execute_values
+
+
+# health_parameters.value is DECIMAL(10, 4)
+MAX_PARAMETER_VALUE = 10 ** 6
+BATCH_PAGE_SIZE = 500
+
+
+def parse_test_value(text: Any) -> Optional[float]:
+    """Numeric value of an extracted test ("<0.5", "1,200" ...), or None."""
+    try:
+        return float(str(text).strip().lstrip("<>").strip().replace(",", ""))
+    except ValueError:
+        return None
+
+
+def build_parameters(user_id: str, tests: Sequence[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Turn extracted tests into health_parameters rows
+
+    Args:
+        user_id: Owner of the report
+        tests: Extracted tests (test_name, test_value, unit, reference_range)
+
+    Returns:
+        Tuple of (parameter dicts with parameter_id, user_id, parameter_name,
+        value and unit - the normalize_batch() input format -, warnings for
+        tests that were skipped)
+    """
+    parameters = []
+    warnings = []
+    for test in tests:
+        value = parse_test_value(test.get("test_value", ""))
+        if value is None or abs(value) >= MAX_PARAMETER_VALUE:
+            warnings.append(f"Skipped value for {test.get('test_name')}: {test.get('test_value')}")
+            continue
+        parameters.append({
+            "parameter_id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "parameter_name": test["test_name"],
+            "value": value,
+            "unit": test.get("unit") or None
+        })
+    return parameters, warnings
+
+
+def store_reports(db, reports: Sequence[Dict[str, Any]]) -> List[str]:
+    """
+    Insert reports and their parameters in the caller's transaction
+
+    Args:
+        db: Open DatabaseConnection
+        reports: Dicts with user_id, file_path, report_date (datetime) and
+            parameters (from build_parameters())
+
+    Returns:
+        Report IDs, in input order
+    """
+    report_ids = [str(uuid.uuid4()) for _ in reports]
+    if not reports:
+        return report_ids
+
+    execute_values(
+        db.cursor,
+        """
+        INSERT INTO medical_reports (report_id, user_id, report_date, file_path)
+        VALUES %s
+        """,
+        [
+            (report_id, report["user_id"], report["report_date"], report["file_path"])
+            for report_id, report in zip(report_ids, reports)
+        ],
+        page_size=BATCH_PAGE_SIZE
+    )
+    rows = [
+        (p["parameter_id"], p["user_id"], p["parameter_name"], p["value"], p["unit"],
+         report["report_date"], report_id)
+        for report_id, report in zip(report_ids, reports)
+        for p in report["parameters"]
+    ]
+    if rows:
+        execute_values(
+            db.cursor,
+            """
+            INSERT INTO health_parameters (
+                parameter_id, user_id, parameter_name, value, unit,
+                timestamp, source, report_id, normalization_status
+            ) VALUES %s
+            """,
+            rows,
+            template="(%s, %s, %s, %s, %s, %s, 'report', %s, 'pending')",
+            page_size=BATCH_PAGE_SIZE
+        )
+    return report_ids
+
+
+def find_reports(db, reports: Sequence[Dict[str, Any]]) -> Dict[Tuple[str, str], str]:
+    """
+    Look up reports that are already stored
+
+    Args:
+        db: Open DatabaseConnection
+        reports: Dicts with user_id and file_path
+
+    Returns:
+        Report ID per (user_id, file_path) found (the earliest if several)
+    """
+    if not reports:
+        return {}
+    db.cursor.execute(
+        """
+        SELECT DISTINCT ON (user_id, file_path) user_id::text, file_path, report_id::text
+        FROM medical_reports
+        WHERE (user_id, file_path) IN (SELECT * FROM unnest(%s::uuid[], %s::text[]))
+        ORDER BY user_id, file_path, created_at
+        """,
+        ([str(report["user_id"]) for report in reports], [report["file_path"] for report in reports])
+    )
+    return {
+        (row["user_id"], row["file_path"]): row["report_id"]
+        for row in db.cursor.fetchall()
+    }
+
+
+def store_new_reports(db, reports: Sequence[Dict[str, Any]]) -> List[Tuple[str, List[Dict[str, Any]]]]:
+    """
+    Insert the reports that are not stored yet, in the caller's transaction
+
+    A report already stored for the same user and file (by a run that was
+    interrupted before recording it) is not inserted again; its parameters
+    that are still pending normalization are returned instead of the
+    extracted ones.
+
+    Args:
+        db: Open DatabaseConnection
+        reports: store_reports() input
+
+    Returns:
+        (report_id, parameters to normalize) per report, in input order
+    """
+    existing = find_reports(db, reports)
+    new = [report for report in reports if (str(report["user_id"]), report["file_path"]) not in existing]
+    new_ids = iter(store_reports(db, new))
+    pending: Dict[str, List[Dict[str, Any]]] = {}
+    for parameter in pending_parameters(db, list(existing.values())):
+        pending.setdefault(parameter["report_id"], []).append(parameter)
+
+    stored = []
+    for report in reports:
+        report_id = existing.get((str(report["user_id"]), report["file_path"]))
+        if report_id is None:
+            stored.append((next(new_ids), report["parameters"]))
+        else:
+            stored.append((report_id, pending.get(report_id, [])))
+    return stored
+
+
+def pending_parameters(db, report_ids: Sequence[str]) -> List[Dict[str, Any]]:
+    """
+    Parameters of the given reports that are still waiting for normalization
+
+    Args:
+        db: Open DatabaseConnection
+        report_ids: Report IDs
+
+    Returns:
+        Parameter dicts (normalize_batch() format plus report_id and timestamp)
+    """
+    if not report_ids:
+        return []
+    db.cursor.execute(
+        """
+        SELECT parameter_id::text, user_id::text, parameter_name, value, unit,
+               report_id::text, timestamp
+        FROM health_parameters
+        WHERE report_id = ANY(%s::uuid[]) AND normalization_status = 'pending'
+        """,
+        (list(report_ids),)
+    )
+    return [
+        {**row, "value": float(row["value"])}
+        for row in db.cursor.fetchall()
+    ]
+
+
+def normalized_parameters(db, report_ids: Sequence[str]) -> List[Dict[str, Any]]:
+    """
+    Normalized parameters of the given reports, for replaying trend updates
+
+    Args:
+        db: Open DatabaseConnection
+        report_ids: Report IDs
+
+    Returns:
+        normalize_batch() normalized_parameter dicts (the keys update_trends()
+        reads) plus the measurement timestamp
+    """
+    if not report_ids:
+        return []
+    db.cursor.execute(
+        """
+        SELECT np.original_parameter_id::text, np.user_id::text, np.canonical_name,
+               np.normalized_value, hp.timestamp
+        FROM normalized_parameters np
+        JOIN health_parameters hp ON hp.parameter_id = np.original_parameter_id
+        WHERE hp.report_id = ANY(%s::uuid[])
+        """,
+        (list(report_ids),)
+    )
+    return [
+        {**row, "normalized_value": float(row["normalized_value"])}
+        for row in db.cursor.fetchall()
+    ]
+
+
+def update_trends(db, normalized: Sequence[Dict[str, Any]], timestamps: Dict[str, datetime]) -> Dict[Tuple[str, str], str]:
+    """
+    Add normalized values to their (user, parameter) trend accumulators
+
+    Args:
+        db: Open DatabaseConnection
+        normalized: normalize_batch() normalized_parameter dicts
+        timestamps: Measurement time per original parameter_id
+
+    Returns:
+        Trend type per (user_id, canonical_name)
+    """
+    from tools.src.analysis_computation_tools.trend_accumulator import update_trend
+
+    points: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    for parameter in normalized:
+        points.setdefault((parameter["user_id"], parameter["canonical_name"]), []).append({
+            "value": parameter["normalized_value"],
+            "timestamp": timestamps[parameter["original_parameter_id"]]
+        })
+    return {
+        key: update_trend(key[0], key[1], data_points, db)["trend_type"]
+        for key, data_points in points.items()
+    }
+
+
+def claim_trend_updates(db, report_ids: Sequence[str]) -> List[str]:
+    """
+    Mark reports as applied to the trend accumulators
+
+    Call in the same transaction as update_trends(), with only the values
+    of the returned reports, so a report is never added twice.
+
+    Args:
+        db: Open DatabaseConnection
+        report_ids: Report IDs
+
+    Returns:
+        The report IDs that were not marked yet
+    """
+    if not report_ids:
+        return []
+    db.cursor.execute(
+        """
+        INSERT INTO report_trend_updates (report_id)
+        SELECT DISTINCT unnest(%s::uuid[])
+        ON CONFLICT (report_id) DO NOTHING
+        RETURNING report_id::text
+        """,
+        (list(report_ids),)
+    )
+    return [row["report_id"] for row in db.cursor.fetchall()]
@@ -0,0 +1,352 @@
+"""
+Patient Record Store
+
+Crash-safe storage for validated intake records under
+patient_data_exports/<user_id>/. Two layouts are supported:
+
+- "files" (default): one pretty-printed record_<timestamp>.json per record,
+  as before. Each file is written to a temporary name and hard-linked into
+  place, so readers never see a partial record.
+- "jsonl": one append-only records.jsonl segment per user with a
+  records.idx offset index (record key, byte offset, length), so a day's
+  intakes for a user append to one file and any record is read back with a
+  single seek.
+
+Records are never replaced: saving under a key the user already has stores
+the record under <key>_2 (then _3, ...) in both layouts.
+
+Writers take a per-user file lock (fcntl on POSIX, msvcrt on Windows), so
+concurrent intakes from several threads or processes never interleave or
+lose records. fsync can be batched: pending writes are forced to disk every
+`fsync_every` records and on flush()/close(); a crash can then lose the
+records written since the last fsync, but never corrupts earlier ones. In
+the "files" layout each record is fsynced before it is linked, so a visible
+record file is never empty; only the directory fsyncs are batched there.
+With fsync_every=0 flushing is left to the OS and nothing is tracked.
+"""
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def _file_lock(path: str):
+    """Hold an exclusive inter-process lock on `path` (created if missing)."""
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _fsync_path(path: str, directory: bool = False):
+    """fsync a file or (on POSIX) a directory by path."""
+    if directory and os.name == "nt":
+        return
+    fd = os.open(path, os.O_RDONLY if directory else os.O_RDWR)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class PatientRecordStore:
+    """Per-user record storage with file locking, atomic writes and batched fsync"""
+
+    FORMATS = ("files", "jsonl")
+    SEGMENT_NAME = "records.jsonl"
+    INDEX_NAME = "records.idx"
+    LOCK_NAME = ".lock"
+
+    def __init__(self, root: str = "patient_data_exports", format: str = "files", fsync_every: int = 1):
+        """
+        Initialize the store
+
+        Args:
+            root: Directory holding one sub-directory per user
+            format: "files" (one JSON file per record) or "jsonl" (append-only segment + index)
+            fsync_every: Records written between fsyncs (1: every record, 0: leave it to the OS)
+        """
+        if format not in self.FORMATS:
+            raise ValueError(f"Unknown record store format: {format} (expected one of {self.FORMATS})")
+        self.root = root
+        self.format = format
+        self.fsync_every = fsync_every
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._pending_files: Set[str] = set()
+        self._pending_dirs: Set[str] = set()
+        # user directory -> (next segment offset, index size, record keys) after our last append
+        self._tails: Dict[str, Tuple[int, int, Set[str]]] = {}
+
+    @classmethod
+    def from_env(cls) -> "PatientRecordStore":
+        """
+        Build a store from environment variables
+
+        PATIENT_EXPORT_DIR (default: patient_data_exports),
+        PATIENT_EXPORT_FORMAT (default: files), PATIENT_EXPORT_FSYNC_EVERY (default: 1).
+
+        Returns:
+            PatientRecordStore instance
+        """
+        return cls(
+            root=os.getenv("PATIENT_EXPORT_DIR", "patient_data_exports"),
+            format=os.getenv("PATIENT_EXPORT_FORMAT", "files").lower(),
+            fsync_every=int(os.getenv("PATIENT_EXPORT_FSYNC_EVERY", "1"))
+        )
+
+    def user_dir(self, user_id: str) -> str:
+        """Directory holding a user's records"""
+        return os.path.join(self.root, user_id)
+
+    def save(self, user_id: str, record_key: str, record: Dict[str, Any]) -> str:
+        """
+        Store one record
+
+        Args:
+            user_id: User ID
+            record_key: Unique key of the record within the user (e.g. its timestamp);
+                if the user already has a record under it, <record_key>_2
+                (then _3, ...) is used instead
+            record: JSON-serializable record
+
+        Returns:
+            Path of the file the record was written to
+        """
+        directory = self.user_dir(user_id)
+        new_dir = not os.path.isdir(directory)
+        os.makedirs(directory, exist_ok=True)
+
+        with self._lock, _file_lock(os.path.join(directory, self.LOCK_NAME)):
+            if self.format == "files":
+                path = self._write_file(directory, record_key, record)
+            else:
+                path = self._append_segment(directory, record_key, record)
+
+            if new_dir and self.fsync_every:
+                self._pending_dirs.add(self.root)
+            self._unsynced += 1
+            if self.fsync_every and self._unsynced >= self.fsync_every:
+                self._sync()
+        return path
+
+    def read(self, user_id: str, record_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Read one record
+
+        Args:
+            user_id: User ID
+            record_key: Record key given to save()
+
+        Returns:
+            Record dict, or None if not stored
+        """
+        directory = self.user_dir(user_id)
+        if self.format == "files":
+            path = os.path.join(directory, f"record_{record_key}.json")
+            if not os.path.exists(path):
+                return None
+            with open(path, "r") as f:
+                return json.load(f)
+
+        for key, offset, length in self._read_index(directory):
+            if key == record_key:
+                with open(os.path.join(directory, self.SEGMENT_NAME), "rb") as f:
+                    f.seek(offset)
+                    return json.loads(f.read(length))
+        return None
+
+    def iter_records(self, user_id: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Iterate over a user's records in write order
+
+        Args:
+            user_id: User ID
+
+        Yields:
+            Tuples of (record_key, record)
+        """
+        directory = self.user_dir(user_id)
+        if not os.path.isdir(directory):
+            return
+        if self.format == "files":
+            for name in sorted(os.listdir(directory)):
+                if name.startswith("record_") and name.endswith(".json"):
+                    with open(os.path.join(directory, name), "r") as f:
+                        yield name[len("record_"):-len(".json")], json.load(f)
+            return
+
+        index = self._read_index(directory)
+        if not index:
+            return
+        with open(os.path.join(directory, self.SEGMENT_NAME), "rb") as f:
+            for key, offset, length in index:
+                f.seek(offset)
+                yield key, json.loads(f.read(length))
+
+    def flush(self):
+        """fsync every record written since the last fsync"""
+        with self._lock:
+            self._sync()
+
+    def close(self):
+        """Flush pending records"""
+        self.flush()
+
+    @staticmethod
+    def _candidate_keys(record_key: str) -> Iterator[str]:
+        """record_key, then record_key_2, record_key_3, ... until one is free."""
+        yield record_key
+        n = 2
+        while True:
+            yield f"{record_key}_{n}"
+            n += 1
+
+    def _write_file(self, directory: str, record_key: str, record: Dict[str, Any]) -> str:
+        """Write record_<key>.json via a temporary file and an atomic, no-clobber hard link."""
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".record_", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(record, f, indent=2)
+                if self.fsync_every:
+                    # The data is durable before the link makes it visible
+                    f.flush()
+                    os.fsync(f.fileno())
+            for key in self._candidate_keys(record_key):
+                path = os.path.join(directory, f"record_{key}.json")
+                try:
+                    # Unlike a rename, a link fails instead of replacing an existing record
+                    os.link(tmp_path, path)
+                    break
+                except FileExistsError:
+                    continue
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        if self.fsync_every:
+            # The link itself becomes durable with the (batched) directory fsync
+            self._pending_dirs.add(directory)
+        return path
+
+    def _append_segment(self, directory: str, record_key: str, record: Dict[str, Any]) -> str:
+        """Append the record to records.jsonl, then its entry to records.idx."""
+        segment_path = os.path.join(directory, self.SEGMENT_NAME)
+        index_path = os.path.join(directory, self.INDEX_NAME)
+        line = json.dumps(record, separators=(",", ":")).encode("utf-8")
+
+        offset, index_size, keys = self._index_tail(directory)
+        record_key = next(key for key in self._candidate_keys(record_key) if key not in keys)
+
+        with open(segment_path, "ab") as segment:
+            # Anything past the last indexed record is a tail a crash left
+            # behind before its index entry was written; it was never acknowledged
+            if segment.seek(0, os.SEEK_END) != offset:
+                segment.truncate(offset)
+            segment.write(line + b"\n")
+        with open(index_path, "ab") as index_file:
+            if index_file.seek(0, os.SEEK_END) != index_size:
+                index_file.truncate(index_size)
+            entry = f"{record_key}\t{offset}\t{len(line)}\n".encode("utf-8")
+            index_file.write(entry)
+
+        keys.add(record_key)
+        self._tails[directory] = (offset + len(line) + 1, index_size + len(entry), keys)
+        if self.fsync_every:
+            self._pending_files.update((segment_path, index_path))
+        return segment_path
+
+    def _index_tail(self, directory: str) -> Tuple[int, int, Set[str]]:
+        """
+        Segment offset for the next record, byte size of the complete index
+        and the record keys in it
+
+        Cached per user and re-read only when another writer changed the index.
+        """
+        index_path = os.path.join(directory, self.INDEX_NAME)
+        size = os.path.getsize(index_path) if os.path.exists(index_path) else 0
+        cached = self._tails.get(directory)
+        if cached is not None and cached[1] == size:
+            return cached
+        index, index_size = self._load_index(directory)
+        offset = index[-1][1] + index[-1][2] + 1 if index else 0
+        return offset, index_size, {key for key, _, _ in index}
+
+    def _read_index(self, directory: str) -> List[Tuple[str, int, int]]:
+        """Complete entries of records.idx."""
+        return self._load_index(directory)[0]
+
+    def _load_index(self, directory: str) -> Tuple[List[Tuple[str, int, int]], int]:
+        """
+        Parse records.idx
+
+        Returns:
+            Tuple of (entries as (record_key, offset, length), byte size of
+            the complete entries; a torn last line is excluded)
+        """
+        index_path = os.path.join(directory, self.INDEX_NAME)
+        if not os.path.exists(index_path):
+            return [], 0
+        entries = []
+        size = 0
+        with open(index_path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                key, offset, length = line.decode("utf-8").rstrip("\n").split("\t")
+                entries.append((key, int(offset), int(length)))
+                size += len(line)
+        return entries, size
+
+    def _sync(self):
+        """fsync pending files and directories (caller holds self._lock)."""
+        if self.fsync_every:
+            for path in self._pending_files:
+                _fsync_path(path)
+            for path in self._pending_dirs:
+                _fsync_path(path, directory=True)
+        self._pending_files.clear()
+        self._pending_dirs.clear()
+        self._unsynced = 0
+
+
+_store: Optional[PatientRecordStore] = None
+_store_lock = threading.Lock()
+
+
+def get_record_store() -> PatientRecordStore:
+    """
+    Get the process-wide record store, creating it on first use
+
+    Pending records are flushed at interpreter exit.
+
+    Returns:
+        PatientRecordStore (configured from the environment)
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = PatientRecordStore.from_env()
+                atexit.register(_store.close)
+    return _store
@@ -0,0 +1,297 @@
+"""
+Patient Registry
+
+SQLite-backed registry of intake patients, replacing the user_registry.json
+file that was loaded, scanned and rewritten in full on every intake.
+
+Patients are looked up through an index on (name_lower, age,
+gender_lower), and each registration is a single transaction, so lookups
+and writes do not grow with the number of registered patients and a crash
+never leaves a half-written registry. An existing user_registry.json is
+imported the first time the registry is opened.
+
+As with the JSON file, several user IDs may share a name, age and gender
+(registered directly or through update()); lookups return the first one
+registered.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class PatientRegistry:
+    """Patient registry stored in an SQLite database"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS patients (
+            user_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            name_lower TEXT NOT NULL,
+            age INTEGER NOT NULL,
+            gender TEXT NOT NULL,
+            gender_lower TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            records_count INTEGER NOT NULL DEFAULT 0,
+            last_updated TEXT
+        );
+        DROP INDEX IF EXISTS idx_patients_identity;
+        CREATE INDEX IF NOT EXISTS idx_patients_identity_lookup
+            ON patients (name_lower, age, gender_lower);
+    """
+
+    # Fields of a patient entry, in user_registry.json order
+    ENTRY_FIELDS = ('name', 'age', 'gender', 'created_at', 'records_count', 'last_updated')
+
+    def __init__(self, path: str = "user_registry.db", legacy_json_path: Optional[str] = "user_registry.json"):
+        """
+        Open (and create if needed) the registry database
+
+        Args:
+            path: SQLite database file (":memory:" for a private in-memory registry)
+            legacy_json_path: user_registry.json to import when the registry is empty
+                (None to skip the import)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+
+        if legacy_json_path and os.path.exists(legacy_json_path) and len(self) == 0:
+            self.import_json(legacy_json_path)
+
+    @classmethod
+    def from_env(cls) -> "PatientRegistry":
+        """
+        Build a registry from environment variables
+
+        PATIENT_REGISTRY_PATH (default: user_registry.db),
+        PATIENT_REGISTRY_LEGACY_JSON (default: user_registry.json).
+
+        Returns:
+            PatientRegistry instance
+        """
+        return cls(
+            path=os.getenv("PATIENT_REGISTRY_PATH", "user_registry.db"),
+            legacy_json_path=os.getenv("PATIENT_REGISTRY_LEGACY_JSON", "user_registry.json")
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM patients").fetchone()[0]
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+    def find(self, name: str, age: int, gender: str) -> Optional[str]:
+        """
+        Look up a patient by exact (case-insensitive) name, age and gender
+
+        Args:
+            name: Patient name
+            age: Patient age
+            gender: Patient gender
+
+        Returns:
+            User ID if the patient exists (the first registered if several
+            share the identity), None otherwise
+        """
+        with self._lock:
+            return self._find(name, age, gender)
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a patient entry
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            Entry dict (user_registry.json format), or None if unknown
+        """
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(self.ENTRY_FIELDS)} FROM patients WHERE user_id = ?",
+                (user_id,)
+            ).fetchone()
+        return self._entry(row) if row is not None else None
+
+    def register(self, user_id: str, name: str, age: int, gender: str) -> None:
+        """
+        Add a record to a patient, creating the patient if needed
+
+        Args:
+            user_id: Unique user ID
+            name: Patient name
+            age: Patient age
+            gender: Patient gender
+        """
+        with self._lock, self._transaction():
+            self._register(user_id, name, age, gender)
+
+    def register_visit(
+        self,
+        name: str,
+        age: int,
+        gender: str,
+        new_user_id: Callable[[], str]
+    ) -> Tuple[str, bool]:
+        """
+        Find or create a patient and add a record, in one transaction
+
+        Args:
+            name: Patient name
+            age: Patient age
+            gender: Patient gender
+            new_user_id: Called for the user ID of a new patient
+
+        Returns:
+            Tuple of (user_id, is_new_patient)
+        """
+        with self._lock, self._transaction():
+            user_id = self._find(name, age, gender)
+            is_new = user_id is None
+            if is_new:
+                user_id = new_user_id()
+            self._register(user_id, name, age, gender)
+        return user_id, is_new
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Export every patient
+
+        Returns:
+            Dictionary mapping user_id to patient info (user_registry.json format)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT user_id, {', '.join(self.ENTRY_FIELDS)} FROM patients ORDER BY rowid"
+            ).fetchall()
+        return {row['user_id']: self._entry(row) for row in rows}
+
+    def update(self, registry: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Insert or replace patient entries
+
+        Args:
+            registry: Dictionary mapping user_id to patient info
+        """
+        with self._lock, self._transaction():
+            for user_id, info in registry.items():
+                self._conn.execute(
+                    """
+                    INSERT INTO patients (user_id, name, name_lower, age, gender, gender_lower,
+                                          created_at, records_count, last_updated)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (user_id) DO UPDATE SET
+                        name = excluded.name, name_lower = excluded.name_lower,
+                        age = excluded.age, gender = excluded.gender,
+                        gender_lower = excluded.gender_lower, created_at = excluded.created_at,
+                        records_count = excluded.records_count, last_updated = excluded.last_updated
+                    """,
+                    self._row(user_id, info)
+                )
+
+    def import_json(self, json_path: str) -> int:
+        """
+        Import a user_registry.json file
+
+        Patients already registered (same user ID) are kept. Entries that
+        share a name, age and gender are all imported; find() returns the
+        first one in file order, as the old linear scan did.
+
+        Args:
+            json_path: Path to user_registry.json
+
+        Returns:
+            Number of patients imported
+        """
+        with open(json_path, 'r') as f:
+            registry = json.load(f)
+        with self._lock, self._transaction():
+            before = self._conn.total_changes
+            self._conn.executemany(
+                """
+                INSERT OR IGNORE INTO patients (user_id, name, name_lower, age, gender, gender_lower,
+                                                created_at, records_count, last_updated)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [self._row(user_id, info) for user_id, info in registry.items()]
+            )
+            return self._conn.total_changes - before
+
+    @contextmanager
+    def _transaction(self):
+        """Run a write transaction: BEGIN IMMEDIATE ... COMMIT, rolled back on error."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._conn
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _find(self, name: str, age: int, gender: str) -> Optional[str]:
+        row = self._conn.execute(
+            "SELECT user_id FROM patients WHERE name_lower = ? AND age = ? AND gender_lower = ? "
+            "ORDER BY rowid LIMIT 1",
+            (name.lower(), age, gender.lower())
+        ).fetchone()
+        return row['user_id'] if row is not None else None
+
+    def _register(self, user_id: str, name: str, age: int, gender: str):
+        now = datetime.now().isoformat()
+        self._conn.execute(
+            """
+            INSERT INTO patients (user_id, name, name_lower, age, gender, gender_lower,
+                                  created_at, records_count, last_updated)
+            VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?)
+            ON CONFLICT (user_id) DO UPDATE SET
+                records_count = records_count + 1,
+                last_updated = excluded.last_updated
+            """,
+            (user_id, name, name.lower(), age, gender, gender.lower(), now, now)
+        )
+
+    @staticmethod
+    def _row(user_id: str, info: Dict[str, Any]) -> tuple:
+        return (
+            user_id, info['name'], info['name'].lower(), info['age'], info['gender'],
+            info['gender'].lower(), info.get('created_at') or datetime.now().isoformat(),
+            info.get('records_count', 0), info.get('last_updated')
+        )
+
+    def _entry(self, row: sqlite3.Row) -> Dict[str, Any]:
+        entry = {field: row[field] for field in self.ENTRY_FIELDS}
+        if entry['last_updated'] is None:
+            del entry['last_updated']
+        return entry
+
+
+_registry: Optional[PatientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_patient_registry() -> PatientRegistry:
+    """
+    Get the process-wide patient registry, opening it on first use
+
+    Returns:
+        PatientRegistry (configured from the environment)
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = PatientRegistry.from_env()
+    return _registry
@@ -9,12 +9,14 @@ Lab reports are handled by a separate tool.
 from typing import Optional, Dict, Any, Tuple
 from pydantic import BaseModel, Field, field_validator
 import json
-import os
 from datetime import datetime
 import uuid
 import argparse
 import sys
 
+from tools.src.intake_validation_tools.patient_record_store import get_record_store
+from tools.src.intake_validation_tools.patient_registry import get_patient_registry
+
 
 class UserIDSchema(BaseModel):
     """Schema for USER_ID field validation"""
@@ -290,33 +292,28 @@ def display_input_summary(user_input: Dict[str, Any]) -> None:
 
 def load_user_registry() -> Dict[str, Any]:
     """
-    Load user registry from JSON file.
+    Load the full user registry.
     
     Returns:
         Dictionary mapping user_id to patient info
     """
-    registry_path = "user_registry.json"
-    if os.path.exists(registry_path):
-        with open(registry_path, 'r') as f:
-            return json.load(f)
-    return {}
+    return get_patient_registry().to_dict()
 
 
 def save_user_registry(registry: Dict[str, Any]) -> None:
     """
-    Save user registry to JSON file.
+    Save user registry entries (inserted or replaced by user_id).
     
     Args:
         registry: User registry dictionary
     """
-    with open("user_registry.json", 'w') as f:
-        json.dump(registry, f, indent=2)
+    get_patient_registry().update(registry)
 
 
 def check_existing_patient(name: str, age: int, gender: str) -> Optional[str]:
     """
     Check if patient already exists in registry.
-    Uses exact match on name, age, and gender.
+    Uses exact match on name, age, and gender (indexed lookup).
     
     Args:
         name: Patient name
@@ -326,15 +323,7 @@ def check_existing_patient(name: str, age: int, gender: str) -> Optional[str]:
     Returns:
         User ID if patient exists, None otherwise
     """
-    registry = load_user_registry()
-    
-    for user_id, patient_info in registry.items():
-        if (patient_info['name'].lower() == name.lower() and
-            patient_info['age'] == age and
-            patient_info['gender'].lower() == gender.lower()):
-            return user_id
-    
-    return None
+    return get_patient_registry().find(name, age, gender)
 
 
 def generate_user_id() -> str:
@@ -358,22 +347,7 @@ def register_patient(user_id: str, name: str, age: int, gender: str, is_new: boo
         gender: Patient gender
         is_new: Whether this is a new patient registration
     """
-    registry = load_user_registry()
-    
-    if user_id not in registry:
-        registry[user_id] = {
-            "name": name,
-            "age": age,
-            "gender": gender,
-            "created_at": datetime.now().isoformat(),
-            "records_count": 0
-        }
-    
-    # Update records count
-    registry[user_id]['records_count'] = registry[user_id].get('records_count', 0) + 1
-    registry[user_id]['last_updated'] = datetime.now().isoformat()
-    
-    save_user_registry(registry)
+    get_patient_registry().register(user_id, name, age, gender)
 
 
 def save_validation_to_json(result: Dict[str, Any], patient_data: Dict[str, Any]) -> Tuple[str, str, bool]:
@@ -397,28 +371,11 @@ def save_validation_to_json(result: Dict[str, Any], patient_data: Dict[str, Any]
     age = patient_data['age']
     gender = patient_data['gender']
     
-    # Check if patient already exists
-    existing_user_id = check_existing_patient(name, age, gender)
-    
-    if existing_user_id:
-        user_id = existing_user_id
-        is_new_patient = False
-    else:
-        user_id = generate_user_id()
-        is_new_patient = True
-    
-    # Register/update patient in registry
-    register_patient(user_id, name, age, gender, is_new_patient)
-    
-    # Create user-specific directory
-    output_dir = os.path.join("patient_data_exports", user_id)
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    # Reuse the User ID of an existing patient, or register a new one
+    user_id, is_new_patient = get_patient_registry().register_visit(name, age, gender, generate_user_id)
     
-    # Generate timestamped record filename (UNIQUE: USER_ID + TIMESTAMP)
+    # Generate timestamped record key (UNIQUE: USER_ID + TIMESTAMP)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S%f")[:-3]  # Include milliseconds for uniqueness
-    filename = f"record_{timestamp}.json"
-    filepath = os.path.join(output_dir, filename)
     
     # Add User ID and timestamp metadata to the export
     export_data = {
@@ -438,9 +395,8 @@ def save_validation_to_json(result: Dict[str, Any], patient_data: Dict[str, Any]
         "data": result['validated_data']
     }
     
-    # Save to JSON file
-    with open(filepath, 'w') as f:
-        json.dump(export_data, f, indent=2)
+    # Save under patient_data_exports/<user_id>/ (locked, atomic write)
+    filepath = get_record_store().save(user_id, timestamp, export_data)
     
     return filepath, user_id, is_new_patient
 
@@ -521,7 +477,7 @@ if __name__ == "__main__":
                 print(f"   New record added to patient history")
             
             print(f"\n📁 Record saved to: {json_filepath}")
-            print(f"   History Location: patient_data_exports/{user_id}/")
+            print(f"   History Location: {get_record_store().user_dir(user_id)}/")
             print("\nThis record has been added to the patient's permanent history.")
             print("All records are uniquely identified by USER_ID + TIMESTAMP.")
             print("=" * 80)
@@ -0,0 +1,43 @@
+-- Incremental trend state
+-- Running regression sums per (user, parameter), so a new measurement updates
+-- its trend in constant time instead of recomputing from all history.
+-- Maintained by tools/src/analysis_computation_tools/trend_accumulator.py
+
+CREATE TABLE trend_accumulators (
+    user_id UUID NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    canonical_name VARCHAR(255) NOT NULL,
+    point_count BIGINT NOT NULL DEFAULT 0,
+    origin_day DOUBLE PRECISION,
+    sum_t DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sum_v DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sum_tt DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sum_tv DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sum_vv DOUBLE PRECISION NOT NULL DEFAULT 0,
+    first_day DOUBLE PRECISION,
+    first_value DOUBLE PRECISION,
+    last_day DOUBLE PRECISION,
+    last_value DOUBLE PRECISION,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, canonical_name)
+);
+
+-- Reports whose normalized values are already in the accumulators. Written in
+-- the same transaction as the accumulator update, so a resumed batch ingest
+-- never adds a report's values twice.
+CREATE TABLE report_trend_updates (
+    report_id UUID PRIMARY KEY REFERENCES medical_reports(report_id) ON DELETE CASCADE,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- ============================================================================
+-- COMMENTS
+-- ============================================================================
+
+COMMENT ON TABLE trend_accumulators IS 'Running sums for incremental trend computation, one row per user and canonical parameter';
+COMMENT ON TABLE report_trend_updates IS 'Reports whose normalized values have been added to trend_accumulators';
+
+COMMENT ON COLUMN trend_accumulators.origin_day IS 'Time origin (days since Unix epoch) of t in the sums; the first measurement received';
+COMMENT ON COLUMN trend_accumulators.sum_t IS 'Sum of t, days since origin_day';
+COMMENT ON COLUMN trend_accumulators.sum_tv IS 'Sum of t * value';
+COMMENT ON COLUMN trend_accumulators.first_day IS 'Time (days since Unix epoch) of the earliest measurement';
+COMMENT ON COLUMN trend_accumulators.last_day IS 'Time (days since Unix epoch) of the latest measurement';